@@ -1,18 +1,51 @@
 import streamlit as st
+import matplotlib
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import matplotlib.ticker as ticker
 from matplotlib.ticker import FuncFormatter
 import numpy as np
 import pandas as pd
+import time
 import seaborn as sns
-import plotly.express as px
-import altair as alt
 from mpl_toolkits.mplot3d import Axes3D
 
 # --- 配置中文字体（必须在导入后立即设置）---
-from catalogs.utils import setup_chinese_font, generate_sample_data, ensure_chinese_font
+from catalogs.utils import (
+    setup_chinese_font, generate_sample_data, ensure_chinese_font,
+    generate_large_series, generate_large_scatter, lazy_tabs, is_tab_open
+)
+from catalogs.decimation import DECIMATION_METHODS, plot_decimated
+from catalogs.density import DENSITY_NORMS, density_scatter, benchmark_scatter_modes
+from catalogs.animation import get_animation, get_animation_formats
+from catalogs.geometry import wave_segments, hexagon_wave, time_line_rendering
+from catalogs.layout_cache import tight_layout
+from catalogs.render_policy import apply_render_policy, format_render_decision, show_figure
+from catalogs.encoders import get_output_settings, render_output_settings, render_encode_stats
+from catalogs.render_cache import DEFAULT_SAVEFIG_OPTIONS, figure_to_png
 from catalogs.interactive_editor import render_interactive_editor
+from catalogs.color import get_colormap_strip_png
+from catalogs.style_gallery import render_style_gallery
+from catalogs.rc_isolation import isolated_style, locked_figure, locked_subplots
+from catalogs.image_pyramid import render_image_pyramid_demo
+from catalogs.surface import (
+    DEFAULT_RESOLUTION, SURFACE_FUNCTIONS, SURFACE_RESOLUTIONS, choose_resolution, format_surface_readout,
+    get_mesh_cache_info, get_surface_mesh, get_timing_model, plot_lod_surface, predict_render_seconds,
+    record_surface_timing
+)
+from catalogs.vector_field import (
+    FIELD_GRID_SIZES, STREAM_DENSITIES, VECTOR_FIELDS, add_cached_streamplot, get_field, get_field_cache_info,
+    get_stream_geometry
+)
+from catalogs.contour_cache import (
+    CONTOUR_FUNCTIONS, CONTOUR_GRID_SIZES, add_cached_contour, get_contour_cache_info, get_contour_geometry
+)
+from catalogs.libraries import (
+    JOINTPLOT_KINDS, get_iris_data, get_numeric_columns,
+    get_jointplot_png, get_cached_jointplot_count, start_jointplot_precompute,
+    get_altair_basic_spec, get_altair_brush_spec, get_altair_combined_spec,
+    get_plotly_scatter_3d_spec, get_plotly_line_spec, get_plotly_density_heatmap_spec
+)
 setup_chinese_font()
 
 # --- 页面配置 ---
@@ -353,6 +386,7 @@ menu = st.sidebar.radio(
         "8. 小白交互编辑练习"
     ]
 )
+render_output_settings()
 
 # --- 辅助函数：生成数据 ---
 @st.cache_data
@@ -364,6 +398,15 @@ def get_random_data(points=100):
         'value': np.random.rand(points) * 100
     })
 
+@st.cache_data
+def get_scatter_benchmark(sizes):
+    """缓存散点渲染基准测试结果（两种模式的耗时）"""
+    x, y = generate_large_scatter(max(sizes))
+    return pd.DataFrame(benchmark_scatter_modes(x, y, sizes))
+
+# 启动时在后台预渲染第6章的联合分布图（每个服务进程只执行一次）
+start_jointplot_precompute()
+
 # --- 章节 1: 生态全景 ---
 if menu == "1. 生态全景":
     st.title("Python 数据可视化生态全景")
@@ -617,7 +660,7 @@ ax.grid(True)
 
     with col_demo:
         if style_choice == "Pyplot (快捷模式)":
-            fig = plt.figure(figsize=(6, 4))
+            fig = locked_figure(figsize=(6, 4))
             plt.plot(x, y, label='Sine Wave', color='blue')
             plt.title("Pyplot Style")
             plt.xlabel("X Axis")
@@ -625,14 +668,14 @@ ax.grid(True)
             plt.legend()
             plt.grid(True)
         else:
-            fig, ax = plt.subplots(figsize=(6, 4))
+            fig, ax = locked_subplots(figsize=(6, 4))
             ax.plot(x, y, label='Sine Wave', color='green')
             ax.set_title("OO Style (Recommended)")
             ax.set_xlabel("X Axis")
             ax.set_ylabel("Y Axis")
             ax.legend()
             ax.grid(True)
-        st.pyplot(fig)
+        show_figure(fig)
 
     with col_code:
         st.markdown("#### 对应代码")
@@ -642,10 +685,11 @@ ax.grid(True)
     st.markdown("### 2. 解构画布：Figure vs Axes vs Artist")
     
     # 使用Tabs组织内容
-    core_tabs = st.tabs(["📐 核心概念", "🎨 Artist层级", "📊 坐标轴类型", "⚙️ 后端系统"])
+    core_tabs = lazy_tabs(["📐 核心概念", "🎨 Artist层级", "📊 坐标轴类型", "⚙️ 后端系统"], key="core_tabs")
     
     with core_tabs[0]:
-        st.markdown("""
+        if is_tab_open(core_tabs[0]):
+            st.markdown("""
         <div style='background-color: #f0fdf4; padding: 1.5rem; border-radius: 8px; border-left: 4px solid #22c55e;'>
             <ul style='margin: 0; padding-left: 1.5rem; color: #166534;'>
                 <li style='margin-bottom: 0.5rem;'><strong>Figure (画布)</strong>: 整个图像的容器，可以包含多个子图。</li>
@@ -656,13 +700,13 @@ ax.grid(True)
         </div>
         """, unsafe_allow_html=True)
         
-        # 可视化层级结构
-        ensure_chinese_font()
-        fig_hierarchy, ax_hierarchy = plt.subplots(figsize=(10, 6))
-        ax_hierarchy.axis('off')
+            # 可视化层级结构
+            ensure_chinese_font()
+            fig_hierarchy, ax_hierarchy = locked_subplots(figsize=(10, 6))
+            ax_hierarchy.axis('off')
         
-        # 绘制层级结构图
-        hierarchy_text = """
+            # 绘制层级结构图
+            hierarchy_text = """
         Figure (画布)
         └── Axes (坐标系)
             ├── Axis (X轴)
@@ -672,14 +716,15 @@ ax.grid(True)
             ├── Patches (形状)
             └── Collections (集合)
         """
-        ax_hierarchy.text(0.1, 0.5, hierarchy_text, fontsize=14, family='monospace',
-                         verticalalignment='center', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
-        ax_hierarchy.set_title("Matplotlib Object Hierarchy", fontsize=16, fontweight='bold', pad=20)
-        st.pyplot(fig_hierarchy)
+            ax_hierarchy.text(0.1, 0.5, hierarchy_text, fontsize=14, family='monospace',
+                             verticalalignment='center', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+            ax_hierarchy.set_title("Matplotlib Object Hierarchy", fontsize=16, fontweight='bold', pad=20)
+            show_figure(fig_hierarchy)
     
     with core_tabs[1]:
-        st.markdown("#### Artist 层级结构")
-        st.info("""
+        if is_tab_open(core_tabs[1]):
+            st.markdown("#### Artist 层级结构")
+            st.info("""
         **Artist 是 Matplotlib 中所有可见对象的基类**，包括：
         
         - **Figure**: 顶层容器
@@ -690,87 +735,88 @@ ax.grid(True)
         - **Collection**: 集合对象（如散点集合）
         """)
         
-        # Artist 示例
-        fig_artist, axes_artist = plt.subplots(2, 2, figsize=(10, 8))
-        axes_flat = axes_artist.flatten()
-        
-        # 1. Line2D
-        x = np.linspace(0, 10, 100)
-        axes_flat[0].plot(x, np.sin(x), label='Line2D')
-        axes_flat[0].set_title("Line2D Artist", fontweight='bold')
-        axes_flat[0].legend()
-        axes_flat[0].grid(True, alpha=0.3)
-        
-        # 2. Text
-        axes_flat[1].text(0.5, 0.5, 'Text Artist', fontsize=20, ha='center', va='center',
-                         bbox=dict(boxstyle='round', facecolor='lightblue'))
-        axes_flat[1].set_title("Text Artist", fontweight='bold')
-        axes_flat[1].set_xlim(0, 1)
-        axes_flat[1].set_ylim(0, 1)
-        
-        # 3. Rectangle
-        rect = patches.Rectangle((0.2, 0.2), 0.6, 0.6, facecolor='lightgreen', edgecolor='black', linewidth=2)
-        axes_flat[2].add_patch(rect)
-        axes_flat[2].set_title("Rectangle Artist", fontweight='bold')
-        axes_flat[2].set_xlim(0, 1)
-        axes_flat[2].set_ylim(0, 1)
-        
-        # 4. Collection
-        x_scatter = np.random.rand(50)
-        y_scatter = np.random.rand(50)
-        axes_flat[3].scatter(x_scatter, y_scatter, s=100, c=x_scatter, cmap='viridis')
-        axes_flat[3].set_title("Collection Artist", fontweight='bold')
-        
-        plt.tight_layout()
-        st.pyplot(fig_artist)
+            # Artist 示例
+            fig_artist, axes_artist = locked_subplots(2, 2, figsize=(10, 8))
+            axes_flat = axes_artist.flatten()
+        
+            # 1. Line2D
+            x = np.linspace(0, 10, 100)
+            axes_flat[0].plot(x, np.sin(x), label='Line2D')
+            axes_flat[0].set_title("Line2D Artist", fontweight='bold')
+            axes_flat[0].legend()
+            axes_flat[0].grid(True, alpha=0.3)
+        
+            # 2. Text
+            axes_flat[1].text(0.5, 0.5, 'Text Artist', fontsize=20, ha='center', va='center',
+                             bbox=dict(boxstyle='round', facecolor='lightblue'))
+            axes_flat[1].set_title("Text Artist", fontweight='bold')
+            axes_flat[1].set_xlim(0, 1)
+            axes_flat[1].set_ylim(0, 1)
+        
+            # 3. Rectangle
+            rect = patches.Rectangle((0.2, 0.2), 0.6, 0.6, facecolor='lightgreen', edgecolor='black', linewidth=2)
+            axes_flat[2].add_patch(rect)
+            axes_flat[2].set_title("Rectangle Artist", fontweight='bold')
+            axes_flat[2].set_xlim(0, 1)
+            axes_flat[2].set_ylim(0, 1)
+        
+            # 4. Collection
+            x_scatter = np.random.rand(50)
+            y_scatter = np.random.rand(50)
+            axes_flat[3].scatter(x_scatter, y_scatter, s=100, c=x_scatter, cmap='viridis')
+            axes_flat[3].set_title("Collection Artist", fontweight='bold')
+        
+            tight_layout()
+            show_figure(fig_artist)
     
     with core_tabs[2]:
-        st.markdown("#### 坐标轴类型 (Axis Scale)")
-        st.info("Matplotlib 支持多种坐标轴类型，适用于不同的数据分布。")
-        
-        scale_type = st.selectbox("选择坐标轴类型", 
-                                 ["linear (线性)", "log (对数)", "symlog (对称对数)", "logit (逻辑)", "function (函数)"],
-                                 key="axis_scale_type")
-        
-        ensure_chinese_font()
-        fig_scale, ax_scale = plt.subplots(figsize=(8, 5))
-        x = np.linspace(1, 1000, 1000)
-        y = np.exp(x / 100)
-        
-        if scale_type == "linear (线性)":
-            ax_scale.plot(x, y)
-            ax_scale.set_xscale('linear')
-            ax_scale.set_title("Linear Scale", fontweight='bold')
-        elif scale_type == "log (对数)":
-            ax_scale.plot(x, y)
-            ax_scale.set_xscale('log')
-            ax_scale.set_yscale('log')
-            ax_scale.set_title("Log Scale", fontweight='bold')
-        elif scale_type == "symlog (对称对数)":
-            x_sym = np.linspace(-100, 100, 200)
-            y_sym = np.sign(x_sym) * np.log10(1 + np.abs(x_sym))
-            ax_scale.plot(x_sym, y_sym)
-            ax_scale.set_xscale('symlog')
-            ax_scale.set_title("Symlog Scale", fontweight='bold')
-        elif scale_type == "logit (逻辑)":
-            x_logit = np.linspace(0.01, 0.99, 100)
-            y_logit = x_logit
-            ax_scale.plot(x_logit, y_logit)
-            ax_scale.set_xscale('logit')
-            ax_scale.set_title("Logit Scale", fontweight='bold')
-        else:  # function
-            def forward(x):
-                return x ** 2
-            def inverse(x):
-                return np.sqrt(x)
-            ax_scale.plot(x, y)
-            ax_scale.set_xscale('function', functions=(forward, inverse))
-            ax_scale.set_title("Function Scale", fontweight='bold')
-        
-        ax_scale.grid(True, alpha=0.3)
-        st.pyplot(fig_scale)
-        
-        st.code(f"""
+        if is_tab_open(core_tabs[2]):
+            st.markdown("#### 坐标轴类型 (Axis Scale)")
+            st.info("Matplotlib 支持多种坐标轴类型，适用于不同的数据分布。")
+        
+            scale_type = st.selectbox("选择坐标轴类型", 
+                                     ["linear (线性)", "log (对数)", "symlog (对称对数)", "logit (逻辑)", "function (函数)"],
+                                     key="axis_scale_type")
+        
+            ensure_chinese_font()
+            fig_scale, ax_scale = locked_subplots(figsize=(8, 5))
+            x = np.linspace(1, 1000, 1000)
+            y = np.exp(x / 100)
+        
+            if scale_type == "linear (线性)":
+                ax_scale.plot(x, y)
+                ax_scale.set_xscale('linear')
+                ax_scale.set_title("Linear Scale", fontweight='bold')
+            elif scale_type == "log (对数)":
+                ax_scale.plot(x, y)
+                ax_scale.set_xscale('log')
+                ax_scale.set_yscale('log')
+                ax_scale.set_title("Log Scale", fontweight='bold')
+            elif scale_type == "symlog (对称对数)":
+                x_sym = np.linspace(-100, 100, 200)
+                y_sym = np.sign(x_sym) * np.log10(1 + np.abs(x_sym))
+                ax_scale.plot(x_sym, y_sym)
+                ax_scale.set_xscale('symlog')
+                ax_scale.set_title("Symlog Scale", fontweight='bold')
+            elif scale_type == "logit (逻辑)":
+                x_logit = np.linspace(0.01, 0.99, 100)
+                y_logit = x_logit
+                ax_scale.plot(x_logit, y_logit)
+                ax_scale.set_xscale('logit')
+                ax_scale.set_title("Logit Scale", fontweight='bold')
+            else:  # function
+                def forward(x):
+                    return x ** 2
+                def inverse(x):
+                    return np.sqrt(x)
+                ax_scale.plot(x, y)
+                ax_scale.set_xscale('function', functions=(forward, inverse))
+                ax_scale.set_title("Function Scale", fontweight='bold')
+        
+            ax_scale.grid(True, alpha=0.3)
+            show_figure(fig_scale)
+        
+            st.code(f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -786,8 +832,9 @@ plt.show()
         """, language='python')
     
     with core_tabs[3]:
-        st.markdown("#### 后端系统 (Backend)")
-        st.info("""
+        if is_tab_open(core_tabs[3]):
+            st.markdown("#### 后端系统 (Backend)")
+            st.info("""
         Matplotlib 支持多种后端（Backend），用于渲染图形：
         
         - **TkAgg**: Tkinter 后端（桌面应用）
@@ -797,7 +844,7 @@ plt.show()
         - **SVG**: SVG 后端（生成矢量图）
         """)
         
-        backend_info = f"""
+            backend_info = f"""
         **当前后端**: {plt.get_backend()}
         
         **常用后端设置**:
@@ -808,7 +855,7 @@ plt.show()
         
         **注意**: 后端设置必须在导入 pyplot 之前完成。
         """
-        st.markdown(backend_info)
+            st.markdown(backend_info)
 
 # --- 章节 3: 基础笔触 ---
 elif menu == "3. 基础笔触":
@@ -824,186 +871,189 @@ elif menu == "3. 基础笔触":
     
     tab1, tab2, tab3, tab4 = st.tabs(["Line2D (线条)", "Patches (形状)", "Collections (散点)", "Images (图像)"])
     
+    # 每个演示面板都是独立的 fragment：拖动面板内的控件只重新运行该面板，而不是整个页面
     with tab1:
-        st.subheader("线条的艺术 (Line2D)")
-        st.caption("💡 调整下方参数，实时查看效果。点击参数旁的「查看选项」了解更多。")
-        
-        # 合并的交互式界面
-        col_ctrl, col_view = st.columns([1.2, 2])
-        
-        with col_ctrl:
-            st.markdown("#### 🎛️ 参数控制")
-            
-            # linestyle 参数
-            with st.expander("📏 线型 (linestyle)", expanded=True):
-                line_style = st.selectbox(
-                    "选择线型",
-                    ['-', '--', '-.', ':', 'None'],
-                    index=0,
-                    key="line_style",
-                    help="'-' 实线 | '--' 虚线 | '-.' 点划线 | ':' 点线"
-                )
-                if st.button("📚 查看所有选项", key="btn_linestyle"):
-                    from catalogs.line import render_linestyle_gallery
-                    render_linestyle_gallery()
-            
-            # linewidth 参数
-            with st.expander("📐 线宽 (linewidth)", expanded=True):
-                line_width = st.slider(
-                    "线宽",
-                    1, 10, 2,
-                    key="line_width",
-                    help="数值越大，线条越粗"
-                )
+        @st.fragment
+        def _line2d_panel():
+            st.subheader("线条的艺术 (Line2D)")
+            st.caption("💡 调整下方参数，实时查看效果。点击参数旁的「查看选项」了解更多。")
+        
+            # 合并的交互式界面
+            col_ctrl, col_view = st.columns([1.2, 2])
+        
+            with col_ctrl:
+                st.markdown("#### 🎛️ 参数控制")
             
-            # color 参数
-            with st.expander("🎨 颜色 (color)", expanded=True):
-                color = st.color_picker("选择颜色", "#FF5733", key="line_color")
-            
-            # marker 参数
-            with st.expander("📍 标记 (marker)", expanded=True):
-                marker = st.selectbox(
-                    "选择标记",
-                    [None, 'o', 's', '^', 'v', '<', '>', '*', '+', 'x'],
-                    key="line_marker",
-                    help="None 表示不显示标记点"
-                )
-                if st.button("📚 查看所有标记", key="btn_marker"):
-                    from catalogs.marker import render_marker_gallery
-                    render_marker_gallery()
-            
-            # drawstyle 参数
-            with st.expander("📈 绘制样式 (drawstyle)", expanded=False):
-                from catalogs.line import get_drawstyle_options
-                drawstyles = get_drawstyle_options()
-                drawstyle = st.selectbox(
-                    "选择绘制样式",
-                    list(drawstyles.keys()),
-                    index=0,
-                    key="line_drawstyle",
-                    help="控制数据点的连接方式"
-                )
-                if st.button("📚 查看绘制样式选项", key="btn_drawstyle"):
-                    from catalogs.line import render_drawstyle_gallery
-                    render_drawstyle_gallery()
-            
-            # capstyle 参数（仅对粗线有效）
-            with st.expander("🔲 线端样式 (capstyle)", expanded=False):
-                from catalogs.line import get_capstyle_options
-                capstyles = get_capstyle_options()
-                capstyle = st.selectbox(
-                    "选择线端样式",
-                    capstyles,
-                    index=0,
-                    key="line_capstyle",
-                    help="控制线条端点的形状（仅对粗线有效）"
-                )
-                if st.button("📚 查看线端样式选项", key="btn_capstyle"):
-                    from catalogs.line import render_capstyle_gallery
-                    render_capstyle_gallery()
-            
-            # joinstyle 参数（仅对折线有效）
-            with st.expander("🔗 连接样式 (joinstyle)", expanded=False):
-                from catalogs.line import get_joinstyle_options
-                joinstyles = get_joinstyle_options()
-                joinstyle = st.selectbox(
-                    "选择连接样式",
-                    joinstyles,
-                    index=0,
-                    key="line_joinstyle",
-                    help="控制线条转折处的连接方式（仅对折线有效）"
-                )
-                if st.button("📚 查看连接样式选项", key="btn_joinstyle"):
-                    from catalogs.line import render_joinstyle_gallery
-                    render_joinstyle_gallery()
-        
-        with col_view:
-            st.markdown("#### 📊 实时预览")
-            
-            # 根据参数选择合适的数据
-            # 对于 joinstyle，需要折线数据（至少3个点）才能看到效果
-            use_joinstyle_data = False
-            
-            # 如果选择了 joinstyle，需要折线数据才能看到效果
-            # 即使选择 miter（默认值），也使用折线数据以便对比
-            if joinstyle:
-                use_joinstyle_data = True
-            
-            # 根据参数选择数据
-            if use_joinstyle_data:
-                # 使用折线数据以便看清 joinstyle 效果
-                x = np.array([1, 5, 9, 13, 17])
-                y = np.array([0.2, 0.8, 0.3, 0.7, 0.4])
-            elif drawstyle != 'default':
-                # 对于 drawstyle，使用较少点数以便看清阶梯效果
-                x = np.linspace(0, 10, 15)
-                y = np.cos(x)
-            else:
-                # 默认数据
-                x = np.linspace(0, 10, 50)
-                y = np.cos(x)
+                # linestyle 参数
+                with st.expander("📏 线型 (linestyle)", expanded=True):
+                    line_style = st.selectbox(
+                        "选择线型",
+                        ['-', '--', '-.', ':', 'None'],
+                        index=0,
+                        key="line_style",
+                        help="'-' 实线 | '--' 虚线 | '-.' 点划线 | ':' 点线"
+                    )
+                    if st.button("📚 查看所有选项", key="btn_linestyle"):
+                        from catalogs.line import render_linestyle_gallery
+                        render_linestyle_gallery()
+            
+                # linewidth 参数
+                with st.expander("📐 线宽 (linewidth)", expanded=True):
+                    line_width = st.slider(
+                        "线宽",
+                        1, 10, 2,
+                        key="line_width",
+                        help="数值越大，线条越粗"
+                    )
             
-            ensure_chinese_font()
-            fig, ax = plt.subplots(figsize=(8, 5))
-            
-            # 构建 plot 参数
-            plot_kwargs = {
-                'linestyle': line_style,
-                'linewidth': line_width,
-                'color': color,
-                'drawstyle': drawstyle,
-            }
-            
-            # marker 参数：只有当 marker 不为 None 时才添加
-            if marker is not None:
-                plot_kwargs['marker'] = marker
-                # 根据线宽调整标记点大小，保持比例协调
-                plot_kwargs['markersize'] = max(6, int(line_width * 3))
-            
-            # capstyle 和 joinstyle：总是应用，但效果在粗线上更明显
-            plot_kwargs['solid_capstyle'] = capstyle
-            plot_kwargs['solid_joinstyle'] = joinstyle
-            
-            ax.plot(x, y, **plot_kwargs)
-            
-            # 如果线宽较小，显示提示信息
-            if line_width < 3 and (capstyle != 'butt' or joinstyle != 'miter'):
-                tip_text = "💡 Some effects may not be obvious when line width is small"
-                ax.text(0.02, 0.98, tip_text, 
-                       transform=ax.transAxes, fontsize=8, verticalalignment='top',
-                       bbox=dict(boxstyle='round', facecolor='#fff3cd', alpha=0.8))
-            
-            ax.set_title("Line Style Preview", fontsize=14, fontweight='bold')
-            ax.set_xlabel("X Axis", fontsize=12)
-            ax.set_ylabel("Y Axis", fontsize=12)
-            ax.grid(True, alpha=0.3)
-            st.pyplot(fig)
-            
-            # 代码生成
-            st.markdown("#### 💻 生成代码")
-            marker_str = f"'{marker}'" if marker else "None"
-            
-            # 根据实际使用的数据生成代码
-            if use_joinstyle_data:
-                data_code = "x = np.array([1, 5, 9, 13, 17])\ny = np.array([0.2, 0.8, 0.3, 0.7, 0.4])"
-            elif drawstyle != 'default':
-                data_code = "x = np.linspace(0, 10, 15)\ny = np.cos(x)"
-            else:
-                data_code = "x = np.linspace(0, 10, 50)\ny = np.cos(x)"
+                # color 参数
+                with st.expander("🎨 颜色 (color)", expanded=True):
+                    color = st.color_picker("选择颜色", "#FF5733", key="line_color")
+            
+                # marker 参数
+                with st.expander("📍 标记 (marker)", expanded=True):
+                    marker = st.selectbox(
+                        "选择标记",
+                        [None, 'o', 's', '^', 'v', '<', '>', '*', '+', 'x'],
+                        key="line_marker",
+                        help="None 表示不显示标记点"
+                    )
+                    if st.button("📚 查看所有标记", key="btn_marker"):
+                        from catalogs.marker import render_marker_gallery
+                        render_marker_gallery()
             
-            code_params = f"""    linestyle='{line_style}', 
+                # drawstyle 参数
+                with st.expander("📈 绘制样式 (drawstyle)", expanded=False):
+                    from catalogs.line import get_drawstyle_options
+                    drawstyles = get_drawstyle_options()
+                    drawstyle = st.selectbox(
+                        "选择绘制样式",
+                        list(drawstyles.keys()),
+                        index=0,
+                        key="line_drawstyle",
+                        help="控制数据点的连接方式"
+                    )
+                    if st.button("📚 查看绘制样式选项", key="btn_drawstyle"):
+                        from catalogs.line import render_drawstyle_gallery
+                        render_drawstyle_gallery()
+            
+                # capstyle 参数（仅对粗线有效）
+                with st.expander("🔲 线端样式 (capstyle)", expanded=False):
+                    from catalogs.line import get_capstyle_options
+                    capstyles = get_capstyle_options()
+                    capstyle = st.selectbox(
+                        "选择线端样式",
+                        capstyles,
+                        index=0,
+                        key="line_capstyle",
+                        help="控制线条端点的形状（仅对粗线有效）"
+                    )
+                    if st.button("📚 查看线端样式选项", key="btn_capstyle"):
+                        from catalogs.line import render_capstyle_gallery
+                        render_capstyle_gallery()
+            
+                # joinstyle 参数（仅对折线有效）
+                with st.expander("🔗 连接样式 (joinstyle)", expanded=False):
+                    from catalogs.line import get_joinstyle_options
+                    joinstyles = get_joinstyle_options()
+                    joinstyle = st.selectbox(
+                        "选择连接样式",
+                        joinstyles,
+                        index=0,
+                        key="line_joinstyle",
+                        help="控制线条转折处的连接方式（仅对折线有效）"
+                    )
+                    if st.button("📚 查看连接样式选项", key="btn_joinstyle"):
+                        from catalogs.line import render_joinstyle_gallery
+                        render_joinstyle_gallery()
+        
+            with col_view:
+                st.markdown("#### 📊 实时预览")
+            
+                # 根据参数选择合适的数据
+                # 对于 joinstyle，需要折线数据（至少3个点）才能看到效果
+                use_joinstyle_data = False
+            
+                # 如果选择了 joinstyle，需要折线数据才能看到效果
+                # 即使选择 miter（默认值），也使用折线数据以便对比
+                if joinstyle:
+                    use_joinstyle_data = True
+            
+                # 根据参数选择数据
+                if use_joinstyle_data:
+                    # 使用折线数据以便看清 joinstyle 效果
+                    x = np.array([1, 5, 9, 13, 17])
+                    y = np.array([0.2, 0.8, 0.3, 0.7, 0.4])
+                elif drawstyle != 'default':
+                    # 对于 drawstyle，使用较少点数以便看清阶梯效果
+                    x = np.linspace(0, 10, 15)
+                    y = np.cos(x)
+                else:
+                    # 默认数据
+                    x = np.linspace(0, 10, 50)
+                    y = np.cos(x)
+            
+                ensure_chinese_font()
+                fig, ax = locked_subplots(figsize=(8, 5))
+            
+                # 构建 plot 参数
+                plot_kwargs = {
+                    'linestyle': line_style,
+                    'linewidth': line_width,
+                    'color': color,
+                    'drawstyle': drawstyle,
+                }
+            
+                # marker 参数：只有当 marker 不为 None 时才添加
+                if marker is not None:
+                    plot_kwargs['marker'] = marker
+                    # 根据线宽调整标记点大小，保持比例协调
+                    plot_kwargs['markersize'] = max(6, int(line_width * 3))
+            
+                # capstyle 和 joinstyle：总是应用，但效果在粗线上更明显
+                plot_kwargs['solid_capstyle'] = capstyle
+                plot_kwargs['solid_joinstyle'] = joinstyle
+            
+                ax.plot(x, y, **plot_kwargs)
+            
+                # 如果线宽较小，显示提示信息
+                if line_width < 3 and (capstyle != 'butt' or joinstyle != 'miter'):
+                    tip_text = "💡 Some effects may not be obvious when line width is small"
+                    ax.text(0.02, 0.98, tip_text, 
+                           transform=ax.transAxes, fontsize=8, verticalalignment='top',
+                           bbox=dict(boxstyle='round', facecolor='#fff3cd', alpha=0.8))
+            
+                ax.set_title("Line Style Preview", fontsize=14, fontweight='bold')
+                ax.set_xlabel("X Axis", fontsize=12)
+                ax.set_ylabel("Y Axis", fontsize=12)
+                ax.grid(True, alpha=0.3)
+                show_figure(fig)
+            
+                # 代码生成
+                st.markdown("#### 💻 生成代码")
+                marker_str = f"'{marker}'" if marker else "None"
+            
+                # 根据实际使用的数据生成代码
+                if use_joinstyle_data:
+                    data_code = "x = np.array([1, 5, 9, 13, 17])\ny = np.array([0.2, 0.8, 0.3, 0.7, 0.4])"
+                elif drawstyle != 'default':
+                    data_code = "x = np.linspace(0, 10, 15)\ny = np.cos(x)"
+                else:
+                    data_code = "x = np.linspace(0, 10, 50)\ny = np.cos(x)"
+            
+                code_params = f"""    linestyle='{line_style}', 
     linewidth={line_width}, 
     color='{color}', 
     drawstyle='{drawstyle}',
     solid_capstyle='{capstyle}',
     solid_joinstyle='{joinstyle}'"""
             
-            # 只有当 marker 不为 None 时才添加 marker 参数
-            if marker is not None:
-                marker_size = max(6, int(line_width * 3))
-                code_params += f",\n    marker={marker_str},\n    markersize={marker_size}"
+                # 只有当 marker 不为 None 时才添加 marker 参数
+                if marker is not None:
+                    marker_size = max(6, int(line_width * 3))
+                    code_params += f",\n    marker={marker_str},\n    markersize={marker_size}"
             
-            st.code(f"""
+                st.code(f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -1020,17 +1070,85 @@ ax.grid(True, alpha=0.3)
 plt.show()
             """, language='python')
             
-            # 添加参数说明
-            if use_joinstyle_data:
-                st.info("💡 **提示**：为了展示 `joinstyle` 的效果，使用了折线数据（至少3个转折点）。")
-            if drawstyle != 'default':
-                st.info("💡 **提示**：为了展示 `drawstyle` 的阶梯效果，使用了较少的数据点。")
-            if line_width < 3 and (capstyle != 'butt' or joinstyle != 'miter'):
-                st.warning(f"⚠️ **注意**：当前线宽为 {line_width}，`capstyle` 和 `joinstyle` 的效果在细线上可能不明显。建议将线宽调整为 3-5 或更大以便看清效果。")
+                # 添加参数说明
+                if use_joinstyle_data:
+                    st.info("💡 **提示**：为了展示 `joinstyle` 的效果，使用了折线数据（至少3个转折点）。")
+                if drawstyle != 'default':
+                    st.info("💡 **提示**：为了展示 `drawstyle` 的阶梯效果，使用了较少的数据点。")
+                if line_width < 3 and (capstyle != 'butt' or joinstyle != 'miter'):
+                    st.warning(f"⚠️ **注意**：当前线宽为 {line_width}，`capstyle` 和 `joinstyle` 的效果在细线上可能不明显。建议将线宽调整为 3-5 或更大以便看清效果。")
+        
+        _line2d_panel()
+
+        @st.fragment
+        def _line_decimation_panel():
+            st.markdown("---")
+            st.subheader("🚀 大数据量线图：降采样 (Decimation)")
+            st.caption("💡 数据点远多于屏幕像素时，先按 Axes 像素宽度降采样再调用 `ax.plot`，画面几乎不变，但渲染时间大幅缩短。")
+
+            col_big_ctrl, col_big_view = st.columns([1.2, 2])
+
+            with col_big_ctrl:
+                big_n = st.select_slider(
+                    "数据点数",
+                    options=[100_000, 1_000_000, 3_000_000, 10_000_000],
+                    value=1_000_000,
+                    format_func=lambda n: f"{n:,}",
+                    key="big_line_n"
+                )
+                big_method = st.selectbox(
+                    "降采样方法",
+                    list(DECIMATION_METHODS),
+                    index=list(DECIMATION_METHODS).index('m4'),
+                    key="big_line_method",
+                    help="m4: 每个像素列保留首/尾/最小/最大值，与完整绘制几乎逐像素一致 | lttb: 保留视觉形状，点数更少"
+                )
+                big_compare = st.checkbox("同时绘制完整数据进行对比（较慢）", value=False, key="big_line_compare")
+
+            with col_big_view:
+                x_big, y_big = generate_large_series(big_n)
+
+                fig, ax = locked_subplots(figsize=(10, 4))
+                start = time.perf_counter()
+                _, n_plotted = plot_decimated(ax, x_big, y_big, method=big_method,
+                                              dpi=DEFAULT_SAVEFIG_OPTIONS['dpi'], color='#1f77b4', linewidth=0.8)
+                ax.set_title(f"降采样 ({big_method}): {n_plotted:,} / {big_n:,} 个点")
+                ax.grid(True, alpha=0.3)
+                decimated_png = figure_to_png(fig)
+                decimated_time = time.perf_counter() - start
+                st.image(decimated_png, use_container_width=True)
+
+                metric_cols = st.columns(3)
+                metric_cols[0].metric("实际绘制点数", f"{n_plotted:,}")
+                metric_cols[1].metric("降采样渲染耗时", f"{decimated_time:.2f} s")
+
+                if big_compare:
+                    fig, ax = locked_subplots(figsize=(10, 4))
+                    start = time.perf_counter()
+                    ax.plot(x_big, y_big, color='#1f77b4', linewidth=0.8)
+                    ax.set_title(f"完整数据: {big_n:,} 个点")
+                    ax.grid(True, alpha=0.3)
+                    full_png = figure_to_png(fig)
+                    full_time = time.perf_counter() - start
+                    st.image(full_png, use_container_width=True)
+                    metric_cols[2].metric("完整渲染耗时", f"{full_time:.2f} s",
+                                          delta=f"{full_time / max(decimated_time, 1e-6):.1f}×", delta_color="off")
+
+                st.code(f"""
+from catalogs.decimation import plot_decimated
+
+fig, ax = plt.subplots(figsize=(10, 4))
+# 按 Axes 像素宽度自动计算点数预算
+lines, n_plotted = plot_decimated(ax, x, y, method='{big_method}')
+            """, language='python')
+        
+        _line_decimation_panel()
 
     with tab2:
-        st.subheader("塑造形态 (Patches: 形状与统计图)")
-        st.markdown("""
+        @st.fragment
+        def _patches_panel():
+            st.subheader("塑造形态 (Patches: 形状与统计图)")
+            st.markdown("""
         <div style='background-color: #f0fdf4; padding: 1rem; border-radius: 8px; border-left: 4px solid #22c55e; margin-bottom: 1.5rem;'>
             <p style='margin: 0; color: #166534;'>
                 💡 <strong>提示</strong>：调整下方参数，实时查看效果。Patches 包括条形图、直方图、饼图、箱线图等多种统计图表。
@@ -1038,231 +1156,231 @@ plt.show()
         </div>
         """, unsafe_allow_html=True)
         
-        # 图表类型选择
-        chart_type = st.selectbox(
-            "选择图表类型",
-            [
-                "Bar Chart (垂直条形图)",
-                "Barh Chart (水平条形图)",
-                "Stacked Bar (堆叠条形图)",
-                "Histogram (直方图)",
-                "Pie Chart (饼图)",
-                "Box Plot (箱线图)",
-                "Violin Plot (小提琴图)",
-                "Errorbar (误差棒图)",
-                "Fill Between (填充区域)",
-                "Stackplot (堆叠面积图)"
-            ],
-            key="patches_chart_type"
-        )
-        
-        # 合并的交互式界面
-        col_ctrl, col_view = st.columns([1.2, 2])
-        
-        with col_ctrl:
-            st.markdown("#### 🎛️ 参数控制")
-            
-            # 通用参数
-            with st.expander("🎨 颜色 (color)", expanded=True):
-                patch_color = st.color_picker("选择颜色", "#3b82f6", key="patch_color")
-            
-            with st.expander("📏 透明度 (alpha)", expanded=True):
-                patch_alpha = st.slider("透明度", 0.0, 1.0, 0.8, 0.1, key="patch_alpha")
-            
-            with st.expander("🔲 边框 (edgecolor)", expanded=False):
-                use_edge = st.checkbox("显示边框", value=True, key="patch_use_edge")
-                if use_edge:
-                    edge_color = st.color_picker("边框颜色", "#000000", key="patch_edgecolor")
-                    edge_width = st.slider("边框宽度", 0.5, 3.0, 1.0, 0.5, key="patch_edgewidth")
-        
-        with col_view:
-            st.markdown("#### 📊 实时预览")
+            # 图表类型选择
+            chart_type = st.selectbox(
+                "选择图表类型",
+                [
+                    "Bar Chart (垂直条形图)",
+                    "Barh Chart (水平条形图)",
+                    "Stacked Bar (堆叠条形图)",
+                    "Histogram (直方图)",
+                    "Pie Chart (饼图)",
+                    "Box Plot (箱线图)",
+                    "Violin Plot (小提琴图)",
+                    "Errorbar (误差棒图)",
+                    "Fill Between (填充区域)",
+                    "Stackplot (堆叠面积图)"
+                ],
+                key="patches_chart_type"
+            )
+        
+            # 合并的交互式界面
+            col_ctrl, col_view = st.columns([1.2, 2])
+        
+            with col_ctrl:
+                st.markdown("#### 🎛️ 参数控制")
             
-            ensure_chinese_font()
-            fig, ax = plt.subplots(figsize=(8, 5))
-            code_str = ""
-            plot_kwargs = {}
-            
-            if chart_type == "Bar Chart (垂直条形图)":
-                categories = ['A', 'B', 'C', 'D', 'E']
-                values = [23, 45, 56, 78, 32]
-                plot_kwargs = {'color': patch_color, 'alpha': patch_alpha}
-                if use_edge:
-                    plot_kwargs['edgecolor'] = edge_color
-                    plot_kwargs['linewidth'] = edge_width
-                ax.bar(categories, values, **plot_kwargs)
-                ax.set_title("Bar Chart", fontsize=14, fontweight='bold')
-                ax.set_xlabel("Category", fontsize=12)
-                ax.set_ylabel("Value", fontsize=12)
-                code_str = f"ax.bar(categories, values, color='{patch_color}', alpha={patch_alpha}"
-                if use_edge:
-                    code_str += f", edgecolor='{edge_color}', linewidth={edge_width}"
-                code_str += ")"
-                
-            elif chart_type == "Barh Chart (水平条形图)":
-                categories = ['A', 'B', 'C', 'D', 'E']
-                values = [23, 45, 56, 78, 32]
-                plot_kwargs = {'color': patch_color, 'alpha': patch_alpha}
-                if use_edge:
-                    plot_kwargs['edgecolor'] = edge_color
-                    plot_kwargs['linewidth'] = edge_width
-                ax.barh(categories, values, **plot_kwargs)
-                ax.set_title("Barh Chart", fontsize=14, fontweight='bold')
-                ax.set_xlabel("Value", fontsize=12)
-                ax.set_ylabel("Category", fontsize=12)
-                code_str = f"ax.barh(categories, values, color='{patch_color}', alpha={patch_alpha}"
-                if use_edge:
-                    code_str += f", edgecolor='{edge_color}', linewidth={edge_width}"
-                code_str += ")"
-                
-            elif chart_type == "Stacked Bar (堆叠条形图)":
-                categories = ['A', 'B', 'C', 'D']
-                values1 = [20, 35, 30, 35]
-                values2 = [25, 25, 25, 25]
-                values3 = [15, 20, 15, 18]
-                x = np.arange(len(categories))
-                width = 0.6
-                plot_kwargs1 = {'color': '#3b82f6', 'alpha': patch_alpha}
-                plot_kwargs2 = {'color': '#10b981', 'alpha': patch_alpha}
-                plot_kwargs3 = {'color': '#f59e0b', 'alpha': patch_alpha}
-                if use_edge:
-                    plot_kwargs1['edgecolor'] = edge_color
-                    plot_kwargs1['linewidth'] = edge_width
-                    plot_kwargs2['edgecolor'] = edge_color
-                    plot_kwargs2['linewidth'] = edge_width
-                    plot_kwargs3['edgecolor'] = edge_color
-                    plot_kwargs3['linewidth'] = edge_width
-                ax.bar(categories, values1, width, label='系列1', **plot_kwargs1)
-                ax.bar(categories, values2, width, bottom=values1, label='系列2', **plot_kwargs2)
-                ax.bar(categories, values3, width, bottom=np.array(values1)+np.array(values2), label='系列3', **plot_kwargs3)
-                ax.set_title("Stacked Bar", fontsize=14, fontweight='bold')
-                ax.set_xlabel("Category", fontsize=12)
-                ax.set_ylabel("Value", fontsize=12)
-                ax.legend()
-                code_str = f"""ax.bar(categories, values1, width, label='系列1', color='#3b82f6', alpha={patch_alpha})
+                # 通用参数
+                with st.expander("🎨 颜色 (color)", expanded=True):
+                    patch_color = st.color_picker("选择颜色", "#3b82f6", key="patch_color")
+            
+                with st.expander("📏 透明度 (alpha)", expanded=True):
+                    patch_alpha = st.slider("透明度", 0.0, 1.0, 0.8, 0.1, key="patch_alpha")
+            
+                with st.expander("🔲 边框 (edgecolor)", expanded=False):
+                    use_edge = st.checkbox("显示边框", value=True, key="patch_use_edge")
+                    if use_edge:
+                        edge_color = st.color_picker("边框颜色", "#000000", key="patch_edgecolor")
+                        edge_width = st.slider("边框宽度", 0.5, 3.0, 1.0, 0.5, key="patch_edgewidth")
+        
+            with col_view:
+                st.markdown("#### 📊 实时预览")
+            
+                ensure_chinese_font()
+                fig, ax = locked_subplots(figsize=(8, 5))
+                code_str = ""
+                plot_kwargs = {}
+            
+                if chart_type == "Bar Chart (垂直条形图)":
+                    categories = ['A', 'B', 'C', 'D', 'E']
+                    values = [23, 45, 56, 78, 32]
+                    plot_kwargs = {'color': patch_color, 'alpha': patch_alpha}
+                    if use_edge:
+                        plot_kwargs['edgecolor'] = edge_color
+                        plot_kwargs['linewidth'] = edge_width
+                    ax.bar(categories, values, **plot_kwargs)
+                    ax.set_title("Bar Chart", fontsize=14, fontweight='bold')
+                    ax.set_xlabel("Category", fontsize=12)
+                    ax.set_ylabel("Value", fontsize=12)
+                    code_str = f"ax.bar(categories, values, color='{patch_color}', alpha={patch_alpha}"
+                    if use_edge:
+                        code_str += f", edgecolor='{edge_color}', linewidth={edge_width}"
+                    code_str += ")"
+                
+                elif chart_type == "Barh Chart (水平条形图)":
+                    categories = ['A', 'B', 'C', 'D', 'E']
+                    values = [23, 45, 56, 78, 32]
+                    plot_kwargs = {'color': patch_color, 'alpha': patch_alpha}
+                    if use_edge:
+                        plot_kwargs['edgecolor'] = edge_color
+                        plot_kwargs['linewidth'] = edge_width
+                    ax.barh(categories, values, **plot_kwargs)
+                    ax.set_title("Barh Chart", fontsize=14, fontweight='bold')
+                    ax.set_xlabel("Value", fontsize=12)
+                    ax.set_ylabel("Category", fontsize=12)
+                    code_str = f"ax.barh(categories, values, color='{patch_color}', alpha={patch_alpha}"
+                    if use_edge:
+                        code_str += f", edgecolor='{edge_color}', linewidth={edge_width}"
+                    code_str += ")"
+                
+                elif chart_type == "Stacked Bar (堆叠条形图)":
+                    categories = ['A', 'B', 'C', 'D']
+                    values1 = [20, 35, 30, 35]
+                    values2 = [25, 25, 25, 25]
+                    values3 = [15, 20, 15, 18]
+                    x = np.arange(len(categories))
+                    width = 0.6
+                    plot_kwargs1 = {'color': '#3b82f6', 'alpha': patch_alpha}
+                    plot_kwargs2 = {'color': '#10b981', 'alpha': patch_alpha}
+                    plot_kwargs3 = {'color': '#f59e0b', 'alpha': patch_alpha}
+                    if use_edge:
+                        plot_kwargs1['edgecolor'] = edge_color
+                        plot_kwargs1['linewidth'] = edge_width
+                        plot_kwargs2['edgecolor'] = edge_color
+                        plot_kwargs2['linewidth'] = edge_width
+                        plot_kwargs3['edgecolor'] = edge_color
+                        plot_kwargs3['linewidth'] = edge_width
+                    ax.bar(categories, values1, width, label='系列1', **plot_kwargs1)
+                    ax.bar(categories, values2, width, bottom=values1, label='系列2', **plot_kwargs2)
+                    ax.bar(categories, values3, width, bottom=np.array(values1)+np.array(values2), label='系列3', **plot_kwargs3)
+                    ax.set_title("Stacked Bar", fontsize=14, fontweight='bold')
+                    ax.set_xlabel("Category", fontsize=12)
+                    ax.set_ylabel("Value", fontsize=12)
+                    ax.legend()
+                    code_str = f"""ax.bar(categories, values1, width, label='系列1', color='#3b82f6', alpha={patch_alpha})
 ax.bar(categories, values2, width, bottom=values1, label='系列2', color='#10b981', alpha={patch_alpha})
 ax.bar(categories, values3, width, bottom=np.array(values1)+np.array(values2), label='系列3', color='#f59e0b', alpha={patch_alpha})"""
                 
-            elif chart_type == "Histogram (直方图)":
-                data = np.random.randn(1000)
-                bins = st.slider("分组数 (bins)", 10, 50, 20, key="hist_bins")
-                plot_kwargs = {'color': patch_color, 'alpha': patch_alpha, 'bins': bins}
-                if use_edge:
-                    plot_kwargs['edgecolor'] = edge_color
-                    plot_kwargs['linewidth'] = edge_width
-                ax.hist(data, **plot_kwargs)
-                ax.set_title("Histogram", fontsize=14, fontweight='bold')
-                ax.set_xlabel("Value", fontsize=12)
-                ax.set_ylabel("Frequency", fontsize=12)
-                code_str = f"ax.hist(data, bins={bins}, color='{patch_color}', alpha={patch_alpha}"
-                if use_edge:
-                    code_str += f", edgecolor='{edge_color}', linewidth={edge_width}"
-                code_str += ")"
-                
-            elif chart_type == "Pie Chart (饼图)":
-                labels = ['类别A', '类别B', '类别C', '类别D']
-                sizes = [15, 30, 45, 10]
-                explode = st.multiselect("突出显示", labels, key="pie_explode")
-                explode_values = [0.1 if label in explode else 0 for label in labels]
-                colors_list = [patch_color, '#10b981', '#f59e0b', '#ef4444']
-                wedges, texts, autotexts = ax.pie(sizes, explode=explode_values, labels=labels, colors=colors_list, 
-                      autopct='%1.1f%%', shadow=True, startangle=90)
-                # 设置透明度
-                for w in wedges:
-                    w.set_alpha(patch_alpha)
-                ax.set_title("Pie Chart", fontsize=14, fontweight='bold')
-                # 保存变量供代码生成使用
-                pie_explode_values = explode_values
-                pie_colors_list = colors_list
-                code_str = f"""wedges, texts, autotexts = ax.pie(sizes, explode={explode_values}, labels=labels, 
+                elif chart_type == "Histogram (直方图)":
+                    data = np.random.randn(1000)
+                    bins = st.slider("分组数 (bins)", 10, 50, 20, key="hist_bins")
+                    plot_kwargs = {'color': patch_color, 'alpha': patch_alpha, 'bins': bins}
+                    if use_edge:
+                        plot_kwargs['edgecolor'] = edge_color
+                        plot_kwargs['linewidth'] = edge_width
+                    ax.hist(data, **plot_kwargs)
+                    ax.set_title("Histogram", fontsize=14, fontweight='bold')
+                    ax.set_xlabel("Value", fontsize=12)
+                    ax.set_ylabel("Frequency", fontsize=12)
+                    code_str = f"ax.hist(data, bins={bins}, color='{patch_color}', alpha={patch_alpha}"
+                    if use_edge:
+                        code_str += f", edgecolor='{edge_color}', linewidth={edge_width}"
+                    code_str += ")"
+                
+                elif chart_type == "Pie Chart (饼图)":
+                    labels = ['类别A', '类别B', '类别C', '类别D']
+                    sizes = [15, 30, 45, 10]
+                    explode = st.multiselect("突出显示", labels, key="pie_explode")
+                    explode_values = [0.1 if label in explode else 0 for label in labels]
+                    colors_list = [patch_color, '#10b981', '#f59e0b', '#ef4444']
+                    wedges, texts, autotexts = ax.pie(sizes, explode=explode_values, labels=labels, colors=colors_list, 
+                          autopct='%1.1f%%', shadow=True, startangle=90)
+                    # 设置透明度
+                    for w in wedges:
+                        w.set_alpha(patch_alpha)
+                    ax.set_title("Pie Chart", fontsize=14, fontweight='bold')
+                    # 保存变量供代码生成使用
+                    pie_explode_values = explode_values
+                    pie_colors_list = colors_list
+                    code_str = f"""wedges, texts, autotexts = ax.pie(sizes, explode={explode_values}, labels=labels, 
     colors={colors_list}, autopct='%1.1f%%', shadow=True, startangle=90)
 for w in wedges:
     w.set_alpha({patch_alpha})"""
                 
-            elif chart_type == "Box Plot (箱线图)":
-                data_box = [np.random.normal(0, std, 100) for std in range(1, 5)]
-                plot_kwargs = {}
-                if use_edge:
-                    plot_kwargs['boxprops'] = dict(color=edge_color, linewidth=edge_width)
-                    plot_kwargs['whiskerprops'] = dict(color=edge_color, linewidth=edge_width)
-                    plot_kwargs['capprops'] = dict(color=edge_color, linewidth=edge_width)
-                bp = ax.boxplot(data_box, patch_artist=True, **plot_kwargs)
-                for patch in bp['boxes']:
-                    patch.set_facecolor(patch_color)
-                    patch.set_alpha(patch_alpha)
-                ax.set_title("Box Plot", fontsize=14, fontweight='bold')
-                ax.set_xticklabels(['Group 1', 'Group 2', 'Group 3', 'Group 4'])
-                ax.set_ylabel("Value", fontsize=12)
-                code_str = f"""bp = ax.boxplot(data, patch_artist=True)
+                elif chart_type == "Box Plot (箱线图)":
+                    data_box = [np.random.normal(0, std, 100) for std in range(1, 5)]
+                    plot_kwargs = {}
+                    if use_edge:
+                        plot_kwargs['boxprops'] = dict(color=edge_color, linewidth=edge_width)
+                        plot_kwargs['whiskerprops'] = dict(color=edge_color, linewidth=edge_width)
+                        plot_kwargs['capprops'] = dict(color=edge_color, linewidth=edge_width)
+                    bp = ax.boxplot(data_box, patch_artist=True, **plot_kwargs)
+                    for patch in bp['boxes']:
+                        patch.set_facecolor(patch_color)
+                        patch.set_alpha(patch_alpha)
+                    ax.set_title("Box Plot", fontsize=14, fontweight='bold')
+                    ax.set_xticklabels(['Group 1', 'Group 2', 'Group 3', 'Group 4'])
+                    ax.set_ylabel("Value", fontsize=12)
+                    code_str = f"""bp = ax.boxplot(data, patch_artist=True)
 for patch in bp['boxes']:
     patch.set_facecolor('{patch_color}')
     patch.set_alpha({patch_alpha})"""
                 
-            elif chart_type == "Violin Plot (小提琴图)":
-                data_violin = [np.random.normal(0, std, 100) for std in range(1, 5)]
-                parts = ax.violinplot(data_violin, positions=range(1, 5), showmeans=True)
-                for pc in parts['bodies']:
-                    pc.set_facecolor(patch_color)
-                    pc.set_alpha(patch_alpha)
-                ax.set_title("Violin Plot", fontsize=14, fontweight='bold')
-                ax.set_xticks(range(1, 5))
-                ax.set_xticklabels(['Group 1', 'Group 2', 'Group 3', 'Group 4'])
-                ax.set_ylabel("Value", fontsize=12)
-                code_str = f"""parts = ax.violinplot(data, positions=range(1, 5), showmeans=True)
+                elif chart_type == "Violin Plot (小提琴图)":
+                    data_violin = [np.random.normal(0, std, 100) for std in range(1, 5)]
+                    parts = ax.violinplot(data_violin, positions=range(1, 5), showmeans=True)
+                    for pc in parts['bodies']:
+                        pc.set_facecolor(patch_color)
+                        pc.set_alpha(patch_alpha)
+                    ax.set_title("Violin Plot", fontsize=14, fontweight='bold')
+                    ax.set_xticks(range(1, 5))
+                    ax.set_xticklabels(['Group 1', 'Group 2', 'Group 3', 'Group 4'])
+                    ax.set_ylabel("Value", fontsize=12)
+                    code_str = f"""parts = ax.violinplot(data, positions=range(1, 5), showmeans=True)
 for pc in parts['bodies']:
     pc.set_facecolor('{patch_color}')
     pc.set_alpha({patch_alpha})"""
                 
-            elif chart_type == "Errorbar (误差棒图)":
-                x = np.arange(1, 6)
-                y = [2, 3, 4, 3, 2]
-                yerr = [0.3, 0.4, 0.5, 0.4, 0.3]
-                xerr = [0.1, 0.1, 0.1, 0.1, 0.1]
-                ax.errorbar(x, y, yerr=yerr, xerr=xerr, fmt='o', color=patch_color, 
-                           alpha=patch_alpha, capsize=5, capthick=2)
-                ax.set_title("Errorbar", fontsize=14, fontweight='bold')
-                ax.set_xlabel("X Axis", fontsize=12)
-                ax.set_ylabel("Y Axis", fontsize=12)
-                ax.grid(True, alpha=0.3)
-                code_str = f"ax.errorbar(x, y, yerr=yerr, xerr=xerr, fmt='o', color='{patch_color}', alpha={patch_alpha}, capsize=5)"
+                elif chart_type == "Errorbar (误差棒图)":
+                    x = np.arange(1, 6)
+                    y = [2, 3, 4, 3, 2]
+                    yerr = [0.3, 0.4, 0.5, 0.4, 0.3]
+                    xerr = [0.1, 0.1, 0.1, 0.1, 0.1]
+                    ax.errorbar(x, y, yerr=yerr, xerr=xerr, fmt='o', color=patch_color, 
+                               alpha=patch_alpha, capsize=5, capthick=2)
+                    ax.set_title("Errorbar", fontsize=14, fontweight='bold')
+                    ax.set_xlabel("X Axis", fontsize=12)
+                    ax.set_ylabel("Y Axis", fontsize=12)
+                    ax.grid(True, alpha=0.3)
+                    code_str = f"ax.errorbar(x, y, yerr=yerr, xerr=xerr, fmt='o', color='{patch_color}', alpha={patch_alpha}, capsize=5)"
                 
-            elif chart_type == "Fill Between (填充区域)":
-                x = np.linspace(0, 10, 100)
-                y1 = np.sin(x)
-                y2 = np.cos(x)
-                ax.plot(x, y1, color='#3b82f6', label='sin(x)')
-                ax.plot(x, y2, color='#10b981', label='cos(x)')
-                ax.fill_between(x, y1, y2, where=(y1 > y2), color=patch_color, alpha=patch_alpha, label='填充区域')
-                ax.set_title("Fill Between", fontsize=14, fontweight='bold')
-                ax.set_xlabel("X Axis", fontsize=12)
-                ax.set_ylabel("Y Axis", fontsize=12)
-                ax.legend()
-                ax.grid(True, alpha=0.3)
-                code_str = f"ax.fill_between(x, y1, y2, where=(y1 > y2), color='{patch_color}', alpha={patch_alpha})"
-                
-            elif chart_type == "Stackplot (堆叠面积图)":
-                x = np.arange(0, 10, 0.1)
-                y1 = np.sin(x)
-                y2 = np.cos(x)
-                y3 = np.sin(x) * 0.5
-                ax.stackplot(x, y1, y2, y3, labels=['系列1', '系列2', '系列3'], 
-                           colors=[patch_color, '#10b981', '#f59e0b'], alpha=patch_alpha)
-                ax.set_title("Stackplot", fontsize=14, fontweight='bold')
-                ax.set_xlabel("X Axis", fontsize=12)
-                ax.set_ylabel("Y Axis", fontsize=12)
-                ax.legend()
-                ax.grid(True, alpha=0.3)
-                code_str = f"ax.stackplot(x, y1, y2, y3, labels=['系列1', '系列2', '系列3'], colors=['{patch_color}', '#10b981', '#f59e0b'], alpha={patch_alpha})"
+                elif chart_type == "Fill Between (填充区域)":
+                    x = np.linspace(0, 10, 100)
+                    y1 = np.sin(x)
+                    y2 = np.cos(x)
+                    ax.plot(x, y1, color='#3b82f6', label='sin(x)')
+                    ax.plot(x, y2, color='#10b981', label='cos(x)')
+                    ax.fill_between(x, y1, y2, where=(y1 > y2), color=patch_color, alpha=patch_alpha, label='填充区域')
+                    ax.set_title("Fill Between", fontsize=14, fontweight='bold')
+                    ax.set_xlabel("X Axis", fontsize=12)
+                    ax.set_ylabel("Y Axis", fontsize=12)
+                    ax.legend()
+                    ax.grid(True, alpha=0.3)
+                    code_str = f"ax.fill_between(x, y1, y2, where=(y1 > y2), color='{patch_color}', alpha={patch_alpha})"
+                
+                elif chart_type == "Stackplot (堆叠面积图)":
+                    x = np.arange(0, 10, 0.1)
+                    y1 = np.sin(x)
+                    y2 = np.cos(x)
+                    y3 = np.sin(x) * 0.5
+                    ax.stackplot(x, y1, y2, y3, labels=['系列1', '系列2', '系列3'], 
+                               colors=[patch_color, '#10b981', '#f59e0b'], alpha=patch_alpha)
+                    ax.set_title("Stackplot", fontsize=14, fontweight='bold')
+                    ax.set_xlabel("X Axis", fontsize=12)
+                    ax.set_ylabel("Y Axis", fontsize=12)
+                    ax.legend()
+                    ax.grid(True, alpha=0.3)
+                    code_str = f"ax.stackplot(x, y1, y2, y3, labels=['系列1', '系列2', '系列3'], colors=['{patch_color}', '#10b981', '#f59e0b'], alpha={patch_alpha})"
             
-            ax.grid(True, alpha=0.3)
-            st.pyplot(fig)
+                ax.grid(True, alpha=0.3)
+                show_figure(fig)
             
-            # 代码生成
-            st.markdown("#### 💻 生成代码")
+                # 代码生成
+                st.markdown("#### 💻 生成代码")
             
-            # 根据图表类型生成完整代码
-            if chart_type in ["Bar Chart (垂直条形图)", "Barh Chart (水平条形图)"]:
-                full_code = f"""
+                # 根据图表类型生成完整代码
+                if chart_type in ["Bar Chart (垂直条形图)", "Barh Chart (水平条形图)"]:
+                    full_code = f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -1277,8 +1395,8 @@ ax.set_ylabel("Value" if "垂直" in chart_type else "Category", fontsize=12)
 ax.grid(True, alpha=0.3)
 plt.show()
 """
-            elif chart_type == "Stacked Bar (堆叠条形图)":
-                full_code = f"""
+                elif chart_type == "Stacked Bar (堆叠条形图)":
+                    full_code = f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -1297,8 +1415,8 @@ ax.legend()
 ax.grid(True, alpha=0.3)
 plt.show()
 """
-            elif chart_type == "Histogram (直方图)":
-                full_code = f"""
+                elif chart_type == "Histogram (直方图)":
+                    full_code = f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -1312,11 +1430,11 @@ ax.set_ylabel("Frequency", fontsize=12)
 ax.grid(True, alpha=0.3)
 plt.show()
 """
-            elif chart_type == "Pie Chart (饼图)":
-                # 使用之前保存的变量
-                pie_explode_vals = pie_explode_values if 'pie_explode_values' in locals() else [0, 0, 0, 0]
-                pie_colors = pie_colors_list if 'pie_colors_list' in locals() else [patch_color, '#10b981', '#f59e0b', '#ef4444']
-                full_code = f"""
+                elif chart_type == "Pie Chart (饼图)":
+                    # 使用之前保存的变量
+                    pie_explode_vals = pie_explode_values if 'pie_explode_values' in locals() else [0, 0, 0, 0]
+                    pie_colors = pie_colors_list if 'pie_colors_list' in locals() else [patch_color, '#10b981', '#f59e0b', '#ef4444']
+                    full_code = f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -1333,8 +1451,8 @@ for w in wedges:
 ax.set_title("Pie Chart", fontsize=14, fontweight='bold')
 plt.show()
 """
-            elif chart_type == "Box Plot (箱线图)":
-                full_code = f"""
+                elif chart_type == "Box Plot (箱线图)":
+                    full_code = f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -1348,8 +1466,8 @@ ax.set_ylabel("Value", fontsize=12)
 ax.grid(True, alpha=0.3)
 plt.show()
 """
-            elif chart_type == "Violin Plot (小提琴图)":
-                full_code = f"""
+                elif chart_type == "Violin Plot (小提琴图)":
+                    full_code = f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -1364,8 +1482,8 @@ ax.set_ylabel("Value", fontsize=12)
 ax.grid(True, alpha=0.3)
 plt.show()
 """
-            elif chart_type == "Errorbar (误差棒图)":
-                full_code = f"""
+                elif chart_type == "Errorbar (误差棒图)":
+                    full_code = f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -1382,8 +1500,8 @@ ax.set_ylabel("Y Axis", fontsize=12)
 ax.grid(True, alpha=0.3)
 plt.show()
 """
-            elif chart_type == "Fill Between (填充区域)":
-                full_code = f"""
+                elif chart_type == "Fill Between (填充区域)":
+                    full_code = f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -1402,8 +1520,8 @@ ax.legend()
 ax.grid(True, alpha=0.3)
 plt.show()
 """
-            elif chart_type == "Stackplot (堆叠面积图)":
-                full_code = f"""
+                elif chart_type == "Stackplot (堆叠面积图)":
+                    full_code = f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -1421,8 +1539,8 @@ ax.legend()
 ax.grid(True, alpha=0.3)
 plt.show()
 """
-            else:
-                full_code = f"""
+                else:
+                    full_code = f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -1432,11 +1550,15 @@ ax.set_title("{chart_type.split('(')[0].strip()}", fontsize=14, fontweight='bold
 plt.show()
 """
             
-            st.code(full_code, language='python')
+                st.code(full_code, language='python')
+        
+        _patches_panel()
 
     with tab3:
-        st.subheader("点绘星空 (Collections: 集合类型)")
-        st.markdown("""
+        @st.fragment
+        def _collections_panel():
+            st.subheader("点绘星空 (Collections: 集合类型)")
+            st.markdown("""
         <div style='background-color: #fef3c7; padding: 1rem; border-radius: 8px; border-left: 4px solid #f59e0b; margin-bottom: 1.5rem;'>
             <p style='margin: 0; color: #92400e;'>
                 💡 <strong>提示</strong>：Collections 包括散点、线段集合、多边形集合等多种类型，适合高效绘制大量相似元素。
@@ -1444,112 +1566,112 @@ plt.show()
         </div>
         """, unsafe_allow_html=True)
         
-        collection_type = st.selectbox("选择集合类型",
-                                      ["Scatter (散点)", "LineCollection (线段集合)", "PolyCollection (多边形集合)", "EventCollection (事件集合)"],
-                                      key="collection_type")
-        
-        if collection_type == "Scatter (散点)":
-            st.caption("💡 调整参数查看散点图效果。点击「查看选项」了解更多参数。")
-            
-            col_ctrl, col_view = st.columns([1.2, 2])
-            
-            with col_ctrl:
-                st.markdown("#### 🎛️ 参数控制")
-                
-                n_points = st.slider("点数量", 50, 500, 200, key="scatter_points")
-                
-                with st.expander("📍 标记样式 (marker)", expanded=True):
-                    marker_scatter = st.selectbox(
-                        "选择标记",
-                        ['o', 's', '^', 'v', '*', '+', 'x'],
-                        index=0,
-                        key="scatter_marker"
-                    )
-                    if st.button("📚 查看所有标记", key="btn_scatter_marker"):
-                        from catalogs.marker import render_marker_gallery
-                        render_marker_gallery()
+            collection_type = st.selectbox("选择集合类型",
+                                          ["Scatter (散点)", "Large Scatter (大数据散点)", "LineCollection (线段集合)", "PolyCollection (多边形集合)", "EventCollection (事件集合)"],
+                                          key="collection_type")
+        
+            if collection_type == "Scatter (散点)":
+                st.caption("💡 调整参数查看散点图效果。点击「查看选项」了解更多参数。")
+            
+                col_ctrl, col_view = st.columns([1.2, 2])
+            
+                with col_ctrl:
+                    st.markdown("#### 🎛️ 参数控制")
+                
+                    n_points = st.slider("点数量", 50, 5000, 200, key="scatter_points")
+                
+                    with st.expander("📍 标记样式 (marker)", expanded=True):
+                        marker_scatter = st.selectbox(
+                            "选择标记",
+                            ['o', 's', '^', 'v', '*', '+', 'x'],
+                            index=0,
+                            key="scatter_marker"
+                        )
+                        if st.button("📚 查看所有标记", key="btn_scatter_marker"):
+                            from catalogs.marker import render_marker_gallery
+                            render_marker_gallery()
+                
+                    # fillstyle 参数（注意：scatter 支持有限，主要用于 plot）
+                    with st.expander("🎨 填充样式 (fillstyle)", expanded=False):
+                        st.caption("⚠️ 注意：`fillstyle` 主要用于 `plot()` 函数。`scatter()` 对 fillstyle 的支持有限。")
+                        from catalogs.marker import get_fillstyle_options
+                        fillstyles = get_fillstyle_options()
+                        fillstyle_scatter = st.selectbox(
+                            "选择填充样式",
+                            fillstyles,
+                            index=0,
+                            key="scatter_fillstyle",
+                            help="控制标记符号的填充样式。注意：scatter() 仅支持 'full' 和 'none'，其他样式主要用于 plot()"
+                        )
+                        if st.button("📚 查看填充样式选项", key="btn_scatter_fillstyle"):
+                            from catalogs.marker import render_fillstyle_gallery
+                            render_fillstyle_gallery()
+                
+                    with st.expander("🌈 颜色映射 (cmap)", expanded=True):
+                        cmap_choice = st.selectbox(
+                            "选择颜色映射",
+                            ['viridis', 'plasma', 'inferno', 'magma', 'coolwarm', 'RdYlBu'],
+                            index=0,
+                            key="scatter_cmap"
+                        )
+                        if st.button("📚 查看所有颜色映射", key="btn_scatter_cmap"):
+                            from catalogs.color import render_colormap_gallery
+                            render_colormap_gallery()
+                
+                    alpha_scatter = st.slider("透明度 (alpha)", 0.1, 1.0, 0.5, 0.1, key="scatter_alpha")
+            
+                with col_view:
+                    st.markdown("#### 📊 实时预览")
+                    x = np.random.rand(n_points)
+                    y = np.random.rand(n_points)
+                    colors = np.random.rand(n_points)
+                    area = (30 * np.random.rand(n_points))**2 
+                
+                    fig, ax = locked_subplots(figsize=(8, 5))
+                
+                    # 构建 scatter 参数
+                    # 注意：scatter() 不支持 fillstyle 参数，fillstyle 仅适用于 plot()
+                    scatter_kwargs = {
+                        's': area,
+                        'c': colors,
+                        'alpha': alpha_scatter,
+                        'cmap': cmap_choice,
+                        'marker': marker_scatter,
+                    }
                 
-                # fillstyle 参数（注意：scatter 支持有限，主要用于 plot）
-                with st.expander("🎨 填充样式 (fillstyle)", expanded=False):
-                    st.caption("⚠️ 注意：`fillstyle` 主要用于 `plot()` 函数。`scatter()` 对 fillstyle 的支持有限。")
-                    from catalogs.marker import get_fillstyle_options
-                    fillstyles = get_fillstyle_options()
-                    fillstyle_scatter = st.selectbox(
-                        "选择填充样式",
-                        fillstyles,
-                        index=0,
-                        key="scatter_fillstyle",
-                        help="控制标记符号的填充样式。注意：scatter() 仅支持 'full' 和 'none'，其他样式主要用于 plot()"
-                    )
-                    if st.button("📚 查看填充样式选项", key="btn_scatter_fillstyle"):
-                        from catalogs.marker import render_fillstyle_gallery
-                        render_fillstyle_gallery()
-                
-                with st.expander("🌈 颜色映射 (cmap)", expanded=True):
-                    cmap_choice = st.selectbox(
-                        "选择颜色映射",
-                        ['viridis', 'plasma', 'inferno', 'magma', 'coolwarm', 'RdYlBu'],
-                        index=0,
-                        key="scatter_cmap"
-                    )
-                    if st.button("📚 查看所有颜色映射", key="btn_scatter_cmap"):
-                        from catalogs.color import render_colormap_gallery
-                        render_colormap_gallery()
-                
-                alpha_scatter = st.slider("透明度 (alpha)", 0.1, 1.0, 0.5, 0.1, key="scatter_alpha")
-            
-            with col_view:
-                st.markdown("#### 📊 实时预览")
-                x = np.random.rand(n_points)
-                y = np.random.rand(n_points)
-                colors = np.random.rand(n_points)
-                area = (30 * np.random.rand(n_points))**2 
-                
-                fig, ax = plt.subplots(figsize=(8, 5))
-                
-                # 构建 scatter 参数
-                # 注意：scatter() 不支持 fillstyle 参数，fillstyle 仅适用于 plot()
-                scatter_kwargs = {
-                    's': area,
-                    'c': colors,
-                    'alpha': alpha_scatter,
-                    'cmap': cmap_choice,
-                    'marker': marker_scatter,
-                }
-                
-                ensure_chinese_font()
-                sc = ax.scatter(x, y, **scatter_kwargs)
-                
-                # scatter() 不支持 fillstyle 参数，但我们可以通过 PathCollection 的属性来模拟部分效果
-                fillable_markers = ['o', 's', '^', 'v', '<', '>', 'D', 'd', 'p', 'h', 'H', '8', '*']
-                if marker_scatter in fillable_markers and fillstyle_scatter == 'none':
-                    # 不填充，仅显示边框
-                    # 注意：scatter 的 fillstyle='none' 效果需要通过设置 facecolors 和 edgecolors 来实现
-                    sc.set_facecolors('none')
-                    # 确保边框可见
-                    if sc.get_edgecolors().size == 0:
-                        sc.set_edgecolors('black')
-                    sc.set_linewidths(1.5)  # 设置边框宽度以便看清
-                # 注意：'left', 'right', 'top', 'bottom' 等部分填充效果在 scatter 中无法直接实现
-                # 这些效果主要用于 plot() 函数
-                
-                ax.set_title("Scatter Plot Preview", fontsize=14, fontweight='bold')
-                ax.set_xlabel("X Axis", fontsize=12)
-                ax.set_ylabel("Y Axis", fontsize=12)
-                cbar = fig.colorbar(sc, ax=ax)
-                cbar.set_label("Color Mapping", fontsize=10)
-                st.pyplot(fig)
-                
-                st.markdown("#### 💻 生成代码")
-                # scatter 不支持 fillstyle，但我们可以通过其他方式控制
-                fillstyle_note = ""
-                if marker_scatter in fillable_markers and fillstyle_scatter != 'full':
-                    if fillstyle_scatter == 'none':
-                        fillstyle_note = "\n# 注意：scatter() 不支持 fillstyle，但可以通过 set_facecolors('none') 实现不填充效果\nsc.set_facecolors('none')"
-                    else:
-                        fillstyle_note = f"\n# 注意：scatter() 不支持 fillstyle='{fillstyle_scatter}'，fillstyle 主要用于 plot() 函数"
-                
-                st.code(f"""
+                    ensure_chinese_font()
+                    sc = ax.scatter(x, y, **scatter_kwargs)
+                
+                    # scatter() 不支持 fillstyle 参数，但我们可以通过 PathCollection 的属性来模拟部分效果
+                    fillable_markers = ['o', 's', '^', 'v', '<', '>', 'D', 'd', 'p', 'h', 'H', '8', '*']
+                    if marker_scatter in fillable_markers and fillstyle_scatter == 'none':
+                        # 不填充，仅显示边框
+                        # 注意：scatter 的 fillstyle='none' 效果需要通过设置 facecolors 和 edgecolors 来实现
+                        sc.set_facecolors('none')
+                        # 确保边框可见
+                        if sc.get_edgecolors().size == 0:
+                            sc.set_edgecolors('black')
+                        sc.set_linewidths(1.5)  # 设置边框宽度以便看清
+                    # 注意：'left', 'right', 'top', 'bottom' 等部分填充效果在 scatter 中无法直接实现
+                    # 这些效果主要用于 plot() 函数
+                
+                    ax.set_title("Scatter Plot Preview", fontsize=14, fontweight='bold')
+                    ax.set_xlabel("X Axis", fontsize=12)
+                    ax.set_ylabel("Y Axis", fontsize=12)
+                    cbar = fig.colorbar(sc, ax=ax)
+                    cbar.set_label("Color Mapping", fontsize=10)
+                    show_figure(fig)
+                
+                    st.markdown("#### 💻 生成代码")
+                    # scatter 不支持 fillstyle，但我们可以通过其他方式控制
+                    fillstyle_note = ""
+                    if marker_scatter in fillable_markers and fillstyle_scatter != 'full':
+                        if fillstyle_scatter == 'none':
+                            fillstyle_note = "\n# 注意：scatter() 不支持 fillstyle，但可以通过 set_facecolors('none') 实现不填充效果\nsc.set_facecolors('none')"
+                        else:
+                            fillstyle_note = f"\n# 注意：scatter() 不支持 fillstyle='{fillstyle_scatter}'，fillstyle 主要用于 plot() 函数"
+                
+                    st.code(f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -1571,65 +1693,161 @@ cbar.set_label("Color Mapping", fontsize=10)
 plt.show()
                 """, language='python')
                 
-                # 添加说明
-                if marker_scatter in fillable_markers:
-                    st.info(f"💡 **提示**：`fillstyle` 参数主要用于 `plot()` 函数。对于 `scatter()`，填充样式控制有限。如需完整体验 fillstyle 效果，建议使用 `plot()` 函数配合 `marker` 参数。")
+                    # 添加说明
+                    if marker_scatter in fillable_markers:
+                        st.info(f"💡 **提示**：`fillstyle` 参数主要用于 `plot()` 函数。对于 `scatter()`，填充样式控制有限。如需完整体验 fillstyle 效果，建议使用 `plot()` 函数配合 `marker` 参数。")
             
-        elif collection_type == "LineCollection (线段集合)":
-            st.caption("💡 LineCollection 用于高效绘制大量线段。")
+            elif collection_type == "Large Scatter (大数据散点)":
+                st.caption("💡 点数达到百万级时，逐点绘制标记会越来越慢。密度聚合模式先把点按图表像素网格计数，再用 `imshow` 显示，渲染耗时与点数基本无关。")
             
-            col_lc_ctrl, col_lc_view = st.columns([1.2, 2])
+                col_ds_ctrl, col_ds_view = st.columns([1.2, 2])
             
-            with col_lc_ctrl:
-                st.markdown("#### 🎛️ 参数控制")
-                n_segments = st.slider("线段数量", 10, 100, 30, key="linecollection_n")
-                line_width_lc = st.slider("线宽", 0.5, 3.0, 1.0, 0.5, key="linecollection_width")
-                use_colormap = st.checkbox("使用颜色映射", value=True, key="linecollection_cmap")
-            
-            with col_lc_view:
-                from matplotlib.collections import LineCollection
-                
-                fig_lc, ax_lc = plt.subplots(figsize=(8, 5))
-                
-                # 生成多条线段
-                segments = []
-                colors_list = []
-                for i in range(n_segments):
-                    x_seg = np.linspace(0, 10, 50)
-                    y_seg = np.sin(x_seg + i * 0.2) + i * 0.1
-                    segments.append(np.column_stack([x_seg, y_seg]))
-                    if use_colormap:
-                        colors_list.append(i)
+                with col_ds_ctrl:
+                    st.markdown("#### 🎛️ 参数控制")
+                    ds_n = st.select_slider(
+                        "点数量",
+                        options=[10_000, 100_000, 1_000_000, 3_000_000, 10_000_000],
+                        value=1_000_000,
+                        format_func=lambda n: f"{n:,}",
+                        key="density_scatter_n"
+                    )
+                    ds_mode = st.radio("绘制模式", ["密度聚合 (imshow)", "逐点标记 (scatter)"], key="density_scatter_mode")
+                    ds_norm = st.selectbox(
+                        "归一化 (norm)",
+                        list(DENSITY_NORMS),
+                        key="density_scatter_norm",
+                        help="eq_hist: 直方图均衡化，稀疏和密集区域都清晰 | log: 对数 | linear: 线性，只能看清最密集的区域"
+                    )
+                    ds_cmap = st.selectbox("颜色映射", ['viridis', 'inferno', 'magma', 'plasma', 'cividis'], key="density_scatter_cmap")
+            
+                with col_ds_view:
+                    st.markdown("#### 📊 实时预览")
+                    x_ds, y_ds = generate_large_scatter(ds_n)
+                    use_markers = ds_mode.startswith("逐点标记")
+                    if use_markers and ds_n > 1_000_000:
+                        st.warning("⚠️ 逐点标记模式最多绘制 1,000,000 个点，已自动截断。")
+                        x_ds, y_ds = x_ds[:1_000_000], y_ds[:1_000_000]
+                
+                    start = time.perf_counter()
+                    fig, ax = locked_subplots(figsize=(8, 5))
+                    if use_markers:
+                        ax.scatter(x_ds, y_ds, s=1, c='C0', alpha=0.3, linewidths=0)
+                    else:
+                        image = density_scatter(ax, x_ds, y_ds, cmap=ds_cmap, norm=ds_norm, dpi=DEFAULT_SAVEFIG_OPTIONS['dpi'])
+                        fig.colorbar(image, ax=ax, label="点密度" + (" (排名)" if ds_norm == 'eq_hist' else ""))
+                    ax.set_title(f"{len(x_ds):,} 个点", fontsize=14, fontweight='bold')
+                    ds_decision = apply_render_policy(fig)
+                    ds_png = figure_to_png(fig, dpi=ds_decision['dpi'])
+                    ds_time = time.perf_counter() - start
+                    st.image(ds_png, use_container_width=True)
+                    if format_render_decision(ds_decision):
+                        st.caption(format_render_decision(ds_decision))
+                    st.metric("渲染耗时（绘制 + PNG 编码）", f"{ds_time:.2f} s")
+                
+                    st.markdown("#### ⏱️ 性能对比")
+                    if st.button("运行基准测试（10³ ~ 10⁷ 个点）", key="density_scatter_benchmark"):
+                        with st.spinner("正在测量两种模式的渲染耗时..."):
+                            bench = get_scatter_benchmark((1_000, 10_000, 100_000, 1_000_000, 10_000_000))
+                        fig, ax = locked_subplots(figsize=(8, 4))
+                        ax.plot(bench['n_points'], bench['marker'], 'o-', label='逐点标记 (scatter)')
+                        ax.plot(bench['n_points'], bench['density'], 's-', label='密度聚合 (imshow)')
+                        ax.set_xscale('log')
+                        ax.set_xlabel("点数量")
+                        ax.set_ylabel("渲染耗时 (s)")
+                        ax.grid(True, alpha=0.3)
+                        ax.legend()
+                        show_figure(fig)
+                        st.dataframe(bench, hide_index=True, use_container_width=True)
+                        st.caption("逐点标记模式在 10⁷ 个点时耗时过长，未参与测试。")
+                
+                    st.markdown("#### 💻 生成代码")
+                    st.code(f"""
+import matplotlib.pyplot as plt
+from catalogs.density import density_scatter
+
+fig, ax = plt.subplots(figsize=(8, 5))
+# 按 Axes 像素网格计数，再用 imshow 显示
+image = density_scatter(ax, x, y, cmap='{ds_cmap}', norm='{ds_norm}')
+fig.colorbar(image, ax=ax)
+plt.show()
+                """, language='python')
+            elif collection_type == "LineCollection (线段集合)":
+                st.caption("💡 LineCollection 用于高效绘制大量线段。")
+            
+                col_lc_ctrl, col_lc_view = st.columns([1.2, 2])
+            
+                with col_lc_ctrl:
+                    st.markdown("#### 🎛️ 参数控制")
+                    stress_lc = st.checkbox("🔥 压力测试（10⁴ ~ 10⁵ 条线段）", value=False, key="linecollection_stress")
+                    if stress_lc:
+                        n_segments = st.select_slider("线段数量", [1_000, 10_000, 30_000, 100_000], value=10_000,
+                                                      format_func=lambda n: f"{n:,}", key="linecollection_stress_n")
+                    else:
+                        n_segments = st.slider("线段数量", 10, 100, 30, key="linecollection_n")
+                    line_width_lc = st.slider("线宽", 0.5, 3.0, 1.0, 0.5, key="linecollection_width")
+                    use_colormap = st.checkbox("使用颜色映射", value=True, key="linecollection_cmap")
+                    compare_loop_lc = st.checkbox("⏱️ 对比逐条 plot 的耗时", value=False, key="linecollection_compare")
+            
+                with col_lc_view:
+                    from matplotlib.collections import LineCollection
                 
-                lc = LineCollection(segments, linewidths=line_width_lc)
-                if use_colormap:
-                    lc.set_array(np.array(colors_list))
-                    lc.set_cmap('viridis')
-                else:
-                    lc.set_color('#3b82f6')
-                
-                ax_lc.add_collection(lc)
-                ax_lc.autoscale()
-                ax_lc.set_title("LineCollection", fontsize=14, fontweight='bold')
-                ax_lc.set_xlabel("X Axis", fontsize=12)
-                ax_lc.set_ylabel("Y Axis", fontsize=12)
-                ax_lc.grid(True, alpha=0.3)
-                if use_colormap:
-                    plt.colorbar(lc, ax=ax_lc)
-                st.pyplot(fig_lc)
+                    start_lc = time.perf_counter()
+                    fig_lc, ax_lc = locked_subplots(figsize=(8, 5))
                 
-                st.markdown("#### 💻 生成代码")
-                st.code(f"""
+                    # 一次性生成全部线段，形状为 (n_segments, 50, 2)
+                    segments = wave_segments(n_segments)
+                
+                    lc = LineCollection(segments, linewidths=line_width_lc)
+                    if use_colormap:
+                        lc.set_array(np.arange(n_segments))
+                        lc.set_cmap('viridis')
+                    else:
+                        lc.set_color('#3b82f6')
+                
+                    ax_lc.add_collection(lc)
+                    ax_lc.autoscale()
+                    ax_lc.set_title("LineCollection", fontsize=14, fontweight='bold')
+                    ax_lc.set_xlabel("X Axis", fontsize=12)
+                    ax_lc.set_ylabel("Y Axis", fontsize=12)
+                    ax_lc.grid(True, alpha=0.3)
+                    if use_colormap:
+                        plt.colorbar(lc, ax=ax_lc)
+                    show_figure(fig_lc)
+                    collection_time_lc = time.perf_counter() - start_lc
+                
+                    timing_cols_lc = st.columns(2)
+                    if compare_loop_lc:
+                        # 两种方式都用 time_line_rendering 测量，颜色、线宽和编码设置相同，结果可以直接比较
+                        collection_cmp_lc, _ = time_line_rendering(segments, mode='collection', linewidth=line_width_lc)
+                        loop_time_lc, n_measured_lc = time_line_rendering(segments, mode='loop', linewidth=line_width_lc)
+                        loop_estimate_lc = loop_time_lc * n_segments / n_measured_lc
+                        timing_cols_lc[0].metric("LineCollection 耗时", f"{collection_cmp_lc:.2f} s",
+                                                 help=f"{n_segments:,} 条线段，绘制 + PNG 编码")
+                        timing_cols_lc[1].metric(
+                            "逐条 plot 耗时" + ("（估算）" if n_measured_lc < n_segments else ""),
+                            f"{loop_estimate_lc:.2f} s",
+                            delta=f"{loop_estimate_lc / max(collection_cmp_lc, 1e-6):.1f}×", delta_color="off"
+                        )
+                        caption_lc = ("两种方式在相同条件下测量：单一颜色、同样的线宽，只计绘制 + PNG 编码"
+                                      f"（不含上图的标题、颜色条和输出设置；上图本身耗时 {collection_time_lc:.2f} s）。")
+                        if n_measured_lc < n_segments:
+                            caption_lc += f"逐条 plot 只实际测量了前 {n_measured_lc:,} 条线段，总耗时按线段数量等比例估算。"
+                        st.caption(caption_lc)
+                    else:
+                        timing_cols_lc[0].metric("LineCollection 耗时", f"{collection_time_lc:.2f} s",
+                                                 help=f"{n_segments:,} 条线段，生成 + 绘制 + 编码")
+                
+                    st.markdown("#### 💻 生成代码")
+                    st.code(f"""
 import matplotlib.pyplot as plt
 from matplotlib.collections import LineCollection
 import numpy as np
 
-# 生成线段数据
-segments = []
-for i in range({n_segments}):
-    x = np.linspace(0, 10, 50)
-    y = np.sin(x + i * 0.2) + i * 0.1
-    segments.append(np.column_stack([x, y]))
+# 用广播一次性生成全部线段，形状为 ({n_segments}, 50, 2)
+x = np.linspace(0, 10, 50)
+i = np.arange({n_segments})[:, np.newaxis]
+y = np.sin(x + i * 0.2) + i * 0.1
+segments = np.stack(np.broadcast_arrays(x, y), axis=-1)
 
 # 创建 LineCollection
 lc = LineCollection(segments, linewidths={line_width_lc})
@@ -1643,61 +1861,55 @@ ax.autoscale()
 plt.show()
                 """, language='python')
             
-        elif collection_type == "PolyCollection (多边形集合)":
-            st.caption("💡 PolyCollection 用于高效绘制大量多边形。")
+            elif collection_type == "PolyCollection (多边形集合)":
+                st.caption("💡 PolyCollection 用于高效绘制大量多边形。")
             
-            col_pc_ctrl, col_pc_view = st.columns([1.2, 2])
+                col_pc_ctrl, col_pc_view = st.columns([1.2, 2])
             
-            with col_pc_ctrl:
-                st.markdown("#### 🎛️ 参数控制")
-                n_polygons = st.slider("多边形数量", 5, 30, 10, key="polycollection_n")
-                poly_alpha = st.slider("透明度", 0.1, 1.0, 0.6, 0.1, key="polycollection_alpha")
-            
-            with col_pc_view:
-                from matplotlib.collections import PolyCollection
-                
-                fig_pc, ax_pc = plt.subplots(figsize=(8, 5))
-                
-                # 生成多个多边形
-                polygons = []
-                colors_poly = []
-                for i in range(n_polygons):
-                    center_x = i * 1.0
-                    center_y = np.sin(i * 0.5)
-                    # 创建六边形
-                    angles = np.linspace(0, 2*np.pi, 6, endpoint=False)
-                    radius = 0.3
-                    x_poly = center_x + radius * np.cos(angles)
-                    y_poly = center_y + radius * np.sin(angles)
-                    polygons.append(np.column_stack([x_poly, y_poly]))
-                    colors_poly.append(i)
-                
-                pc = PolyCollection(polygons, alpha=poly_alpha, cmap='viridis')
-                pc.set_array(np.array(colors_poly))
-                ax_pc.add_collection(pc)
-                ax_pc.autoscale()
-                ax_pc.set_title("PolyCollection", fontsize=14, fontweight='bold')
-                ax_pc.set_xlabel("X Axis", fontsize=12)
-                ax_pc.set_ylabel("Y Axis", fontsize=12)
-                ax_pc.grid(True, alpha=0.3)
-                plt.colorbar(pc, ax=ax_pc)
-                st.pyplot(fig_pc)
-                
-                st.markdown("#### 💻 生成代码")
-                st.code(f"""
+                with col_pc_ctrl:
+                    st.markdown("#### 🎛️ 参数控制")
+                    stress_pc = st.checkbox("🔥 压力测试（10⁴ ~ 10⁵ 个多边形）", value=False, key="polycollection_stress")
+                    if stress_pc:
+                        n_polygons = st.select_slider("多边形数量", [1_000, 10_000, 30_000, 100_000], value=10_000,
+                                                      format_func=lambda n: f"{n:,}", key="polycollection_stress_n")
+                    else:
+                        n_polygons = st.slider("多边形数量", 5, 30, 10, key="polycollection_n")
+                    poly_alpha = st.slider("透明度", 0.1, 1.0, 0.6, 0.1, key="polycollection_alpha")
+            
+                with col_pc_view:
+                    from matplotlib.collections import PolyCollection
+                
+                    start_pc = time.perf_counter()
+                    fig_pc, ax_pc = locked_subplots(figsize=(8, 5))
+                
+                    # 一次性生成全部六边形，形状为 (n_polygons, 6, 2)
+                    polygons = hexagon_wave(n_polygons)
+                
+                    pc = PolyCollection(polygons, alpha=poly_alpha, cmap='viridis')
+                    pc.set_array(np.arange(n_polygons))
+                    ax_pc.add_collection(pc)
+                    ax_pc.autoscale()
+                    ax_pc.set_title("PolyCollection", fontsize=14, fontweight='bold')
+                    ax_pc.set_xlabel("X Axis", fontsize=12)
+                    ax_pc.set_ylabel("Y Axis", fontsize=12)
+                    ax_pc.grid(True, alpha=0.3)
+                    plt.colorbar(pc, ax=ax_pc)
+                    show_figure(fig_pc)
+                    st.metric("PolyCollection 耗时", f"{time.perf_counter() - start_pc:.2f} s",
+                              help=f"{n_polygons:,} 个多边形，生成 + 绘制 + 编码")
+                
+                    st.markdown("#### 💻 生成代码")
+                    st.code(f"""
 import matplotlib.pyplot as plt
 from matplotlib.collections import PolyCollection
 import numpy as np
 
-# 生成多边形数据
-polygons = []
-for i in range({n_polygons}):
-    center_x, center_y = i * 1.0, np.sin(i * 0.5)
-    angles = np.linspace(0, 2*np.pi, 6, endpoint=False)
-    radius = 0.3
-    x = center_x + radius * np.cos(angles)
-    y = center_y + radius * np.sin(angles)
-    polygons.append(np.column_stack([x, y]))
+# 用广播一次性生成全部六边形，形状为 ({n_polygons}, 6, 2)
+i = np.arange({n_polygons})
+centers = np.column_stack([i, np.sin(i * 0.5)])
+angles = np.linspace(0, 2*np.pi, 6, endpoint=False)
+offsets = 0.3 * np.column_stack([np.cos(angles), np.sin(angles)])
+polygons = centers[:, np.newaxis, :] + offsets
 
 # 创建 PolyCollection
 pc = PolyCollection(polygons, alpha={poly_alpha}, cmap='viridis')
@@ -1710,40 +1922,48 @@ plt.colorbar(pc, ax=ax)
 plt.show()
                 """, language='python')
             
-        else:  # EventCollection
-            st.caption("💡 EventCollection 用于标记事件时间点。")
+            else:  # EventCollection
+                st.caption("💡 EventCollection 用于标记事件时间点。")
             
-            col_ec_ctrl, col_ec_view = st.columns([1.2, 2])
+                col_ec_ctrl, col_ec_view = st.columns([1.2, 2])
             
-            with col_ec_ctrl:
-                st.markdown("#### 🎛️ 参数控制")
-                n_events = st.slider("事件数量", 5, 50, 20, key="eventcollection_n")
-                orientation_ec = st.selectbox("方向", ['horizontal', 'vertical'], index=0, key="eventcollection_orient")
-            
-            with col_ec_view:
-                from matplotlib.collections import EventCollection
-                
-                fig_ec, ax_ec = plt.subplots(figsize=(8, 5))
-                
-                # 生成事件数据
-                x_data = np.linspace(0, 10, 100)
-                y_data = np.sin(x_data)
-                events = np.random.choice(x_data, n_events)
-                
-                ax_ec.plot(x_data, y_data, label='数据线')
-                evt = EventCollection(events, orientation=orientation_ec, 
-                                    lineoffset=0, linelength=0.5, 
-                                    color='red', linewidth=2)
-                ax_ec.add_collection(evt)
-                ax_ec.set_title("EventCollection", fontsize=14, fontweight='bold')
-                ax_ec.set_xlabel("X Axis", fontsize=12)
-                ax_ec.set_ylabel("Y Axis", fontsize=12)
-                ax_ec.legend()
-                ax_ec.grid(True, alpha=0.3)
-                st.pyplot(fig_ec)
-                
-                st.markdown("#### 💻 生成代码")
-                st.code(f"""
+                with col_ec_ctrl:
+                    st.markdown("#### 🎛️ 参数控制")
+                    stress_ec = st.checkbox("🔥 压力测试（10⁴ ~ 10⁵ 个事件）", value=False, key="eventcollection_stress")
+                    if stress_ec:
+                        n_events = st.select_slider("事件数量", [1_000, 10_000, 30_000, 100_000], value=10_000,
+                                                    format_func=lambda n: f"{n:,}", key="eventcollection_stress_n")
+                    else:
+                        n_events = st.slider("事件数量", 5, 50, 20, key="eventcollection_n")
+                    orientation_ec = st.selectbox("方向", ['horizontal', 'vertical'], index=0, key="eventcollection_orient")
+            
+                with col_ec_view:
+                    from matplotlib.collections import EventCollection
+                
+                    start_ec = time.perf_counter()
+                    fig_ec, ax_ec = locked_subplots(figsize=(8, 5))
+                
+                    # 生成事件数据（所有事件位置一次性生成）
+                    x_data = np.linspace(0, 10, 100)
+                    y_data = np.sin(x_data)
+                    events = np.random.choice(x_data, n_events)
+                
+                    ax_ec.plot(x_data, y_data, label='数据线')
+                    evt = EventCollection(events, orientation=orientation_ec, 
+                                        lineoffset=0, linelength=0.5, 
+                                        color='red', linewidth=2)
+                    ax_ec.add_collection(evt)
+                    ax_ec.set_title("EventCollection", fontsize=14, fontweight='bold')
+                    ax_ec.set_xlabel("X Axis", fontsize=12)
+                    ax_ec.set_ylabel("Y Axis", fontsize=12)
+                    ax_ec.legend()
+                    ax_ec.grid(True, alpha=0.3)
+                    show_figure(fig_ec)
+                    st.metric("EventCollection 耗时", f"{time.perf_counter() - start_ec:.2f} s",
+                              help=f"{n_events:,} 个事件，生成 + 绘制 + 编码")
+                
+                    st.markdown("#### 💻 生成代码")
+                    st.code(f"""
 import matplotlib.pyplot as plt
 from matplotlib.collections import EventCollection
 import numpy as np
@@ -1761,10 +1981,14 @@ ax.add_collection(evt)
 ax.legend()
 plt.show()
                 """, language='python')
+        
+        _collections_panel()
 
     with tab4:
-        st.subheader("渲染像素 (Images: 图像处理)")
-        st.markdown("""
+        @st.fragment
+        def _images_panel():
+            st.subheader("渲染像素 (Images: 图像处理)")
+            st.markdown("""
         <div style='background-color: #fef3c7; padding: 1rem; border-radius: 8px; border-left: 4px solid #f59e0b; margin-bottom: 1.5rem;'>
             <p style='margin: 0; color: #92400e;'>
                 💡 <strong>提示</strong>：Matplotlib 支持多种图像显示和处理方法，包括 imshow、pcolormesh 等。
@@ -1772,46 +1996,46 @@ plt.show()
         </div>
         """, unsafe_allow_html=True)
         
-        image_type = st.selectbox("选择图像类型", 
-                                 ["imshow", "pcolormesh", "matshow", "imread"],
-                                 key="image_type")
+            image_type = st.selectbox("选择图像类型", 
+                                     ["imshow", "pcolormesh", "matshow", "imread", "大图金字塔"],
+                                     key="image_type")
         
-        col_ctrl, col_view = st.columns([1.2, 2])
+            col_ctrl, col_view = st.columns([1.2, 2])
         
-        with col_ctrl:
-            st.markdown("#### 🎛️ 参数控制")
+            with col_ctrl:
+                st.markdown("#### 🎛️ 参数控制")
             
-            with st.expander("🎨 颜色映射 (cmap)", expanded=True):
-                cmap_img = st.selectbox("选择颜色映射", 
-                                       ['viridis', 'plasma', 'inferno', 'magma', 'gray', 'hot', 'cool'],
-                                       index=0, key="image_cmap")
-                if st.button("📚 查看所有颜色映射", key="btn_image_cmap"):
-                    from catalogs.color import render_colormap_gallery
-                    render_colormap_gallery()
+                with st.expander("🎨 颜色映射 (cmap)", expanded=True):
+                    cmap_img = st.selectbox("选择颜色映射", 
+                                           ['viridis', 'plasma', 'inferno', 'magma', 'gray', 'hot', 'cool'],
+                                           index=0, key="image_cmap")
+                    if st.button("📚 查看所有颜色映射", key="btn_image_cmap"):
+                        from catalogs.color import render_colormap_gallery
+                        render_colormap_gallery()
             
-            with st.expander("🔄 插值方式 (interpolation)", expanded=True):
-                interpolation = st.selectbox("插值方式", 
-                                           ['nearest', 'bilinear', 'bicubic', 'spline16', 'spline36', 'hanning', 'hamming'],
-                                           index=1, key="image_interpolation")
+                with st.expander("🔄 插值方式 (interpolation)", expanded=True):
+                    interpolation = st.selectbox("插值方式", 
+                                               ['nearest', 'bilinear', 'bicubic', 'spline16', 'spline36', 'hanning', 'hamming'],
+                                               index=1, key="image_interpolation")
             
-            with st.expander("📐 其他参数", expanded=False):
-                aspect_ratio = st.selectbox("宽高比", ['auto', 'equal', 1.0, 0.5, 2.0], index=0, key="image_aspect")
-                origin_pos = st.selectbox("原点位置", ['upper', 'lower'], index=0, key="image_origin")
+                with st.expander("📐 其他参数", expanded=False):
+                    aspect_ratio = st.selectbox("宽高比", ['auto', 'equal', 1.0, 0.5, 2.0], index=0, key="image_aspect")
+                    origin_pos = st.selectbox("原点位置", ['upper', 'lower'], index=0, key="image_origin")
         
-        with col_view:
-            st.markdown("#### 📊 实时预览")
+            with col_view:
+                st.markdown("#### 📊 实时预览")
             
-            if image_type == "imshow":
-                data = np.random.rand(30, 30)
-                fig, ax = plt.subplots(figsize=(8, 6))
-                im = ax.imshow(data, interpolation=interpolation, cmap=cmap_img, 
-                             aspect=aspect_ratio, origin=origin_pos)
-                fig.colorbar(im, ax=ax)
-                ax.set_title("imshow", fontsize=14, fontweight='bold')
-                st.pyplot(fig)
-                
-                st.markdown("#### 💻 生成代码")
-                st.code(f"""
+                if image_type == "imshow":
+                    data = np.random.rand(30, 30)
+                    fig, ax = locked_subplots(figsize=(8, 6))
+                    im = ax.imshow(data, interpolation=interpolation, cmap=cmap_img, 
+                                 aspect=aspect_ratio, origin=origin_pos)
+                    fig.colorbar(im, ax=ax)
+                    ax.set_title("imshow", fontsize=14, fontweight='bold')
+                    show_figure(fig)
+                
+                    st.markdown("#### 💻 生成代码")
+                    st.code(f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -1825,21 +2049,21 @@ ax.set_title("imshow")
 plt.show()
                 """, language='python')
             
-            elif image_type == "pcolormesh":
-                x = np.linspace(0, 10, 20)
-                y = np.linspace(0, 10, 20)
-                X, Y = np.meshgrid(x, y)
-                Z = np.sin(X) * np.cos(Y)
-                fig, ax = plt.subplots(figsize=(8, 6))
-                mesh = ax.pcolormesh(X, Y, Z, cmap=cmap_img, shading='auto')
-                fig.colorbar(mesh, ax=ax)
-                ax.set_title("pcolormesh", fontsize=14, fontweight='bold')
-                ax.set_xlabel("X Axis", fontsize=12)
-                ax.set_ylabel("Y Axis", fontsize=12)
-                st.pyplot(fig)
+                elif image_type == "pcolormesh":
+                    x = np.linspace(0, 10, 20)
+                    y = np.linspace(0, 10, 20)
+                    X, Y = np.meshgrid(x, y)
+                    Z = np.sin(X) * np.cos(Y)
+                    fig, ax = locked_subplots(figsize=(8, 6))
+                    mesh = ax.pcolormesh(X, Y, Z, cmap=cmap_img, shading='auto')
+                    fig.colorbar(mesh, ax=ax)
+                    ax.set_title("pcolormesh", fontsize=14, fontweight='bold')
+                    ax.set_xlabel("X Axis", fontsize=12)
+                    ax.set_ylabel("Y Axis", fontsize=12)
+                    show_figure(fig)
                 
-                st.markdown("#### 💻 生成代码")
-                st.code(f"""
+                    st.markdown("#### 💻 生成代码")
+                    st.code(f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -1855,16 +2079,16 @@ ax.set_title("pcolormesh")
 plt.show()
                 """, language='python')
             
-            elif image_type == "matshow":
-                data = np.random.rand(10, 10)
-                fig, ax = plt.subplots(figsize=(8, 6))
-                mat = ax.matshow(data, cmap=cmap_img)
-                fig.colorbar(mat, ax=ax)
-                ax.set_title("matshow", fontsize=14, fontweight='bold')
-                st.pyplot(fig)
+                elif image_type == "matshow":
+                    data = np.random.rand(10, 10)
+                    fig, ax = locked_subplots(figsize=(8, 6))
+                    mat = ax.matshow(data, cmap=cmap_img)
+                    fig.colorbar(mat, ax=ax)
+                    ax.set_title("matshow", fontsize=14, fontweight='bold')
+                    show_figure(fig)
                 
-                st.markdown("#### 💻 生成代码")
-                st.code(f"""
+                    st.markdown("#### 💻 生成代码")
+                    st.code(f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -1877,8 +2101,39 @@ ax.set_title("matshow")
 plt.show()
                 """, language='python')
             
-            else:  # imread
-                st.info("""
+                elif image_type == "大图金字塔":
+                    render_image_pyramid_demo(cmap_img, interpolation)
+
+                    st.markdown("#### 💻 生成代码")
+                    st.code(f"""
+import matplotlib.pyplot as plt
+import numpy as np
+
+# 预先生成金字塔：每层宽高减半（2×2 平均），保存为 .npy
+levels = [np.load('level_0.npy', mmap_mode='r')]
+while max(levels[-1].shape[:2]) > 256:
+    prev = levels[-1]
+    h, w = prev.shape[0] // 2, prev.shape[1] // 2
+    np.save(f'level_{{len(levels)}}.npy', prev[:2*h, :2*w].reshape(h, 2, w, 2).mean(axis=(1, 3)))
+    levels.append(np.load(f'level_{{len(levels)}}.npy', mmap_mode='r'))
+
+# 显示窗口 (x0, x1, y0, y1)（原图像素），按 Axes 的像素宽度选层，只读取窗口内的数据
+x0, x1, y0, y1 = 2048, 4096, 2048, 3584
+level = min(int(np.log2((x1 - x0) / 1200)), len(levels) - 1) if x1 - x0 > 1200 else 0
+s = 2**level
+data = levels[level][y0 // s:-(-y1 // s), x0 // s:-(-x1 // s)]
+
+fig, ax = plt.subplots(figsize=(8, 6))
+im = ax.imshow(data, extent=(x0 // s * s, -(-x1 // s) * s, -(-y1 // s) * s, y0 // s * s),
+               cmap='{cmap_img}', interpolation='{interpolation}')
+ax.set_xlim(x0, x1)
+ax.set_ylim(y1, y0)
+fig.colorbar(im, ax=ax)
+plt.show()
+                """, language='python')
+
+                else:  # imread
+                    st.info("""
                 **imread 用于读取图像文件**：
                 
                 ```python
@@ -1890,16 +2145,16 @@ plt.show()
                 **支持的格式**: PNG, JPEG, TIFF, BMP 等
                 """)
                 
-                # 创建一个示例图像数据
-                fig, ax = plt.subplots(figsize=(8, 6))
-                # 模拟一个图像（使用随机数据）
-                img_data = np.random.rand(100, 100, 3)  # RGB图像
-                ax.imshow(img_data)
-                ax.set_title("imread Example (Simulated RGB Image)", fontsize=14, fontweight='bold')
-                st.pyplot(fig)
+                    # 创建一个示例图像数据
+                    fig, ax = locked_subplots(figsize=(8, 6))
+                    # 模拟一个图像（使用随机数据）
+                    img_data = np.random.rand(100, 100, 3)  # RGB图像
+                    ax.imshow(img_data)
+                    ax.set_title("imread Example (Simulated RGB Image)", fontsize=14, fontweight='bold')
+                    show_figure(fig)
                 
-                st.markdown("#### 💻 生成代码")
-                st.code("""
+                    st.markdown("#### 💻 生成代码")
+                    st.code("""
 import matplotlib.pyplot as plt
 from matplotlib.image import imread
 
@@ -1911,6 +2166,8 @@ ax.imshow(img)
 ax.set_title("Loaded Image")
 plt.show()
                 """, language='python')
+        
+        _images_panel()
 
 # --- 章节 4: 布局与美学 ---
 elif menu == "4. 布局与美学":
@@ -1924,36 +2181,37 @@ elif menu == "4. 布局与美学":
     """, unsafe_allow_html=True)
     
     # 使用 Tab 组织不同类别
-    style_tabs = st.tabs(["📐 子图布局", "🎨 样式", "🌈 颜色", "📝 文本样式", "📊 坐标轴设置"])
+    style_tabs = lazy_tabs(["📐 子图布局", "🎨 样式", "🌈 颜色", "📝 文本样式", "📊 坐标轴设置"], key="style_tabs")
     
     with style_tabs[0]:
-        st.subheader("子图布局 (Subplots)")
-        st.caption("学习如何创建多个子图")
+        if is_tab_open(style_tabs[0]):
+            st.subheader("子图布局 (Subplots)")
+            st.caption("学习如何创建多个子图")
         
-        c1, c2 = st.columns(2)
-        rows = c1.number_input("行数 (Rows)", min_value=1, max_value=5, value=2, key="subplot_rows")
-        cols = c2.number_input("列数 (Columns)", min_value=1, max_value=5, value=2, key="subplot_cols")
+            c1, c2 = st.columns(2)
+            rows = c1.number_input("行数 (Rows)", min_value=1, max_value=5, value=2, key="subplot_rows")
+            cols = c2.number_input("列数 (Columns)", min_value=1, max_value=5, value=2, key="subplot_cols")
 
-        col_img, col_code = st.columns([3, 2])
+            col_img, col_code = st.columns([3, 2])
         
-        with col_img:
-            fig, axes = plt.subplots(rows, cols, figsize=(8, 6), constrained_layout=True)
+            with col_img:
+                fig, axes = locked_subplots(rows, cols, figsize=(8, 6), constrained_layout=True)
             
-            if rows == 1 and cols == 1:
-                axes_flat = [axes]
-            else:
-                axes_flat = axes.flatten()
+                if rows == 1 and cols == 1:
+                    axes_flat = [axes]
+                else:
+                    axes_flat = axes.flatten()
                 
-            for i, ax in enumerate(axes_flat):
-                ax.plot(np.random.rand(10), label=f"Line {i+1}")
-                ax.set_title(f"Subplot {i+1}", fontsize=12, fontweight='bold')
-                ax.legend(loc='upper right', fontsize='small')
-                ax.grid(True, alpha=0.3)
-            st.pyplot(fig)
+                for i, ax in enumerate(axes_flat):
+                    ax.plot(np.random.rand(10), label=f"Line {i+1}")
+                    ax.set_title(f"Subplot {i+1}", fontsize=12, fontweight='bold')
+                    ax.legend(loc='upper right', fontsize='small')
+                    ax.grid(True, alpha=0.3)
+                show_figure(fig)
             
-        with col_code:
-            st.markdown("#### 💻 实现代码")
-            code_str = f"""
+            with col_code:
+                st.markdown("#### 💻 实现代码")
+                code_str = f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -1974,38 +2232,46 @@ for i, ax in enumerate(axes_flat):
     ax.grid(True, alpha=0.3)
 plt.show()
 """
-            st.code(code_str, language='python')
+                st.code(code_str, language='python')
     
     with style_tabs[1]:
-        st.subheader("样式")
+        if is_tab_open(style_tabs[1]):
+            st.subheader("样式")
         
-        col_ctrl, col_view = st.columns([1.2, 2])
+            col_ctrl, col_view = st.columns([1.2, 2])
         
-        with col_ctrl:
-            st.markdown("#### 🎨 全局样式")
-            style_select = st.selectbox(
-                "选择样式 (Style Sheets)", 
-                plt.style.available, 
-                index=plt.style.available.index('ggplot') if 'ggplot' in plt.style.available else 0,
-                key="style_select"
-            )
+            with col_ctrl:
+                st.markdown("#### 🎨 全局样式")
+                # 初始值通过 session_state 设置，下方缩略图画廊也会修改这个 key
+                if "style_select" not in st.session_state:
+                    st.session_state["style_select"] = 'ggplot' if 'ggplot' in plt.style.available else plt.style.available[0]
+                style_select = st.selectbox(
+                    "选择样式 (Style Sheets)", 
+                    plt.style.available, 
+                    key="style_select"
+                )
         
-        with col_view:
-            with plt.style.context(style_select):
-                fig, ax = plt.subplots(figsize=(8, 5))
-                x = np.linspace(0, 10, 100)
-                for i in range(1, 4):
-                    ax.plot(x, np.sin(x + i * .5) * (7 - i), label=f"Wave {i}")
-                ax.set_title(f"Style Preview: {style_select}", fontsize=14, fontweight='bold')
-                ax.set_xlabel("X Axis", fontsize=12)
-                ax.set_ylabel("Y Axis", fontsize=12)
-                ax.legend()
-                ax.grid(True, alpha=0.3)
-                st.pyplot(fig)
+            with col_view:
+                with isolated_style(style_select):
+                    fig, ax = locked_subplots(figsize=(8, 5))
+                    x = np.linspace(0, 10, 100)
+                    for i in range(1, 4):
+                        ax.plot(x, np.sin(x + i * .5) * (7 - i), label=f"Wave {i}")
+                    ax.set_title(f"Style Preview: {style_select}", fontsize=14, fontweight='bold')
+                    ax.set_xlabel("X Axis", fontsize=12)
+                    ax.set_ylabel("Y Axis", fontsize=12)
+                    ax.legend()
+                    ax.grid(True, alpha=0.3)
+                    show_figure(fig)
+
+            with st.expander(f"🖼️ 全部样式缩略图（{len(plt.style.available)} 个）", expanded=False):
+                st.caption("同一张示例图在各样式表下的效果，点击样式名即可切换上方的预览")
+                render_style_gallery(plt.style.available, state_key="style_select", current=style_select)
     
     with style_tabs[2]:
-        st.subheader("颜色")
-        st.markdown("""
+        if is_tab_open(style_tabs[2]):
+            st.subheader("颜色")
+            st.markdown("""
         <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
                     color: white; padding: 1rem; border-radius: 8px; margin-bottom: 1.5rem;'>
             <p style='margin: 0; text-align: center; font-weight: 500;'>
@@ -2014,114 +2280,115 @@ plt.show()
         </div>
         """, unsafe_allow_html=True)
         
-        # 使用子Tab组织内容
-        color_subtabs = st.tabs(["🎨 颜色基础", "🌈 颜色映射", "💡 最佳实践", "📚 完整参考"])
+            # 使用子Tab组织内容
+            color_subtabs = lazy_tabs(["🎨 颜色基础", "🌈 颜色映射", "💡 最佳实践", "📚 完整参考"], key="color_subtabs")
         
-        with color_subtabs[0]:
-            st.markdown("### 🎨 颜色基础")
-            st.caption("学习 Matplotlib 中颜色的基本用法和表示形式")
+            with color_subtabs[0]:
+                if is_tab_open(color_subtabs[0]):
+                    st.markdown("### 🎨 颜色基础")
+                    st.caption("学习 Matplotlib 中颜色的基本用法和表示形式")
             
-            col_left, col_right = st.columns([1.2, 2])
+                    col_left, col_right = st.columns([1.2, 2])
             
-            with col_left:
-                st.markdown("#### 📝 颜色表示形式")
+                    with col_left:
+                        st.markdown("#### 📝 颜色表示形式")
                 
-                color_form_tabs = st.tabs(["单色", "多色"])
+                        color_form_tabs = st.tabs(["单色", "多色"])
                 
-                with color_form_tabs[0]:
-                    st.markdown("**选择颜色形式**")
-                    color_form = st.radio(
-                        "颜色形式",
-                        ["颜色名称", "单字符", "CN颜色", "HEX", "RGB"],
-                        key="color_form_demo"
-                    )
+                        with color_form_tabs[0]:
+                            st.markdown("**选择颜色形式**")
+                            color_form = st.radio(
+                                "颜色形式",
+                                ["颜色名称", "单字符", "CN颜色", "HEX", "RGB"],
+                                key="color_form_demo"
+                            )
                     
-                    if color_form == "颜色名称":
-                        common_colors_list = ['red', 'blue', 'green', 'orange', 'purple', 'brown', 'pink', 'gray', 
-                                             'black', 'yellow', 'cyan', 'magenta', 'lime', 'navy', 'maroon', 'olive']
-                        selected_color = st.selectbox("选择颜色", common_colors_list, key="color_name_demo")
-                        color_value = selected_color
-                        color_code = f"'{selected_color}'"
-                    elif color_form == "单字符":
-                        base_chars = ['r', 'g', 'b', 'c', 'm', 'y', 'k', 'w']
-                        selected_char = st.selectbox("选择颜色", base_chars, key="color_char_demo")
-                        color_value = selected_char
-                        color_code = f"'{selected_char}'"
-                    elif color_form == "CN颜色":
-                        cn_list = [f'C{i}' for i in range(10)]
-                        selected_cn = st.selectbox("选择颜色", cn_list, key="color_cn_demo")
-                        color_value = selected_cn
-                        color_code = f"'{selected_cn}'"
-                    elif color_form == "HEX":
-                        hex_color = st.color_picker("选择颜色", "#FF5733", key="color_hex_demo")
-                        color_value = hex_color
-                        color_code = f"'{hex_color}'"
-                    else:  # RGB
-                        col_r, col_g, col_b = st.columns(3)
-                        with col_r:
-                            r_val = st.slider("R", 0.0, 1.0, 1.0, 0.01, key="rgb_r_demo")
-                        with col_g:
-                            g_val = st.slider("G", 0.0, 1.0, 0.34, 0.01, key="rgb_g_demo")
-                        with col_b:
-                            b_val = st.slider("B", 0.0, 1.0, 0.2, 0.01, key="rgb_b_demo")
-                        color_value = (r_val, g_val, b_val)
-                        color_code = f"({r_val}, {g_val}, {b_val})"
+                            if color_form == "颜色名称":
+                                common_colors_list = ['red', 'blue', 'green', 'orange', 'purple', 'brown', 'pink', 'gray', 
+                                                     'black', 'yellow', 'cyan', 'magenta', 'lime', 'navy', 'maroon', 'olive']
+                                selected_color = st.selectbox("选择颜色", common_colors_list, key="color_name_demo")
+                                color_value = selected_color
+                                color_code = f"'{selected_color}'"
+                            elif color_form == "单字符":
+                                base_chars = ['r', 'g', 'b', 'c', 'm', 'y', 'k', 'w']
+                                selected_char = st.selectbox("选择颜色", base_chars, key="color_char_demo")
+                                color_value = selected_char
+                                color_code = f"'{selected_char}'"
+                            elif color_form == "CN颜色":
+                                cn_list = [f'C{i}' for i in range(10)]
+                                selected_cn = st.selectbox("选择颜色", cn_list, key="color_cn_demo")
+                                color_value = selected_cn
+                                color_code = f"'{selected_cn}'"
+                            elif color_form == "HEX":
+                                hex_color = st.color_picker("选择颜色", "#FF5733", key="color_hex_demo")
+                                color_value = hex_color
+                                color_code = f"'{hex_color}'"
+                            else:  # RGB
+                                col_r, col_g, col_b = st.columns(3)
+                                with col_r:
+                                    r_val = st.slider("R", 0.0, 1.0, 1.0, 0.01, key="rgb_r_demo")
+                                with col_g:
+                                    g_val = st.slider("G", 0.0, 1.0, 0.34, 0.01, key="rgb_g_demo")
+                                with col_b:
+                                    b_val = st.slider("B", 0.0, 1.0, 0.2, 0.01, key="rgb_b_demo")
+                                color_value = (r_val, g_val, b_val)
+                                color_code = f"({r_val}, {g_val}, {b_val})"
                     
-                    st.markdown("---")
-                    st.markdown("**透明度 (Alpha)**")
-                    alpha_val = st.slider("透明度", 0.0, 1.0, 1.0, 0.1, key="alpha_demo")
+                            st.markdown("---")
+                            st.markdown("**透明度 (Alpha)**")
+                            alpha_val = st.slider("透明度", 0.0, 1.0, 1.0, 0.1, key="alpha_demo")
                 
-                with color_form_tabs[1]:
-                    st.markdown("**多系列颜色**")
-                    st.info("""
+                        with color_form_tabs[1]:
+                            st.markdown("**多系列颜色**")
+                            st.info("""
                     当绘制多条线或多个系列时，可以使用：
                     - **CN颜色循环**：自动使用C0, C1, C2...
                     - **颜色列表**：手动指定每个系列的颜色
                     """)
                     
-                    use_cn_cycle = st.checkbox("使用CN颜色循环", value=True, key="use_cn_cycle")
-                    if not use_cn_cycle:
-                        num_series = st.slider("系列数量", 2, 8, 3, key="num_series")
-                        st.caption(f"将使用前{num_series}个CN颜色")
-            
-            with col_right:
-                st.markdown("#### 📊 实时预览")
-                
-                try:
-                    ensure_chinese_font()
-                    fig, ax = plt.subplots(figsize=(10, 5))
-                    x = np.linspace(0, 10, 100)
+                            use_cn_cycle = st.checkbox("使用CN颜色循环", value=True, key="use_cn_cycle")
+                            if not use_cn_cycle:
+                                num_series = st.slider("系列数量", 2, 8, 3, key="num_series")
+                                st.caption(f"将使用前{num_series}个CN颜色")
+            
+                    with col_right:
+                        st.markdown("#### 📊 实时预览")
+                
+                        try:
+                            ensure_chinese_font()
+                            fig, ax = locked_subplots(figsize=(10, 5))
+                            x = np.linspace(0, 10, 100)
                     
-                    if use_cn_cycle:
-                        # 使用CN颜色循环
-                        for i in range(3):
-                            ax.plot(x, np.sin(x + i * 0.5) * (3 - i), 
-                                   color=f'C{i}', linewidth=2.5, alpha=alpha_val,
-                                   label=f"Series {i+1} (C{i})")
-                    else:
-                        # 使用选定的颜色
-                        for i in range(num_series):
-                            if isinstance(color_value, tuple):
-                                # RGB颜色，为每个系列添加轻微变化
-                                r, g, b = color_value
-                                series_color = (min(1.0, r + i*0.1), min(1.0, g + i*0.1), min(1.0, b + i*0.1))
+                            if use_cn_cycle:
+                                # 使用CN颜色循环
+                                for i in range(3):
+                                    ax.plot(x, np.sin(x + i * 0.5) * (3 - i), 
+                                           color=f'C{i}', linewidth=2.5, alpha=alpha_val,
+                                           label=f"Series {i+1} (C{i})")
                             else:
-                                series_color = color_value
-                            ax.plot(x, np.sin(x + i * 0.5) * (3 - i), 
-                                   color=series_color, linewidth=2.5, alpha=alpha_val,
-                                   label=f"Series {i+1}")
+                                # 使用选定的颜色
+                                for i in range(num_series):
+                                    if isinstance(color_value, tuple):
+                                        # RGB颜色，为每个系列添加轻微变化
+                                        r, g, b = color_value
+                                        series_color = (min(1.0, r + i*0.1), min(1.0, g + i*0.1), min(1.0, b + i*0.1))
+                                    else:
+                                        series_color = color_value
+                                    ax.plot(x, np.sin(x + i * 0.5) * (3 - i), 
+                                           color=series_color, linewidth=2.5, alpha=alpha_val,
+                                           label=f"Series {i+1}")
                     
-                    ax.set_title(f"Color Example: {color_form}", fontsize=14, fontweight='bold')
-                    ax.set_xlabel("X Axis", fontsize=12)
-                    ax.set_ylabel("Y Axis", fontsize=12)
-                    ax.legend(loc='upper right')
-                    ax.grid(True, alpha=0.3)
-                    st.pyplot(fig)
-                    plt.close(fig)
+                            ax.set_title(f"Color Example: {color_form}", fontsize=14, fontweight='bold')
+                            ax.set_xlabel("X Axis", fontsize=12)
+                            ax.set_ylabel("Y Axis", fontsize=12)
+                            ax.legend(loc='upper right')
+                            ax.grid(True, alpha=0.3)
+                            show_figure(fig)
+                            plt.close(fig)
                     
-                    st.markdown("#### 💻 代码示例")
-                    if use_cn_cycle:
-                        code_example = f"""
+                            st.markdown("#### 💻 代码示例")
+                            if use_cn_cycle:
+                                code_example = f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -2139,8 +2406,8 @@ ax.legend()
 ax.grid(True, alpha=0.3)
 plt.show()
 """
-                    else:
-                        code_example = f"""
+                            else:
+                                code_example = f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -2159,137 +2426,138 @@ ax.legend()
 ax.grid(True, alpha=0.3)
 plt.show()
 """
-                    st.code(code_example, language='python')
-                except Exception as e:
-                    st.error(f"渲染错误: {str(e)}")
+                            st.code(code_example, language='python')
+                        except Exception as e:
+                            st.error(f"渲染错误: {str(e)}")
             
-            st.markdown("---")
-            st.markdown("#### 📋 颜色形式对比表")
-            
-            color_comparison_data = {
-                '形式': ['颜色名称', '单字符', 'CN颜色', 'HEX', 'RGB', 'RGBA'],
-                '示例': ["'red'", "'r'", "'C0'", "'#FF5733'", "(1.0, 0.0, 0.0)", "(1.0, 0.0, 0.0, 0.8)"],
-                '优点': [
-                    '直观易读，148种CSS4颜色',
-                    '简洁快速，8种基础颜色',
-                    '自动循环，适合多系列',
-                    '精确控制，支持透明度',
-                    '精确控制RGB值',
-                    '支持透明度控制'
-                ],
-                '适用场景': [
-                    '一般用途，需要直观颜色名',
-                    '快速原型，简单图表',
-                    '多系列图表（推荐）',
-                    'Web设计，精确颜色',
-                    '精确颜色控制',
-                    '需要透明度的场景'
-                ]
-            }
-            st.dataframe(pd.DataFrame(color_comparison_data), use_container_width=True, hide_index=True)
-        
-        with color_subtabs[1]:
-            st.markdown("### 🌈 颜色映射 (Colormap)")
-            st.caption("学习如何使用颜色映射将数值数据映射到颜色")
-            
-            col_left, col_right = st.columns([1.2, 2])
-            
-            with col_left:
-                st.markdown("#### 🎨 Colormap 选择")
-                
-                cmap_category = st.selectbox(
-                    "Colormap 类别",
-                    ["Perceptually Uniform", "Sequential", "Diverging", "Qualitative", "Cyclic"],
-                    key="cmap_category_demo"
-                )
-                
-                # 根据类别选择colormap
-                if cmap_category == "Perceptually Uniform":
-                    cmap_options = ['viridis', 'plasma', 'inferno', 'magma', 'cividis']
-                    cmap_desc = "感知均匀，适合科学可视化（推荐）"
-                elif cmap_category == "Sequential":
-                    cmap_options = ['Blues', 'Greens', 'Reds', 'Oranges', 'Purples', 'Greys']
-                    cmap_desc = "连续映射，适合有序数据"
-                elif cmap_category == "Diverging":
-                    cmap_options = ['coolwarm', 'RdBu', 'RdYlBu', 'Spectral', 'seismic']
-                    cmap_desc = "发散映射，适合有中心值的数据"
-                elif cmap_category == "Qualitative":
-                    cmap_options = ['tab10', 'tab20', 'Set1', 'Set2', 'Set3', 'Pastel1']
-                    cmap_desc = "定性映射，适合分类数据"
-                else:  # Cyclic
-                    cmap_options = ['hsv', 'twilight', 'twilight_shifted']
-                    cmap_desc = "循环映射，适合周期性数据"
-                
-                selected_cmap = st.selectbox("选择 Colormap", cmap_options, key="cmap_select_demo")
-                st.caption(f"*{cmap_desc}*")
-                
-                # 反转选项
-                reverse_cmap = st.checkbox("反转 Colormap (添加 '_r' 后缀)", key="reverse_cmap")
-                if reverse_cmap:
-                    selected_cmap = selected_cmap + '_r'
-                
-                st.markdown("---")
-                st.markdown("#### 📊 应用场景")
-                cmap_application = st.selectbox(
-                    "选择应用场景",
-                    ["散点图 (Scatter)", "热力图 (Heatmap)", "等高线 (Contour)", "2D图像 (imshow)"],
-                    key="cmap_application"
-                )
-            
-            with col_right:
-                st.markdown("#### 📊 实时预览")
-                
-                try:
-                    ensure_chinese_font()
-                    fig, ax = plt.subplots(figsize=(10, 6))
+                    st.markdown("---")
+                    st.markdown("#### 📋 颜色形式对比表")
+            
+                    color_comparison_data = {
+                        '形式': ['颜色名称', '单字符', 'CN颜色', 'HEX', 'RGB', 'RGBA'],
+                        '示例': ["'red'", "'r'", "'C0'", "'#FF5733'", "(1.0, 0.0, 0.0)", "(1.0, 0.0, 0.0, 0.8)"],
+                        '优点': [
+                            '直观易读，148种CSS4颜色',
+                            '简洁快速，8种基础颜色',
+                            '自动循环，适合多系列',
+                            '精确控制，支持透明度',
+                            '精确控制RGB值',
+                            '支持透明度控制'
+                        ],
+                        '适用场景': [
+                            '一般用途，需要直观颜色名',
+                            '快速原型，简单图表',
+                            '多系列图表（推荐）',
+                            'Web设计，精确颜色',
+                            '精确颜色控制',
+                            '需要透明度的场景'
+                        ]
+                    }
+                    st.dataframe(pd.DataFrame(color_comparison_data), use_container_width=True, hide_index=True)
+        
+            with color_subtabs[1]:
+                if is_tab_open(color_subtabs[1]):
+                    st.markdown("### 🌈 颜色映射 (Colormap)")
+                    st.caption("学习如何使用颜色映射将数值数据映射到颜色")
+            
+                    col_left, col_right = st.columns([1.2, 2])
+            
+                    with col_left:
+                        st.markdown("#### 🎨 Colormap 选择")
+                
+                        cmap_category = st.selectbox(
+                            "Colormap 类别",
+                            ["Perceptually Uniform", "Sequential", "Diverging", "Qualitative", "Cyclic"],
+                            key="cmap_category_demo"
+                        )
+                
+                        # 根据类别选择colormap
+                        if cmap_category == "Perceptually Uniform":
+                            cmap_options = ['viridis', 'plasma', 'inferno', 'magma', 'cividis']
+                            cmap_desc = "感知均匀，适合科学可视化（推荐）"
+                        elif cmap_category == "Sequential":
+                            cmap_options = ['Blues', 'Greens', 'Reds', 'Oranges', 'Purples', 'Greys']
+                            cmap_desc = "连续映射，适合有序数据"
+                        elif cmap_category == "Diverging":
+                            cmap_options = ['coolwarm', 'RdBu', 'RdYlBu', 'Spectral', 'seismic']
+                            cmap_desc = "发散映射，适合有中心值的数据"
+                        elif cmap_category == "Qualitative":
+                            cmap_options = ['tab10', 'tab20', 'Set1', 'Set2', 'Set3', 'Pastel1']
+                            cmap_desc = "定性映射，适合分类数据"
+                        else:  # Cyclic
+                            cmap_options = ['hsv', 'twilight', 'twilight_shifted']
+                            cmap_desc = "循环映射，适合周期性数据"
+                
+                        selected_cmap = st.selectbox("选择 Colormap", cmap_options, key="cmap_select_demo")
+                        st.caption(f"*{cmap_desc}*")
+                
+                        # 反转选项
+                        reverse_cmap = st.checkbox("反转 Colormap (添加 '_r' 后缀)", key="reverse_cmap")
+                        if reverse_cmap:
+                            selected_cmap = selected_cmap + '_r'
+                
+                        st.markdown("---")
+                        st.markdown("#### 📊 应用场景")
+                        cmap_application = st.selectbox(
+                            "选择应用场景",
+                            ["散点图 (Scatter)", "热力图 (Heatmap)", "等高线 (Contour)", "2D图像 (imshow)"],
+                            key="cmap_application"
+                        )
+            
+                    with col_right:
+                        st.markdown("#### 📊 实时预览")
+                
+                        try:
+                            ensure_chinese_font()
+                            fig, ax = locked_subplots(figsize=(10, 6))
                     
-                    if cmap_application == "散点图 (Scatter)":
-                        x_scatter = np.random.rand(200) * 10
-                        y_scatter = np.random.rand(200) * 10
-                        c_scatter = np.random.rand(200)
+                            if cmap_application == "散点图 (Scatter)":
+                                x_scatter = np.random.rand(200) * 10
+                                y_scatter = np.random.rand(200) * 10
+                                c_scatter = np.random.rand(200)
                         
-                        scatter = ax.scatter(x_scatter, y_scatter, c=c_scatter, 
-                                            cmap=selected_cmap, s=80, alpha=0.7, edgecolors='white', linewidths=0.5)
-                        plt.colorbar(scatter, ax=ax, label='Value')
-                        ax.set_title(f"Scatter Plot with '{selected_cmap}'", fontsize=14, fontweight='bold')
-                        ax.set_xlabel("X Axis", fontsize=12)
-                        ax.set_ylabel("Y Axis", fontsize=12)
+                                scatter = ax.scatter(x_scatter, y_scatter, c=c_scatter, 
+                                                    cmap=selected_cmap, s=80, alpha=0.7, edgecolors='white', linewidths=0.5)
+                                plt.colorbar(scatter, ax=ax, label='Value')
+                                ax.set_title(f"Scatter Plot with '{selected_cmap}'", fontsize=14, fontweight='bold')
+                                ax.set_xlabel("X Axis", fontsize=12)
+                                ax.set_ylabel("Y Axis", fontsize=12)
                         
-                    elif cmap_application == "热力图 (Heatmap)":
-                        data_heatmap = np.random.rand(15, 15)
-                        im = ax.imshow(data_heatmap, cmap=selected_cmap, aspect='auto', interpolation='nearest')
-                        plt.colorbar(im, ax=ax, label='Value')
-                        ax.set_title(f"Heatmap with '{selected_cmap}'", fontsize=14, fontweight='bold')
-                        ax.set_xticks([])
-                        ax.set_yticks([])
+                            elif cmap_application == "热力图 (Heatmap)":
+                                data_heatmap = np.random.rand(15, 15)
+                                im = ax.imshow(data_heatmap, cmap=selected_cmap, aspect='auto', interpolation='nearest')
+                                plt.colorbar(im, ax=ax, label='Value')
+                                ax.set_title(f"Heatmap with '{selected_cmap}'", fontsize=14, fontweight='bold')
+                                ax.set_xticks([])
+                                ax.set_yticks([])
                         
-                    elif cmap_application == "等高线 (Contour)":
-                        x_contour = np.linspace(-3, 3, 100)
-                        y_contour = np.linspace(-3, 3, 100)
-                        X, Y = np.meshgrid(x_contour, y_contour)
-                        Z = np.exp(-(X**2 + Y**2)) + 0.5 * np.exp(-((X-1)**2 + (Y-1)**2))
+                            elif cmap_application == "等高线 (Contour)":
+                                x_contour = np.linspace(-3, 3, 100)
+                                y_contour = np.linspace(-3, 3, 100)
+                                X, Y = np.meshgrid(x_contour, y_contour)
+                                Z = np.exp(-(X**2 + Y**2)) + 0.5 * np.exp(-((X-1)**2 + (Y-1)**2))
                         
-                        contour = ax.contourf(X, Y, Z, levels=20, cmap=selected_cmap)
-                        plt.colorbar(contour, ax=ax, label='Value')
-                        ax.set_title(f"Contour Plot with '{selected_cmap}'", fontsize=14, fontweight='bold')
-                        ax.set_xlabel("X Axis", fontsize=12)
-                        ax.set_ylabel("Y Axis", fontsize=12)
+                                contour = ax.contourf(X, Y, Z, levels=20, cmap=selected_cmap)
+                                plt.colorbar(contour, ax=ax, label='Value')
+                                ax.set_title(f"Contour Plot with '{selected_cmap}'", fontsize=14, fontweight='bold')
+                                ax.set_xlabel("X Axis", fontsize=12)
+                                ax.set_ylabel("Y Axis", fontsize=12)
                         
-                    else:  # imshow
-                        data_2d = np.random.rand(20, 20)
-                        im = ax.imshow(data_2d, cmap=selected_cmap, aspect='auto')
-                        plt.colorbar(im, ax=ax, label='Value')
-                        ax.set_title(f"2D Image with '{selected_cmap}'", fontsize=14, fontweight='bold')
-                        ax.set_xticks([])
-                        ax.set_yticks([])
+                            else:  # imshow
+                                data_2d = np.random.rand(20, 20)
+                                im = ax.imshow(data_2d, cmap=selected_cmap, aspect='auto')
+                                plt.colorbar(im, ax=ax, label='Value')
+                                ax.set_title(f"2D Image with '{selected_cmap}'", fontsize=14, fontweight='bold')
+                                ax.set_xticks([])
+                                ax.set_yticks([])
                     
-                    ax.grid(False)
-                    st.pyplot(fig)
-                    plt.close(fig)
+                            ax.grid(False)
+                            show_figure(fig)
+                            plt.close(fig)
                     
-                    st.markdown("#### 💻 代码示例")
-                    if cmap_application == "散点图 (Scatter)":
-                        code_cmap = f"""
+                            st.markdown("#### 💻 代码示例")
+                            if cmap_application == "散点图 (Scatter)":
+                                code_cmap = f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -2304,8 +2572,8 @@ plt.colorbar(scatter, ax=ax, label='Value')
 ax.set_title("Scatter Plot with Colormap")
 plt.show()
 """
-                    elif cmap_application == "热力图 (Heatmap)":
-                        code_cmap = f"""
+                            elif cmap_application == "热力图 (Heatmap)":
+                                code_cmap = f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -2318,8 +2586,8 @@ plt.colorbar(im, ax=ax, label='Value')
 ax.set_title("Heatmap with Colormap")
 plt.show()
 """
-                    elif cmap_application == "等高线 (Contour)":
-                        code_cmap = f"""
+                            elif cmap_application == "等高线 (Contour)":
+                                code_cmap = f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -2335,8 +2603,8 @@ plt.colorbar(contour, ax=ax, label='Value')
 ax.set_title("Contour Plot with Colormap")
 plt.show()
 """
-                    else:
-                        code_cmap = f"""
+                            else:
+                                code_cmap = f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -2349,42 +2617,43 @@ plt.colorbar(im, ax=ax, label='Value')
 ax.set_title("2D Image with Colormap")
 plt.show()
 """
-                    st.code(code_cmap, language='python')
-                except Exception as e:
-                    st.error(f"渲染错误: {str(e)}")
-            
-            st.markdown("---")
-            st.markdown("#### 📋 Colormap 选择指南")
-            
-            cmap_guide_data = {
-                '数据类型': ['连续数据', '有中心值的数据', '分类数据', '周期性数据', '科学可视化'],
-                '推荐 Colormap': [
-                    'viridis, plasma, inferno',
-                    'coolwarm, RdBu, Spectral',
-                    'tab10, Set1, Set2',
-                    'hsv, twilight',
-                    'viridis, plasma, cividis'
-                ],
-                '特点': [
-                    '感知均匀，适合表示大小',
-                    '中心值用不同颜色，两端用对比色',
-                    '颜色区分明显，适合分类',
-                    '颜色循环，适合周期性',
-                    '色盲友好，感知均匀'
-                ]
-            }
-            st.dataframe(pd.DataFrame(cmap_guide_data), use_container_width=True, hide_index=True)
-        
-        with color_subtabs[2]:
-            st.markdown("### 💡 颜色最佳实践")
-            st.caption("学习如何选择合适的颜色，让图表更专业、更易读")
-            
-            col1, col2 = st.columns(2)
+                            st.code(code_cmap, language='python')
+                        except Exception as e:
+                            st.error(f"渲染错误: {str(e)}")
             
-            with col1:
-                st.markdown("#### ✅ 推荐做法")
-                
-                st.success("""
+                    st.markdown("---")
+                    st.markdown("#### 📋 Colormap 选择指南")
+            
+                    cmap_guide_data = {
+                        '数据类型': ['连续数据', '有中心值的数据', '分类数据', '周期性数据', '科学可视化'],
+                        '推荐 Colormap': [
+                            'viridis, plasma, inferno',
+                            'coolwarm, RdBu, Spectral',
+                            'tab10, Set1, Set2',
+                            'hsv, twilight',
+                            'viridis, plasma, cividis'
+                        ],
+                        '特点': [
+                            '感知均匀，适合表示大小',
+                            '中心值用不同颜色，两端用对比色',
+                            '颜色区分明显，适合分类',
+                            '颜色循环，适合周期性',
+                            '色盲友好，感知均匀'
+                        ]
+                    }
+                    st.dataframe(pd.DataFrame(cmap_guide_data), use_container_width=True, hide_index=True)
+        
+            with color_subtabs[2]:
+                if is_tab_open(color_subtabs[2]):
+                    st.markdown("### 💡 颜色最佳实践")
+                    st.caption("学习如何选择合适的颜色，让图表更专业、更易读")
+            
+                    col1, col2 = st.columns(2)
+            
+                    with col1:
+                        st.markdown("#### ✅ 推荐做法")
+                
+                        st.success("""
                 **1. 使用感知均匀的 Colormap**
                 - ✅ `viridis`：默认推荐，色盲友好
                 - ✅ `plasma`：高对比度
@@ -2408,10 +2677,10 @@ plt.show()
                 - 使用形状+颜色双重编码
                 """)
             
-            with col2:
-                st.markdown("#### ❌ 避免的做法")
+                    with col2:
+                        st.markdown("#### ❌ 避免的做法")
                 
-                st.error("""
+                        st.error("""
                 **1. 避免使用 jet colormap**
                 - ❌ `jet`：虽然常见但不推荐
                 - 问题：不感知均匀，对色盲不友好
@@ -2430,67 +2699,69 @@ plt.show()
                 - ✅ `color=(1.0, 0.0, 0.0)` 或 `color='red'`
                 """)
             
-            st.markdown("---")
-            st.markdown("#### 🎯 实际应用示例")
+                    st.markdown("---")
+                    st.markdown("#### 🎯 实际应用示例")
             
-            example_tabs = st.tabs(["对比示例", "色盲友好", "多系列配色"])
+                    example_tabs = lazy_tabs(["对比示例", "色盲友好", "多系列配色"], key="example_tabs")
             
-            with example_tabs[0]:
-                st.markdown("**好的 vs 不好的 Colormap 选择**")
+                    with example_tabs[0]:
+                        if is_tab_open(example_tabs[0]):
+                            st.markdown("**好的 vs 不好的 Colormap 选择**")
                 
-                fig_compare, axes_compare = plt.subplots(1, 2, figsize=(14, 5))
+                            fig_compare, axes_compare = locked_subplots(1, 2, figsize=(14, 5))
                 
-                data_compare = np.random.rand(20, 20)
+                            data_compare = np.random.rand(20, 20)
                 
-                # 不好的选择：jet
-                im1 = axes_compare[0].imshow(data_compare, cmap='jet', aspect='auto')
-                axes_compare[0].set_title("❌ jet (不推荐)", fontsize=12, fontweight='bold')
-                axes_compare[0].axis('off')
-                plt.colorbar(im1, ax=axes_compare[0])
+                            # 不好的选择：jet
+                            im1 = axes_compare[0].imshow(data_compare, cmap='jet', aspect='auto')
+                            axes_compare[0].set_title("❌ jet (不推荐)", fontsize=12, fontweight='bold')
+                            axes_compare[0].axis('off')
+                            plt.colorbar(im1, ax=axes_compare[0])
                 
-                # 好的选择：viridis
-                im2 = axes_compare[1].imshow(data_compare, cmap='viridis', aspect='auto')
-                axes_compare[1].set_title("✅ viridis (推荐)", fontsize=12, fontweight='bold')
-                axes_compare[1].axis('off')
-                plt.colorbar(im2, ax=axes_compare[1])
+                            # 好的选择：viridis
+                            im2 = axes_compare[1].imshow(data_compare, cmap='viridis', aspect='auto')
+                            axes_compare[1].set_title("✅ viridis (推荐)", fontsize=12, fontweight='bold')
+                            axes_compare[1].axis('off')
+                            plt.colorbar(im2, ax=axes_compare[1])
                 
-                plt.tight_layout()
-                st.pyplot(fig_compare)
-                plt.close(fig_compare)
+                            tight_layout()
+                            show_figure(fig_compare)
+                            plt.close(fig_compare)
                 
-                st.info("""
+                            st.info("""
                 **为什么 viridis 更好？**
                 - 感知均匀：数值变化与颜色变化一致
                 - 色盲友好：色盲用户也能区分
                 - 适合打印：灰度打印时仍能区分
                 """)
             
-            with example_tabs[1]:
-                st.markdown("**色盲友好配色方案**")
+                    with example_tabs[1]:
+                        if is_tab_open(example_tabs[1]):
+                            st.markdown("**色盲友好配色方案**")
                 
-                fig_colorblind, axes_colorblind = plt.subplots(1, 2, figsize=(14, 5))
+                            fig_colorblind, axes_colorblind = locked_subplots(1, 2, figsize=(14, 5))
                 
-                x_cb = np.linspace(0, 10, 100)
+                            x_cb = np.linspace(0, 10, 100)
                 
-                # 不友好：红绿对比
-                axes_colorblind[0].plot(x_cb, np.sin(x_cb), 'r-', linewidth=2, label='Series 1')
-                axes_colorblind[0].plot(x_cb, np.cos(x_cb), 'g-', linewidth=2, label='Series 2')
-                axes_colorblind[0].set_title("❌ 红绿对比（色盲不友好）", fontsize=12, fontweight='bold')
-                axes_colorblind[0].legend()
-                axes_colorblind[0].grid(True, alpha=0.3)
+                            # 不友好：红绿对比
+                            axes_colorblind[0].plot(x_cb, np.sin(x_cb), 'r-', linewidth=2, label='Series 1')
+                            axes_colorblind[0].plot(x_cb, np.cos(x_cb), 'g-', linewidth=2, label='Series 2')
+                            axes_colorblind[0].set_title("❌ 红绿对比（色盲不友好）", fontsize=12, fontweight='bold')
+                            axes_colorblind[0].legend()
+                            axes_colorblind[0].grid(True, alpha=0.3)
                 
-                # 友好：蓝橙对比
-                axes_colorblind[1].plot(x_cb, np.sin(x_cb), 'C0', linewidth=2, label='Series 1')
-                axes_colorblind[1].plot(x_cb, np.cos(x_cb), 'C1', linewidth=2, label='Series 2')
-                axes_colorblind[1].set_title("✅ 蓝橙对比（色盲友好）", fontsize=12, fontweight='bold')
-                axes_colorblind[1].legend()
-                axes_colorblind[1].grid(True, alpha=0.3)
+                            # 友好：蓝橙对比
+                            axes_colorblind[1].plot(x_cb, np.sin(x_cb), 'C0', linewidth=2, label='Series 1')
+                            axes_colorblind[1].plot(x_cb, np.cos(x_cb), 'C1', linewidth=2, label='Series 2')
+                            axes_colorblind[1].set_title("✅ 蓝橙对比（色盲友好）", fontsize=12, fontweight='bold')
+                            axes_colorblind[1].legend()
+                            axes_colorblind[1].grid(True, alpha=0.3)
                 
-                plt.tight_layout()
-                st.pyplot(fig_colorblind)
-                plt.close(fig_colorblind)
+                            tight_layout()
+                            show_figure(fig_colorblind)
+                            plt.close(fig_colorblind)
                 
-                st.success("""
+                            st.success("""
                 **色盲友好建议**：
                 1. 使用 `tab10` colormap（色盲友好设计）
                 2. 结合形状和颜色（如不同标记点）
@@ -2498,29 +2769,30 @@ plt.show()
                 4. 避免仅依赖颜色传达信息
                 """)
             
-            with example_tabs[2]:
-                st.markdown("**多系列图表配色**")
+                    with example_tabs[2]:
+                        if is_tab_open(example_tabs[2]):
+                            st.markdown("**多系列图表配色**")
                 
-                fig_multi, ax_multi = plt.subplots(figsize=(10, 6))
+                            fig_multi, ax_multi = locked_subplots(figsize=(10, 6))
                 
-                x_multi = np.linspace(0, 10, 100)
+                            x_multi = np.linspace(0, 10, 100)
                 
-                # 使用CN颜色循环
-                for i in range(6):
-                    ax_multi.plot(x_multi, np.sin(x_multi + i * 0.5) * (6 - i), 
-                                 color=f'C{i}', linewidth=2.5, marker='o', markersize=4,
-                                 label=f'Series {i+1} (C{i})', markevery=10)
+                            # 使用CN颜色循环
+                            for i in range(6):
+                                ax_multi.plot(x_multi, np.sin(x_multi + i * 0.5) * (6 - i), 
+                                             color=f'C{i}', linewidth=2.5, marker='o', markersize=4,
+                                             label=f'Series {i+1} (C{i})', markevery=10)
                 
-                ax_multi.set_title("多系列图表 - 使用 CN 颜色循环", fontsize=14, fontweight='bold')
-                ax_multi.set_xlabel("X Axis", fontsize=12)
-                ax_multi.set_ylabel("Y Axis", fontsize=12)
-                ax_multi.legend(loc='upper right', ncol=2)
-                ax_multi.grid(True, alpha=0.3)
+                            ax_multi.set_title("多系列图表 - 使用 CN 颜色循环", fontsize=14, fontweight='bold')
+                            ax_multi.set_xlabel("X Axis", fontsize=12)
+                            ax_multi.set_ylabel("Y Axis", fontsize=12)
+                            ax_multi.legend(loc='upper right', ncol=2)
+                            ax_multi.grid(True, alpha=0.3)
                 
-                st.pyplot(fig_multi)
-                plt.close(fig_multi)
+                            show_figure(fig_multi)
+                            plt.close(fig_multi)
                 
-                st.code("""
+                            st.code("""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -2539,16 +2811,18 @@ ax.grid(True, alpha=0.3)
 plt.show()
 """, language='python')
         
-        with color_subtabs[3]:
-            st.markdown("### 📚 完整参考")
-            st.caption("查看完整的颜色和颜色映射参考文档")
+            with color_subtabs[3]:
+                if is_tab_open(color_subtabs[3]):
+                    st.markdown("### 📚 完整参考")
+                    st.caption("查看完整的颜色和颜色映射参考文档")
             
-            # 使用tabs组织完整参考内容
-            ref_tabs = st.tabs(["🎨 颜色完整参考", "🌈 颜色映射完整参考"])
+                    # 使用tabs组织完整参考内容
+                    ref_tabs = lazy_tabs(["🎨 颜色完整参考", "🌈 颜色映射完整参考"], key="ref_tabs")
             
-            with ref_tabs[0]:
-                st.markdown("### 🎨 颜色 (Color) 完整参考")
-                st.info("""
+                    with ref_tabs[0]:
+                        if is_tab_open(ref_tabs[0]):
+                            st.markdown("### 🎨 颜色 (Color) 完整参考")
+                            st.info("""
                 **包含内容**：
                 - 所有颜色形式详解
                 - Base颜色、CN颜色、CSS4颜色完整列表
@@ -2557,12 +2831,13 @@ plt.show()
                 - 常见错误和解决方案
                 """)
                 
-                from catalogs.color import render_color_gallery
-                render_color_gallery()
+                            from catalogs.color import render_color_gallery
+                            render_color_gallery()
             
-            with ref_tabs[1]:
-                st.markdown("### 🌈 颜色映射 (Colormap) 完整参考")
-                st.info("""
+                    with ref_tabs[1]:
+                        if is_tab_open(ref_tabs[1]):
+                            st.markdown("### 🌈 颜色映射 (Colormap) 完整参考")
+                            st.info("""
                 **包含内容**：
                 - 所有 Colormap 分类展示
                 - 常用 Colormap 预览
@@ -2571,96 +2846,89 @@ plt.show()
                 - 选择指南和最佳实践
                 """)
                 
-                from catalogs.color import render_colormap_gallery
-                render_colormap_gallery()
+                            from catalogs.color import render_colormap_gallery
+                            render_colormap_gallery()
             
-            st.markdown("---")
-            st.markdown("#### 📖 快速参考表")
-            
-            # 颜色快速参考
-            st.markdown("##### 🎨 常用颜色名称")
-            common_colors_grid = st.columns(4)
-            common_colors_list = [
-                ('red', '红色'), ('blue', '蓝色'), ('green', '绿色'), ('orange', '橙色'),
-                ('purple', '紫色'), ('brown', '棕色'), ('pink', '粉色'), ('gray', '灰色'),
-                ('black', '黑色'), ('yellow', '黄色'), ('cyan', '青色'), ('magenta', '洋红'),
-                ('lime', '酸橙绿'), ('navy', '海军蓝'), ('maroon', '栗色'), ('olive', '橄榄绿')
-            ]
-            
-            for idx, (color_name, color_cn) in enumerate(common_colors_list):
-                with common_colors_grid[idx % 4]:
-                    st.markdown(f"**{color_cn}**<br>`'{color_name}'`", unsafe_allow_html=True)
+                    st.markdown("---")
+                    st.markdown("#### 📖 快速参考表")
+            
+                    # 颜色快速参考
+                    st.markdown("##### 🎨 常用颜色名称")
+                    common_colors_grid = st.columns(4)
+                    common_colors_list = [
+                        ('red', '红色'), ('blue', '蓝色'), ('green', '绿色'), ('orange', '橙色'),
+                        ('purple', '紫色'), ('brown', '棕色'), ('pink', '粉色'), ('gray', '灰色'),
+                        ('black', '黑色'), ('yellow', '黄色'), ('cyan', '青色'), ('magenta', '洋红'),
+                        ('lime', '酸橙绿'), ('navy', '海军蓝'), ('maroon', '栗色'), ('olive', '橄榄绿')
+                    ]
+            
+                    for idx, (color_name, color_cn) in enumerate(common_colors_list):
+                        with common_colors_grid[idx % 4]:
+                            st.markdown(f"**{color_cn}**<br>`'{color_name}'`", unsafe_allow_html=True)
             
-            st.markdown("---")
-            st.markdown("##### 🌈 推荐 Colormap 速查")
-            
-            recommended_cmaps = {
-                '科学可视化': ['viridis', 'plasma', 'inferno', 'magma', 'cividis'],
-                '连续数据': ['Blues', 'Greens', 'Reds', 'Oranges', 'Purples'],
-                '发散数据': ['coolwarm', 'RdBu', 'RdYlBu', 'Spectral', 'seismic'],
-                '分类数据': ['tab10', 'tab20', 'Set1', 'Set2', 'Set3'],
-                '周期性数据': ['hsv', 'twilight', 'twilight_shifted']
-            }
-            
-            for category, cmaps in recommended_cmaps.items():
-                with st.expander(f"**{category}**", expanded=False):
-                    cols = st.columns(len(cmaps))
-                    for idx, cmap in enumerate(cmaps):
-                        with cols[idx]:
-                            st.markdown(f"`'{cmap}'`")
-                            # 显示颜色条预览
-                            try:
-                                fig_bar, ax_bar = plt.subplots(figsize=(2, 0.3))
-                                gradient = np.linspace(0, 1, 100).reshape(1, -1)
-                                ax_bar.imshow(gradient, cmap=cmap, aspect='auto')
-                                ax_bar.set_xticks([])
-                                ax_bar.set_yticks([])
-                                st.pyplot(fig_bar)
-                                plt.close(fig_bar)
-                            except:
-                                pass
+                    st.markdown("---")
+                    st.markdown("##### 🌈 推荐 Colormap 速查")
+            
+                    recommended_cmaps = {
+                        '科学可视化': ['viridis', 'plasma', 'inferno', 'magma', 'cividis'],
+                        '连续数据': ['Blues', 'Greens', 'Reds', 'Oranges', 'Purples'],
+                        '发散数据': ['coolwarm', 'RdBu', 'RdYlBu', 'Spectral', 'seismic'],
+                        '分类数据': ['tab10', 'tab20', 'Set1', 'Set2', 'Set3'],
+                        '周期性数据': ['hsv', 'twilight', 'twilight_shifted']
+                    }
+            
+                    for category, cmaps in recommended_cmaps.items():
+                        with st.expander(f"**{category}**", expanded=False):
+                            cols = st.columns(len(cmaps))
+                            for idx, cmap in enumerate(cmaps):
+                                with cols[idx]:
+                                    st.markdown(f"`'{cmap}'`")
+                                    # 显示颜色条预览（直接由查找表生成，不创建 Figure）
+                                    if cmap in matplotlib.colormaps:
+                                        st.image(get_colormap_strip_png(cmap), use_container_width=True)
     
     with style_tabs[3]:
-        st.subheader("文本样式")
-        st.caption("💡 学习如何设置标题、标签等文本的样式")
+        if is_tab_open(style_tabs[3]):
+            st.subheader("文本样式")
+            st.caption("💡 学习如何设置标题、标签等文本的样式")
         
-        col_ctrl, col_view = st.columns([1.2, 2])
+            col_ctrl, col_view = st.columns([1.2, 2])
         
-        with col_ctrl:
-            st.markdown("#### 📝 文本参数")
-            
-            with st.expander("📏 字体大小 (fontsize)", expanded=True):
-                fontsize_val = st.slider("字体大小", 8, 24, 12, key="text_fontsize")
-                if st.button("📚 查看字体大小选项", key="btn_fontsize"):
-                    from catalogs.text import render_fontsize_gallery
-                    render_fontsize_gallery()
-            
-            with st.expander("💪 字体粗细 (fontweight)", expanded=True):
-                fontweight_val = st.selectbox("字体粗细", ['normal', 'bold', 'light'], index=1, key="text_fontweight")
-                if st.button("📚 查看字体粗细选项", key="btn_fontweight"):
-                    from catalogs.text import render_fontweight_gallery
-                    render_fontweight_gallery()
-            
-            with st.expander("🔤 字体族 (fontfamily)", expanded=True):
-                fontfamily_val = st.selectbox("字体族", ['sans-serif', 'serif', 'monospace'], index=0, key="text_fontfamily")
-                if st.button("📚 查看字体族选项", key="btn_fontfamily"):
-                    from catalogs.text import render_fontfamily_gallery
-                    render_fontfamily_gallery()
+            with col_ctrl:
+                st.markdown("#### 📝 文本参数")
+            
+                with st.expander("📏 字体大小 (fontsize)", expanded=True):
+                    fontsize_val = st.slider("字体大小", 8, 24, 12, key="text_fontsize")
+                    if st.button("📚 查看字体大小选项", key="btn_fontsize"):
+                        from catalogs.text import render_fontsize_gallery
+                        render_fontsize_gallery()
+            
+                with st.expander("💪 字体粗细 (fontweight)", expanded=True):
+                    fontweight_val = st.selectbox("字体粗细", ['normal', 'bold', 'light'], index=1, key="text_fontweight")
+                    if st.button("📚 查看字体粗细选项", key="btn_fontweight"):
+                        from catalogs.text import render_fontweight_gallery
+                        render_fontweight_gallery()
+            
+                with st.expander("🔤 字体族 (fontfamily)", expanded=True):
+                    fontfamily_val = st.selectbox("字体族", ['sans-serif', 'serif', 'monospace'], index=0, key="text_fontfamily")
+                    if st.button("📚 查看字体族选项", key="btn_fontfamily"):
+                        from catalogs.text import render_fontfamily_gallery
+                        render_fontfamily_gallery()
         
-        with col_view:
-            ensure_chinese_font()
-            fig, ax = plt.subplots(figsize=(8, 5))
-            x = np.linspace(0, 10, 50)
-            y = np.sin(x)
-            ax.plot(x, y, linewidth=2, color='#2c3e50')
-            ax.set_title("Title Example", fontsize=fontsize_val, fontweight=fontweight_val, fontfamily=fontfamily_val)
-            ax.set_xlabel("X Axis Label", fontsize=fontsize_val-2, fontfamily=fontfamily_val)
-            ax.set_ylabel("Y Axis Label", fontsize=fontsize_val-2, fontfamily=fontfamily_val)
-            ax.grid(True, alpha=0.3)
-            st.pyplot(fig)
-            
-            st.markdown("#### 💻 生成代码")
-            st.code(f"""
+            with col_view:
+                ensure_chinese_font()
+                fig, ax = locked_subplots(figsize=(8, 5))
+                x = np.linspace(0, 10, 50)
+                y = np.sin(x)
+                ax.plot(x, y, linewidth=2, color='#2c3e50')
+                ax.set_title("Title Example", fontsize=fontsize_val, fontweight=fontweight_val, fontfamily=fontfamily_val)
+                ax.set_xlabel("X Axis Label", fontsize=fontsize_val-2, fontfamily=fontfamily_val)
+                ax.set_ylabel("Y Axis Label", fontsize=fontsize_val-2, fontfamily=fontfamily_val)
+                ax.grid(True, alpha=0.3)
+                show_figure(fig)
+            
+                st.markdown("#### 💻 生成代码")
+                st.code(f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -2681,57 +2949,58 @@ plt.show()
             """, language='python')
     
     with style_tabs[4]:
-        st.subheader("坐标轴设置")
-        st.caption("💡 学习如何控制坐标轴的范围、网格和边框")
-        
-        col_ctrl, col_view = st.columns([1.2, 2])
-        
-        with col_ctrl:
-            st.markdown("#### 📊 坐标轴参数")
-            
-            with st.expander("📏 坐标范围 (xlim/ylim)", expanded=True):
-                x_min = st.number_input("X 最小值", value=0.0, key="axes_xmin")
-                x_max = st.number_input("X 最大值", value=10.0, key="axes_xmax")
-                y_min = st.number_input("Y 最小值", value=-1.5, key="axes_ymin")
-                y_max = st.number_input("Y 最大值", value=1.5, key="axes_ymax")
-                if st.button("📚 查看坐标范围选项", key="btn_xlim"):
-                    from catalogs.axes import render_xlim_ylim_gallery
-                    render_xlim_ylim_gallery()
-            
-            with st.expander("🔲 网格 (grid)", expanded=True):
-                show_grid = st.checkbox("显示网格", value=True, key="axes_grid")
-                grid_alpha = st.slider("网格透明度", 0.1, 1.0, 0.3, 0.1, key="grid_alpha")
-                if st.button("📚 查看网格选项", key="btn_grid"):
-                    from catalogs.axes import render_grid_gallery
-                    render_grid_gallery()
-            
-            with st.expander("📐 边框 (spines)", expanded=True):
-                hide_top = st.checkbox("隐藏上边框", key="spine_top")
-                hide_right = st.checkbox("隐藏右边框", key="spine_right")
-                if st.button("📚 查看边框选项", key="btn_spines"):
-                    from catalogs.axes import render_spines_gallery
-                    render_spines_gallery()
-        
-        with col_view:
-            x, y = generate_sample_data(50)
-            ensure_chinese_font()
-            fig, ax = plt.subplots(figsize=(8, 5))
-            ax.plot(x, y, linewidth=2, color='#2c3e50')
-            ax.set_xlim(x_min, x_max)
-            ax.set_ylim(y_min, y_max)
-            if show_grid:
-                ax.grid(True, alpha=grid_alpha)
-            if hide_top:
-                ax.spines['top'].set_visible(False)
-            if hide_right:
-                ax.spines['right'].set_visible(False)
-            ax.set_title("Axes Settings Preview", fontsize=14, fontweight='bold')
-            ax.set_xlabel("X Axis", fontsize=12)
-            ax.set_ylabel("Y Axis", fontsize=12)
-            st.pyplot(fig)
-            
-            st.markdown("#### 💻 生成代码")
-            st.code(f"""
+        if is_tab_open(style_tabs[4]):
+            st.subheader("坐标轴设置")
+            st.caption("💡 学习如何控制坐标轴的范围、网格和边框")
+        
+            col_ctrl, col_view = st.columns([1.2, 2])
+        
+            with col_ctrl:
+                st.markdown("#### 📊 坐标轴参数")
+            
+                with st.expander("📏 坐标范围 (xlim/ylim)", expanded=True):
+                    x_min = st.number_input("X 最小值", value=0.0, key="axes_xmin")
+                    x_max = st.number_input("X 最大值", value=10.0, key="axes_xmax")
+                    y_min = st.number_input("Y 最小值", value=-1.5, key="axes_ymin")
+                    y_max = st.number_input("Y 最大值", value=1.5, key="axes_ymax")
+                    if st.button("📚 查看坐标范围选项", key="btn_xlim"):
+                        from catalogs.axes import render_xlim_ylim_gallery
+                        render_xlim_ylim_gallery()
+            
+                with st.expander("🔲 网格 (grid)", expanded=True):
+                    show_grid = st.checkbox("显示网格", value=True, key="axes_grid")
+                    grid_alpha = st.slider("网格透明度", 0.1, 1.0, 0.3, 0.1, key="grid_alpha")
+                    if st.button("📚 查看网格选项", key="btn_grid"):
+                        from catalogs.axes import render_grid_gallery
+                        render_grid_gallery()
+            
+                with st.expander("📐 边框 (spines)", expanded=True):
+                    hide_top = st.checkbox("隐藏上边框", key="spine_top")
+                    hide_right = st.checkbox("隐藏右边框", key="spine_right")
+                    if st.button("📚 查看边框选项", key="btn_spines"):
+                        from catalogs.axes import render_spines_gallery
+                        render_spines_gallery()
+        
+            with col_view:
+                x, y = generate_sample_data(50)
+                ensure_chinese_font()
+                fig, ax = locked_subplots(figsize=(8, 5))
+                ax.plot(x, y, linewidth=2, color='#2c3e50')
+                ax.set_xlim(x_min, x_max)
+                ax.set_ylim(y_min, y_max)
+                if show_grid:
+                    ax.grid(True, alpha=grid_alpha)
+                if hide_top:
+                    ax.spines['top'].set_visible(False)
+                if hide_right:
+                    ax.spines['right'].set_visible(False)
+                ax.set_title("Axes Settings Preview", fontsize=14, fontweight='bold')
+                ax.set_xlabel("X Axis", fontsize=12)
+                ax.set_ylabel("Y Axis", fontsize=12)
+                show_figure(fig)
+            
+                st.markdown("#### 💻 生成代码")
+                st.code(f"""
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -2750,33 +3019,33 @@ ax.set_xlabel("X Axis", fontsize=12)
 ax.set_ylabel("Y Axis", fontsize=12)
 plt.show()
             """, language='python')
-        st.caption("调整下方的滑块，查看代码如何动态变化以适应不同的子图布局。")
+            st.caption("调整下方的滑块，查看代码如何动态变化以适应不同的子图布局。")
         
-        # 增加自由设置行列的功能
-        c1, c2 = st.columns(2)
-        rows = c1.number_input("行数 (Rows)", min_value=1, max_value=5, value=2)
-        cols = c2.number_input("列数 (Columns)", min_value=1, max_value=5, value=2)
+            # 增加自由设置行列的功能
+            c1, c2 = st.columns(2)
+            rows = c1.number_input("行数 (Rows)", min_value=1, max_value=5, value=2)
+            cols = c2.number_input("列数 (Columns)", min_value=1, max_value=5, value=2)
 
-        col_img, col_code = st.columns([3, 2])
+            col_img, col_code = st.columns([3, 2])
         
-        with col_img:
-            fig, axes = plt.subplots(rows, cols, figsize=(8, 6), constrained_layout=True)
+            with col_img:
+                fig, axes = locked_subplots(rows, cols, figsize=(8, 6), constrained_layout=True)
             
-            # 统一处理 axes，因为当 rows=1, cols=1 时，axes 不是数组
-            if rows == 1 and cols == 1:
-                axes_flat = [axes]
-            else:
-                axes_flat = axes.flatten()
+                # 统一处理 axes，因为当 rows=1, cols=1 时，axes 不是数组
+                if rows == 1 and cols == 1:
+                    axes_flat = [axes]
+                else:
+                    axes_flat = axes.flatten()
                 
-            for i, ax in enumerate(axes_flat):
-                ax.plot(np.random.rand(10), label=f"Line {i}")
-                ax.set_title(f"Subplot {i+1}")
-                ax.legend(loc='upper right', fontsize='small')
-            st.pyplot(fig)
+                for i, ax in enumerate(axes_flat):
+                    ax.plot(np.random.rand(10), label=f"Line {i}")
+                    ax.set_title(f"Subplot {i+1}")
+                    ax.legend(loc='upper right', fontsize='small')
+                show_figure(fig)
             
-        with col_code:
-            st.markdown("**实现代码：**")
-            code_str = f"""
+            with col_code:
+                st.markdown("**实现代码：**")
+                code_str = f"""
 # {rows}行{cols}列布局，自动调整间距
 fig, axes = plt.subplots({rows}, {cols}, 
     constrained_layout=True)
@@ -2792,82 +3061,85 @@ for i, ax in enumerate(axes_flat):
     ax.plot(data)
     ax.set_title(f"Subplot {{i+1}}")
 """
-            st.code(code_str, language='python')
+                st.code(code_str, language='python')
 
-        st.markdown("---")
-        st.subheader("2. 全局样式 (Style Sheets)")
+            st.markdown("---")
+            st.subheader("2. 全局样式 (Style Sheets)")
         
-        style_select = st.selectbox("选择样式 (rcParams预设)", plt.style.available, index=plt.style.available.index('ggplot') if 'ggplot' in plt.style.available else 0)
+            style_select = st.selectbox("选择样式 (rcParams预设)", plt.style.available, index=plt.style.available.index('ggplot') if 'ggplot' in plt.style.available else 0)
         
-        col1, col2 = st.columns([1,1])
-        with col1:
-            with plt.style.context(style_select):
-                fig, ax = plt.subplots(figsize=(6,4))
-                x = np.linspace(0, 10, 100)
-                for i in range(1, 4):
-                    ax.plot(x, np.sin(x + i * .5) * (7 - i), label=f"Wave {i}")
-                ax.set_title(f"Style: {style_select}")
-                ax.legend()
-                st.pyplot(fig)
-        with col2:
-            st.markdown("**上下文管理器代码：**")
-            st.code(f"""
+            col1, col2 = st.columns([1,1])
+            with col1:
+                with isolated_style(style_select):
+                    fig, ax = locked_subplots(figsize=(6,4))
+                    x = np.linspace(0, 10, 100)
+                    for i in range(1, 4):
+                        ax.plot(x, np.sin(x + i * .5) * (7 - i), label=f"Wave {i}")
+                    ax.set_title(f"Style: {style_select}")
+                    ax.legend()
+                    show_figure(fig)
+            with col2:
+                st.markdown("**上下文管理器代码：**")
+                st.code(f"""
 # 临时应用样式，不影响全局
 with plt.style.context('{style_select}'):
     fig, ax = plt.subplots()
     ax.plot(x, y)
             """, language='python')
                 
-        st.markdown("### 3. 图例 (Legend)")
-        st.caption("💡 学习如何创建和自定义图例")
-        
-        legend_tabs = st.tabs(["基础图例", "图例位置", "图例样式"])
-        
-        with legend_tabs[0]:
-            col_legend_demo, col_legend_code = st.columns([1, 1])
-            with col_legend_demo:
-                fig_legend, ax_legend = plt.subplots(figsize=(6, 4))
-                x = np.linspace(0, 10, 100)
-                ax_legend.plot(x, np.sin(x), label='sin(x)')
-                ax_legend.plot(x, np.cos(x), label='cos(x)')
-                ax_legend.plot(x, np.sin(x)*0.5, label='0.5*sin(x)')
-                ax_legend.legend()
-                ax_legend.grid(True, alpha=0.3)
-                st.pyplot(fig_legend)
-            with col_legend_code:
-                st.code("""
+            st.markdown("### 3. 图例 (Legend)")
+            st.caption("💡 学习如何创建和自定义图例")
+        
+            legend_tabs = lazy_tabs(["基础图例", "图例位置", "图例样式"], key="legend_tabs")
+        
+            with legend_tabs[0]:
+                if is_tab_open(legend_tabs[0]):
+                    col_legend_demo, col_legend_code = st.columns([1, 1])
+                    with col_legend_demo:
+                        fig_legend, ax_legend = locked_subplots(figsize=(6, 4))
+                        x = np.linspace(0, 10, 100)
+                        ax_legend.plot(x, np.sin(x), label='sin(x)')
+                        ax_legend.plot(x, np.cos(x), label='cos(x)')
+                        ax_legend.plot(x, np.sin(x)*0.5, label='0.5*sin(x)')
+                        ax_legend.legend()
+                        ax_legend.grid(True, alpha=0.3)
+                        show_figure(fig_legend)
+                    with col_legend_code:
+                        st.code("""
 ax.plot(x, y1, label='sin(x)')
 ax.plot(x, y2, label='cos(x)')
 ax.legend()  # 自动创建图例
                 """, language='python')
         
-        with legend_tabs[1]:
-            legend_loc = st.selectbox("图例位置", 
-                                    ['best', 'upper right', 'upper left', 'lower left', 'lower right',
-                                     'right', 'center left', 'center right', 'lower center', 'upper center', 'center'],
-                                    index=0, key="legend_loc_demo")
-            fig_legend_loc, ax_legend_loc = plt.subplots(figsize=(6, 4))
-            x = np.linspace(0, 10, 100)
-            ax_legend_loc.plot(x, np.sin(x), label='sin(x)')
-            ax_legend_loc.plot(x, np.cos(x), label='cos(x)')
-            ax_legend_loc.legend(loc=legend_loc)
-            ax_legend_loc.grid(True, alpha=0.3)
-            st.pyplot(fig_legend_loc)
-            st.code(f"ax.legend(loc='{legend_loc}')", language='python')
-        
-        with legend_tabs[2]:
-            col_legend_style, col_legend_style_code = st.columns([1, 1])
-            with col_legend_style:
-                fig_legend_style, ax_legend_style = plt.subplots(figsize=(6, 4))
-                x = np.linspace(0, 10, 100)
-                ax_legend_style.plot(x, np.sin(x), label='sin(x)', linewidth=2)
-                ax_legend_style.plot(x, np.cos(x), label='cos(x)', linewidth=2)
-                ax_legend_style.legend(frameon=True, fancybox=True, shadow=True, 
-                                     framealpha=0.9, ncol=2, fontsize=10)
-                ax_legend_style.grid(True, alpha=0.3)
-                st.pyplot(fig_legend_style)
-            with col_legend_style_code:
-                st.code("""
+            with legend_tabs[1]:
+                if is_tab_open(legend_tabs[1]):
+                    legend_loc = st.selectbox("图例位置", 
+                                            ['best', 'upper right', 'upper left', 'lower left', 'lower right',
+                                             'right', 'center left', 'center right', 'lower center', 'upper center', 'center'],
+                                            index=0, key="legend_loc_demo")
+                    fig_legend_loc, ax_legend_loc = locked_subplots(figsize=(6, 4))
+                    x = np.linspace(0, 10, 100)
+                    ax_legend_loc.plot(x, np.sin(x), label='sin(x)')
+                    ax_legend_loc.plot(x, np.cos(x), label='cos(x)')
+                    ax_legend_loc.legend(loc=legend_loc)
+                    ax_legend_loc.grid(True, alpha=0.3)
+                    show_figure(fig_legend_loc)
+                    st.code(f"ax.legend(loc='{legend_loc}')", language='python')
+        
+            with legend_tabs[2]:
+                if is_tab_open(legend_tabs[2]):
+                    col_legend_style, col_legend_style_code = st.columns([1, 1])
+                    with col_legend_style:
+                        fig_legend_style, ax_legend_style = locked_subplots(figsize=(6, 4))
+                        x = np.linspace(0, 10, 100)
+                        ax_legend_style.plot(x, np.sin(x), label='sin(x)', linewidth=2)
+                        ax_legend_style.plot(x, np.cos(x), label='cos(x)', linewidth=2)
+                        ax_legend_style.legend(frameon=True, fancybox=True, shadow=True, 
+                                             framealpha=0.9, ncol=2, fontsize=10)
+                        ax_legend_style.grid(True, alpha=0.3)
+                        show_figure(fig_legend_style)
+                    with col_legend_style_code:
+                        st.code("""
 ax.legend(frameon=True,      # 显示边框
           fancybox=True,      # 圆角边框
           shadow=True,        # 阴影
@@ -2876,72 +3148,75 @@ ax.legend(frameon=True,      # 显示边框
           fontsize=10)       # 字体大小
                 """, language='python')
         
-        st.markdown("---")
-        st.markdown("### 4. 注解 (Annotations)")
-        st.caption("💡 学习如何添加箭头、文本标注等注解")
-        
-        annotation_tabs = st.tabs(["基础注解", "箭头样式", "高级注解"])
-        
-        with annotation_tabs[0]:
-            col_anno_demo, col_anno_code = st.columns([1, 1])
-            with col_anno_demo:
-                ensure_chinese_font()
-                fig_anno, ax_anno = plt.subplots(figsize=(6, 4))
-                x = np.linspace(0, 10, 100)
-                y = np.sin(x)
-                ax_anno.plot(x, y)
-                # 找到最大值点
-                max_idx = np.argmax(y)
-                max_x, max_y = x[max_idx], y[max_idx]
-                ax_anno.annotate('Maximum', xy=(max_x, max_y), xytext=(max_x+2, max_y+0.3),
-                               arrowprops=dict(arrowstyle='->', color='red', lw=2))
-                ax_anno.plot(max_x, max_y, 'ro', markersize=10)
-                ax_anno.grid(True, alpha=0.3)
-                st.pyplot(fig_anno)
-            with col_anno_code:
-                st.code("""
+            st.markdown("---")
+            st.markdown("### 4. 注解 (Annotations)")
+            st.caption("💡 学习如何添加箭头、文本标注等注解")
+        
+            annotation_tabs = lazy_tabs(["基础注解", "箭头样式", "高级注解"], key="annotation_tabs")
+        
+            with annotation_tabs[0]:
+                if is_tab_open(annotation_tabs[0]):
+                    col_anno_demo, col_anno_code = st.columns([1, 1])
+                    with col_anno_demo:
+                        ensure_chinese_font()
+                        fig_anno, ax_anno = locked_subplots(figsize=(6, 4))
+                        x = np.linspace(0, 10, 100)
+                        y = np.sin(x)
+                        ax_anno.plot(x, y)
+                        # 找到最大值点
+                        max_idx = np.argmax(y)
+                        max_x, max_y = x[max_idx], y[max_idx]
+                        ax_anno.annotate('Maximum', xy=(max_x, max_y), xytext=(max_x+2, max_y+0.3),
+                                       arrowprops=dict(arrowstyle='->', color='red', lw=2))
+                        ax_anno.plot(max_x, max_y, 'ro', markersize=10)
+                        ax_anno.grid(True, alpha=0.3)
+                        show_figure(fig_anno)
+                    with col_anno_code:
+                        st.code("""
 ax.annotate('Maximum', 
             xy=(max_x, max_y),      # 箭头指向的点
             xytext=(max_x+2, max_y+0.3),  # 文字位置
             arrowprops=dict(arrowstyle='->', color='red', lw=2))
                 """, language='python')
         
-        with annotation_tabs[1]:
-            arrow_style = st.selectbox("箭头样式",
-                                     ['->', '->>', '-', '-|>', '<-', '<->', '<|-', '<|-|>'],
-                                     index=0, key="arrow_style_demo")
-            fig_arrow, ax_arrow = plt.subplots(figsize=(6, 4))
-            x = np.linspace(0, 10, 100)
-            y = np.sin(x)
-            ax_arrow.plot(x, y)
-            max_idx = np.argmax(y)
-            max_x, max_y = x[max_idx], y[max_idx]
-            ax_arrow.annotate(f'Style: {arrow_style}', xy=(max_x, max_y), 
-                            xytext=(max_x+2, max_y+0.3),
-                            arrowprops=dict(arrowstyle=arrow_style, color='red', lw=2))
-            ax_arrow.plot(max_x, max_y, 'ro', markersize=10)
-            ax_arrow.grid(True, alpha=0.3)
-            st.pyplot(fig_arrow)
-            st.code(f"arrowprops=dict(arrowstyle='{arrow_style}', color='red', lw=2)", language='python')
-        
-        with annotation_tabs[2]:
-            col_anno_adv, col_anno_adv_code = st.columns([1, 1])
-            with col_anno_adv:
-                fig_anno_adv, ax_anno_adv = plt.subplots(figsize=(6, 4))
-                x = np.linspace(0, 10, 100)
-                y = np.sin(x)
-                ax_anno_adv.plot(x, y, label='sin(x)')
-                # 多个注解
-                ax_anno_adv.annotate('Start Point', xy=(0, 0), xytext=(1, 0.5),
-                                   arrowprops=dict(arrowstyle='->', connectionstyle='arc3'),
-                                   bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.5))
-                ax_anno_adv.annotate('Mid Point', xy=(5, np.sin(5)), xytext=(6, 0.5),
-                                   arrowprops=dict(arrowstyle='->', connectionstyle='arc3,rad=0.3'),
-                                   bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.5))
-                ax_anno_adv.grid(True, alpha=0.3)
-                st.pyplot(fig_anno_adv)
-            with col_anno_adv_code:
-                st.code("""
+            with annotation_tabs[1]:
+                if is_tab_open(annotation_tabs[1]):
+                    arrow_style = st.selectbox("箭头样式",
+                                             ['->', '->>', '-', '-|>', '<-', '<->', '<|-', '<|-|>'],
+                                             index=0, key="arrow_style_demo")
+                    fig_arrow, ax_arrow = locked_subplots(figsize=(6, 4))
+                    x = np.linspace(0, 10, 100)
+                    y = np.sin(x)
+                    ax_arrow.plot(x, y)
+                    max_idx = np.argmax(y)
+                    max_x, max_y = x[max_idx], y[max_idx]
+                    ax_arrow.annotate(f'Style: {arrow_style}', xy=(max_x, max_y), 
+                                    xytext=(max_x+2, max_y+0.3),
+                                    arrowprops=dict(arrowstyle=arrow_style, color='red', lw=2))
+                    ax_arrow.plot(max_x, max_y, 'ro', markersize=10)
+                    ax_arrow.grid(True, alpha=0.3)
+                    show_figure(fig_arrow)
+                    st.code(f"arrowprops=dict(arrowstyle='{arrow_style}', color='red', lw=2)", language='python')
+        
+            with annotation_tabs[2]:
+                if is_tab_open(annotation_tabs[2]):
+                    col_anno_adv, col_anno_adv_code = st.columns([1, 1])
+                    with col_anno_adv:
+                        fig_anno_adv, ax_anno_adv = locked_subplots(figsize=(6, 4))
+                        x = np.linspace(0, 10, 100)
+                        y = np.sin(x)
+                        ax_anno_adv.plot(x, y, label='sin(x)')
+                        # 多个注解
+                        ax_anno_adv.annotate('Start Point', xy=(0, 0), xytext=(1, 0.5),
+                                           arrowprops=dict(arrowstyle='->', connectionstyle='arc3'),
+                                           bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.5))
+                        ax_anno_adv.annotate('Mid Point', xy=(5, np.sin(5)), xytext=(6, 0.5),
+                                           arrowprops=dict(arrowstyle='->', connectionstyle='arc3,rad=0.3'),
+                                           bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.5))
+                        ax_anno_adv.grid(True, alpha=0.3)
+                        show_figure(fig_anno_adv)
+                    with col_anno_adv_code:
+                        st.code("""
 # 连接样式示例
 ax.annotate('Start Point', xy=(0, 0), xytext=(1, 0.5),
            arrowprops=dict(arrowstyle='->', 
@@ -2978,7 +3253,7 @@ elif menu == "5. 进阶画廊":
     
     col_viz, col_code = st.columns([3, 2])
     
-    fig = plt.figure(figsize=(8, 6))
+    fig = locked_figure(figsize=(8, 6))
     code_display = ""
     
     if gallery_type == "3D Plotting (3D曲线)":
@@ -3004,22 +3279,38 @@ ax.set_zlabel('Z')
 """
 
     elif gallery_type == "3D Surface (3D曲面)":
+        with col_code:
+            surface_name = st.selectbox("曲面函数", list(SURFACE_FUNCTIONS), key="surface_function",
+                                        format_func=lambda name: SURFACE_FUNCTIONS[name].label)
+            lod_mode = st.radio("网格分辨率", ["⚡ 自动（按渲染耗时预算）", "🎚️ 手动"], horizontal=True, key="surface_lod_mode")
+            surface_fmt = get_output_settings()['format']
+            if lod_mode.startswith("⚡"):
+                surface_budget = st.slider("渲染耗时预算 (ms)", 200, 3000, 800, step=100, key="surface_budget") / 1000
+                resolution = choose_resolution(surface_budget, surface_fmt)
+                surface_predicted = predict_render_seconds(resolution, surface_fmt)
+            else:
+                resolution = st.select_slider("每个方向的采样点数", SURFACE_RESOLUTIONS, value=DEFAULT_RESOLUTION,
+                                              key="surface_resolution")
+                surface_budget = surface_predicted = None
         ax = fig.add_subplot(111, projection='3d')
-        x = np.linspace(-5, 5, 50)
-        y = np.linspace(-5, 5, 50)
-        X, Y = np.meshgrid(x, y)
-        Z = np.sin(np.sqrt(X**2 + Y**2))
-        surf = ax.plot_surface(X, Y, Z, cmap='viridis', alpha=0.9)
+        # Z 网格和多边形顶点按 (函数, 分辨率) 缓存，直接构造 Poly3DCollection
+        geometry_start = time.perf_counter()
+        surface_mesh, surface_cache_hit = get_surface_mesh(surface_name, resolution)
+        surf = plot_lod_surface(ax, surface_mesh, cmap='viridis', alpha=0.9)
+        surface_geometry_seconds = time.perf_counter() - geometry_start
         fig.colorbar(surf, ax=ax)
         ax.set_xlabel('X')
         ax.set_ylabel('Y')
         ax.set_zlabel('Z')
-        ax.set_title("3D Surface")
-        code_display = """
+        ax.set_title(f"3D Surface ({resolution}×{resolution})")
+        code_display = f"""
 ax = fig.add_subplot(111, projection='3d')
+x = y = np.linspace(-5, 5, {resolution})
 X, Y = np.meshgrid(x, y)
-Z = np.sin(np.sqrt(X**2 + Y**2))
-surf = ax.plot_surface(X, Y, Z, cmap='viridis')
+Z = {SURFACE_FUNCTIONS[surface_name].expression}
+# plot_surface 默认最多绘制 50×50 个面（rcount/ccount），
+# rstride=1, cstride=1 表示使用全部网格点；面数越多，投影、排序和填充越慢
+surf = ax.plot_surface(X, Y, Z, rstride=1, cstride=1, cmap='viridis')
 fig.colorbar(surf, ax=ax)
 """
 
@@ -3052,46 +3343,81 @@ ax.plot(theta, r) # 极坐标绘图
 """
         
     elif gallery_type == "Vector Fields (Quiver矢量场)":
+        with col_code:
+            field_name = st.selectbox("矢量场", list(VECTOR_FIELDS), key="quiver_field",
+                                      format_func=lambda name: VECTOR_FIELDS[name].label)
+            grid_size = st.select_slider("网格大小（每个方向的箭头数）", FIELD_GRID_SIZES, value=30, key="quiver_grid")
         ax = fig.add_subplot(111)
-        x, y = np.meshgrid(np.arange(0, 2 * np.pi, .2), np.arange(0, 2 * np.pi, .2))
-        u = np.cos(x)
-        v = np.sin(y)
-        q = ax.quiver(x, y, u, v, scale=20)
+        # 场数据按 (场, 网格大小) 缓存；箭头多边形在绘制时才生成
+        field = get_field(field_name, grid_size)
+        ax.quiver(field.X, field.Y, field.U, field.V)
         ax.set_title("Quiver Plot")
-        code_display = """
-x, y = np.meshgrid(np.arange(0, 2*np.pi, .2), np.arange(0, 2*np.pi, .2))
-u, v = np.cos(x), np.sin(y)
-ax.quiver(x, y, u, v, scale=20)
+        code_display = f"""
+x = y = np.linspace({VECTOR_FIELDS[field_name].extent[0]:.3g}, {VECTOR_FIELDS[field_name].extent[1]:.3g}, {grid_size})
+X, Y = np.meshgrid(x, y)
+U, V = {VECTOR_FIELDS[field_name].expression}
+ax.quiver(X, Y, U, V)  # 不指定 scale 时按箭头数量和平均长度自动缩放
 """
 
     elif gallery_type == "Streamplot (流线图)":
+        with col_code:
+            field_name = st.selectbox("矢量场", list(VECTOR_FIELDS), key="stream_field",
+                                      format_func=lambda name: VECTOR_FIELDS[name].label)
+            col_grid, col_density = st.columns(2)
+            grid_size = col_grid.select_slider("网格大小", FIELD_GRID_SIZES, value=20, key="stream_grid")
+            density = col_density.select_slider("density", STREAM_DENSITIES, value=1.5, key="stream_density")
         ax = fig.add_subplot(111)
-        x = np.linspace(0, 2*np.pi, 20)
-        y = np.linspace(0, 2*np.pi, 20)
-        X, Y = np.meshgrid(x, y)
-        U = np.cos(X)
-        V = np.sin(Y)
-        ax.streamplot(X, Y, U, V, density=1.5, color=U, linewidth=2, cmap='viridis')
+        # 流线积分结果按 (场, 网格大小, density) 缓存，重跑时只重新添加线段和箭头
+        stream_geometry, stream_cache_hit = get_stream_geometry(field_name, grid_size, density)
+        replay_start = time.perf_counter()
+        add_cached_streamplot(ax, stream_geometry)
+        replay_seconds = time.perf_counter() - replay_start
         ax.set_title("Streamplot")
-        code_display = """
+        field_info = get_field_cache_info()
+        stream_caption = (f"⚡ 流线积分 {stream_geometry.seconds * 1000:.0f} ms"
+                          + ("（已缓存，本次跳过）" if stream_cache_hit else "（首次计算，已缓存）")
+                          + f" · 添加到图中 {replay_seconds * 1000:.0f} ms · {len(stream_geometry.segments):,} 个线段、"
+                          f"{len(stream_geometry.arrows)} 个箭头 · 缓存 {field_info['size']} 项，"
+                          f"累计命中 {field_info['hits']} / {field_info['hits'] + field_info['misses']}")
+        code_display = f"""
+x = y = np.linspace({VECTOR_FIELDS[field_name].extent[0]:.3g}, {VECTOR_FIELDS[field_name].extent[1]:.3g}, {grid_size})
 X, Y = np.meshgrid(x, y)
-U, V = np.cos(X), np.sin(Y)
-ax.streamplot(X, Y, U, V, density=1.5, color=U, cmap='viridis')
+U, V = {VECTOR_FIELDS[field_name].expression}
+# 流线积分是 streamplot 最耗时的部分，网格越大、density 越高越慢
+ax.streamplot(X, Y, U, V, density={density}, color=U, linewidth=2, cmap='viridis')
 """
 
     elif gallery_type == "Contour (等高线)":
+        with col_code:
+            contour_name = st.selectbox("函数", list(CONTOUR_FUNCTIONS), key="contour_function",
+                                        format_func=lambda name: CONTOUR_FUNCTIONS[name].label)
+            col_grid, col_levels = st.columns(2)
+            grid_size = col_grid.select_slider("网格大小", CONTOUR_GRID_SIZES, value=100, key="contour_grid")
+            n_levels = col_levels.slider("等高线数量 (levels)", 3, 30, 10, key="contour_levels")
         ax = fig.add_subplot(111)
-        x = np.linspace(-3, 3, 100)
-        y = np.linspace(-3, 3, 100)
-        X, Y = np.meshgrid(x, y)
-        Z = np.exp(-(X**2 + Y**2))
-        contour = ax.contour(X, Y, Z, levels=10, cmap='viridis')
-        ax.clabel(contour, inline=True, fontsize=8)
+        # 等高线路径和 inline 标签的位置按 (函数, 网格大小, levels, Figure 尺寸) 缓存
+        contour_geometry, contour_cache_hit = get_contour_geometry(contour_name, grid_size, n_levels,
+                                                                   tuple(fig.get_size_inches()))
+        replay_start = time.perf_counter()
+        add_cached_contour(ax, contour_geometry)
+        replay_seconds = time.perf_counter() - replay_start
         ax.set_title("Contour Plot")
-        code_display = """
+        if contour_cache_hit:
+            contour_caption = f"⚡ 等高线与标签位置已缓存，本次只重新添加到图中（{replay_seconds * 1000:.0f} ms）"
+        else:
+            grid_note = (f"网格与生成器 {contour_geometry.grid_seconds * 1000:.0f} ms · " if contour_geometry.grid_seconds
+                         else "复用该网格的 marching squares 生成器 · ")
+            contour_caption = (f"⚡ 首次计算：{grid_note}追踪等值线 {contour_geometry.contour_seconds * 1000:.0f} ms · "
+                               f"inline 标签 {contour_geometry.label_seconds * 1000:.0f} ms（已缓存）")
+        contour_info = get_contour_cache_info()
+        contour_caption += (f" · {grid_size}×{grid_size} 网格，{len(contour_geometry.levels)} 条等高线、"
+                            f"{len(contour_geometry.labels)} 个标签 · 缓存命中 {contour_info['hits']} / "
+                            f"{contour_info['hits'] + contour_info['misses']}")
+        code_display = f"""
+x = y = np.linspace({CONTOUR_FUNCTIONS[contour_name].extent[0]:.3g}, {CONTOUR_FUNCTIONS[contour_name].extent[1]:.3g}, {grid_size})
 X, Y = np.meshgrid(x, y)
-Z = np.exp(-(X**2 + Y**2))
-contour = ax.contour(X, Y, Z, levels=10, cmap='viridis')
+Z = {CONTOUR_FUNCTIONS[contour_name].expression}
+contour = ax.contour(X, Y, Z, levels={n_levels}, cmap='viridis')
 ax.clabel(contour, inline=True, fontsize=8)
 """
 
@@ -3108,7 +3434,21 @@ fig.colorbar(im, ax=ax)
 """
 
     with col_viz:
-        st.pyplot(fig)
+        decision = show_figure(fig)
+        if gallery_type == "3D Surface (3D曲面)":
+            record_surface_timing(decision['format'], surface_mesh.n_faces,
+                                  surface_geometry_seconds + decision['encode_seconds'])
+            st.caption(format_surface_readout(resolution, surface_mesh, surface_cache_hit, surface_geometry_seconds,
+                                              decision['encode_seconds'], surface_budget, surface_predicted))
+            base, per_face, n_samples = get_timing_model(decision['format'])
+            mesh_info = get_mesh_cache_info()
+            st.caption(f"📈 耗时模型：固定 {base * 1000:.0f} ms + 每千个面 {per_face * 1e6:.1f} ms"
+                       f"（基于最近 {n_samples} 次测量）· 网格缓存 {mesh_info['size']} 个，"
+                       f"累计命中 {mesh_info['hits']} / {mesh_info['hits'] + mesh_info['misses']}")
+        elif gallery_type == "Streamplot (流线图)":
+            st.caption(stream_caption)
+        elif gallery_type == "Contour (等高线)":
+            st.caption(contour_caption)
     with col_code:
         st.code(code_display, language='python')
 
@@ -3131,73 +3471,77 @@ elif menu == "6. 其他库实战":
         "Pandas Plotting (数据驱动)",
         "Bokeh (Web交互)"
     ])
-    df = px.data.iris() 
+    df = get_iris_data()
     
     if lib_choice == "Seaborn (统计)":
         st.subheader("Seaborn: 极简统计图")
         st.info("Seaborn 基于 Matplotlib，提供更美观的统计图表。")
         
-        seaborn_tabs = st.tabs(["联合分布图", "分类图", "关系图"])
+        seaborn_tabs = lazy_tabs(["联合分布图", "分类图", "关系图"], key="seaborn_tabs")
         
         with seaborn_tabs[0]:
-            col_x = st.selectbox("X 轴", df.columns[:-2], key="sns_x")
-            col_y = st.selectbox("Y 轴", df.columns[:-2], index=1, key="sns_y")
+            if is_tab_open(seaborn_tabs[0]):
+                numeric_columns = get_numeric_columns(df)
+                col_x = st.selectbox("X 轴", numeric_columns, key="sns_x")
+                col_y = st.selectbox("Y 轴", numeric_columns, index=1, key="sns_y")
+                joint_kind = st.selectbox("图形类型 (kind)", JOINTPLOT_KINDS, key="sns_kind")
             
-            fig = sns.jointplot(data=df, x=col_x, y=col_y, hue="species", kind="scatter")
-            st.pyplot(fig)
-            st.code(f"sns.jointplot(data=df, x='{col_x}', y='{col_y}', hue='species', kind='scatter')", language='python')
+                try:
+                    st.image(get_jointplot_png(df, col_x, col_y, joint_kind), use_container_width=True)
+                except Exception as e:
+                    st.error(f"渲染错误: {str(e)}")
+                    st.info("请尝试选择不同的 X / Y 轴组合")
+                st.caption(f"💡 联合分布图在服务端预渲染并缓存（已缓存 {get_cached_jointplot_count(df)} 种组合），切换坐标轴时直接读取图片。")
+                st.code(f"sns.jointplot(data=df, x='{col_x}', y='{col_y}', hue='species', kind='{joint_kind}')", language='python')
         
         with seaborn_tabs[1]:
-            fig_cat, ax_cat = plt.subplots(figsize=(8, 5))
-            sns.boxplot(data=df, x='species', y='sepal_length', ax=ax_cat)
-            ax_cat.set_title("Seaborn Boxplot", fontweight='bold')
-            st.pyplot(fig_cat)
-            st.code("sns.boxplot(data=df, x='species', y='sepal_length')", language='python')
+            if is_tab_open(seaborn_tabs[1]):
+                fig_cat, ax_cat = locked_subplots(figsize=(8, 5))
+                sns.boxplot(data=df, x='species', y='sepal_length', ax=ax_cat)
+                ax_cat.set_title("Seaborn Boxplot", fontweight='bold')
+                show_figure(fig_cat)
+                st.code("sns.boxplot(data=df, x='species', y='sepal_length')", language='python')
         
         with seaborn_tabs[2]:
-            fig_rel, ax_rel = plt.subplots(figsize=(8, 5))
-            sns.scatterplot(data=df, x='sepal_length', y='sepal_width', hue='species', style='species', ax=ax_rel)
-            ax_rel.set_title("Seaborn Scatterplot", fontweight='bold')
-            st.pyplot(fig_rel)
-            st.code("sns.scatterplot(data=df, x='sepal_length', y='sepal_width', hue='species', style='species')", language='python')
+            if is_tab_open(seaborn_tabs[2]):
+                fig_rel, ax_rel = locked_subplots(figsize=(8, 5))
+                sns.scatterplot(data=df, x='sepal_length', y='sepal_width', hue='species', style='species', ax=ax_rel)
+                ax_rel.set_title("Seaborn Scatterplot", fontweight='bold')
+                show_figure(fig_rel)
+                st.code("sns.scatterplot(data=df, x='sepal_length', y='sepal_width', hue='species', style='species')", language='python')
 
     elif lib_choice == "Plotly (交互)":
         st.subheader("Plotly: 网页原生交互")
         st.info("Plotly 提供丰富的交互功能，适合Web应用。")
         
-        plotly_tabs = st.tabs(["3D散点", "交互式线图", "热力图"])
+        plotly_tabs = lazy_tabs(["3D散点", "交互式线图", "热力图"], key="plotly_tabs")
         
         with plotly_tabs[0]:
-            fig = px.scatter_3d(df, x='sepal_length', y='sepal_width', z='petal_width',
-                          color='species', size='petal_length', opacity=0.7)
-            st.plotly_chart(fig, use_container_width=True)
-            st.code("px.scatter_3d(df, x='sepal_length', y='sepal_width', z='petal_width', color='species')", language='python')
+            if is_tab_open(plotly_tabs[0]):
+                st.plotly_chart(get_plotly_scatter_3d_spec(), use_container_width=True)
+                st.code("px.scatter_3d(df, x='sepal_length', y='sepal_width', z='petal_width', color='species')", language='python')
         
         with plotly_tabs[1]:
-            fig_line = px.line(df.head(20), x='sepal_length', y='sepal_width', color='species')
-            st.plotly_chart(fig_line, use_container_width=True)
-            st.code("px.line(df, x='sepal_length', y='sepal_width', color='species')", language='python')
+            if is_tab_open(plotly_tabs[1]):
+                st.plotly_chart(get_plotly_line_spec(20), use_container_width=True)
+                st.code("px.line(df, x='sepal_length', y='sepal_width', color='species')", language='python')
         
         with plotly_tabs[2]:
-            fig_heat = px.density_heatmap(df, x='sepal_length', y='sepal_width', nbinsx=20, nbinsy=20)
-            st.plotly_chart(fig_heat, use_container_width=True)
-            st.code("px.density_heatmap(df, x='sepal_length', y='sepal_width')", language='python')
+            if is_tab_open(plotly_tabs[2]):
+                st.plotly_chart(get_plotly_density_heatmap_spec('sepal_length', 'sepal_width', 20), use_container_width=True)
+                st.caption("💡 分箱计数在服务端用 `np.histogram2d` 完成，浏览器只接收 20×20 的计数矩阵。")
+                st.code("px.density_heatmap(df, x='sepal_length', y='sepal_width')", language='python')
 
     elif lib_choice == "Altair (声明式)":
         st.subheader("Altair: 语法驱动")
         st.info("Altair 使用声明式语法，代码简洁优雅。")
         
-        altair_tabs = st.tabs(["基础图表", "交互式图表", "组合图表"])
+        altair_tabs = lazy_tabs(["基础图表", "交互式图表", "组合图表"], key="altair_tabs")
         
         with altair_tabs[0]:
-            chart = alt.Chart(df).mark_point().encode(
-                x='sepal_length',
-                y='sepal_width',
-                color='species',
-                size='petal_length'
-            )
-            st.altair_chart(chart, use_container_width=True)
-            st.code("""
+            if is_tab_open(altair_tabs[0]):
+                st.vega_lite_chart(get_altair_basic_spec(), use_container_width=True)
+                st.code("""
 alt.Chart(df).mark_point().encode(
     x='sepal_length',
     y='sepal_width',
@@ -3207,17 +3551,10 @@ alt.Chart(df).mark_point().encode(
             """, language='python')
         
         with altair_tabs[1]:
-            brush = alt.selection_interval()
-            points = alt.Chart(df).mark_point().encode(
-                x='sepal_length', y='sepal_width',
-                color=alt.condition(brush, 'species', alt.value('lightgray'))
-            ).add_params(brush)
-            bars = alt.Chart(df).mark_bar().encode(
-                y='species', color='species', x='count(species)'
-            ).transform_filter(brush)
-            
-            st.altair_chart(points & bars, use_container_width=True)
-            st.code("""
+            if is_tab_open(altair_tabs[1]):
+                st.vega_lite_chart(get_altair_brush_spec(), use_container_width=True)
+                st.caption("💡 散点图和柱状图引用同一个命名数据集，数据只下发一次。")
+                st.code("""
 brush = alt.selection_interval()
 points = alt.Chart(df).mark_point().encode(...).add_params(brush)
 bars = alt.Chart(df).mark_bar().encode(...).transform_filter(brush)
@@ -3225,11 +3562,10 @@ chart = points & bars
             """, language='python')
         
         with altair_tabs[2]:
-            chart1 = alt.Chart(df).mark_bar().encode(x='species', y='mean(sepal_length)')
-            chart2 = alt.Chart(df).mark_point().encode(x='sepal_length', y='sepal_width', color='species')
-            combined = chart1 | chart2
-            st.altair_chart(combined, use_container_width=True)
-            st.code("""
+            if is_tab_open(altair_tabs[2]):
+                st.vega_lite_chart(get_altair_combined_spec(), use_container_width=True)
+                st.caption("💡 柱状图的分组均值已在服务端计算，只下发 3 行聚合结果。")
+                st.code("""
 chart1 = alt.Chart(df).mark_bar().encode(...)
 chart2 = alt.Chart(df).mark_point().encode(...)
 combined = chart1 | chart2  # 水平组合
@@ -3239,36 +3575,40 @@ combined = chart1 | chart2  # 水平组合
         st.subheader("Pandas Plotting: 数据驱动可视化")
         st.info("Pandas 内置的绘图接口，与DataFrame无缝集成。")
         
-        pandas_tabs = st.tabs(["线图", "柱状图", "散点图", "直方图"])
+        pandas_tabs = lazy_tabs(["线图", "柱状图", "散点图", "直方图"], key="pandas_tabs")
         
         with pandas_tabs[0]:
-            fig_pd_line, ax_pd_line = plt.subplots(figsize=(8, 5))
-            df.head(20).plot(x='sepal_length', y='sepal_width', ax=ax_pd_line, kind='line')
-            ax_pd_line.set_title("Pandas Line Plot", fontweight='bold')
-            st.pyplot(fig_pd_line)
-            st.code("df.plot(x='sepal_length', y='sepal_width', kind='line')", language='python')
+            if is_tab_open(pandas_tabs[0]):
+                fig_pd_line, ax_pd_line = locked_subplots(figsize=(8, 5))
+                df.head(20).plot(x='sepal_length', y='sepal_width', ax=ax_pd_line, kind='line')
+                ax_pd_line.set_title("Pandas Line Plot", fontweight='bold')
+                show_figure(fig_pd_line)
+                st.code("df.plot(x='sepal_length', y='sepal_width', kind='line')", language='python')
         
         with pandas_tabs[1]:
-            fig_pd_bar, ax_pd_bar = plt.subplots(figsize=(8, 5))
-            df.groupby('species')['sepal_length'].mean().plot(kind='bar', ax=ax_pd_bar)
-            ax_pd_bar.set_title("Pandas Bar Plot", fontweight='bold')
-            ax_pd_bar.set_ylabel("Average Sepal Length")
-            st.pyplot(fig_pd_bar)
-            st.code("df.groupby('species')['sepal_length'].mean().plot(kind='bar')", language='python')
+            if is_tab_open(pandas_tabs[1]):
+                fig_pd_bar, ax_pd_bar = locked_subplots(figsize=(8, 5))
+                df.groupby('species')['sepal_length'].mean().plot(kind='bar', ax=ax_pd_bar)
+                ax_pd_bar.set_title("Pandas Bar Plot", fontweight='bold')
+                ax_pd_bar.set_ylabel("Average Sepal Length")
+                show_figure(fig_pd_bar)
+                st.code("df.groupby('species')['sepal_length'].mean().plot(kind='bar')", language='python')
         
         with pandas_tabs[2]:
-            fig_pd_scatter, ax_pd_scatter = plt.subplots(figsize=(8, 5))
-            df.plot(x='sepal_length', y='sepal_width', kind='scatter', ax=ax_pd_scatter, c=df['species'].astype('category').cat.codes, cmap='viridis')
-            ax_pd_scatter.set_title("Pandas Scatter Plot", fontweight='bold')
-            st.pyplot(fig_pd_scatter)
-            st.code("df.plot(x='sepal_length', y='sepal_width', kind='scatter')", language='python')
+            if is_tab_open(pandas_tabs[2]):
+                fig_pd_scatter, ax_pd_scatter = locked_subplots(figsize=(8, 5))
+                df.plot(x='sepal_length', y='sepal_width', kind='scatter', ax=ax_pd_scatter, c=df['species'].astype('category').cat.codes, cmap='viridis')
+                ax_pd_scatter.set_title("Pandas Scatter Plot", fontweight='bold')
+                show_figure(fig_pd_scatter)
+                st.code("df.plot(x='sepal_length', y='sepal_width', kind='scatter')", language='python')
         
         with pandas_tabs[3]:
-            fig_pd_hist, ax_pd_hist = plt.subplots(figsize=(8, 5))
-            df['sepal_length'].plot(kind='hist', bins=20, ax=ax_pd_hist)
-            ax_pd_hist.set_title("Pandas Histogram", fontweight='bold')
-            st.pyplot(fig_pd_hist)
-            st.code("df['sepal_length'].plot(kind='hist', bins=20)", language='python')
+            if is_tab_open(pandas_tabs[3]):
+                fig_pd_hist, ax_pd_hist = locked_subplots(figsize=(8, 5))
+                df['sepal_length'].plot(kind='hist', bins=20, ax=ax_pd_hist)
+                ax_pd_hist.set_title("Pandas Histogram", fontweight='bold')
+                show_figure(fig_pd_hist)
+                st.code("df['sepal_length'].plot(kind='hist', bins=20)", language='python')
     
     else:  # Bokeh
         st.subheader("Bokeh: Web交互式可视化")
@@ -3310,48 +3650,49 @@ elif menu == "7. 进阶挑战：大师之路":
     </div>
     """, unsafe_allow_html=True)
     
-    tab_layout, tab_dual, tab_fmt, tab_gspec, tab_anim = st.tabs([
+    tab_layout, tab_dual, tab_fmt, tab_gspec, tab_anim = lazy_tabs([
         "1. 复杂仪表盘 (Mosaic Layout)", 
         "2. 双轴帕累托图 (Dual Axis)", 
         "3. 专业格式化 (Formatter)",
         "4. GridSpec 高级布局",
         "5. 动画制作 (Animation)"
-    ])
+    ], key="challenge_tabs")
     
     # --- 挑战 1: 语义化布局 ---
     with tab_layout:
-        st.header("利用 subplot_mosaic 进行语义化布局")
-        st.markdown("放弃 `GridSpec` 的复杂索引，使用 ASCII 字符画来定义你的仪表盘布局。")
+        if is_tab_open(tab_layout):
+            st.header("利用 subplot_mosaic 进行语义化布局")
+            st.markdown("放弃 `GridSpec` 的复杂索引，使用 ASCII 字符画来定义你的仪表盘布局。")
         
-        col_viz, col_code = st.columns([1.5, 1])
+            col_viz, col_code = st.columns([1.5, 1])
         
-        # 修正：移除空格，确保 contiguous 连续性
-        layout_str = """
+            # 修正：移除空格，确保 contiguous 连续性
+            layout_str = """
         AAB
         AAC
         DDD
         """
         
-        with col_viz:
-            fig, axd = plt.subplot_mosaic(layout_str, figsize=(10, 6), constrained_layout=True)
+            with col_viz:
+                fig, axd = plt.subplot_mosaic(layout_str, figsize=(10, 6), constrained_layout=True)
             
-            # 模拟绘图
-            axd['A'].plot(np.cumsum(np.random.randn(100)), color='#2c3e50')
-            axd['A'].set_title("Main Trend (A)")
+                # 模拟绘图
+                axd['A'].plot(np.cumsum(np.random.randn(100)), color='#2c3e50')
+                axd['A'].set_title("Main Trend (A)")
             
-            axd['B'].hist(np.random.randn(100), color='#e74c3c')
-            axd['B'].set_title("Dist (B)")
+                axd['B'].hist(np.random.randn(100), color='#e74c3c')
+                axd['B'].set_title("Dist (B)")
             
-            axd['C'].scatter(np.random.rand(20), np.random.rand(20), color='#f1c40f')
-            axd['C'].set_title("Scatter (C)")
+                axd['C'].scatter(np.random.rand(20), np.random.rand(20), color='#f1c40f')
+                axd['C'].set_title("Scatter (C)")
             
-            axd['D'].bar(['Q1','Q2','Q3','Q4'], [10,20,15,25], color='#3498db')
-            axd['D'].set_title("Quarterly (D)")
+                axd['D'].bar(['Q1','Q2','Q3','Q4'], [10,20,15,25], color='#3498db')
+                axd['D'].set_title("Quarterly (D)")
             
-            st.pyplot(fig)
+                show_figure(fig)
             
-        with col_code:
-            st.code("""
+            with col_code:
+                st.code("""
 # 1. 定义布局 (ASCII Art)
 # 修正：移除中间空格，确保D是连续的
 layout = \"\"\"
@@ -3372,36 +3713,37 @@ axd['B'].hist(data)
             
     # --- 挑战 2: 双轴图 ---
     with tab_dual:
-        st.header("双轴图 (Twin Axis) 与 帕累托图")
-        st.markdown("在同一个 X 轴上展示两个不同量纲的数据（例如：销售额 vs 累计百分比）。")
+        if is_tab_open(tab_dual):
+            st.header("双轴图 (Twin Axis) 与 帕累托图")
+            st.markdown("在同一个 X 轴上展示两个不同量纲的数据（例如：销售额 vs 累计百分比）。")
         
-        col_viz, col_code = st.columns([1.5, 1])
+            col_viz, col_code = st.columns([1.5, 1])
         
-        data = pd.DataFrame({'Sales': [100, 80, 50, 30, 10]}, index=['Product A', 'B', 'C', 'D', 'E'])
-        data['CumPct'] = data['Sales'].cumsum() / data['Sales'].sum() * 100
+            data = pd.DataFrame({'Sales': [100, 80, 50, 30, 10]}, index=['Product A', 'B', 'C', 'D', 'E'])
+            data['CumPct'] = data['Sales'].cumsum() / data['Sales'].sum() * 100
         
-        with col_viz:
-            fig, ax1 = plt.subplots(figsize=(10, 5))
+            with col_viz:
+                fig, ax1 = locked_subplots(figsize=(10, 5))
             
-            # 轴1：柱状图
-            color = 'tab:blue'
-            ax1.set_xlabel('Product')
-            ax1.set_ylabel('Sales Volume', color=color)
-            ax1.bar(data.index, data['Sales'], color=color, alpha=0.6)
-            ax1.tick_params(axis='y', labelcolor=color)
+                # 轴1：柱状图
+                color = 'tab:blue'
+                ax1.set_xlabel('Product')
+                ax1.set_ylabel('Sales Volume', color=color)
+                ax1.bar(data.index, data['Sales'], color=color, alpha=0.6)
+                ax1.tick_params(axis='y', labelcolor=color)
             
-            # 轴2：共享 X 轴
-            ax2 = ax1.twinx()  
-            color = 'tab:red'
-            ax2.set_ylabel('Cumulative %', color=color)
-            ax2.plot(data.index, data['CumPct'], color=color, marker='o', linewidth=2)
-            ax2.tick_params(axis='y', labelcolor=color)
-            ax2.set_ylim(0, 110)
+                # 轴2：共享 X 轴
+                ax2 = ax1.twinx()  
+                color = 'tab:red'
+                ax2.set_ylabel('Cumulative %', color=color)
+                ax2.plot(data.index, data['CumPct'], color=color, marker='o', linewidth=2)
+                ax2.tick_params(axis='y', labelcolor=color)
+                ax2.set_ylim(0, 110)
             
-            st.pyplot(fig)
+                show_figure(fig)
             
-        with col_code:
-            st.code("""
+            with col_code:
+                st.code("""
 fig, ax1 = plt.subplots()
 
 # 绘制左轴
@@ -3418,33 +3760,34 @@ ax2.set_ylabel('Percentage', color='red')
 
     # --- 挑战 3: 格式化 ---
     with tab_fmt:
-        st.header("专业格式化 (FuncFormatter)")
-        st.markdown("将丑陋的科学计数法（1e6）转换为可读性强的商业格式（$1M）。")
+        if is_tab_open(tab_fmt):
+            st.header("专业格式化 (FuncFormatter)")
+            st.markdown("将丑陋的科学计数法（1e6）转换为可读性强的商业格式（$1M）。")
         
-        col_viz, col_code = st.columns([1.5, 1])
+            col_viz, col_code = st.columns([1.5, 1])
         
-        with col_viz:
-            money = [1500000, 2500000, 3800000]
-            names = ['A Corp', 'B Corp', 'C Corp']
+            with col_viz:
+                money = [1500000, 2500000, 3800000]
+                names = ['A Corp', 'B Corp', 'C Corp']
             
-            fig, ax = plt.subplots(figsize=(8, 4))
-            ax.barh(names, money, color='#16a085')
+                fig, ax = locked_subplots(figsize=(8, 4))
+                ax.barh(names, money, color='#16a085')
             
-            # 定义格式化函数
-            def currency(x, pos):
-                if x >= 1e6:
-                    return f'${x*1e-6:.1f}M'
-                return f'${x:.0f}'
+                # 定义格式化函数
+                def currency(x, pos):
+                    if x >= 1e6:
+                        return f'${x*1e-6:.1f}M'
+                    return f'${x:.0f}'
             
-            # 应用 Formatter
-            formatter = FuncFormatter(currency)
-            ax.xaxis.set_major_formatter(formatter)
-            ax.set_title("Revenue (Formatted)")
+                # 应用 Formatter
+                formatter = FuncFormatter(currency)
+                ax.xaxis.set_major_formatter(formatter)
+                ax.set_title("Revenue (Formatted)")
             
-            st.pyplot(fig)
+                show_figure(fig)
             
-        with col_code:
-            st.code("""
+            with col_code:
+                st.code("""
 from matplotlib.ticker import FuncFormatter
 
 def currency(x, pos):
@@ -3458,45 +3801,46 @@ ax.xaxis.set_major_formatter(formatter)
     
     # --- 挑战 4: GridSpec 高级布局 ---
     with tab_gspec:
-        st.header("GridSpec: 灵活的子图布局")
-        st.markdown("使用 `GridSpec` 创建非均匀、跨行列的复杂布局。")
+        if is_tab_open(tab_gspec):
+            st.header("GridSpec: 灵活的子图布局")
+            st.markdown("使用 `GridSpec` 创建非均匀、跨行列的复杂布局。")
         
-        col_gspec_demo, col_gspec_code = st.columns([1.5, 1])
+            col_gspec_demo, col_gspec_code = st.columns([1.5, 1])
         
-        with col_gspec_demo:
-            from matplotlib.gridspec import GridSpec
+            with col_gspec_demo:
+                from matplotlib.gridspec import GridSpec
             
-            fig_gspec = plt.figure(figsize=(10, 6))
-            gs = GridSpec(3, 3, figure=fig_gspec, hspace=0.3, wspace=0.3)
+                fig_gspec = locked_figure(figsize=(10, 6))
+                gs = GridSpec(3, 3, figure=fig_gspec, hspace=0.3, wspace=0.3)
             
-            # 大图占据左侧2x2
-            ax_main = fig_gspec.add_subplot(gs[0:2, 0:2])
-            x = np.linspace(0, 10, 100)
-            ax_main.plot(x, np.sin(x), label='sin(x)')
-            ax_main.plot(x, np.cos(x), label='cos(x)')
-            ax_main.set_title("Main Plot (2x2)", fontweight='bold')
-            ax_main.legend()
-            ax_main.grid(True, alpha=0.3)
-            
-            # 右上角小图
-            ax_top = fig_gspec.add_subplot(gs[0, 2])
-            ax_top.hist(np.random.randn(100), bins=20)
-            ax_top.set_title("Histogram", fontsize=9)
-            
-            # 右中小图
-            ax_mid = fig_gspec.add_subplot(gs[1, 2])
-            ax_mid.scatter(np.random.rand(50), np.random.rand(50))
-            ax_mid.set_title("Scatter Plot", fontsize=9)
-            
-            # 底部横跨3列
-            ax_bottom = fig_gspec.add_subplot(gs[2, :])
-            ax_bottom.bar(['A', 'B', 'C', 'D'], [10, 20, 15, 25])
-            ax_bottom.set_title("Bottom Bar Chart (Spanning 3 Columns)", fontweight='bold')
-            
-            st.pyplot(fig_gspec)
-        
-        with col_gspec_code:
-            st.code("""
+                # 大图占据左侧2x2
+                ax_main = fig_gspec.add_subplot(gs[0:2, 0:2])
+                x = np.linspace(0, 10, 100)
+                ax_main.plot(x, np.sin(x), label='sin(x)')
+                ax_main.plot(x, np.cos(x), label='cos(x)')
+                ax_main.set_title("Main Plot (2x2)", fontweight='bold')
+                ax_main.legend()
+                ax_main.grid(True, alpha=0.3)
+            
+                # 右上角小图
+                ax_top = fig_gspec.add_subplot(gs[0, 2])
+                ax_top.hist(np.random.randn(100), bins=20)
+                ax_top.set_title("Histogram", fontsize=9)
+            
+                # 右中小图
+                ax_mid = fig_gspec.add_subplot(gs[1, 2])
+                ax_mid.scatter(np.random.rand(50), np.random.rand(50))
+                ax_mid.set_title("Scatter Plot", fontsize=9)
+            
+                # 底部横跨3列
+                ax_bottom = fig_gspec.add_subplot(gs[2, :])
+                ax_bottom.bar(['A', 'B', 'C', 'D'], [10, 20, 15, 25])
+                ax_bottom.set_title("Bottom Bar Chart (Spanning 3 Columns)", fontweight='bold')
+            
+                show_figure(fig_gspec)
+        
+            with col_gspec_code:
+                st.code("""
 from matplotlib.gridspec import GridSpec
 
 fig = plt.figure(figsize=(10, 6))
@@ -3515,23 +3859,23 @@ ax_bottom = fig.add_subplot(gs[2, :])
 ax_bottom.bar(categories, values)
             """, language='python')
         
-        st.markdown("---")
-        st.markdown("#### GridSpec vs subplot_mosaic")
-        col_comp1, col_comp2 = st.columns(2)
+            st.markdown("---")
+            st.markdown("#### GridSpec vs subplot_mosaic")
+            col_comp1, col_comp2 = st.columns(2)
         
-        with col_comp1:
-            st.markdown("**GridSpec (传统方法)**")
-            st.code("""
+            with col_comp1:
+                st.markdown("**GridSpec (传统方法)**")
+                st.code("""
 from matplotlib.gridspec import GridSpec
 gs = GridSpec(2, 2)
 ax1 = fig.add_subplot(gs[0, 0])
 ax2 = fig.add_subplot(gs[0, 1])
             """, language='python')
-            st.caption("✅ 灵活但需要手动计算索引")
+                st.caption("✅ 灵活但需要手动计算索引")
         
-        with col_comp2:
-            st.markdown("**subplot_mosaic (推荐)**")
-            st.code("""
+            with col_comp2:
+                st.markdown("**subplot_mosaic (推荐)**")
+                st.code("""
 layout = \"\"\"
 AAB
 AAC
@@ -3540,24 +3884,25 @@ DDD
 fig, axd = plt.subplot_mosaic(layout)
 axd['A'].plot(x, y)
             """, language='python')
-            st.caption("✅ 直观，使用ASCII字符画布局")
+                st.caption("✅ 直观，使用ASCII字符画布局")
     
     # --- 挑战 5: 动画制作 ---
     with tab_anim:
-        st.header("动画制作 (Animation)")
-        st.markdown("使用 Matplotlib 的 `animation` 模块创建动态图表。")
+        if is_tab_open(tab_anim):
+            st.header("动画制作 (Animation)")
+            st.markdown("使用 Matplotlib 的 `animation` 模块创建动态图表。")
         
-        st.info("""
-        **注意**：网页中无法直接显示动画，这里展示代码示例和静态预览。
-        实际运行时需要使用 `plt.show()` 或保存为 GIF/MP4 文件。
+            st.info("""
+        **说明**：网页中无法直接运行 `plt.show()` 的交互动画，下方动画由服务器用 blitting 逐帧渲染并编码为 GIF/WebP/MP4。
+        实际运行时可以使用 `plt.show()` 或 `ani.save()` 保存为文件。
         """)
         
-        anim_type = st.selectbox("选择动画类型", 
-                                ["动态线图", "动态散点", "3D动画", "保存动画"],
-                                key="anim_type")
+            anim_type = st.selectbox("选择动画类型", 
+                                    ["动态线图", "动态散点", "3D动画", "保存动画"],
+                                    key="anim_type")
         
-        if anim_type == "动态线图":
-            st.code("""
+            if anim_type == "动态线图":
+                st.code("""
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import numpy as np
@@ -3578,20 +3923,9 @@ ani = animation.FuncAnimation(fig, animate, frames=100,
                               interval=50, blit=True)
 plt.show()
             """, language='python')
-            
-            # 静态预览
-            fig_anim_preview, ax_anim_preview = plt.subplots(figsize=(8, 5))
-            x_preview = np.linspace(0, 2*np.pi, 100)
-            y_preview = np.sin(x_preview)
-            ax_anim_preview.plot(x_preview, y_preview, lw=2)
-            ax_anim_preview.set_xlim(0, 2*np.pi)
-            ax_anim_preview.set_ylim(-1, 1)
-            ax_anim_preview.set_title("Animation Preview (Static Frame)", fontweight='bold')
-            ax_anim_preview.grid(True, alpha=0.3)
-            st.pyplot(fig_anim_preview)
-        
-        elif anim_type == "动态散点":
-            st.code("""
+        
+            elif anim_type == "动态散点":
+                st.code("""
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import numpy as np
@@ -3613,32 +3947,32 @@ ani = animation.FuncAnimation(fig, animate, frames=100,
 plt.show()
             """, language='python')
         
-        elif anim_type == "3D动画":
-            st.code("""
+            elif anim_type == "3D动画":
+                st.code("""
 from mpl_toolkits.mplot3d import Axes3D
 import matplotlib.animation as animation
 
 fig = plt.figure()
 ax = fig.add_subplot(111, projection='3d')
+theta = np.linspace(0, 2*np.pi, 100)
+z = np.linspace(0, 10, 100)
+line, = ax.plot([], [], [])
+ax.set_xlim(-2, 2)
+ax.set_ylim(-2, 2)
+ax.set_zlim(0, 10)
 
 def animate(frame):
-    ax.clear()
-    theta = np.linspace(0, 2*np.pi, 100)
-    z = np.linspace(0, 10, 100)
+    # 只更新线条数据，不必每帧 ax.clear() 重建坐标轴
     r = 1 + np.sin(frame * 0.1)
-    x = r * np.cos(theta)
-    y = r * np.sin(theta)
-    ax.plot(x, y, z)
-    ax.set_xlim(-2, 2)
-    ax.set_ylim(-2, 2)
-    ax.set_zlim(0, 10)
+    line.set_data_3d(r * np.cos(theta), r * np.sin(theta), z)
+    return line,
 
 ani = animation.FuncAnimation(fig, animate, frames=100, interval=50)
 plt.show()
             """, language='python')
         
-        else:  # 保存动画
-            st.code("""
+            else:  # 保存动画
+                st.code("""
 import matplotlib.animation as animation
 
 # 创建动画
@@ -3655,18 +3989,50 @@ from matplotlib.animation import HTMLWriter
 ani.save('animation.html', writer=HTMLWriter())
             """, language='python')
             
-            st.markdown("""
+                st.markdown("""
             **保存格式说明**：
             - **GIF**: 需要 `pillow` 库，适合简单动画
             - **MP4**: 需要 `ffmpeg`，适合复杂动画
             - **HTML**: JavaScript动画，可在浏览器中播放
             """)
+        
+            # 在后台线程渲染动画并缓存到磁盘，首次渲染完成后再次访问无需重新编码
+            anim_example = "动态线图" if anim_type == "保存动画" else anim_type
+            anim_formats = get_animation_formats()
+            col_anim1, col_anim2, col_anim3, col_anim4 = st.columns(4)
+            with col_anim1:
+                anim_frames = st.select_slider("帧数 (frames)", [30, 60, 100], value=60, key="anim_frames")
+            with col_anim2:
+                anim_interval = st.select_slider("帧间隔 (interval, ms)", [20, 50, 100, 200], value=50, key="anim_interval")
+            with col_anim3:
+                anim_dpi = st.select_slider("分辨率 (dpi)", [60, 80, 100], value=80, key="anim_dpi")
+            with col_anim4:
+                anim_fmt = st.selectbox("输出格式", anim_formats, key="anim_fmt",
+                                        help="gif/webp 由 Pillow 编码；mp4 需要系统安装 ffmpeg")
+        
+            anim_data, anim_future = get_animation(anim_example, anim_frames, anim_interval, anim_dpi, anim_fmt)
+            if anim_data is not None:
+                if anim_fmt == 'mp4':
+                    st.video(anim_data, format="video/mp4", loop=True, autoplay=True, muted=True)
+                else:
+                    st.image(anim_data, caption=f"{anim_example}（{anim_frames} 帧，{anim_interval} ms/帧，{anim_fmt.upper()}）")
+                st.download_button("⬇️ 下载动画", anim_data, file_name=f"animation.{anim_fmt}", key="anim_download")
+            elif anim_future.done() and anim_future.exception() is not None:
+                st.error(f"动画渲染失败：{anim_future.exception()}")
+            else:
+                @st.fragment(run_every=1.0)
+                def _wait_for_animation():
+                    if anim_future.done():
+                        st.rerun(scope="app")
+                    st.info("⏳ 首次访问，正在后台渲染动画（渲染完成后会缓存，之后无需等待）...")
+                _wait_for_animation()
 
 # --- 章节 8: 小白交互编辑练习 ---
 elif menu == "8. 小白交互编辑练习":
     render_interactive_editor()
 
 # --- 页脚 ---
+render_encode_stats()
 st.sidebar.markdown("---")
 st.sidebar.markdown("""
 <div style='text-align: center; padding: 1rem 0; color: #6b7280; font-size: 0.85rem;'>
@@ -0,0 +1,53 @@
+"""
+服务端数据聚合 - 用 NumPy 在服务器上完成分箱与分组统计，浏览器只接收聚合结果
+"""
+import numpy as np
+from typing import Optional, Sequence, Tuple
+
+
+def bin_2d(x: np.ndarray, y: np.ndarray, bins=20,
+           value_range: Optional[Sequence[Sequence[float]]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """二维分箱计数，返回 (counts, x_edges, y_edges)，counts 形状为 (ny, nx) 便于直接作为图像行列"""
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins, range=value_range)
+    return counts.T, x_edges, y_edges
+
+
+def bin_centers(edges: np.ndarray) -> np.ndarray:
+    """由分箱边界计算分箱中心"""
+    return (edges[:-1] + edges[1:]) / 2
+
+
+def group_mean(keys: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """按 keys 分组求均值，返回 (分组标签, 均值)"""
+    labels, inverse = np.unique(np.asarray(keys), return_inverse=True)
+    sums = np.bincount(inverse, weights=np.asarray(values, dtype=float))
+    counts = np.bincount(inverse)
+    return labels, sums / counts
+
+
+def pad_range(value_range: Tuple[float, float]) -> Tuple[float, float]:
+    """宽度为 0 的范围（如所有点的 x 都相同）向两侧各扩展 0.5，与 np.histogram2d 的处理相同"""
+    low, high = float(value_range[0]), float(value_range[1])
+    if low == high:
+        return low - 0.5, high + 0.5
+    return low, high
+
+
+def bin_2d_pixels(x: np.ndarray, y: np.ndarray, shape: Tuple[int, int],
+                  x_range: Tuple[float, float], y_range: Tuple[float, float]) -> np.ndarray:
+    """按像素网格计数（比 np.histogram2d 更快的 bincount 实现），返回形状为 (ny, nx) 的计数矩阵
+
+    宽度为 0 的范围先按 pad_range 扩展，否则计算格子索引时会除以 0。
+    """
+    ny, nx = shape
+    x_range, y_range = pad_range(x_range), pad_range(y_range)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    ix = ((x - x_range[0]) * (nx / (x_range[1] - x_range[0]))).astype(np.int64)
+    iy = ((y - y_range[0]) * (ny / (y_range[1] - y_range[0]))).astype(np.int64)
+    # 落在右/上边界上的点归入最后一格，范围外的点丢弃
+    ix[x == x_range[1]] = nx - 1
+    iy[y == y_range[1]] = ny - 1
+    inside = (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+    flat = iy[inside] * nx + ix[inside]
+    return np.bincount(flat, minlength=nx * ny).reshape(ny, nx)
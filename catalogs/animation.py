@@ -0,0 +1,207 @@
+"""
+动画渲染（第7章） - 用 blitting 在同一个 Figure 上逐帧重绘变化的 artist，编码为 GIF/WebP/MP4 并缓存到磁盘
+"""
+import io
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image, features
+
+from catalogs.rc_isolation import attach_figure_rc, figure_rc, rc_lock
+from catalogs.render_cache import FigureCache, get_render_executor, make_cache_key
+
+# 动画示例注册表：name -> setup(fig) -> (需要逐帧更新的 artist 列表, update(frame))
+ANIMATION_EXAMPLES: Dict[str, Callable] = {}
+
+
+def register_animation_example(name: str):
+    """注册动画示例的装饰器"""
+    def decorator(func):
+        ANIMATION_EXAMPLES[name] = func
+        return func
+    return decorator
+
+
+@register_animation_example("动态线图")
+def _setup_line(fig) -> Tuple[List, Callable[[int], None]]:
+    ax = fig.add_subplot(111)
+    x = np.linspace(0, 2 * np.pi, 100)
+    line, = ax.plot([], [], lw=2)
+    ax.set_xlim(0, 2 * np.pi)
+    ax.set_ylim(-1, 1)
+    ax.grid(True)
+
+    def update(frame: int) -> None:
+        line.set_data(x, np.sin(x + frame * 0.1))
+
+    return [line], update
+
+
+@register_animation_example("动态散点")
+def _setup_scatter(fig) -> Tuple[List, Callable[[int], None]]:
+    ax = fig.add_subplot(111)
+    scatter = ax.scatter([], [], s=100)
+    ax.set_xlim(-1, 1)
+    ax.set_ylim(-1, 1)
+
+    def update(frame: int) -> None:
+        # 以帧号为随机种子，同样的参数总是得到同样的动画（保证缓存结果可复用）
+        rng = np.random.default_rng(frame)
+        scatter.set_offsets(rng.random((50, 2)) * 2 - 1)
+
+    return [scatter], update
+
+
+@register_animation_example("3D动画")
+def _setup_3d(fig) -> Tuple[List, Callable[[int], None]]:
+    ax = fig.add_subplot(111, projection='3d')
+    theta = np.linspace(0, 2 * np.pi, 100)
+    z = np.linspace(0, 10, 100)
+    line, = ax.plot([], [], [])
+    ax.set_xlim(-2, 2)
+    ax.set_ylim(-2, 2)
+    ax.set_zlim(0, 10)
+
+    def update(frame: int) -> None:
+        # 只更新线条数据，不调用 ax.clear()，坐标轴无需每帧重建
+        r = 1 + np.sin(frame * 0.1)
+        line.set_data_3d(r * np.cos(theta), r * np.sin(theta), z)
+
+    return [line], update
+
+
+def get_animation_formats() -> List[str]:
+    """当前环境可用的输出格式"""
+    formats = ['gif']
+    if features.check('webp'):
+        formats.append('webp')
+    if shutil.which('ffmpeg'):
+        formats.append('mp4')
+    return formats
+
+
+def render_frames(example: str, frames: int = 60, dpi: int = 80,
+                  figsize: Tuple[float, float] = (8, 5)) -> List[Image.Image]:
+    """用 blitting 渲染所有帧：背景只绘制一次，之后每帧只重绘变化的 artist
+
+    在后台线程中运行，因此直接创建 Figure 和 Agg 画布，不经过 pyplot 的全局状态；
+    只在创建 Figure 和 artist 时持有 rc_lock（不会读到其他会话隔离渲染中的样式）并记下此时的 rcParams；
+    逐帧绘制在 figure_rc 中使用这份参数，不持锁。
+    """
+    with rc_lock:
+        fig = Figure(figsize=figsize, dpi=dpi)
+        canvas = FigureCanvasAgg(fig)
+        artists, update = ANIMATION_EXAMPLES[example](fig)
+        attach_figure_rc(fig)
+    for artist in artists:
+        artist.set_animated(True)
+
+    images = []
+    with figure_rc(fig):
+        canvas.draw()
+        background = canvas.copy_from_bbox(fig.bbox)
+        for frame in range(frames):
+            canvas.restore_region(background)
+            update(frame)
+            for artist in artists:
+                fig.draw_artist(artist)
+            images.append(Image.fromarray(np.asarray(canvas.buffer_rgba())[..., :3].copy()))
+    return images
+
+
+def encode_frames(images: List[Image.Image], interval: int, fmt: str = 'gif') -> bytes:
+    """将帧序列编码为 GIF / WebP（Pillow）或 MP4（ffmpeg）"""
+    if fmt == 'mp4':
+        return _encode_mp4(images, interval)
+    if fmt == 'gif':
+        # 所有帧共用第一帧的调色板，避免 Pillow 逐帧重新量化颜色（编码快一倍以上，文件也更小）
+        palette = images[0].quantize(colors=64, method=Image.Quantize.MEDIANCUT)
+        images = [image.quantize(palette=palette, dither=Image.Dither.NONE) for image in images]
+    buffer = io.BytesIO()
+    images[0].save(buffer, format=fmt.upper(), save_all=True, append_images=images[1:],
+                   duration=interval, loop=0)
+    return buffer.getvalue()
+
+
+def _encode_mp4(images: List[Image.Image], interval: int) -> bytes:
+    """通过管道把原始 RGB 帧交给 ffmpeg 编码为 H.264 MP4"""
+    width, height = images[0].size
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = Path(tmp) / 'animation.mp4'
+        cmd = [
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{width}x{height}', '-r', f'{1000 / interval:.3f}',
+            '-i', '-',
+            # H.264 要求宽高为偶数
+            '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', '-movflags', '+faststart',
+            str(out_path),
+        ]
+        raw = b''.join(image.tobytes() for image in images)
+        subprocess.run(cmd, input=raw, check=True)
+        return out_path.read_bytes()
+
+
+_animation_caches: Dict[str, FigureCache] = {}
+_pending: Dict[str, Future] = {}
+# 失败的任务：下一次获取时交给界面显示一次错误，之后再获取时重新提交
+_failed: Dict[str, Future] = {}
+_pending_lock = threading.RLock()
+
+
+def _get_cache(fmt: str) -> FigureCache:
+    with _pending_lock:
+        if fmt not in _animation_caches:
+            _animation_caches[fmt] = FigureCache('animation', suffix=f'.{fmt}')
+        return _animation_caches[fmt]
+
+
+def _animation_key(example: str, frames: int, interval: int, dpi: int, fmt: str) -> str:
+    return make_cache_key('animation', example, frames, interval, dpi, fmt)
+
+
+def render_animation(example: str, frames: int = 60, interval: int = 50, dpi: int = 80, fmt: str = 'gif') -> bytes:
+    """渲染并编码动画，结果写入磁盘缓存"""
+    data = encode_frames(render_frames(example, frames, dpi), interval, fmt)
+    _get_cache(fmt).set(_animation_key(example, frames, interval, dpi, fmt), data)
+    return data
+
+
+def get_animation(example: str, frames: int = 60, interval: int = 50, dpi: int = 80,
+                  fmt: str = 'gif') -> Tuple[Optional[bytes], Optional[Future]]:
+    """获取动画：命中缓存时返回 (数据, None)；否则提交后台渲染并返回 (None, future)
+
+    同样参数的渲染任务只会提交一次，多个会话共享同一个 future。
+    渲染失败时（如 ffmpeg 缺失或崩溃），下一次获取返回这个失败的 future 供界面显示错误，
+    再之后的获取会重新提交渲染。
+    """
+    key = _animation_key(example, frames, interval, dpi, fmt)
+    data = _get_cache(fmt).get(key)
+    if data is not None:
+        return data, None
+    with _pending_lock:
+        failed = _failed.pop(key, None)
+        if failed is not None:
+            return None, failed
+        future = _pending.get(key)
+        if future is None:
+            future = get_render_executor().submit(render_animation, example, frames, interval, dpi, fmt)
+            _pending[key] = future
+            future.add_done_callback(lambda f, key=key: _discard_pending(key, f))
+    return None, future
+
+
+def _discard_pending(key: str, future: Future) -> None:
+    """任务结束后移除记录：成功的结果已在磁盘缓存中，失败的任务转入 _failed 等待显示错误"""
+    with _pending_lock:
+        if _pending.get(key) is future:
+            del _pending[key]
+            if future.exception() is not None:
+                _failed[key] = future
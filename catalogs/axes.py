@@ -2,11 +2,13 @@
 Axes（坐标轴）相关参数的完整选项目录
 """
 import streamlit as st
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple
 from catalogs.utils import get_matplotlib_version, generate_sample_data, ensure_chinese_font
+from catalogs.layout_cache import tight_layout
+from catalogs.rc_isolation import locked_subplots
+from catalogs.render_policy import show_figure
 
 def render_xlim_ylim_gallery():
     """渲染 xlim/ylim 全量画廊"""
@@ -40,7 +42,7 @@ def render_xlim_ylim_gallery():
         ("仅设置 Y", None, (-0.5, 0.5)),
     ]
     
-    fig, axes = plt.subplots(2, 2, figsize=(12, 8))
+    fig, axes = locked_subplots(2, 2, figsize=(12, 8))
     axes = axes.flatten()
     
     for idx, (title, xlim_val, ylim_val) in enumerate(ranges):
@@ -53,8 +55,8 @@ def render_xlim_ylim_gallery():
         ax.set_title(f"{title}\nxlim={xlim_val}, ylim={ylim_val}", fontsize=10, fontweight='bold')
         ax.grid(True, alpha=0.3)
     
-    plt.tight_layout()
-    st.pyplot(fig)
+    tight_layout()
+    show_figure(fig)
     
     # === 交互式预览 ===
     st.markdown("### 🎛️ 交互式范围设置")
@@ -67,13 +69,13 @@ def render_xlim_ylim_gallery():
         y_min = st.number_input("Y 最小值", value=-1.5, key='ylim_min')
         y_max = st.number_input("Y 最大值", value=1.5, key='ylim_max')
     
-    fig_custom, ax_custom = plt.subplots(figsize=(10, 4))
+    fig_custom, ax_custom = locked_subplots(figsize=(10, 4))
     ax_custom.plot(x, y, linewidth=2, color='#2c3e50')
     ax_custom.set_xlim(x_min, x_max)
     ax_custom.set_ylim(y_min, y_max)
     ax_custom.set_title(f"xlim=({x_min}, {x_max}), ylim=({y_min}, {y_max})", fontsize=11, fontweight='bold')
     ax_custom.grid(True, alpha=0.3)
-    st.pyplot(fig_custom)
+    show_figure(fig_custom)
     
     st.code(f"""
 import matplotlib.pyplot as plt
@@ -138,7 +140,7 @@ def render_grid_gallery():
     cols = 2
     rows = (n_configs + cols - 1) // cols
     
-    fig, axes = plt.subplots(rows, cols, figsize=(6*cols, 3*rows))
+    fig, axes = locked_subplots(rows, cols, figsize=(6*cols, 3*rows))
     if rows == 1:
         axes = axes if isinstance(axes, np.ndarray) else [axes]
     else:
@@ -155,8 +157,8 @@ def render_grid_gallery():
     for idx in range(n_configs, len(axes)):
         axes[idx].axis('off')
     
-    plt.tight_layout()
-    st.pyplot(fig)
+    tight_layout()
+    show_figure(fig)
     
     st.markdown("### ⚠️ 常见坑")
     st.warning("""
@@ -205,7 +207,7 @@ def render_spines_gallery():
     cols = 2
     rows = (n_configs + cols - 1) // cols
     
-    fig, axes = plt.subplots(rows, cols, figsize=(6*cols, 3*rows))
+    fig, axes = locked_subplots(rows, cols, figsize=(6*cols, 3*rows))
     if rows == 1:
         axes = axes if isinstance(axes, np.ndarray) else [axes]
     else:
@@ -236,8 +238,8 @@ def render_spines_gallery():
     for idx in range(n_configs, len(axes)):
         axes[idx].axis('off')
     
-    plt.tight_layout()
-    st.pyplot(fig)
+    tight_layout()
+    show_figure(fig)
     
     st.code("""
 # 隐藏上边框和右边框
@@ -0,0 +1,208 @@
+"""
+代码生成 - 把 PlotParams 编译为可独立运行的 matplotlib 脚本
+
+- 模板在导入时预编译：占位符只解析一次，生成时按顺序拼接
+- 脚本按片段（见 plot_params.FIELD_SECTIONS）生成，每个片段按其依赖字段的取值缓存，
+  参数变化时只有依赖这些字段的片段会重新生成
+- 整段代码按 PlotParams 缓存，重复运行时直接返回
+"""
+import string
+from functools import lru_cache
+from typing import Callable, Dict, List, Mapping, Tuple
+
+from catalogs.plot_params import FIELD_SECTIONS, PlotParams
+from catalogs.utils import CHINESE_FONTS, resolve_chinese_font
+
+# 片段输出顺序（imports 为固定内容）
+SECTION_ORDER = ['style', 'font', 'data', 'figure', 'artist', 'axes', 'text', 'layout']
+
+HEADER = "import matplotlib.pyplot as plt\nimport numpy as np\n"
+
+_formatter = string.Formatter()
+
+
+def compile_template(template: str) -> Callable[..., str]:
+    """预编译 str.format 风格的模板，返回 render(**context) -> str
+
+    支持 {name}、{name!r} 和格式说明符；{{ 和 }} 表示字面量花括号。
+    """
+    parts: List[Tuple[str, str, str, str]] = list(_formatter.parse(template))
+
+    def render(**context) -> str:
+        out = []
+        for literal, name, spec, conversion in parts:
+            out.append(literal)
+            if name is not None:
+                value = context[name]
+                if conversion == 'r':
+                    value = repr(value)
+                elif conversion == 's':
+                    value = str(value)
+                out.append(format(value, spec or ''))
+        return "".join(out)
+
+    return render
+
+
+TEMPLATES: Dict[str, Callable[..., str]] = {name: compile_template(text) for name, text in {
+    'style_use': "plt.style.use({style_sheet!r})",
+    'data': "x = np.linspace(0, 10, {n_points})\ny = np.sin(x)",
+    'subplots': "fig, axes = plt.subplots({rows}, {cols}, figsize={figsize}, dpi={dpi}, constrained_layout=True)",
+    'subplot': "fig, ax = plt.subplots(figsize={figsize}, dpi={dpi})",
+    'facecolor': "fig.set_facecolor({facecolor!r})",
+    'decimation_hint': ("{indent}# 预览时使用了 '{method}' 降采样；数据量大时可改用：\n"
+                        "{indent}# from catalogs.decimation import plot_decimated\n"
+                        "{indent}# plot_decimated(ax, x, y, method='{method}'{kwargs})"),
+    'xlim': "{indent}ax.set_xlim({low}, {high})",
+    'ylim': "{indent}ax.set_ylim({low}, {high})",
+    'grid': "{indent}ax.grid(True{kwargs})",
+    'spine': "{indent}ax.spines['{side}'].set_visible(False)",
+    'set_text': "{indent}ax.set_{what}({text!r}{kwargs})",
+}.items()}
+
+# 各图表类型的绘图调用（{kwargs} 处填入 PlotParams.chart_kwargs()）
+CHART_CALLS: Dict[str, Callable[..., str]] = {name: compile_template(text) for name, text in {
+    'plot': "{indent}ax.plot(x, y{kwargs})",
+    'scatter': "{indent}ax.scatter(x, y{kwargs})",
+    'bar': "{indent}ax.bar(x[:10], y[:10]{kwargs})",
+    'hist': "{indent}ax.hist(y, bins=20{kwargs})",
+    'box': "{indent}ax.boxplot([y]{kwargs})",
+    'pie': "{indent}ax.pie(np.abs(y[:5]), labels=[f'Item {{i+1}}' for i in range(5)]{kwargs})",
+}.items()}
+
+
+def format_kwargs(kwargs: Mapping) -> str:
+    """把关键字参数格式化为 ', name=value, ...'（没有参数时为空字符串）"""
+    return "".join(f", {name}={value!r}" for name, value in kwargs.items())
+
+
+def _indent(params: PlotParams) -> str:
+    # 子图模式下绘图和设置代码位于 for 循环内
+    return "    " if params.is_subplots else ""
+
+
+# === 各片段的生成函数：只能读取 FIELD_SECTIONS 中本片段列出的字段 ===
+
+def _section_style(p: PlotParams) -> List[str]:
+    if p.style_sheet == 'default':
+        return []
+    lines = ["# 应用样式表"]
+    if 'seaborn' in p.style_sheet.lower():
+        lines += ["# 注意：此样式需要安装 seaborn 库",
+                  "# pip install seaborn",
+                  "import seaborn as sns  # 导入seaborn会自动注册样式"]
+    return lines + [TEMPLATES['style_use'](style_sheet=p.style_sheet), ""]
+
+
+def _section_font(p: PlotParams) -> List[str]:
+    # 与预览中的 ensure_chinese_font 一致：本机选出的中文字体排在最前，负号用连字符显示
+    resolved = resolve_chinese_font()
+    fonts = ([resolved] if resolved else []) + [font for font in CHINESE_FONTS if font not in ('sans-serif', resolved)]
+    fonts.append('DejaVu Sans')
+    return ["# 中文显示设置（使用系统中第一个可用的字体）",
+            f"plt.rcParams['font.sans-serif'] = {fonts!r}",
+            "plt.rcParams['axes.unicode_minus'] = False",
+            ""]
+
+
+def _section_data(p: PlotParams) -> List[str]:
+    return ["# 生成示例数据", TEMPLATES['data'](n_points=p.data_points), ""]
+
+
+def _section_figure(p: PlotParams) -> List[str]:
+    lines = ["# 创建图表"]
+    if p.is_subplots:
+        lines += [TEMPLATES['subplots'](rows=p.subplot_rows, cols=p.subplot_cols, figsize=p.figsize, dpi=p.dpi),
+                  TEMPLATES['facecolor'](facecolor=p.facecolor),
+                  "axes_flat = axes.flatten()",
+                  "",
+                  "# 为每个子图绘制",
+                  "for idx, ax in enumerate(axes_flat):"]
+    else:
+        lines += [TEMPLATES['subplot'](figsize=p.figsize, dpi=p.dpi),
+                  TEMPLATES['facecolor'](facecolor=p.facecolor),
+                  ""]
+    return lines
+
+
+def _section_artist(p: PlotParams) -> List[str]:
+    indent = _indent(p)
+    kwargs = format_kwargs(p.chart_kwargs())
+    lines = [f"{indent}# 绘制数据"]
+    if p.chart_type == 'plot' and p.decimation_method != 'none' and p.n_points > 10000:
+        lines.append(TEMPLATES['decimation_hint'](indent=indent, method=p.decimation_method, kwargs=kwargs))
+    return lines + [CHART_CALLS[p.chart_type](indent=indent, kwargs=kwargs), ""]
+
+
+def _section_axes(p: PlotParams) -> List[str]:
+    indent = _indent(p)
+    lines = []
+    if p.xlim is not None:
+        lines.append(TEMPLATES['xlim'](indent=indent, low=p.xlim[0], high=p.xlim[1]))
+    if p.ylim is not None:
+        lines.append(TEMPLATES['ylim'](indent=indent, low=p.ylim[0], high=p.ylim[1]))
+    if p.grid:
+        lines.append(TEMPLATES['grid'](indent=indent, kwargs=format_kwargs(p.grid_kwargs())))
+    for side in p.hidden_spines:
+        lines.append(TEMPLATES['spine'](indent=indent, side=side))
+    return [f"{indent}# 设置坐标轴"] + lines + [""] if lines else []
+
+
+def _section_text(p: PlotParams) -> List[str]:
+    text_indent = "        " if p.is_subplots else ""
+    lines = []
+    for what, text, kwargs in (('title', p.title, p.title_kwargs()),
+                               ('xlabel', p.xlabel, p.label_kwargs('x')),
+                               ('ylabel', p.ylabel, p.label_kwargs('y'))):
+        if text:
+            lines.append(TEMPLATES['set_text'](indent=text_indent, what=what, text=text, kwargs=format_kwargs(kwargs)))
+    if not p.is_subplots:
+        return ["# 设置标题和标签"] + lines + [""] if lines else []
+    # 子图模式：标题和标签只设置在第一个子图上，其余子图显示编号
+    return (["    # 设置标题和标签（仅第一个子图）",
+             "    if idx == 0:"] + (lines or ["        pass"]) +
+            ["    else:",
+             "        ax.set_title(f\"Subplot {idx+1}\", fontsize=10)",
+             ""])
+
+
+def _section_layout(p: PlotParams) -> List[str]:
+    # 子图已使用 constrained_layout，不能再调用 tight_layout
+    return (["plt.show()"] if p.is_subplots else ["plt.tight_layout()", "plt.show()"])
+
+
+SECTION_BUILDERS: Dict[str, Callable[[PlotParams], List[str]]] = {
+    'style': _section_style,
+    'font': _section_font,
+    'data': _section_data,
+    'figure': _section_figure,
+    'artist': _section_artist,
+    'axes': _section_axes,
+    'text': _section_text,
+    'layout': _section_layout,
+}
+
+
+@lru_cache(maxsize=1024)
+def _render_section(section: str, values: Tuple) -> str:
+    """按片段依赖字段的取值缓存生成结果（其余字段取默认值，不影响本片段）"""
+    params = PlotParams.from_dict(dict(zip(FIELD_SECTIONS[section], values)))
+    return "\n".join(SECTION_BUILDERS[section](params))
+
+
+def render_section(params: PlotParams, section: str) -> str:
+    """生成单个片段的代码"""
+    return _render_section(section, tuple(getattr(params, name) for name in FIELD_SECTIONS[section]))
+
+
+@lru_cache(maxsize=256)
+def generate_code(params: PlotParams) -> str:
+    """根据参数生成完整的matplotlib代码（按参数缓存；未变化的片段直接复用）"""
+    sections = [render_section(params, section) for section in SECTION_ORDER]
+    return HEADER + "\n" + "\n".join(section for section in sections if section)
+
+
+def get_codegen_cache_info() -> Dict[str, int]:
+    """片段缓存的命中统计"""
+    info = _render_section.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize}
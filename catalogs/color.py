@@ -1,13 +1,28 @@
 """
 Color（颜色）相关参数的完整选项目录
 """
+import io
 import streamlit as st
+import matplotlib
 import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
 import numpy as np
 import pandas as pd
+from PIL import Image
 from typing import Dict, List, Tuple
 from catalogs.utils import get_matplotlib_version, generate_sample_data, ensure_chinese_font
+from catalogs.layout_cache import tight_layout
+from catalogs.rc_isolation import locked_subplots
+from catalogs.render_policy import show_figure
+
+@st.cache_data
+def get_colormap_strip_png(cmap_name: str, width: int = 256, height: int = 24) -> bytes:
+    """直接用 colormap 的查找表生成渐变条 PNG（不创建 Figure）"""
+    rgba = matplotlib.colormaps[cmap_name](np.linspace(0, 1, width), bytes=True)
+    strip = np.ascontiguousarray(np.broadcast_to(rgba, (height, width, 4)))
+    buffer = io.BytesIO()
+    Image.fromarray(strip, 'RGBA').save(buffer, format='PNG')
+    return buffer.getvalue()
 
 @st.cache_data
 def get_color_options() -> Dict:
@@ -110,7 +125,7 @@ def render_color_gallery():
     st.markdown("### 🎨 Base 颜色（单字符，8个）")
     base_colors = options['base_colors']
     
-    fig1, axes1 = plt.subplots(1, len(base_colors), figsize=(2*len(base_colors), 2))
+    fig1, axes1 = locked_subplots(1, len(base_colors), figsize=(2*len(base_colors), 2))
     for idx, (key, rgb) in enumerate(base_colors.items()):
         ax = axes1[idx]
         ax.plot(x, y, color=key, linewidth=3, label=f"'{key}'")
@@ -120,14 +135,14 @@ def render_color_gallery():
         ax.set_ylim(-1.5, 1.5)
         ax.axis('off')
     
-    plt.tight_layout()
-    st.pyplot(fig1)
+    tight_layout()
+    show_figure(fig1)
     
     # === CN 颜色预览 ===
     st.markdown("### 🎨 CN 颜色（C0-C9，10个）")
     cn_colors = options['cn_colors']
     
-    fig2, axes2 = plt.subplots(2, 5, figsize=(12, 4))
+    fig2, axes2 = locked_subplots(2, 5, figsize=(12, 4))
     axes2 = axes2.flatten()
     
     for idx, (key, desc) in enumerate(cn_colors.items()):
@@ -139,8 +154,8 @@ def render_color_gallery():
         ax.set_ylim(-1.5, 1.5)
         ax.axis('off')
     
-    plt.tight_layout()
-    st.pyplot(fig2)
+    tight_layout()
+    show_figure(fig2)
     
     # === CSS4 颜色预览（部分）===
     st.markdown("### 🎨 CSS4 颜色（部分常用，共148个）")
@@ -157,7 +172,7 @@ def render_color_gallery():
     cols = 4
     rows = (n_common + cols - 1) // cols
     
-    fig3, axes3 = plt.subplots(rows, cols, figsize=(3*cols, 2*rows))
+    fig3, axes3 = locked_subplots(rows, cols, figsize=(3*cols, 2*rows))
     if rows == 1:
         axes3 = axes3 if isinstance(axes3, np.ndarray) else [axes3]
     else:
@@ -178,12 +193,12 @@ def render_color_gallery():
     for idx in range(n_common, len(axes3)):
         axes3[idx].axis('off')
     
-    plt.tight_layout()
-    st.pyplot(fig3)
+    tight_layout()
+    show_figure(fig3)
     
     # === 颜色形式对比 ===
     st.markdown("### 🔍 不同颜色形式对比")
-    fig4, ax4 = plt.subplots(figsize=(10, 3))
+    fig4, ax4 = locked_subplots(figsize=(10, 3))
     
     color_examples = [
         ("颜色名称", "'red'", 'red'),
@@ -208,7 +223,7 @@ def render_color_gallery():
     ax4.legend(loc='upper right', fontsize=8, ncol=2)
     ax4.set_title("Color Format Examples", fontsize=11, fontweight='bold')
     ax4.grid(True, alpha=0.3)
-    st.pyplot(fig4)
+    show_figure(fig4)
     
     # === 合法值表格 ===
     st.markdown("### 📋 颜色形式表格")
@@ -265,14 +280,14 @@ def render_color_gallery():
     
     # 渲染预览图表
     try:
-        fig_custom, ax_custom = plt.subplots(figsize=(10, 4))
+        fig_custom, ax_custom = locked_subplots(figsize=(10, 4))
         x_custom, y_custom = generate_sample_data(50)
         ax_custom.plot(x_custom, y_custom, color=color_value, linewidth=3, label=f"color={color_value}")
         ax_custom.fill_between(x_custom, y_custom, alpha=0.3, color=color_value)
         ax_custom.set_title(f"Color Preview: {color_value}", fontsize=11, fontweight='bold')
         ax_custom.grid(True, alpha=0.3)
         ax_custom.legend()
-        st.pyplot(fig_custom)
+        show_figure(fig_custom)
         plt.close(fig_custom)
     except Exception as e:
         st.error(f"渲染图表时出错: {str(e)}")
@@ -361,7 +376,7 @@ def render_colormap_gallery():
     cols = 3
     rows = (n_popular + cols - 1) // cols
     
-    fig1, axes1 = plt.subplots(rows, cols, figsize=(4*cols, 2*rows))
+    fig1, axes1 = locked_subplots(rows, cols, figsize=(4*cols, 2*rows))
     if rows == 1:
         axes1 = axes1 if isinstance(axes1, np.ndarray) else [axes1]
     else:
@@ -383,8 +398,8 @@ def render_colormap_gallery():
     for idx in range(n_popular, len(axes1)):
         axes1[idx].axis('off')
     
-    plt.tight_layout()
-    st.pyplot(fig1)
+    tight_layout()
+    show_figure(fig1)
     
     # === 按类别展示 ===
     st.markdown("### 📊 按类别展示 Colormap")
@@ -403,32 +418,13 @@ def render_colormap_gallery():
             # 限制显示数量，避免页面过长
             display_cmaps = cmap_list[:30]  # 每类最多显示30个
             
-            n_display = len(display_cmaps)
             cols_cat = 4
-            rows_cat = (n_display + cols_cat - 1) // cols_cat
-            
-            fig_cat, axes_cat = plt.subplots(rows_cat, cols_cat, figsize=(2.5*cols_cat, 1.5*rows_cat))
-            if rows_cat == 1:
-                axes_cat = axes_cat if isinstance(axes_cat, np.ndarray) else [axes_cat]
-            else:
-                axes_cat = axes_cat.flatten()
-            
-            gradient = np.linspace(0, 1, 100).reshape(1, -1)
-            
-            for idx, cmap_name in enumerate(display_cmaps):
-                if idx >= len(axes_cat):
-                    break
-                ax = axes_cat[idx]
-                ax.imshow(gradient, cmap=cmap_name, aspect='auto')
-                ax.set_title(f"'{cmap_name}'", fontsize=8)
-                ax.set_xticks([])
-                ax.set_yticks([])
-            
-            for idx in range(n_display, len(axes_cat)):
-                axes_cat[idx].axis('off')
-            
-            plt.tight_layout()
-            st.pyplot(fig_cat)
+            for row_start in range(0, len(display_cmaps), cols_cat):
+                cols = st.columns(cols_cat)
+                for col, cmap_name in zip(cols, display_cmaps[row_start:row_start + cols_cat]):
+                    with col:
+                        st.caption(f"`'{cmap_name}'`")
+                        st.image(get_colormap_strip_png(cmap_name), use_container_width=True)
             
             if len(cmap_list) > 30:
                 st.caption(f"*仅显示前 30 个，共 {len(cmap_list)} 个 colormap*")
@@ -443,7 +439,7 @@ def render_colormap_gallery():
     with col2:
         data_type = st.selectbox("数据类型", ["2D 图像", "散点图", "等高线"], key='cmap_data_type')
     
-    fig_custom, ax_custom = plt.subplots(figsize=(10, 6))
+    fig_custom, ax_custom = locked_subplots(figsize=(10, 6))
     
     if data_type == "2D 图像":
         data_2d = np.random.rand(20, 20)
@@ -466,7 +462,7 @@ def render_colormap_gallery():
         plt.colorbar(cf, ax=ax_custom)
         ax_custom.set_title(f"contourf with cmap='{cmap_choice}'", fontsize=11, fontweight='bold')
     
-    st.pyplot(fig_custom)
+    show_figure(fig_custom)
     
     st.code(f"""
 import matplotlib.pyplot as plt
@@ -0,0 +1,209 @@
+"""
+等高线缓存 - 复用 marching squares 生成器、等高线路径和 clabel 的标签位置
+
+- 每个 (函数, 网格大小) 只创建一次 contourpy 生成器（保存在一个模板 QuadContourSet 中），
+  改变等高线数量时直接用它追踪新的等值线，不再重新处理整个网格
+- 每个 (函数, 网格大小, 等高线数量) 的结果——被 inline 标签切开后的路径和标签的位置、角度、颜色——
+  缓存下来，重跑页面时只需重新创建 ContourSet 和 Text，与 ax.contour + ax.clabel 的效果相同
+- clabel 按屏幕坐标放置标签，因此缓存键还包含 Figure 尺寸和 dpi
+"""
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+import matplotlib as mpl
+import matplotlib.colors as mcolors
+import matplotlib.contour as mcontour
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties
+from matplotlib.text import Text
+from matplotlib.ticker import MaxNLocator
+
+from catalogs.rc_isolation import rc_lock
+
+CONTOUR_GRID_SIZES = [50, 100, 200, 300, 500, 750, 1000]
+CONTOUR_CMAP = 'viridis'
+LABEL_FONTSIZE = 8
+MAX_CONTOUR_ENTRIES = 32
+# 1000×1000 的网格约 24 MB，只保留最近几个
+MAX_GRID_ENTRIES = 4
+
+
+class ContourFunction(NamedTuple):
+    """可选的等高线函数：Z = func(X, Y)，定义在 extent 范围内；expression 用于生成示例代码"""
+    label: str
+    func: Callable[[np.ndarray, np.ndarray], np.ndarray]
+    extent: Tuple[float, float]
+    expression: str
+
+
+class ContourLabel(NamedTuple):
+    x: float
+    y: float
+    text: str
+    rotation: float
+    color: Tuple[float, float, float, float]
+    zorder: float
+
+
+class ContourGeometry(NamedTuple):
+    """一次 contour + clabel 的结果（数据坐标）"""
+    levels: np.ndarray
+    paths: List[Tuple[np.ndarray, np.ndarray]]  # 每个等高线层级的 (顶点, 路径代码)
+    labels: List[ContourLabel]
+    xlim: Tuple[float, float]
+    ylim: Tuple[float, float]
+    grid_seconds: float  # 计算网格并创建生成器的耗时（复用已有生成器时为 0）
+    contour_seconds: float
+    label_seconds: float
+
+
+CONTOUR_FUNCTIONS: Dict[str, ContourFunction] = {}
+
+
+def register_contour_function(name: str, label: str, extent: Tuple[float, float], expression: str):
+    """注册等高线函数的装饰器"""
+    def decorator(func):
+        CONTOUR_FUNCTIONS[name] = ContourFunction(label, func, extent, expression)
+        return func
+    return decorator
+
+
+@register_contour_function('gaussian', "高斯峰 exp(-r²)", (-3.0, 3.0), "np.exp(-(X**2 + Y**2))")
+def _gaussian(X, Y):
+    return np.exp(-(X**2 + Y**2))
+
+
+@register_contour_function('two_peaks', "双峰", (-3.0, 3.0),
+                           "np.exp(-((X-1)**2 + Y**2)) - 0.7 * np.exp(-((X+1)**2 + (Y-0.5)**2) / 0.5)")
+def _two_peaks(X, Y):
+    return np.exp(-((X - 1)**2 + Y**2)) - 0.7 * np.exp(-((X + 1)**2 + (Y - 0.5)**2) / 0.5)
+
+
+@register_contour_function('ripple', "涟漪 cos(r)·exp(-r/3)", (-6.0, 6.0),
+                           "np.cos(np.hypot(X, Y)) * np.exp(-np.hypot(X, Y) / 3)")
+def _ripple(X, Y):
+    r = np.hypot(X, Y)
+    return np.cos(r) * np.exp(-r / 3)
+
+
+class _ContourGrid(NamedTuple):
+    template: mcontour.QuadContourSet  # 持有 contourpy 生成器和网格的 z 范围
+    lock: threading.Lock               # 生成器内部有可复用的缓冲区，不能多线程同时使用
+    seconds: float
+
+
+_grids: Dict[Tuple[str, int], _ContourGrid] = {}
+_geometries: Dict[Tuple, ContourGeometry] = {}
+_lock = threading.Lock()
+_stats = {'grid_hits': 0, 'grid_misses': 0, 'hits': 0, 'misses': 0}
+
+
+def _lru_get(cache: Dict, key, stat: str):
+    with _lock:
+        value = cache.get(key)
+        _stats[stat + ('hits' if value is not None else 'misses')] += 1
+        if value is not None:
+            cache[key] = cache.pop(key)
+        return value
+
+
+def _lru_put(cache: Dict, key, value, max_entries: int) -> None:
+    with _lock:
+        cache[key] = value
+        while len(cache) > max_entries:
+            del cache[next(iter(cache))]
+
+
+def get_contour_cache_info() -> Dict[str, int]:
+    """生成器与等高线几何缓存的命中统计"""
+    with _lock:
+        return {**_stats, 'grids': len(_grids), 'size': len(_geometries)}
+
+
+def _get_grid(name: str, grid_size: int) -> Tuple[_ContourGrid, bool]:
+    if name not in CONTOUR_FUNCTIONS:
+        raise ValueError(f"未知的等高线函数: '{name}'，可选: {list(CONTOUR_FUNCTIONS)}")
+    key = (name, grid_size)
+    grid = _lru_get(_grids, key, 'grid_')
+    if grid is not None:
+        return grid, True
+    start = time.perf_counter()
+    x = np.linspace(*CONTOUR_FUNCTIONS[name].extent, grid_size)
+    X, Y = np.meshgrid(x, x)
+    Z = CONTOUR_FUNCTIONS[name].func(X, Y)
+    # 只追踪一条等值线：这里只需要模板中的生成器
+    template = Figure().subplots().contour(X, Y, Z, levels=[float(Z.mean())])
+    grid = _ContourGrid(template, threading.Lock(), time.perf_counter() - start)
+    _lru_put(_grids, key, grid, MAX_GRID_ENTRIES)
+    return grid, False
+
+
+def contour_levels(zmin: float, zmax: float, n_levels: int) -> np.ndarray:
+    """与 ax.contour(..., levels=n_levels) 自动选择的等高线层级相同"""
+    levels = MaxNLocator(n_levels + 1, min_n_ticks=1).tick_values(zmin, zmax)
+    under = np.nonzero(levels < zmin)[0]
+    i0 = under[-1] if len(under) else 0
+    over = np.nonzero(levels > zmax)[0]
+    i1 = over[0] + 1 if len(over) else len(levels)
+    if i1 - i0 < 3:
+        i0, i1 = 0, len(levels)
+    return levels[i0:i1]
+
+
+def _build_geometry(name: str, grid_size: int, n_levels: int, figsize: Tuple[float, float],
+                    dpi: float) -> ContourGeometry:
+    grid, reused = _get_grid(name, grid_size)
+    levels = contour_levels(grid.template.zmin, grid.template.zmax, n_levels)
+    # 在同样尺寸的离屏 Figure 上运行一次 contour + clabel，标签位置与显示时一致
+    # （标签位置取决于字体设置：创建 Axes 和 clabel 时持有 rc_lock，缓存的结果不会混入其他会话的样式）
+    with rc_lock:
+        fig = Figure(figsize=figsize, dpi=dpi)
+        ax = fig.add_subplot(111)
+    with grid.lock:
+        start = time.perf_counter()
+        contours = ax.contour(grid.template, levels=levels, cmap=CONTOUR_CMAP)
+        contour_seconds = time.perf_counter() - start
+    with rc_lock:
+        start = time.perf_counter()
+        texts = ax.clabel(contours, inline=True, fontsize=LABEL_FONTSIZE)
+        label_seconds = time.perf_counter() - start
+    paths = [(path.vertices, path.codes) for path in contours.get_paths()]
+    for vertices, codes in paths:
+        vertices.flags.writeable = False
+        if codes is not None:
+            codes.flags.writeable = False
+    labels = [ContourLabel(*text.get_position(), text.get_text(), text.get_rotation(),
+                           tuple(mcolors.to_rgba(text.get_color())), text.get_zorder()) for text in texts]
+    return ContourGeometry(contours.levels, paths, labels, ax.get_xlim(), ax.get_ylim(),
+                           0.0 if reused else grid.seconds, contour_seconds, label_seconds)
+
+
+def get_contour_geometry(name: str, grid_size: int, n_levels: int,
+                         figsize: Tuple[float, float] = (8, 6)) -> Tuple[ContourGeometry, bool]:
+    """获取 (函数, 网格大小, 等高线数量, Figure 尺寸) 的等高线几何，返回 (几何, 是否命中缓存)"""
+    dpi = mpl.rcParams['figure.dpi']
+    key = (name, int(grid_size), int(n_levels), tuple(figsize), dpi)
+    geometry = _lru_get(_geometries, key, '')
+    if geometry is not None:
+        return geometry, True
+    geometry = _build_geometry(name, int(grid_size), int(n_levels), tuple(figsize), dpi)
+    _lru_put(_geometries, key, geometry, MAX_CONTOUR_ENTRIES)
+    return geometry, False
+
+
+def add_cached_contour(ax, geometry: ContourGeometry) -> mcontour.ContourSet:
+    """把缓存的等高线和标签重新添加到 ax（与 ax.contour(..., cmap='viridis') + ax.clabel(inline=True) 的效果相同）"""
+    allsegs = [[vertices] for vertices, _ in geometry.paths]
+    allkinds = [[codes] for _, codes in geometry.paths]
+    contours = mcontour.ContourSet(ax, geometry.levels, allsegs, allkinds, cmap=CONTOUR_CMAP)
+    # ContourSet 按等高线本身的范围设置坐标轴，改回按整个网格得到的范围
+    ax.set_xlim(geometry.xlim)
+    ax.set_ylim(geometry.ylim)
+    font = FontProperties(size=LABEL_FONTSIZE)
+    for label in geometry.labels:
+        ax.add_artist(Text(label.x, label.y, label.text, rotation=label.rotation, color=label.color,
+                           horizontalalignment='center', verticalalignment='center', zorder=label.zorder,
+                           fontproperties=font, clip_box=ax.bbox))
+    return contours
@@ -0,0 +1,182 @@
+"""
+图片输出编码器 - 把 Figure 编码为 PNG / WebP / SVG，并记录每张图的字节数和编码耗时
+
+课堂上学生多用手机流量访问，同一张图 WebP 无损通常只有 PNG 的 1/3，线稿类图表用 SVG 更小也更清晰。
+"""
+import io
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+import streamlit as st
+
+from catalogs.layout_cache import get_layout_cache_info
+from catalogs.rc_isolation import figure_rc
+from catalogs.render_cache import DEFAULT_SAVEFIG_OPTIONS
+
+# 输出编码器注册表：name -> {'func': func(fig, dpi, settings, **savefig_kwargs) -> bytes, 'mime': ..., 'label': ...}
+OUTPUT_ENCODERS: Dict[str, Dict] = {}
+
+# 全局默认输出设置（侧边栏修改后保存在 st.session_state['output_settings']）
+DEFAULT_OUTPUT_SETTINGS = {
+    'format': 'png',
+    'png_compress_level': 6,    # 0-9，越大文件越小、编码越慢（Pillow 默认 6）
+    'webp_lossless': True,
+    'webp_quality': 80,         # 有损 WebP 的质量 0-100；无损模式下表示压缩力度
+    'show_stats': False,        # 是否在每张图下方显示体积与编码耗时
+}
+
+# 每个会话最多保留的编码记录条数
+MAX_ENCODE_RECORDS = 200
+
+
+class EncodedFigure(NamedTuple):
+    """一次编码的结果"""
+    data: bytes
+    fmt: str
+    mime: str
+    size: int
+    seconds: float
+
+
+def register_output_encoder(name: str, mime: str, label: str):
+    """注册输出编码器的装饰器"""
+    def decorator(func):
+        OUTPUT_ENCODERS[name] = {'func': func, 'mime': mime, 'label': label}
+        return func
+    return decorator
+
+
+def _savefig(fig, fmt: str, dpi: int, **savefig_kwargs) -> bytes:
+    options = {**DEFAULT_SAVEFIG_OPTIONS, 'format': fmt, 'dpi': dpi, **savefig_kwargs}
+    buffer = io.BytesIO()
+    fig.savefig(buffer, **options)
+    return buffer.getvalue()
+
+
+@register_output_encoder('png', 'image/png', 'PNG（无损位图）')
+def encode_png(fig, dpi: int, settings: Dict, **savefig_kwargs) -> bytes:
+    return _savefig(fig, 'png', dpi, pil_kwargs={'compress_level': settings['png_compress_level']},
+                    **savefig_kwargs)
+
+
+@register_output_encoder('webp', 'image/webp', 'WebP（体积更小）')
+def encode_webp(fig, dpi: int, settings: Dict, **savefig_kwargs) -> bytes:
+    return _savefig(fig, 'webp', dpi, pil_kwargs={'lossless': settings['webp_lossless'],
+                                                   'quality': settings['webp_quality']},
+                    **savefig_kwargs)
+
+
+@register_output_encoder('svg', 'image/svg+xml', 'SVG（矢量，适合线稿）')
+def encode_svg(fig, dpi: int, settings: Dict, **savefig_kwargs) -> bytes:
+    # SVG 中只有 rasterized=True 的 artist 会用到 dpi
+    return _savefig(fig, 'svg', dpi, **savefig_kwargs)
+
+
+def get_output_settings() -> Dict:
+    """当前会话的输出设置（未在侧边栏修改时返回默认值）"""
+    return {**DEFAULT_OUTPUT_SETTINGS, **st.session_state.get('output_settings', {})}
+
+
+def encode_figure(fig, fmt: Optional[str] = None, dpi: Optional[int] = None,
+                  settings: Optional[Dict] = None, **savefig_kwargs) -> EncodedFigure:
+    """按指定格式编码 Figure（fmt 为空时使用全局设置），返回数据、字节数和编码耗时
+
+    传入 settings 时不读取会话状态（在默认值基础上覆盖），可在后台线程中调用。
+    编码在 figure_rc 中进行（隔离渲染的图使用其绘制时的 rcParams，绘制期间不持有 rc_lock）。
+    """
+    base = get_output_settings() if settings is None else DEFAULT_OUTPUT_SETTINGS
+    settings = {**base, **(settings or {})}
+    fmt = fmt or settings['format']
+    if fmt not in OUTPUT_ENCODERS:
+        raise ValueError(f"未知的输出格式: '{fmt}'，可选: {list(OUTPUT_ENCODERS)}")
+    encoder = OUTPUT_ENCODERS[fmt]
+    with figure_rc(fig):
+        start = time.perf_counter()
+        data = encoder['func'](fig, dpi or DEFAULT_SAVEFIG_OPTIONS['dpi'], settings, **savefig_kwargs)
+        seconds = time.perf_counter() - start
+    return EncodedFigure(data, fmt, encoder['mime'], len(data), seconds)
+
+
+def record_encode_stats(result: EncodedFigure, label: str = '', layout_seconds: float = 0.0,
+                        render_seconds: Optional[float] = None) -> None:
+    """把编码结果的格式、字节数和耗时记入当前会话
+
+    layout_seconds 为其中布局求解（tight/constrained layout）的耗时，render_seconds 为布局 + 编码的总耗时
+    （为空时等于编码耗时）。
+    """
+    records: List[Dict] = st.session_state.setdefault('encode_stats', [])
+    records.append({'label': label, 'format': result.fmt, 'bytes': result.size, 'seconds': result.seconds,
+                    'layout_seconds': layout_seconds,
+                    'render_seconds': result.seconds if render_seconds is None else render_seconds})
+    del records[:-MAX_ENCODE_RECORDS]
+
+
+def summarize_encode_stats() -> List[Dict]:
+    """按格式汇总当前会话的编码记录：图片数、总字节数、平均编码耗时"""
+    summary: Dict[str, Dict] = {}
+    for record in st.session_state.get('encode_stats', []):
+        item = summary.setdefault(record['format'], {'format': record['format'], 'count': 0, 'bytes': 0, 'seconds': 0.0})
+        item['count'] += 1
+        item['bytes'] += record['bytes']
+        item['seconds'] += record['seconds']
+    for item in summary.values():
+        item['seconds'] /= item['count']
+    return list(summary.values())
+
+
+def format_encode_result(result: EncodedFigure) -> str:
+    """格式化为图下方的说明文字"""
+    return f"🖼️ {result.fmt.upper()} · {result.size / 1024:,.1f} KB · 编码 {result.seconds * 1000:,.0f} ms"
+
+
+def display_encoded(result: EncodedFigure, width='stretch') -> None:
+    """在页面上显示编码后的图片（SVG 以文本形式交给 st.image）"""
+    if result.fmt == 'svg':
+        st.image(result.data.decode('utf-8'), width=width)
+    else:
+        st.image(result.data, width=width)
+
+
+def render_output_settings() -> None:
+    """在侧边栏渲染全局输出格式设置"""
+    defaults = DEFAULT_OUTPUT_SETTINGS
+    settings = dict(defaults)
+    formats = list(OUTPUT_ENCODERS)
+    with st.sidebar.expander("🖼️ 图片输出格式", expanded=False):
+        settings['format'] = st.selectbox("格式", formats, index=formats.index(defaults['format']),
+                                          format_func=lambda name: OUTPUT_ENCODERS[name]['label'],
+                                          key='output_format')
+        if settings['format'] == 'png':
+            settings['png_compress_level'] = st.slider("PNG 压缩级别", 0, 9, defaults['png_compress_level'],
+                                                       key='output_png_compress_level')
+        elif settings['format'] == 'webp':
+            settings['webp_lossless'] = st.checkbox("无损", value=defaults['webp_lossless'],
+                                                    key='output_webp_lossless')
+            settings['webp_quality'] = st.slider("质量", 0, 100, defaults['webp_quality'], key='output_webp_quality',
+                                                 help="有损模式下为画质；无损模式下为压缩力度")
+        else:
+            st.caption("SVG 在浏览器中绘制，点数很多的图会变慢（超出预算的 artist 会自动栅格化）")
+        settings['show_stats'] = st.checkbox("在图下方显示体积与编码耗时", value=defaults['show_stats'],
+                                             key='output_show_stats')
+    st.session_state['output_settings'] = settings
+    # 每次整页运行重新统计，侧边栏显示的是当前页面上的图片
+    st.session_state['encode_stats'] = []
+
+
+def render_encode_stats() -> None:
+    """在侧边栏显示当前页面的编码统计（需在所有图表之后调用）"""
+    summary = summarize_encode_stats()
+    if not summary:
+        return
+    with st.sidebar.expander("📦 图片体积统计", expanded=False):
+        for item in summary:
+            st.caption(f"{item['format'].upper()}：{item['count']} 张，共 {item['bytes'] / 1024:,.0f} KB，"
+                       f"平均 {item['bytes'] / item['count'] / 1024:,.1f} KB / {item['seconds'] * 1000:,.0f} ms")
+        records = st.session_state.get('encode_stats', [])
+        layout_seconds = sum(record.get('layout_seconds', 0.0) for record in records)
+        render_seconds = sum(record.get('render_seconds', record['seconds']) for record in records)
+        if render_seconds > 0:
+            info = get_layout_cache_info()
+            st.caption(f"📐 布局求解 {layout_seconds * 1000:,.0f} ms，占本页渲染耗时 "
+                       f"{layout_seconds / render_seconds:.0%}（布局缓存累计命中 {info['hits']} / "
+                       f"{info['hits'] + info['misses']}）")
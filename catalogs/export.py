@@ -0,0 +1,161 @@
+"""
+高分辨率导出 - 在独立的后台线程池中执行 savefig，结果按 (参数哈希, 格式, dpi, 库版本) 缓存到磁盘
+
+导出线程池的线程数就是同时进行的导出任务上限，超出的任务排队等待，不会占用页面渲染线程。
+"""
+import io
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+import matplotlib.pyplot as plt
+import streamlit as st
+
+from catalogs.rc_isolation import figure_rc
+from catalogs.render_cache import FigureCache, make_cache_key
+
+# 导出格式：name -> (MIME 类型, 说明)
+EXPORT_FORMATS: Dict[str, Tuple[str, str]] = {
+    'png': ('image/png', 'PNG 位图'),
+    'pdf': ('application/pdf', 'PDF 矢量（论文排版）'),
+    'svg': ('image/svg+xml', 'SVG 矢量（网页 / 再编辑）'),
+    'eps': ('application/postscript', 'EPS 矢量（期刊投稿）'),
+}
+EXPORT_DPI_OPTIONS = [100, 150, 200, 300, 600]
+# 同时进行的导出任务上限
+MAX_CONCURRENT_EXPORTS = 2
+# PNG 导出的最大像素数（600 dpi 的 20×20 英寸图约 1.4 亿像素，内存占用超过 500 MB）
+MAX_EXPORT_PIXELS = 60_000_000
+
+_export_caches: Dict[str, FigureCache] = {}
+_pending: Dict[str, Future] = {}
+_failed: Dict[str, Future] = {}
+_pending_lock = threading.RLock()
+
+
+@st.cache_resource
+def get_export_executor() -> ThreadPoolExecutor:
+    """导出专用线程池（整个服务进程共享，与预览渲染线程池分开）"""
+    return ThreadPoolExecutor(max_workers=MAX_CONCURRENT_EXPORTS, thread_name_prefix='mpl-teach-export')
+
+
+def _get_cache(fmt: str) -> FigureCache:
+    with _pending_lock:
+        if fmt not in _export_caches:
+            _export_caches[fmt] = FigureCache('export', suffix=f'.{fmt}')
+        return _export_caches[fmt]
+
+
+def get_export_key(params_key: str, fmt: str, dpi: int) -> str:
+    """导出缓存键：params_key 为参数哈希，与格式、dpi 和库版本一起经 make_cache_key 生成
+
+    升级 matplotlib 等库后渲染结果可能变化，旧版本导出的文件不会再被命中。
+    """
+    return make_cache_key('export', params_key, fmt, dpi)
+
+
+def check_export_size(figsize: Tuple[float, float], fmt: str, dpi: int) -> Optional[str]:
+    """位图导出超出像素上限时返回提示文字，否则返回 None（矢量格式不受限制）"""
+    if fmt != 'png':
+        return None
+    pixels = figsize[0] * dpi * figsize[1] * dpi
+    if pixels > MAX_EXPORT_PIXELS:
+        return (f"{figsize[0]:g}×{figsize[1]:g} 英寸在 {dpi} dpi 下约 {pixels / 1e6:,.0f} 百万像素，"
+                f"超过上限 {MAX_EXPORT_PIXELS / 1e6:,.0f} 百万像素，请降低 dpi 或使用矢量格式")
+    return None
+
+
+def export_figure(render: Callable[[], plt.Figure], fmt: str, dpi: int) -> bytes:
+    """调用 render() 生成 Figure 并按指定格式和 dpi 保存（绘制期间不持有 rc_lock，不阻塞其他会话创建图）"""
+    fig = render()
+    try:
+        buffer = io.BytesIO()
+        with figure_rc(fig):
+            fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches='tight')
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def _run_export(render: Callable[[], plt.Figure], key: str, fmt: str, dpi: int) -> bytes:
+    data = export_figure(render, fmt, dpi)
+    _get_cache(fmt).set(key, data)
+    return data
+
+
+def get_export(render: Callable[[], plt.Figure], params_key: str, fmt: str,
+               dpi: int, submit: bool = True) -> Tuple[Optional[bytes], Optional[Future]]:
+    """获取导出文件：命中缓存时返回 (数据, None)；否则返回 (None, future)
+
+    同样的 (参数, 格式, dpi) 只会提交一次，多个会话共享同一个 future。submit=False 时只查询，
+    没有进行中的任务则返回 (None, None)。导出失败时，下一次获取返回这个失败的 future 供界面显示错误，
+    之后可以重新提交。render 在后台线程中调用，不应使用 pyplot 或 Streamlit（没有 ScriptRunContext）。
+    """
+    key = get_export_key(params_key, fmt, dpi)
+    data = _get_cache(fmt).get(key)
+    if data is not None:
+        return data, None
+    with _pending_lock:
+        failed = _failed.pop(key, None)
+        if failed is not None:
+            return None, failed
+        future = _pending.get(key)
+        if future is None and submit:
+            future = get_export_executor().submit(_run_export, render, key, fmt, dpi)
+            _pending[key] = future
+            future.add_done_callback(lambda f, key=key: _discard_pending(key, f))
+    return None, future
+
+
+def _discard_pending(key: str, future: Future) -> None:
+    """任务结束后移除记录：成功的结果已在磁盘缓存中，失败的任务转入 _failed 等待显示错误"""
+    with _pending_lock:
+        if _pending.get(key) is future:
+            del _pending[key]
+            if future.exception() is not None:
+                _failed[key] = future
+
+
+def get_pending_export_count() -> int:
+    """进行中和排队中的导出任务数"""
+    with _pending_lock:
+        return sum(not future.done() for future in _pending.values())
+
+
+def render_export_panel(render: Callable[[], plt.Figure], params_key: str,
+                        figsize: Tuple[float, float], file_stem: str = 'figure', key_prefix: str = 'export') -> None:
+    """导出面板：选择格式和 dpi，后台导出完成后显示下载按钮"""
+    formats = list(EXPORT_FORMATS)
+    col_fmt, col_dpi = st.columns(2)
+    fmt = col_fmt.selectbox("导出格式", formats, format_func=lambda name: EXPORT_FORMATS[name][1],
+                            key=f'{key_prefix}_format')
+    dpi = col_dpi.select_slider("导出 DPI", EXPORT_DPI_OPTIONS, value=300, key=f'{key_prefix}_dpi',
+                                help="PNG 的像素分辨率；矢量格式中只影响栅格化的部分")
+    message = check_export_size(figsize, fmt, dpi)
+    if message:
+        st.warning(message)
+        return
+
+    data, future = get_export(render, params_key, fmt, dpi, submit=False)
+    if data is None and future is None:
+        if st.button("📦 生成导出文件", key=f'{key_prefix}_start'):
+            data, future = get_export(render, params_key, fmt, dpi)
+    if data is None and future is not None and future.done() and future.exception() is None:
+        data = future.result()
+
+    if data is not None:
+        st.download_button(f"⬇️ 下载 {fmt.upper()}（{len(data) / 1024:,.0f} KB）", data,
+                           file_name=f"{file_stem}_{dpi}dpi.{fmt}", mime=EXPORT_FORMATS[fmt][0],
+                           key=f'{key_prefix}_download')
+    elif future is not None:
+        if future.done():
+            st.error(f"导出失败: {future.exception()}")
+            return
+
+        @st.fragment(run_every=1.0)
+        def _wait_for_export():
+            if future.done():
+                st.rerun(scope="app")
+            st.info(f"⏳ 正在后台导出（当前共 {get_pending_export_count()} 个导出任务，"
+                    f"最多同时进行 {MAX_CONCURRENT_EXPORTS} 个）...")
+        _wait_for_export()
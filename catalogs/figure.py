@@ -2,11 +2,13 @@
 Figure（画布）相关参数的完整选项目录
 """
 import streamlit as st
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple
 from catalogs.utils import get_matplotlib_version, generate_sample_data, ensure_chinese_font
+from catalogs.layout_cache import tight_layout
+from catalogs.rc_isolation import locked_subplots
+from catalogs.render_policy import show_figure
 
 def render_figsize_gallery():
     """渲染 figsize 全量画廊"""
@@ -47,11 +49,11 @@ def render_figsize_gallery():
     
     for title, size in sizes:
         st.markdown(f"#### {title}")
-        fig, ax = plt.subplots(figsize=size)
+        fig, ax = locked_subplots(figsize=size)
         ax.plot(x, y, linewidth=2, color='#2c3e50')
         ax.set_title(f"figsize={size}", fontsize=10, fontweight='bold')
         ax.grid(True, alpha=0.3)
-        st.pyplot(fig)
+        show_figure(fig)
     
     # === 交互式预览 ===
     st.markdown("### 🎛️ 交互式尺寸设置")
@@ -62,11 +64,11 @@ def render_figsize_gallery():
     with col2:
         height = st.slider("高度（英寸）", 2.0, 20.0, 6.0, 0.5, key='figsize_height')
     
-    fig_custom, ax_custom = plt.subplots(figsize=(width, height))
+    fig_custom, ax_custom = locked_subplots(figsize=(width, height))
     ax_custom.plot(x, y, linewidth=2, color='#2c3e50')
     ax_custom.set_title(f"figsize=({width}, {height})", fontsize=11, fontweight='bold')
     ax_custom.grid(True, alpha=0.3)
-    st.pyplot(fig_custom)
+    show_figure(fig_custom)
     
     st.code(f"""
 import matplotlib.pyplot as plt
@@ -176,7 +178,7 @@ def render_facecolor_gallery():
         ("浅蓝色", 'lightblue'),
     ]
     
-    fig, axes = plt.subplots(2, 2, figsize=(10, 8))
+    fig, axes = locked_subplots(2, 2, figsize=(10, 8))
     axes = axes.flatten()
     
     for idx, (title, color_val) in enumerate(colors):
@@ -187,8 +189,8 @@ def render_facecolor_gallery():
         ax.set_title(f"facecolor='{color_val}'", fontsize=10, fontweight='bold')
         ax.grid(True, alpha=0.3)
     
-    plt.tight_layout()
-    st.pyplot(fig)
+    tight_layout()
+    show_figure(fig)
     
     st.code("""
 import matplotlib.pyplot as plt
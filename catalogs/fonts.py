@@ -0,0 +1,243 @@
+"""
+字体目录 - 基于 fm.fontManager.ttflist 的完整字体索引、搜索、分页和按需渲染的字体样张
+
+- 索引在服务进程内只构建一次；各字体文件的中文覆盖率缓存在磁盘上，按文件 mtime 和大小校验，
+  只有新增或修改过的字体文件才会重新读取 cmap
+- 中文字体排名（覆盖率优先，其次按 CHINESE_FONTS 的偏好顺序）供 setup_chinese_font 和字体画廊使用
+- 搜索和分页只操作索引，不渲染任何图片
+- 样张只为当前页的字体渲染，并按 (字体文件, 文本, 字号) 缓存
+"""
+import hashlib
+import io
+import json
+import math
+import os
+import re
+import warnings
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import matplotlib.font_manager as fm
+import pandas as pd
+import streamlit as st
+from matplotlib.figure import Figure
+from matplotlib.ft2font import FT2Font
+
+from catalogs.rc_isolation import attach_figure_rc, figure_rc, rc_lock
+from catalogs.render_cache import get_cache_dir, get_library_versions
+from catalogs.utils import CHINESE_FONTS
+
+FONTS_PER_PAGE = 12
+DEFAULT_SPECIMEN_TEXT = "AaBbCc 0123 中文字体样张"
+SPECIMEN_SIZES = [12, 16, 20, 28, 36]
+# 统计中文覆盖率使用的代表字符（常用汉字 + 中文标点）
+CJK_SAMPLE_CHARS = ("的一是不了人我在有他这中大来上国个到说们为子和你地出道也时年得就那要下以生会自着去之过家学"
+                    "对可里后能心多然于么都好看起发当没成只如事把还用第想作种开美总从无情己面最女但现前些所"
+                    "图表字体数据坐标轴线条颜色样式题，。、：；！？（）《》“”")
+# 覆盖率达到该比例才视为支持中文
+CJK_COVERAGE_THRESHOLD = 0.9
+
+# 样张中字体缺少的字形显示为方框，这正是样张要展示的信息，不需要逐字警告。在导入时设置一次
+# （catch_warnings 修改的是进程级的过滤器，多线程同时渲染时并不安全）；matplotlib 把这条警告归到
+# 调用它的第一个外部模块，因此只会忽略本模块渲染样张时的警告
+warnings.filterwarnings('ignore', message='Glyph .* missing from font', module=re.escape(__name__))
+
+
+class FontInfo(NamedTuple):
+    """索引中的一个字体（对应 ttflist 中的一个条目）"""
+    family: str
+    style: str
+    weight: int
+    stretch: str
+    file: str
+    cjk_coverage: float
+
+    @property
+    def supports_cjk(self) -> bool:
+        return self.cjk_coverage >= CJK_COVERAGE_THRESHOLD
+
+    @property
+    def file_name(self) -> str:
+        return os.path.basename(self.file)
+
+
+def get_cjk_coverage(path: str) -> float:
+    """读取字体文件的 cmap，返回 CJK_SAMPLE_CHARS 中有字形的比例（无法读取时为 0）"""
+    try:
+        charmap = FT2Font(path).get_charmap()
+    except Exception:
+        return 0.0
+    glyphs = [charmap[ord(char)] for char in CJK_SAMPLE_CHARS if ord(char) in charmap]
+    # Last Resort 之类的兜底字体把整个区块映射到同一个占位字形，不算真正覆盖
+    if len(set(glyphs)) < len(glyphs) / 2:
+        return 0.0
+    return len(glyphs) / len(CJK_SAMPLE_CHARS)
+
+
+def _file_signature(path: str) -> Optional[List[int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _coverage_cache_path():
+    # 代表字符集或 matplotlib 版本变化时使用新的缓存文件
+    digest = hashlib.sha1(f"{get_library_versions()}|{CJK_SAMPLE_CHARS}".encode('utf-8')).hexdigest()[:16]
+    return get_cache_dir('fonts') / f"cjk_coverage-{digest}.json"
+
+
+def load_coverage_index(paths: List[str]) -> Dict[str, float]:
+    """获取各字体文件的中文覆盖率：磁盘缓存中 (mtime, 大小) 一致的直接复用，其余重新扫描并写回"""
+    cache_path = _coverage_cache_path()
+    try:
+        cached = json.loads(cache_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        cached = {}
+    entries = {}
+    for path in dict.fromkeys(paths):
+        signature = _file_signature(path)
+        entry = cached.get(path)
+        if entry is None or entry[:2] != signature:
+            entry = (signature or [0, 0]) + [get_cjk_coverage(path)]
+        entries[path] = entry
+    if entries != cached:
+        # 先写临时文件再替换，多个进程同时写入时不会留下半个文件
+        tmp_path = cache_path.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            tmp_path.write_text(json.dumps(entries, ensure_ascii=False), encoding='utf-8')
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+    return {path: entry[2] for path, entry in entries.items()}
+
+
+def _normalize_weight(weight) -> int:
+    # ttflist 中的 weight 通常为数值，个别字体为 'normal'/'bold' 等字符串
+    if isinstance(weight, str):
+        return fm.weight_dict.get(weight, 400)
+    return int(weight)
+
+
+@st.cache_resource
+def get_font_index() -> List[FontInfo]:
+    """构建完整字体索引（按字体族、粗细、样式排序；整个服务进程共享）"""
+    coverage = load_coverage_index([entry.fname for entry in fm.fontManager.ttflist])
+    index = []
+    for entry in fm.fontManager.ttflist:
+        index.append(FontInfo(entry.name, entry.style, _normalize_weight(entry.weight),
+                              str(entry.stretch), entry.fname, coverage[entry.fname]))
+    index.sort(key=lambda font: (font.family.lower(), font.weight, font.style, font.file))
+    return index
+
+
+def get_font_families() -> List[str]:
+    """所有可用的字体族名称（去重并排序）"""
+    return sorted({font.family for font in get_font_index()}, key=str.lower)
+
+
+def get_cjk_font_ranking() -> List[Tuple[str, float]]:
+    """支持中文的字体族排名：[(字体族, 覆盖率), ...]，覆盖率高的在前，相同时按 CHINESE_FONTS 的顺序"""
+    best: Dict[str, float] = {}
+    for font in get_font_index():
+        if font.supports_cjk:
+            best[font.family] = max(best.get(font.family, 0.0), font.cjk_coverage)
+    preference = {name: i for i, name in enumerate(CHINESE_FONTS)}
+    return sorted(best.items(), key=lambda item: (-item[1], preference.get(item[0], len(preference)), item[0].lower()))
+
+
+def search_fonts(query: str = '', cjk_only: bool = False, style: Optional[str] = None) -> List[FontInfo]:
+    """按名称过滤字体索引：query 不区分大小写，匹配字体族名称或文件名"""
+    query = query.strip().lower()
+    results = []
+    for font in get_font_index():
+        if query and query not in font.family.lower() and query not in font.file_name.lower():
+            continue
+        if cjk_only and not font.supports_cjk:
+            continue
+        if style and font.style != style:
+            continue
+        results.append(font)
+    return results
+
+
+def paginate(items: List, page: int, per_page: int = FONTS_PER_PAGE) -> Tuple[List, int]:
+    """返回第 page 页（从 1 开始，超出范围时取最近的一页）的条目和总页数"""
+    n_pages = max(1, math.ceil(len(items) / per_page))
+    page = min(max(1, page), n_pages)
+    return items[(page - 1) * per_page:page * per_page], n_pages
+
+
+@st.cache_data(max_entries=512)
+def get_font_specimen_png(path: str, text: str, size: int) -> bytes:
+    """用指定字体文件渲染一行样张（不经过 pyplot，可在任意线程调用）"""
+    buffer = io.BytesIO()
+    # 创建时持有 rc_lock 避免读到其他会话正在使用的样式，绘制时在 figure_rc 中使用创建时的参数
+    with rc_lock:
+        fig = Figure(figsize=(6, 0.3 + size / 48))
+        fig.text(0.01, 0.5, text, va='center', fontproperties=fm.FontProperties(fname=path, size=size))
+        attach_figure_rc(fig)
+    with figure_rc(fig):
+        fig.savefig(buffer, format='png', dpi=100, bbox_inches='tight', pad_inches=0.05)
+    return buffer.getvalue()
+
+
+def format_font_label(font: FontInfo) -> str:
+    cjk = "✅ 中文" if font.supports_cjk else f"中文覆盖 {font.cjk_coverage:.0%}"
+    return f"**{font.family}** · {font.style} · {font.weight} · {cjk} · `{font.file_name}`"
+
+
+@st.fragment
+def render_font_catalog(key_prefix: str = 'font_catalog') -> None:
+    """完整字体目录：搜索 + 分页，只渲染当前页字体的样张
+
+    以 fragment 运行，翻页和搜索只重新执行目录本身，不会重跑整个页面。
+    """
+    index = get_font_index()
+    n_cjk = sum(font.supports_cjk for font in index)
+    st.caption(f"共 {len(index)} 个字体文件条目、{len(get_font_families())} 个字体族，其中 {n_cjk} 个支持中文")
+
+    ranking = get_cjk_font_ranking()
+    with st.expander(f"🀄 中文字体排名（{len(ranking)} 个字体族）", expanded=not ranking):
+        if ranking:
+            st.caption(f"中文文本默认使用排名第一的 **{ranking[0][0]}**（覆盖率优先，相同时按常用字体的偏好顺序）")
+            st.dataframe(pd.DataFrame({'字体族': [family for family, _ in ranking],
+                                       '中文覆盖率': [f"{coverage:.0%}" for _, coverage in ranking]}),
+                         width='stretch', hide_index=True)
+        else:
+            st.warning("未检测到支持中文的字体，中文会显示为方框。可安装 Noto Sans CJK SC 或文泉驿微米黑，"
+                       "删除 matplotlib 缓存目录中的 fontlist-*.json 后重启应用（新字体文件会自动扫描）")
+
+    col_query, col_style, col_cjk = st.columns([2, 1, 1])
+    query = col_query.text_input("🔍 搜索字体（名称或文件名）", key=f'{key_prefix}_query')
+    style = col_style.selectbox("样式", ['全部', 'normal', 'italic', 'oblique'], key=f'{key_prefix}_style')
+    cjk_only = col_cjk.checkbox("只看支持中文的字体", key=f'{key_prefix}_cjk')
+    col_text, col_size = st.columns([3, 1])
+    text = col_text.text_input("样张文字", DEFAULT_SPECIMEN_TEXT, key=f'{key_prefix}_text') or DEFAULT_SPECIMEN_TEXT
+    size = col_size.select_slider("字号", SPECIMEN_SIZES, value=20, key=f'{key_prefix}_size')
+
+    results = search_fonts(query, cjk_only, None if style == '全部' else style)
+    if not results:
+        st.info("没有匹配的字体")
+        return
+    # 页码超出范围时由 paginate 收回到最后一页（不给控件设上限，避免搜索条件变化时控件被重置）
+    page = st.number_input("页码", min_value=1, value=1, step=1, key=f'{key_prefix}_page')
+    page_fonts, n_pages = paginate(results, int(page))
+    st.caption(f"第 {min(int(page), n_pages)} / {n_pages} 页，共 {len(results)} 个匹配字体")
+
+    for font in page_fonts:
+        st.markdown(format_font_label(font))
+        try:
+            st.image(get_font_specimen_png(font.file, text, size))
+        except Exception as e:
+            st.caption(f"⚠️ 无法渲染样张: {str(e)}")
+
+    with st.expander("📋 匹配字体列表（不渲染样张）"):
+        df = pd.DataFrame({
+            '字体族': [font.family for font in results],
+            '样式': [font.style for font in results],
+            '粗细': [font.weight for font in results],
+            '中文覆盖率': [f"{font.cjk_coverage:.0%}" for font in results],
+            '文件': [font.file_name for font in results],
+        })
+        st.dataframe(df, width='stretch', hide_index=True, height=300)
@@ -0,0 +1,63 @@
+"""
+批量几何生成 - 用广播一次性生成 Collections 所需的 (n, m, 2) 顶点数组，避免逐条 Python 循环
+"""
+import time
+from typing import Tuple
+
+import numpy as np
+from matplotlib.collections import LineCollection
+
+from catalogs.rc_isolation import locked_subplots
+from catalogs.render_cache import figure_to_png
+
+# 逐条 plot 的计时最多测量这么多条线，超出部分按比例估算
+LOOP_TIMING_LIMIT = 2000
+
+
+def wave_segments(n: int, n_points: int = 50, x_range: Tuple[float, float] = (0, 10),
+                  phase_step: float = 0.2, offset_step: float = 0.1) -> np.ndarray:
+    """生成 n 条相位、高度递增的正弦线，返回形状为 (n, n_points, 2) 的数组
+
+    第 i 条线为 y = sin(x + i * phase_step) + i * offset_step
+    """
+    x = np.linspace(x_range[0], x_range[1], n_points)
+    i = np.arange(n)[:, np.newaxis]
+    y = np.sin(x + i * phase_step) + i * offset_step
+    return np.stack(np.broadcast_arrays(x, y), axis=-1)
+
+
+def regular_polygons(centers: np.ndarray, n_sides: int = 6, radius: float = 0.3) -> np.ndarray:
+    """以 centers (n, 2) 为中心生成正多边形，返回形状为 (n, n_sides, 2) 的数组"""
+    angles = np.linspace(0, 2 * np.pi, n_sides, endpoint=False)
+    offsets = radius * np.column_stack([np.cos(angles), np.sin(angles)])
+    return np.asarray(centers, dtype=float)[:, np.newaxis, :] + offsets
+
+
+def hexagon_wave(n: int, radius: float = 0.3) -> np.ndarray:
+    """沿 y = sin(0.5 * x) 排列的 n 个六边形（第 i 个中心为 (i, sin(0.5 * i))）"""
+    i = np.arange(n, dtype=float)
+    return regular_polygons(np.column_stack([i, np.sin(i * 0.5)]), 6, radius)
+
+
+def time_line_rendering(segments: np.ndarray, mode: str = 'collection', linewidth: float = 1.0,
+                        figsize: Tuple[float, float] = (8, 5)) -> Tuple[float, int]:
+    """测量绘制 segments 的耗时（绘制 + PNG 编码），返回 (耗时, 实际测量的线条数)
+
+    mode='collection' 用一个 LineCollection 绘制全部线条；mode='loop' 每条线调用一次 ax.plot，
+    超过 LOOP_TIMING_LIMIT 条时只测量前 LOOP_TIMING_LIMIT 条。
+    两种方式使用相同的颜色、线宽和编码设置，对比时应都通过这个函数测量。
+    """
+    if mode not in ('collection', 'loop'):
+        raise ValueError(f"未知的绘制方式: '{mode}'，可选: ['collection', 'loop']")
+    if mode == 'loop':
+        segments = segments[:LOOP_TIMING_LIMIT]
+    start = time.perf_counter()
+    fig, ax = locked_subplots(figsize=figsize)
+    if mode == 'loop':
+        for segment in segments:
+            ax.plot(segment[:, 0], segment[:, 1], color='#3b82f6', linewidth=linewidth)
+    else:
+        ax.add_collection(LineCollection(segments, colors='#3b82f6', linewidths=linewidth))
+        ax.autoscale()
+    figure_to_png(fig)
+    return time.perf_counter() - start, len(segments)
@@ -0,0 +1,282 @@
+"""
+大图金字塔 - 把大尺寸图像预先逐级缩小一半，保存为内存映射的 .npy 文件，显示时只读取需要的那一层和窗口
+
+imshow 会把传入的整个数组重采样到输出像素：8192×8192 的图像即使只显示 800 像素宽，也要处理 6700 万个像素。
+- 金字塔第 0 层为原图，之后每层宽高减半（2×2 平均），直到最长边不超过 MIN_LEVEL_SIZE
+- 各层以 .npy 文件保存在磁盘缓存目录，用 np.load(mmap_mode='r') 打开，只有切片用到的部分才会读入内存
+- 显示时按缩放/平移窗口和 Axes 的输出像素尺寸选层：所选层在窗口内的像素数刚好不少于显示像素数
+- 上传的图片有像素上限，按行分块写入第 0 层；磁盘上只保留最近使用的几个上传图片的金字塔
+"""
+import hashlib
+import io
+import math
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import streamlit as st
+
+from catalogs.density import get_axes_pixel_shape
+from catalogs.rc_isolation import locked_subplots
+from catalogs.render_cache import DEFAULT_SAVEFIG_OPTIONS, get_cache_dir
+from catalogs.render_policy import show_figure
+
+SYNTHETIC_SIZE = 8192
+MIN_LEVEL_SIZE = 256
+# 逐块生成和缩小，避免一次性把整张大图读入内存
+BLOCK_ROWS = 512
+ZOOM_LEVELS = [1, 2, 4, 8, 16, 32, 64]
+# 上传图片的像素上限（约 1.3 亿像素，如 16384×8192）：Pillow 解码时每像素约占 4 字节内存
+MAX_UPLOAD_PIXELS = 2**27
+# 磁盘上保留的上传图片金字塔个数（与 get_uploaded_pyramid 的缓存条目数相同）
+MAX_UPLOAD_PYRAMIDS = 8
+# 金字塔格式变化时递增，使旧文件失效
+PYRAMID_VERSION = 1
+
+_build_lock = threading.Lock()
+
+
+class ImagePyramid(NamedTuple):
+    """磁盘上的图像金字塔：levels[0] 为原图，之后每层宽高减半（均为只读内存映射）"""
+    key: str
+    label: str
+    levels: List[np.ndarray]
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.levels[0].shape[:2]
+
+
+class PyramidView(NamedTuple):
+    """一次显示用到的层和窗口（窗口坐标均为原图像素）"""
+    level: int
+    data: np.ndarray
+    extent: Tuple[float, float, float, float]
+    window: Tuple[int, int, int, int]  # (x0, x1, y0, y1)
+    seconds: float
+
+
+def _downsample(block: np.ndarray) -> np.ndarray:
+    # 2×2 平均；奇数行列丢弃最后一行/列
+    h, w = block.shape[0] // 2 * 2, block.shape[1] // 2 * 2
+    block = block[:h, :w].astype(np.float32)
+    result = block.reshape(h // 2, 2, w // 2, 2, *block.shape[2:]).mean(axis=(1, 3))
+    return result
+
+
+def _write_levels(directory: Path, level0: np.ndarray) -> None:
+    """在 level0 的基础上逐级生成其余各层（按行分块读取上一层）"""
+    previous = level0
+    index = 0
+    while max(previous.shape[:2]) > MIN_LEVEL_SIZE:
+        index += 1
+        h, w = previous.shape[0] // 2, previous.shape[1] // 2
+        level = np.lib.format.open_memmap(directory / f"level_{index}.npy", mode='w+', dtype=previous.dtype,
+                                          shape=(h, w, *previous.shape[2:]))
+        for row in range(0, h, BLOCK_ROWS // 2):
+            reduced = _downsample(previous[row * 2:(row + BLOCK_ROWS // 2) * 2])
+            if np.issubdtype(level.dtype, np.integer):
+                reduced = np.rint(reduced)
+            level[row:row + len(reduced)] = reduced.astype(level.dtype)
+        level.flush()
+        previous = level
+
+
+def _open_pyramid(directory: Path, key: str, label: str) -> ImagePyramid:
+    paths = sorted(directory.glob("level_*.npy"), key=lambda path: int(path.stem.split('_')[1]))
+    return ImagePyramid(key, label, [np.load(path, mmap_mode='r') for path in paths])
+
+
+def build_pyramid(key: str, label: str, shape: Tuple[int, ...], dtype,
+                  fill_level0: Callable[[np.ndarray], None]) -> ImagePyramid:
+    """获取（不存在时构建）金字塔：fill_level0 负责把原图写入传入的内存映射数组
+
+    先在临时目录中写完所有层再改名，多个会话同时构建时不会读到不完整的文件。
+    """
+    root = get_cache_dir('image_pyramids')
+    directory = root / f"v{PYRAMID_VERSION}-{key}"
+    with _build_lock:
+        if directory.exists():
+            # 修改时间记录最近一次使用，evict_pyramids 按它淘汰
+            os.utime(directory)
+        else:
+            tmp_dir = root / f".{directory.name}.{os.getpid()}.tmp"
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            tmp_dir.mkdir()
+            try:
+                level0 = np.lib.format.open_memmap(tmp_dir / "level_0.npy", mode='w+', dtype=dtype, shape=shape)
+                fill_level0(level0)
+                level0.flush()
+                _write_levels(tmp_dir, level0)
+                del level0
+                os.replace(tmp_dir, directory)
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+    return _open_pyramid(directory, key, label)
+
+
+def evict_pyramids(prefix: str, keep: int) -> List[str]:
+    """删除 key 以 prefix 开头的金字塔（包括旧版本格式的），只保留最近使用的 keep 个；返回删除的目录名
+
+    已打开的内存映射不受影响：POSIX 系统上文件在解除映射后才真正释放（删除失败的目录留到下次）。
+    """
+    root = get_cache_dir('image_pyramids')
+    with _build_lock:
+        directories = [path for path in root.iterdir()
+                       if path.is_dir() and not path.name.startswith('.')
+                       and path.name.partition('-')[2].startswith(prefix)]
+        directories.sort(key=lambda path: path.stat().st_mtime, reverse=True)
+        for path in directories[keep:]:
+            shutil.rmtree(path, ignore_errors=True)
+    return [path.name for path in directories[keep:]]
+
+
+def _fill_synthetic(level0: np.ndarray) -> None:
+    # 多个尺度叠加的图案：放大后仍能看到新的细节
+    size = level0.shape[1]
+    x = np.linspace(-1, 1, size, dtype=np.float32)
+    for row in range(0, level0.shape[0], BLOCK_ROWS):
+        y = x[row:row + BLOCK_ROWS, None]
+        r = np.sqrt(x**2 + y**2)
+        value = np.sin(12 * r) * np.exp(-2 * r)
+        for octave in range(1, 7):
+            frequency = 6 * 2**octave
+            value += np.sin(frequency * x + octave) * np.cos(frequency * y - octave) / 2**octave
+        level0[row:row + BLOCK_ROWS] = value
+
+
+@st.cache_resource(show_spinner="正在生成合成图像金字塔（只在首次使用时生成，之后直接读取磁盘文件）...")
+def get_synthetic_pyramid(size: int = SYNTHETIC_SIZE) -> ImagePyramid:
+    """size×size 的合成图像（float32 单通道）的金字塔"""
+    return build_pyramid(f"synthetic-{size}", f"合成图像 {size}×{size}", (size, size), np.float32, _fill_synthetic)
+
+
+@st.cache_resource(show_spinner="正在为上传的图片生成金字塔...", max_entries=MAX_UPLOAD_PYRAMIDS)
+def get_uploaded_pyramid(data: bytes, name: str) -> ImagePyramid:
+    """上传图片的金字塔（按文件内容的哈希缓存；RGB/RGBA 保持 uint8）
+
+    超过 MAX_UPLOAD_PIXELS 的图片抛出 ValueError。金字塔已在磁盘上时不再解码图片；否则按行分块
+    （转换颜色模式后）写入第 0 层，不会另外复制一份整图数组。16 位、32 位整数和浮点灰度图按整图的
+    最小、最大值线性缩放到 0-255（直接 convert 会把超过 255 的值全部截断为白色）。
+    """
+    from PIL import Image
+    digest = hashlib.sha1(data).hexdigest()[:16]
+    too_large = f"超过上限 {MAX_UPLOAD_PIXELS / 1e6:,.0f} 百万像素"
+    try:
+        # 不修改 Pillow 的全局 MAX_IMAGE_PIXELS（进程内其他代码共用）：尺寸在下面单独检查，
+        # 超过 Pillow 自身上限两倍的图片仍由 Pillow 拒绝
+        image = Image.open(io.BytesIO(data))
+    except Image.DecompressionBombError as e:
+        raise ValueError(f"图片像素数{too_large}") from e
+    with image:
+        # open 只读取文件头：先检查尺寸，再决定是否解码
+        width, height = image.size
+        if width * height > MAX_UPLOAD_PIXELS:
+            raise ValueError(f"图片为 {width}×{height}（{width * height / 1e6:,.0f} 百万像素），{too_large}")
+        mode = image.mode
+        scale = None
+        if mode in ('I', 'F') or mode.startswith('I;16'):
+            low, high = image.getextrema()
+            mode, scale = 'L', (low, 255.0 / (high - low) if high > low else 0.0)
+        elif mode not in ('L', 'RGB', 'RGBA'):
+            mode = 'RGBA' if 'A' in image.getbands() else 'RGB'
+        shape = (height, width) if mode == 'L' else (height, width, len(mode))
+
+        def fill(level0):
+            for row in range(0, height, BLOCK_ROWS):
+                strip = image.crop((0, row, width, min(row + BLOCK_ROWS, height)))
+                if scale is not None:
+                    values = (np.asarray(strip, dtype=np.float64) - scale[0]) * scale[1]
+                    level0[row:row + strip.height] = np.clip(np.rint(values), 0, 255)
+                    continue
+                if strip.mode != mode:
+                    strip = strip.convert(mode)
+                level0[row:row + strip.height] = np.asarray(strip)
+
+        pyramid = build_pyramid(f"upload-{digest}", f"{name} ({width}×{height})", shape, np.uint8, fill)
+    evict_pyramids('upload-', MAX_UPLOAD_PYRAMIDS)
+    return pyramid
+
+
+def get_view_window(shape: Tuple[int, int], zoom: float, center: Tuple[float, float]) -> Tuple[int, int, int, int]:
+    """按放大倍数和窗口中心（0-1 的相对位置）计算显示窗口 (x0, x1, y0, y1)，窗口不会超出图像"""
+    height, width = shape
+    window_w, window_h = max(1, round(width / zoom)), max(1, round(height / zoom))
+    x0 = min(max(0, round(center[0] * width - window_w / 2)), width - window_w)
+    y0 = min(max(0, round(center[1] * height - window_h / 2)), height - window_h)
+    return x0, x0 + window_w, y0, y0 + window_h
+
+
+def choose_level(pyramid: ImagePyramid, window: Tuple[int, int, int, int], display_px: Tuple[int, int]) -> int:
+    """选择最粗的一层，使窗口在该层中的像素数仍不少于显示像素数（显示像素为 (高, 宽)）"""
+    x0, x1, y0, y1 = window
+    ratio = min((x1 - x0) / max(display_px[1], 1), (y1 - y0) / max(display_px[0], 1))
+    if ratio <= 1:
+        return 0
+    return min(int(math.floor(math.log2(ratio))), len(pyramid.levels) - 1)
+
+
+def read_view(pyramid: ImagePyramid, window: Tuple[int, int, int, int], level: int) -> PyramidView:
+    """从第 level 层读取窗口内的像素（只有这部分数据会从磁盘读入内存）"""
+    start = time.perf_counter()
+    x0, x1, y0, y1 = window
+    scale = 2**level
+    data = pyramid.levels[level]
+    col0, col1 = x0 // scale, min(data.shape[1], -(-x1 // scale))
+    row0, row1 = y0 // scale, min(data.shape[0], -(-y1 // scale))
+    array = np.array(data[row0:row1, col0:col1])
+    # extent 以原图像素为单位（origin='upper'：上边缘的 y 较小）
+    extent = (col0 * scale, col1 * scale, row1 * scale, row0 * scale)
+    return PyramidView(level, array, extent, window, time.perf_counter() - start)
+
+
+def format_pyramid_summary(pyramid: ImagePyramid) -> str:
+    sizes = " → ".join(f"{level.shape[1]}×{level.shape[0]}" for level in pyramid.levels)
+    disk_mb = sum(level.nbytes for level in pyramid.levels) / 1024**2
+    return f"🗂️ {pyramid.label}：{len(pyramid.levels)} 层（{sizes}），磁盘上共 {disk_mb:.0f} MB"
+
+
+def render_image_pyramid_demo(cmap: str = 'viridis', interpolation: str = 'bilinear') -> None:
+    """大图金字塔演示：选择图像来源，通过缩放/平移窗口浏览，只把所需的层和窗口交给 imshow"""
+    source = st.radio("图像来源", [f"🧪 合成图像 {SYNTHETIC_SIZE}×{SYNTHETIC_SIZE}", "📤 上传图片"],
+                      horizontal=True, key="pyramid_source")
+    pyramid: Optional[ImagePyramid] = None
+    if source.startswith("📤"):
+        uploaded = st.file_uploader("上传图片（PNG / JPEG / TIFF 等）", type=['png', 'jpg', 'jpeg', 'tif', 'tiff', 'bmp'],
+                                    key="pyramid_upload")
+        if uploaded is None:
+            st.info("上传一张图片后即可缩放浏览；也可以切换到合成图像")
+            return
+        try:
+            pyramid = get_uploaded_pyramid(uploaded.getvalue(), uploaded.name)
+        except Exception as e:
+            st.error(f"无法读取图片: {str(e)}")
+            return
+    else:
+        pyramid = get_synthetic_pyramid()
+    st.caption(format_pyramid_summary(pyramid))
+
+    col_zoom, col_x, col_y = st.columns(3)
+    zoom = col_zoom.select_slider("放大倍数", ZOOM_LEVELS, value=1, key="pyramid_zoom")
+    center_x = col_x.slider("窗口中心 x", 0.0, 1.0, 0.5, 0.01, key="pyramid_cx")
+    center_y = col_y.slider("窗口中心 y", 0.0, 1.0, 0.5, 0.01, key="pyramid_cy")
+
+    window = get_view_window(pyramid.shape, zoom, (center_x, center_y))
+    fig, ax = locked_subplots(figsize=(8, 6))
+    level = choose_level(pyramid, window, get_axes_pixel_shape(ax, DEFAULT_SAVEFIG_OPTIONS['dpi']))
+    view = read_view(pyramid, window, level)
+    im = ax.imshow(view.data, extent=view.extent, cmap=cmap, interpolation=interpolation, origin='upper')
+    x0, x1, y0, y1 = window
+    ax.set_xlim(x0, x1)
+    ax.set_ylim(y1, y0)
+    if view.data.ndim == 2:
+        fig.colorbar(im, ax=ax)
+    ax.set_title(f"{zoom}× 窗口 ({x0}:{x1}, {y0}:{y1})", fontsize=12)
+    show_figure(fig)
+    st.caption(f"📐 使用第 {level} 层（每个像素对应原图 {2**level}×{2**level} 像素），读取 "
+               f"{view.data.shape[1]}×{view.data.shape[0]} 个像素（{view.data.nbytes / 1024**2:.1f} MB，"
+               f"{view.seconds * 1000:.1f} ms）；直接显示原图窗口需要 {(x1 - x0) * (y1 - y0):,} 个像素")
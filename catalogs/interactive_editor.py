@@ -6,8 +6,17 @@ import matplotlib.pyplot as plt
 import matplotlib.lines
 import matplotlib.colors as mcolors
 import numpy as np
-from typing import Dict, Tuple, Optional, List
-from catalogs.utils import ensure_chinese_font, generate_sample_data
+from matplotlib.figure import Figure
+from typing import Dict, Tuple, Optional, List, Mapping, NamedTuple
+from catalogs.utils import apply_chinese_font, ensure_chinese_font, resolve_chinese_font
+from catalogs.export import render_export_panel
+from catalogs.layout_cache import enable_layout_cache, tight_layout
+from catalogs.progressive import show_progressive_figure
+from catalogs.style_gallery import render_style_gallery
+from catalogs.plot_params import PlotParams
+from catalogs.codegen import generate_code
+from catalogs.rc_isolation import attach_figure_rc, get_style_params, isolated_style
+from catalogs.decimation import DECIMATION_METHODS, plot_decimated
 from catalogs.line import get_drawstyle_options, get_capstyle_options, get_joinstyle_options
 from catalogs.text import get_fontweight_options, get_fontstyle_options, get_fontfamily_options
 
@@ -54,490 +63,117 @@ def get_all_available_styles() -> List[str]:
     
     return styles
 
-def generate_code(params: Dict) -> str:
-    """根据参数生成完整的matplotlib代码"""
-    code_lines = [
-        "import matplotlib.pyplot as plt",
-        "import numpy as np",
-        "",
-    ]
-    
-    # 样式表
-    style_sheet = params.get('style_sheet', 'default')
-    if style_sheet != 'default':
-        code_lines.append(f"# 应用样式表")
-        # 检查是否是第三方样式库的样式
-        third_party_styles = ['seaborn']
-        is_third_party = any(style in style_sheet.lower() for style in third_party_styles)
-        
-        if is_third_party:
-            # 添加第三方库导入提示
-            if 'seaborn' in style_sheet.lower():
-                code_lines.append("# 注意：此样式需要安装 seaborn 库")
-                code_lines.append("# pip install seaborn")
-                code_lines.append("import seaborn as sns  # 导入seaborn会自动注册样式")
-        
-        code_lines.append(f"plt.style.use('{style_sheet}')")
-        code_lines.append("")
-    
-    code_lines.append("# 生成示例数据")
-    code_lines.append("x = np.linspace(0, 10, 50)")
-    code_lines.append("y = np.sin(x)")
-    code_lines.append("")
-    
-    # Figure参数
-    figsize = params.get('figsize', (8, 6))
-    dpi = params.get('dpi', 100)
-    facecolor = params.get('facecolor', 'white')
-    
-    # 子图布局
-    subplot_rows = params.get('subplot_rows', 1)
-    subplot_cols = params.get('subplot_cols', 1)
-    
-    code_lines.append("# 创建图表")
-    if subplot_rows > 1 or subplot_cols > 1:
-        code_lines.append(f"fig, axes = plt.subplots({subplot_rows}, {subplot_cols}, figsize={figsize}, dpi={dpi}, constrained_layout=True)")
-        code_lines.append("")
-        code_lines.append("# 统一处理 axes")
-        code_lines.append(f"if {subplot_rows} * {subplot_cols} > 1:")
-        code_lines.append("    axes_flat = axes.flatten()")
-        code_lines.append("else:")
-        code_lines.append("    axes_flat = [axes]")
-        code_lines.append("")
-        code_lines.append("# 为每个子图绘制")
-        code_lines.append("for idx, ax in enumerate(axes_flat):")
-        code_lines.append("    # 绘制代码（见下方）")
-    else:
-        code_lines.append(f"fig, ax = plt.subplots(figsize={figsize}, dpi={dpi})")
-    # 处理facecolor，如果是hex格式需要引号
-    if facecolor != 'white':
-        if isinstance(facecolor, str) and facecolor.startswith('#'):
-            code_lines.append(f"fig.set_facecolor('{facecolor}')")
-        elif isinstance(facecolor, str):
-            code_lines.append(f"fig.set_facecolor('{facecolor}')")
-        else:
-            code_lines.append(f"fig.set_facecolor({facecolor})")
-    
-    code_lines.append("")
-    code_lines.append("# 绘制数据")
-    
-    # 图表类型
-    chart_type = params.get('chart_type', 'plot')
-    
-    # Line参数
-    line_params = []
-    if params.get('linewidth', 2) != 2:
-        line_params.append(f"linewidth={params['linewidth']}")
-    if params.get('linestyle', '-') != '-':
-        linestyle = params.get('linestyle', '-')
-        if isinstance(linestyle, str):
-            line_params.append(f"linestyle='{linestyle}'")
-        else:
-            line_params.append(f"linestyle={linestyle}")
-    color = params.get('color', 'C0')
-    # 如果颜色是hex格式，需要特殊处理
-    if isinstance(color, str) and color.startswith('#'):
-        line_params.append(f"color='{color}'")
-    elif color != 'C0':
-        if isinstance(color, str):
-            line_params.append(f"color='{color}'")
-        else:
-            line_params.append(f"color={color}")
-    if params.get('alpha', 1.0) != 1.0:
-        line_params.append(f"alpha={params['alpha']}")
-    
-    # 添加更多线条参数
-    if params.get('drawstyle') and params.get('drawstyle') != 'default':
-        line_params.append(f"drawstyle='{params['drawstyle']}'")
-    if params.get('capstyle') and params.get('capstyle') != 'butt':
-        line_params.append(f"solid_capstyle='{params['capstyle']}'")
-    if params.get('joinstyle') and params.get('joinstyle') != 'miter':
-        line_params.append(f"solid_joinstyle='{params['joinstyle']}'")
-    
-    # Marker参数
-    marker_params = []
-    if params.get('marker') is not None:
-        marker = params.get('marker')
-        if isinstance(marker, str):
-            marker_params.append(f"marker='{marker}'")
-        else:
-            marker_params.append(f"marker={marker}")
-    if params.get('markersize', 6) != 6:
-        marker_params.append(f"markersize={params['markersize']}")
-    if params.get('markerfacecolor') is not None:
-        mfc = params.get('markerfacecolor')
-        if isinstance(mfc, str):
-            marker_params.append(f"markerfacecolor='{mfc}'")
-        else:
-            marker_params.append(f"markerfacecolor={mfc}")
-    if params.get('markeredgecolor') is not None:
-        mec = params.get('markeredgecolor')
-        if isinstance(mec, str):
-            marker_params.append(f"markeredgecolor='{mec}'")
-        else:
-            marker_params.append(f"markeredgecolor={mec}")
-    if params.get('markeredgewidth', 1) != 1:
-        marker_params.append(f"markeredgewidth={params['markeredgewidth']}")
-    if params.get('fillstyle', 'full') != 'full':
-        marker_params.append(f"fillstyle='{params['fillstyle']}'")
-    
-    all_params = line_params + marker_params
-    param_str = ", ".join(all_params) if all_params else ""
-    
-    # 根据图表类型生成代码
-    if subplot_rows > 1 or subplot_cols > 1:
-        indent = "    "
-    else:
-        indent = ""
-    
-    if chart_type == 'plot':
-        code_lines.append(f"{indent}ax.plot(x, y{', ' + param_str if param_str else ''})")
-    elif chart_type == 'scatter':
-        # scatter不支持：linestyle, linewidth, drawstyle, solid_capstyle, solid_joinstyle
-        # 只保留color, alpha和marker相关参数
-        scatter_params = [p for p in all_params if not any(x in p for x in ['linestyle', 'linewidth', 'drawstyle', 'capstyle', 'joinstyle'])]
-        scatter_str = ", ".join(scatter_params) if scatter_params else ""
-        code_lines.append(f"{indent}ax.scatter(x, y{', ' + scatter_str if scatter_str else ''})")
-    elif chart_type == 'bar':
-        # bar不支持：所有Line参数（linestyle, linewidth, drawstyle, capstyle, joinstyle）和所有Marker参数
-        # 只保留color和alpha
-        bar_params = [p for p in all_params if not any(x in p for x in ['linestyle', 'linewidth', 'drawstyle', 'capstyle', 'joinstyle', 'marker'])]
-        bar_str = ", ".join(bar_params) if bar_params else ""
-        code_lines.append(f"{indent}ax.bar(x[:10], y[:10]{', ' + bar_str if bar_str else ''})")
-    elif chart_type == 'hist':
-        # hist不支持：所有Line参数和所有Marker参数
-        # 只保留color和alpha
-        hist_params = [p for p in all_params if not any(x in p for x in ['linestyle', 'linewidth', 'drawstyle', 'capstyle', 'joinstyle', 'marker'])]
-        hist_str = ", ".join(hist_params) if hist_params else ""
-        code_lines.append(f"{indent}ax.hist(y, bins=20{', ' + hist_str if hist_str else ''})")
-    elif chart_type == 'box':
-        code_lines.append(f"{indent}ax.boxplot([y])")
-    elif chart_type == 'pie':
-        code_lines.append(f"{indent}ax.pie(np.abs(y[:5]), labels=[f'Item {{i+1}}' for i in range(5)])")
-    
-    code_lines.append("")
-    
-    # Axes参数
-    code_lines.append("# 设置坐标轴")
-    if params.get('xlim') is not None:
-        xlim = params.get('xlim')
-        code_lines.append(f"ax.set_xlim({xlim[0]}, {xlim[1]})")
-    if params.get('ylim') is not None:
-        ylim = params.get('ylim')
-        code_lines.append(f"ax.set_ylim({ylim[0]}, {ylim[1]})")
-    
-    # Grid
-    if params.get('grid', False):
-        grid_params = []
-        if params.get('grid_alpha', 0.3) != 0.3:
-            grid_params.append(f"alpha={params['grid_alpha']}")
-        if params.get('grid_linestyle', '-') != '-':
-            grid_params.append(f"linestyle='{params['grid_linestyle']}'")
-        grid_color = params.get('grid_color')
-        if grid_color is not None:
-            if isinstance(grid_color, str):
-                grid_params.append(f"color='{grid_color}'")
-            else:
-                grid_params.append(f"color={grid_color}")
-        grid_str = ", ".join(grid_params) if grid_params else ""
-        code_lines.append(f"ax.grid(True{', ' + grid_str if grid_str else ''})")
-    
-    # Spines
-    spines_hidden = []
-    if not params.get('spine_top', True):
-        spines_hidden.append("'top'")
-    if not params.get('spine_right', True):
-        spines_hidden.append("'right'")
-    if not params.get('spine_bottom', True):
-        spines_hidden.append("'bottom'")
-    if not params.get('spine_left', True):
-        spines_hidden.append("'left'")
-    
-    for spine in spines_hidden:
-        code_lines.append(f"ax.spines[{spine}].set_visible(False)")
-    
-    # Title和Labels
-    code_lines.append("")
-    code_lines.append(f"{indent}# 设置标题和标签")
-    title = params.get('title', '')
-    if title:
-        title_params = []
-        if params.get('title_fontsize', 14) != 14:
-            title_params.append(f"fontsize={params['title_fontsize']}")
-        if params.get('title_fontweight', 'normal') != 'normal':
-            title_params.append(f"fontweight='{params['title_fontweight']}'")
-        if params.get('title_fontstyle', 'normal') != 'normal':
-            title_params.append(f"fontstyle='{params['title_fontstyle']}'")
-        if params.get('title_fontfamily', 'sans-serif') != 'sans-serif':
-            title_params.append(f"fontfamily='{params['title_fontfamily']}'")
-        title_color = params.get('title_color')
-        if title_color is not None:
-            if isinstance(title_color, str):
-                title_params.append(f"color='{title_color}'")
-            else:
-                title_params.append(f"color={title_color}")
-        title_param_str = ", ".join(title_params) if title_params else ""
-        code_lines.append(f"{indent}ax.set_title('{title}'{', ' + title_param_str if title_param_str else ''})")
-    
-    xlabel = params.get('xlabel', '')
-    if xlabel:
-        xlabel_params = []
-        if params.get('xlabel_fontsize', 12) != 12:
-            xlabel_params.append(f"fontsize={params['xlabel_fontsize']}")
-        if params.get('xlabel_fontweight', 'normal') != 'normal':
-            xlabel_params.append(f"fontweight='{params['xlabel_fontweight']}'")
-        if params.get('xlabel_fontstyle', 'normal') != 'normal':
-            xlabel_params.append(f"fontstyle='{params['xlabel_fontstyle']}'")
-        if params.get('xlabel_fontfamily', 'sans-serif') != 'sans-serif':
-            xlabel_params.append(f"fontfamily='{params['xlabel_fontfamily']}'")
-        xlabel_param_str = ", ".join(xlabel_params) if xlabel_params else ""
-        code_lines.append(f"{indent}ax.set_xlabel('{xlabel}'{', ' + xlabel_param_str if xlabel_param_str else ''})")
-    
-    ylabel = params.get('ylabel', '')
-    if ylabel:
-        ylabel_params = []
-        if params.get('ylabel_fontsize', 12) != 12:
-            ylabel_params.append(f"fontsize={params['ylabel_fontsize']}")
-        if params.get('ylabel_fontweight', 'normal') != 'normal':
-            ylabel_params.append(f"fontweight='{params['ylabel_fontweight']}'")
-        if params.get('ylabel_fontstyle', 'normal') != 'normal':
-            ylabel_params.append(f"fontstyle='{params['ylabel_fontstyle']}'")
-        if params.get('ylabel_fontfamily', 'sans-serif') != 'sans-serif':
-            ylabel_params.append(f"fontfamily='{params['ylabel_fontfamily']}'")
-        ylabel_param_str = ", ".join(ylabel_params) if ylabel_params else ""
-        code_lines.append(f"{indent}ax.set_ylabel('{ylabel}'{', ' + ylabel_param_str if ylabel_param_str else ''})")
-    
-    code_lines.append("")
-    if subplot_rows > 1 or subplot_cols > 1:
-        code_lines.append("plt.tight_layout()")
-    else:
-        code_lines.append("plt.tight_layout()")
-    code_lines.append("plt.show()")
-    
-    return "\n".join(code_lines)
+class RenderSettings(NamedTuple):
+    """render_plot 用到的、需要在脚本线程中确定的设置"""
+    style_sheet: str
+    font: Optional[str]
+    warning: Optional[str]  # 样式不可用时的提示（由调用方显示）
 
-def render_plot(params: Dict) -> plt.Figure:
-    """根据参数渲染图表"""
-    ensure_chinese_font()
-    
-    # 获取样式表
-    style_sheet = params.get('style_sheet', 'default')
+
+def resolve_render_settings(params: PlotParams) -> RenderSettings:
+    """在脚本线程中检查样式表、解析中文字体（render_plot 本身不调用 Streamlit）"""
+    style_sheet = params.style_sheet
     
     # 尝试导入第三方样式库（如果样式需要）
     # 这确保在运行时也能使用第三方样式
-    if style_sheet != 'default':
-        
-        # 尝试导入seaborn（如果样式可能需要它）
-        if 'seaborn' in style_sheet.lower():
-            try:
-                import seaborn as sns
-            except ImportError:
-                pass
+    if 'seaborn' in style_sheet.lower():
+        try:
+            import seaborn as sns
+        except ImportError:
+            pass
     
-    # 使用样式上下文管理器来应用样式
-    # 这确保样式在创建figure时生效，并且不会影响全局状态
+    warning = None
     if style_sheet != 'default':
         try:
-            style_context = plt.style.context(style_sheet)
+            get_style_params(style_sheet)
         except Exception as e:
             # 如果样式不存在，使用默认样式
-            st.warning(f"样式 '{style_sheet}' 不可用，使用默认样式。错误: {str(e)}")
-            style_context = plt.style.context('default')
-    else:
-        style_context = plt.style.context('default')
+            warning = f"样式 '{style_sheet}' 不可用，使用默认样式。错误: {str(e)}"
+            style_sheet = 'default'
+    return RenderSettings(style_sheet, resolve_chinese_font(), warning)
+
+
+def render_plot(params: PlotParams, settings: Optional[RenderSettings] = None) -> Figure:
+    """根据参数渲染图表
     
-    # 在样式上下文中创建和绘制图表
-    with style_context:
-        # 创建Figure
-        figsize = params.get('figsize', (8, 6))
-        dpi = params.get('dpi', 100)
-        facecolor = params.get('facecolor', 'white')
-        
-        # 子图布局
-        subplot_rows = params.get('subplot_rows', 1)
-        subplot_cols = params.get('subplot_cols', 1)
+    不使用 pyplot 和 Streamlit，可以在后台线程中调用（预览的完整渲染、导出）；settings 应在脚本线程中
+    由 resolve_render_settings 得到，省略时当场解析。
+    """
+    if settings is None:
+        settings = resolve_render_settings(params)
+    
+    # 在隔离的样式上下文中创建和绘制图表：样式只作用于本次渲染，期间不会与其他会话的样式渲染交错
+    with isolated_style(settings.style_sheet):
+        # 样式表会重置字体设置，在样式上下文中重新配置中文字体（生成的代码中有对应的设置）
+        apply_chinese_font(settings.font)
         
-        if subplot_rows > 1 or subplot_cols > 1:
-            fig, axes = plt.subplots(subplot_rows, subplot_cols, figsize=figsize, dpi=dpi, constrained_layout=True)
-            if subplot_rows == 1 and subplot_cols == 1:
-                axes_flat = [axes]
-            else:
-                axes_flat = axes.flatten() if hasattr(axes, 'flatten') else [axes]
+        # 创建Figure
+        if params.is_subplots:
+            fig = Figure(figsize=params.figsize, dpi=params.dpi, layout='constrained')
+            axes = fig.subplots(params.subplot_rows, params.subplot_cols)
+            # 预览、草稿和导出都会重新求解布局，参数不变时复用上次的结果
+            enable_layout_cache(fig)
+            axes_flat = axes.flatten() if hasattr(axes, 'flatten') else [axes]
         else:
-            fig, ax = plt.subplots(figsize=figsize, dpi=dpi)
-            axes_flat = [ax]
-        
-        fig.set_facecolor(facecolor)
+            fig = Figure(figsize=params.figsize, dpi=params.dpi)
+            axes_flat = [fig.subplots()]
         
-        # 生成数据
-        x, y = generate_sample_data(50)
+        fig.set_facecolor(params.facecolor)
         
-        # 为每个子图绘制
-        chart_type = params.get('chart_type', 'plot')
+        # 生成数据（只有折线图支持大数据量；与生成代码中的数据相同）
+        x = np.linspace(0, 10, params.data_points)
+        y = np.sin(x)
+        chart_type = params.chart_type
+        chart_kwargs = params.chart_kwargs()
         
         for idx, ax in enumerate(axes_flat):
-            # 准备plot参数
-            plot_kwargs = {}
-            
-            # Line参数
-            if params.get('linewidth') is not None:
-                plot_kwargs['linewidth'] = params['linewidth']
-            if params.get('linestyle') is not None:
-                plot_kwargs['linestyle'] = params['linestyle']
-            if params.get('color') is not None:
-                plot_kwargs['color'] = params['color']
-            if params.get('alpha') is not None:
-                plot_kwargs['alpha'] = params['alpha']
-            
-            # 添加更多线条参数
-            if params.get('drawstyle') is not None and params.get('drawstyle') != 'default':
-                plot_kwargs['drawstyle'] = params['drawstyle']
-            if params.get('capstyle') is not None:
-                plot_kwargs['solid_capstyle'] = params['capstyle']
-            if params.get('joinstyle') is not None:
-                plot_kwargs['solid_joinstyle'] = params['joinstyle']
-            
-            # Marker参数
-            if params.get('marker') is not None:
-                plot_kwargs['marker'] = params['marker']
-            if params.get('markersize') is not None:
-                plot_kwargs['markersize'] = params['markersize']
-            if params.get('markerfacecolor') is not None:
-                plot_kwargs['markerfacecolor'] = params['markerfacecolor']
-            if params.get('markeredgecolor') is not None:
-                plot_kwargs['markeredgecolor'] = params['markeredgecolor']
-            if params.get('markeredgewidth') is not None:
-                plot_kwargs['markeredgewidth'] = params['markeredgewidth']
-            if params.get('fillstyle') is not None:
-                plot_kwargs['fillstyle'] = params['fillstyle']
-            
-            # 根据图表类型绘制，过滤不兼容的参数
+            # 根据图表类型绘制（不兼容的参数已在 PlotParams.chart_kwargs 中过滤）
             if chart_type == 'plot':
-                # plot支持所有参数
-                ax.plot(x, y, **plot_kwargs)
+                # 点数超过像素预算时先降采样
+                plot_decimated(ax, x, y, method=params.decimation_method, **chart_kwargs)
             elif chart_type == 'scatter':
-                # scatter的参数映射：color -> c, markersize -> s, markerfacecolor -> c (通过c参数)
-                # scatter不支持：linestyle, linewidth, drawstyle, solid_capstyle, solid_joinstyle
-                scatter_kwargs = {}
-                if 'color' in plot_kwargs:
-                    scatter_kwargs['c'] = plot_kwargs['color']
-                if 'alpha' in plot_kwargs:
-                    scatter_kwargs['alpha'] = plot_kwargs['alpha']
-                if 'markersize' in plot_kwargs:
-                    scatter_kwargs['s'] = plot_kwargs['markersize'] ** 2  # scatter的s是面积，需要平方
-                if 'marker' in plot_kwargs:
-                    scatter_kwargs['marker'] = plot_kwargs['marker']
-                if 'markerfacecolor' in plot_kwargs:
-                    scatter_kwargs['c'] = plot_kwargs['markerfacecolor']
-                if 'markeredgecolor' in plot_kwargs:
-                    scatter_kwargs['edgecolors'] = plot_kwargs['markeredgecolor']
-                if 'markeredgewidth' in plot_kwargs:
-                    scatter_kwargs['linewidths'] = plot_kwargs['markeredgewidth']
-                ax.scatter(x, y, **scatter_kwargs)
+                ax.scatter(x, y, **chart_kwargs)
             elif chart_type == 'bar':
-                # bar不支持：linestyle, marker相关, linewidth, drawstyle, solid_capstyle, solid_joinstyle
-                bar_kwargs = {}
-                if 'color' in plot_kwargs:
-                    bar_kwargs['color'] = plot_kwargs['color']
-                if 'alpha' in plot_kwargs:
-                    bar_kwargs['alpha'] = plot_kwargs['alpha']
-                ax.bar(x[:10], y[:10], **bar_kwargs)
+                ax.bar(x[:10], y[:10], **chart_kwargs)
             elif chart_type == 'hist':
-                # hist不支持：linestyle, marker相关, linewidth, drawstyle, solid_capstyle, solid_joinstyle
-                hist_kwargs = {}
-                if 'color' in plot_kwargs:
-                    hist_kwargs['color'] = plot_kwargs['color']
-                if 'alpha' in plot_kwargs:
-                    hist_kwargs['alpha'] = plot_kwargs['alpha']
-                ax.hist(y, bins=20, **hist_kwargs)
+                ax.hist(y, bins=20, **chart_kwargs)
             elif chart_type == 'box':
-                # boxplot不支持color和alpha参数，需要通过patch_artist和boxprops设置
-                ax.boxplot([y], patch_artist=True)
-                # 设置颜色
-                if 'color' in plot_kwargs:
-                    for patch in ax.artists:
-                        patch.set_facecolor(plot_kwargs['color'])
-                        if 'alpha' in plot_kwargs:
-                            patch.set_alpha(plot_kwargs['alpha'])
+                ax.boxplot([y], **chart_kwargs)
             elif chart_type == 'pie':
-                # pie只支持colors参数（需要是列表），不支持alpha
-                pie_kwargs = {}
-                if 'color' in plot_kwargs:
-                    # pie需要colors参数（列表），而不是color
-                    pie_kwargs['colors'] = [plot_kwargs['color']] * 5
-                ax.pie(np.abs(y[:5]), labels=[f'Item {i+1}' for i in range(5)], **pie_kwargs)
+                ax.pie(np.abs(y[:5]), labels=[f'Item {i+1}' for i in range(5)], **chart_kwargs)
             
             # 设置坐标轴范围
-            if params.get('xlim') is not None:
-                ax.set_xlim(params['xlim'])
-            if params.get('ylim') is not None:
-                ax.set_ylim(params['ylim'])
+            if params.xlim is not None:
+                ax.set_xlim(params.xlim)
+            if params.ylim is not None:
+                ax.set_ylim(params.ylim)
             
             # Grid
-            if params.get('grid', False):
-                grid_kwargs = {}
-                if params.get('grid_alpha') is not None:
-                    grid_kwargs['alpha'] = params['grid_alpha']
-                if params.get('grid_linestyle') is not None:
-                    grid_kwargs['linestyle'] = params['grid_linestyle']
-                if params.get('grid_color') is not None:
-                    grid_kwargs['color'] = params['grid_color']
-                ax.grid(True, **grid_kwargs)
+            if params.grid:
+                ax.grid(True, **params.grid_kwargs())
             
             # Spines
-            if not params.get('spine_top', True):
-                ax.spines['top'].set_visible(False)
-            if not params.get('spine_right', True):
-                ax.spines['right'].set_visible(False)
-            if not params.get('spine_bottom', True):
-                ax.spines['bottom'].set_visible(False)
-            if not params.get('spine_left', True):
-                ax.spines['left'].set_visible(False)
+            for spine in params.hidden_spines:
+                ax.spines[spine].set_visible(False)
             
             # Title和Labels（仅对第一个子图或单个图）
             if idx == 0:
-                title_params = {}
-                if params.get('title_fontsize') is not None:
-                    title_params['fontsize'] = params['title_fontsize']
-                if params.get('title_fontweight') is not None:
-                    title_params['fontweight'] = params['title_fontweight']
-                if params.get('title_fontstyle') is not None:
-                    title_params['fontstyle'] = params['title_fontstyle']
-                if params.get('title_fontfamily') is not None:
-                    title_params['fontfamily'] = params['title_fontfamily']
-                if params.get('title_color') is not None:
-                    title_params['color'] = params['title_color']
-                
-                if params.get('title'):
-                    ax.set_title(params['title'], **title_params)
-                
-                xlabel_params = {}
-                if params.get('xlabel_fontsize') is not None:
-                    xlabel_params['fontsize'] = params['xlabel_fontsize']
-                if params.get('xlabel_fontweight') is not None:
-                    xlabel_params['fontweight'] = params['xlabel_fontweight']
-                if params.get('xlabel_fontstyle') is not None:
-                    xlabel_params['fontstyle'] = params['xlabel_fontstyle']
-                if params.get('xlabel_fontfamily') is not None:
-                    xlabel_params['fontfamily'] = params['xlabel_fontfamily']
-                if params.get('xlabel'):
-                    ax.set_xlabel(params['xlabel'], **xlabel_params)
-                
-                ylabel_params = {}
-                if params.get('ylabel_fontsize') is not None:
-                    ylabel_params['fontsize'] = params['ylabel_fontsize']
-                if params.get('ylabel_fontweight') is not None:
-                    ylabel_params['fontweight'] = params['ylabel_fontweight']
-                if params.get('ylabel_fontstyle') is not None:
-                    ylabel_params['fontstyle'] = params['ylabel_fontstyle']
-                if params.get('ylabel_fontfamily') is not None:
-                    ylabel_params['fontfamily'] = params['ylabel_fontfamily']
-                if params.get('ylabel'):
-                    ax.set_ylabel(params['ylabel'], **ylabel_params)
+                if params.title:
+                    ax.set_title(params.title, **params.title_kwargs())
+                if params.xlabel:
+                    ax.set_xlabel(params.xlabel, **params.label_kwargs('x'))
+                if params.ylabel:
+                    ax.set_ylabel(params.ylabel, **params.label_kwargs('y'))
             else:
                 # 其他子图显示编号
                 ax.set_title(f"Subplot {idx+1}", fontsize=10)
         
+        # 与生成代码中的 plt.tight_layout() 保持一致（子图已使用 constrained_layout）
+        if not params.is_subplots:
+            tight_layout(fig)
+        
+        # 草稿、后台的完整分辨率渲染和导出都在代码块外编码，编码时重新应用这份参数
+        attach_figure_rc(fig)
         return fig
 
 def render_interactive_editor():
@@ -552,64 +188,14 @@ def render_interactive_editor():
     </div>
     """, unsafe_allow_html=True)
     
-    # 初始化session state
-    if 'plot_params' not in st.session_state:
-        st.session_state.plot_params = {
-            # Chart Type
-            'chart_type': 'plot',
-            'subplot_rows': 1,
-            'subplot_cols': 1,
-            'style_sheet': 'default',
-            # Figure
-            'figsize': (8.0, 6.0),
-            'dpi': 100,
-            'facecolor': 'white',
-            # Line
-            'linewidth': 2.0,
-            'linestyle': '-',
-            'color': 'C0',
-            'alpha': 1.0,
-            'drawstyle': 'default',
-            'capstyle': 'butt',
-            'joinstyle': 'miter',
-            # Marker
-            'marker': None,
-            'markersize': 6,
-            'markerfacecolor': None,
-            'markeredgecolor': None,
-            'markeredgewidth': 1,
-            'fillstyle': 'full',
-            # Axes
-            'xlim': None,
-            'ylim': None,
-            'grid': False,
-            'grid_alpha': 0.3,
-            'grid_linestyle': '-',
-            'grid_color': None,
-            'spine_top': True,
-            'spine_right': True,
-            'spine_bottom': True,
-            'spine_left': True,
-            # Text
-            'title': '',
-            'title_fontsize': 14,
-            'title_fontweight': 'normal',
-            'title_fontstyle': 'normal',
-            'title_fontfamily': 'sans-serif',
-            'title_color': None,
-            'xlabel': '',
-            'xlabel_fontsize': 12,
-            'xlabel_fontweight': 'normal',
-            'xlabel_fontstyle': 'normal',
-            'xlabel_fontfamily': 'sans-serif',
-            'ylabel': '',
-            'ylabel_fontsize': 12,
-            'ylabel_fontweight': 'normal',
-            'ylabel_fontstyle': 'normal',
-            'ylabel_fontfamily': 'sans-serif',
-        }
+    # 初始化session state（PlotParams 是渲染和代码生成的唯一参数来源）
+    first_run = 'plot_params' not in st.session_state
+    if first_run:
+        st.session_state.plot_params = PlotParams()
+    previous = st.session_state.plot_params
     
-    params = st.session_state.plot_params
+    # 控件在参数字典上逐项修改，全部读取完毕后再构造新的 PlotParams
+    params = previous.to_dict()
     
     # 使用两列布局：左侧参数面板，右侧图表和代码
     col_left, col_right = st.columns([1, 1.5])
@@ -652,14 +238,18 @@ def render_interactive_editor():
                 current_style = 'default'
                 params['style_sheet'] = 'default'
             
-            style_idx = available_styles.index(current_style) if current_style in available_styles else 0
+            # 选择框的值保存在 session_state 中（样式缩略图画廊也会修改这个 key）
+            if st.session_state.get('style_sheet') not in available_styles:
+                st.session_state['style_sheet'] = current_style
             params['style_sheet'] = st.selectbox(
                 f"样式表 (Style Sheet) - 共 {len(available_styles)} 个", 
                 available_styles, 
-                index=style_idx, 
                 key='style_sheet',
                 help="选择图表样式。安装matplotlib-stylelib可获得更多样式选项。"
             )
+            if st.toggle("🖼️ 显示样式缩略图", key='style_sheet_gallery'):
+                render_style_gallery(available_styles, state_key='style_sheet', columns=2,
+                                     current=params['style_sheet'])
         
         # 使用expander组织参数
         with st.expander("📐 Figure (画布)", expanded=True):
@@ -706,6 +296,18 @@ def render_interactive_editor():
                 joinstyles = get_joinstyle_options()
                 joinstyle_idx = joinstyles.index(params.get('joinstyle', 'miter')) if params.get('joinstyle', 'miter') in joinstyles else 0
                 params['joinstyle'] = st.selectbox("连接样式 (joinstyle)", joinstyles, index=joinstyle_idx, key='joinstyle')
+                
+                # 数据量与降采样
+                params['n_points'] = st.select_slider(
+                    "数据点数", [50, 1000, 100_000, 1_000_000], value=params.get('n_points', 50),
+                    format_func=lambda n: f"{n:,}", key='n_points'
+                )
+                decimation_options = list(DECIMATION_METHODS) + ['none']
+                decimation_idx = decimation_options.index(params.get('decimation', 'm4')) if params.get('decimation', 'm4') in decimation_options else 0
+                params['decimation'] = st.selectbox(
+                    "降采样 (decimation)", decimation_options, index=decimation_idx, key='decimation',
+                    help="点数超过图表像素宽度时先降采样再绘制；'none' 表示绘制全部点"
+                )
         else:
             # 对于非 plot 类型，只显示颜色和透明度
             with st.expander("🎨 颜色与透明度", expanded=True):
@@ -817,29 +419,41 @@ def render_interactive_editor():
                 ylabel_fw_idx = fontweights.index(params.get('ylabel_fontweight', 'normal')) if params.get('ylabel_fontweight', 'normal') in fontweights else 0
                 params['ylabel_fontweight'] = st.selectbox("Y轴标签字体粗细", fontweights[:5], index=min(ylabel_fw_idx, 4), key='ylabel_fontweight')
     
+    try:
+        plot_params = PlotParams.from_dict(params)
+    except ValueError as e:
+        st.error(f"参数无效，保留上一次的设置: {str(e)}")
+        plot_params = previous
+    st.session_state.plot_params = plot_params
+    changes = {} if first_run else plot_params.diff(previous)
+    
     with col_right:
         st.markdown("### 📊 实时预览")
         
         # 渲染图表
+        # 先显示按预览宽度渲染的低分辨率草稿，完整 dpi 的图片在后台渲染完成后自动替换
+        settings = resolve_render_settings(plot_params)
+        if settings.warning:
+            st.warning(settings.warning)
         try:
-            fig = render_plot(params)
-            st.pyplot(fig)
-            plt.close(fig)
+            show_progressive_figure(lambda: render_plot(plot_params, settings), plot_params.cache_key,
+                                    plot_params.dpi, state_key='editor_preview')
         except Exception as e:
             st.error(f"渲染错误: {str(e)}")
             st.info("请检查参数设置是否正确")
         
+        with st.expander("💾 导出图片", expanded=False):
+            # PlotParams 不可变，后台导出任务不受之后修改的影响
+            render_export_panel(lambda: render_plot(plot_params, settings), plot_params.cache_key, plot_params.figsize,
+                                file_stem='matplotlib_figure', key_prefix='editor_export')
+        
         st.markdown("### 💻 生成代码")
-        code = generate_code(params)
+        if changes:
+            # 只有依赖这些字段的代码片段会重新生成，其余片段直接复用缓存
+            sections = plot_params.changed_sections(previous)
+            st.caption("🔄 本次修改：" + "，".join(f"`{name}` {old!r} → {new!r}" for name, (old, new) in list(changes.items())[:5])
+                       + ("…" if len(changes) > 5 else "") + f"（重新生成片段：{', '.join(sections)}）")
+        code = generate_code(plot_params)
+        # st.code 自带复制按钮（代码框右上角），无需再把代码嵌入 HTML
         st.code(code, language='python')
-        
-        # 复制代码按钮
-        st.markdown(f"""
-        <div style='margin-top: 1rem;'>
-            <button onclick="navigator.clipboard.writeText(`{code.replace('`', '\\`').replace('$', '\\$')}`)" 
-                    style='background-color: #3b82f6; color: white; border: none; padding: 0.5rem 1rem; border-radius: 6px; cursor: pointer;'>
-                复制代码
-            </button>
-        </div>
-        """, unsafe_allow_html=True)
 
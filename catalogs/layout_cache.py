@@ -0,0 +1,207 @@
+"""
+布局缓存 - 复用 tight_layout / constrained_layout 的求解结果
+
+两种布局引擎每次渲染都要测量所有标题、标签和刻度标签的尺寸再迭代求解。同一张图的布局只取决于
+Figure 尺寸、子图网格和这些文字（内容与字体），因此按这些信息生成签名，签名相同时直接套用上次的结果：
+- tight_layout：缓存求解后的 subplotpars（left/right/bottom/top/wspace/hspace）
+- constrained_layout：缓存求解后每个 Axes 的位置（以及 suptitle 等 Figure 级标签的位置）
+
+设置环境变量 MPL_TEACH_VERIFY_LAYOUT=1 进入校验模式：命中缓存时仍重新求解一次并与缓存比较，
+不一致时发出警告并改用新结果（用于发现签名遗漏的布局因素）。
+"""
+import hashlib
+import os
+import threading
+import time
+import warnings
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+import matplotlib.font_manager as fm
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.layout_engine import ConstrainedLayoutEngine
+from matplotlib.transforms import Bbox
+
+# 缓存条目上限（超出后丢弃最早的条目）
+MAX_LAYOUT_ENTRIES = 2048
+# 校验模式下认为结果一致的误差（Figure 坐标）
+VERIFY_TOLERANCE = 1e-9
+SUBPLOTPARS = ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')
+FIGURE_LABELS = ('_suptitle', '_supxlabel', '_supylabel')
+
+_layouts: Dict[str, object] = {}
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'mismatches': 0}
+# 每个 Figure 累计的布局耗时（秒），由 show_figure 取出计入统计
+_layout_seconds: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+
+
+def is_verify_mode() -> bool:
+    return os.environ.get('MPL_TEACH_VERIFY_LAYOUT', '') not in ('', '0')
+
+
+def _font_signature(prop) -> Tuple:
+    # FontProperties 的哈希只包含字体族名（如 'sans-serif'），实际使用的字体由 rcParams 决定，
+    # 与 text_sheet.measure_text 一样加上 findfont 解析出的字体文件和字号
+    return (hash(prop), fm.findfont(prop), prop.get_size_in_points())
+
+
+def _text_signature(text) -> Tuple:
+    if text is None or not text.get_visible() or not text.get_text():
+        return ()
+    return (text.get_text(), _font_signature(text.get_fontproperties()), text.get_rotation(),
+            text.get_position(), text.get_ha(), text.get_va())
+
+
+def _ticklabel_signature(axis, minor: bool) -> Tuple:
+    # 直接用 locator/formatter 得到刻度文字，不为每个刻度创建 Tick 对象（刻度文字的字体取第一个刻度的设置）
+    locator = axis.get_minor_locator() if minor else axis.get_major_locator()
+    formatter = axis.get_minor_formatter() if minor else axis.get_major_formatter()
+    locs = locator()
+    if len(locs) == 0:
+        return ()
+    label = (axis.minorTicks if minor else axis.majorTicks)[0].label1
+    return (tuple(formatter.format_ticks(locs)), _font_signature(label.get_fontproperties()), label.get_rotation())
+
+
+def _axis_signature(axis) -> Tuple:
+    if not axis.get_visible():
+        return ()
+    return (axis.label_position if hasattr(axis, 'label_position') else None,
+            _text_signature(axis.label), axis.labelpad, axis.get_tick_padding(),
+            repr(sorted(axis.get_tick_params().items())),
+            _ticklabel_signature(axis, minor=False), _ticklabel_signature(axis, minor=True))
+
+
+def _axes_signature(ax) -> Tuple:
+    spec = ax.get_subplotspec()
+    geometry = spec.get_geometry() if spec is not None else tuple(ax.get_position(original=True).bounds)
+    if not ax.get_visible() or not ax.get_in_layout():
+        return (type(ax).__name__, geometry, 'excluded')
+    axes = [ax.xaxis, ax.yaxis] + ([ax.zaxis] if hasattr(ax, 'zaxis') else [])
+    legend = ax.get_legend()
+    return (type(ax).__name__, geometry, ax.axison,
+            tuple(_text_signature(title) for title in (ax.title, ax._left_title, ax._right_title)),
+            tuple(_axis_signature(axis) for axis in axes) if ax.axison else (),
+            tuple(_text_signature(text) for text in ax.texts),
+            (legend._loc, tuple(legend.get_bbox_to_anchor().bounds),
+             tuple(_text_signature(text) for text in legend.get_texts())) if legend is not None else ())
+
+
+def layout_signature(fig, options: Tuple = ()) -> str:
+    """布局签名：Figure 尺寸与 dpi、子图网格、所有参与布局的文字（内容与字体）以及布局参数"""
+    parts = (tuple(fig.get_size_inches()), fig.dpi, options,
+             tuple(getattr(fig.subplotpars, name) for name in SUBPLOTPARS),
+             tuple(_text_signature(text) for text in fig.texts),
+             tuple(_axes_signature(ax) for ax in fig.axes))
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def _get(key: str):
+    with _lock:
+        value = _layouts.get(key)
+        _stats['hits' if value is not None else 'misses'] += 1
+        return value
+
+
+def _put(key: str, value) -> None:
+    with _lock:
+        _layouts[key] = value
+        while len(_layouts) > MAX_LAYOUT_ENTRIES:
+            del _layouts[next(iter(_layouts))]
+
+
+def _report_mismatch(kind: str, cached, fresh) -> None:
+    with _lock:
+        _stats['mismatches'] += 1
+    warnings.warn(f"{kind} 布局缓存与重新求解的结果不一致，已改用新结果：{cached} -> {fresh}")
+
+
+def _add_layout_time(fig, seconds: float) -> None:
+    with _lock:
+        _layout_seconds[fig] = _layout_seconds.get(fig, 0.0) + seconds
+
+
+def get_layout_seconds(fig, reset: bool = False) -> float:
+    """Figure 累计的布局耗时（秒）；reset=True 时取出后清零"""
+    with _lock:
+        if reset:
+            return _layout_seconds.pop(fig, 0.0)
+        return _layout_seconds.get(fig, 0.0)
+
+
+def get_layout_cache_info() -> Dict[str, int]:
+    """布局缓存的命中统计（mismatches 为校验模式下发现的不一致次数）"""
+    with _lock:
+        return {**_stats, 'size': len(_layouts)}
+
+
+def _subplotpars(fig) -> Tuple[float, ...]:
+    return tuple(getattr(fig.subplotpars, name) for name in SUBPLOTPARS)
+
+
+def tight_layout(fig=None, pad: float = 1.08, h_pad: Optional[float] = None, w_pad: Optional[float] = None,
+                 rect: Optional[Tuple[float, float, float, float]] = None) -> None:
+    """带缓存的 fig.tight_layout()（fig 为空时与 plt.tight_layout() 一样作用于当前 Figure）"""
+    fig = fig or plt.gcf()
+    start = time.perf_counter()
+    key = layout_signature(fig, ('tight', pad, h_pad, w_pad, rect))
+    cached = _get(key)
+    if cached is None or is_verify_mode():
+        fig.tight_layout(pad=pad, h_pad=h_pad, w_pad=w_pad, rect=rect)
+        fresh = _subplotpars(fig)
+        if cached is not None and not np.allclose(cached, fresh, rtol=0, atol=VERIFY_TOLERANCE):
+            _report_mismatch('tight_layout', cached, fresh)
+        _put(key, fresh)
+    else:
+        fig.subplots_adjust(**dict(zip(SUBPLOTPARS, cached)))
+    _add_layout_time(fig, time.perf_counter() - start)
+
+
+def _axes_positions(fig) -> List[Tuple[Tuple[float, ...], Tuple[float, ...]]]:
+    return [(tuple(ax.get_position(original=True).bounds), tuple(ax.get_position(original=False).bounds))
+            for ax in fig.axes]
+
+
+def _figure_label_positions(fig) -> List[Optional[Tuple[float, float]]]:
+    labels = [getattr(fig, name, None) for name in FIGURE_LABELS]
+    return [tuple(label.get_position()) if label is not None else None for label in labels]
+
+
+class CachedConstrainedLayoutEngine(ConstrainedLayoutEngine):
+    """constrained_layout 引擎：签名相同时直接恢复上次求解得到的 Axes 位置"""
+
+    def execute(self, fig):
+        start = time.perf_counter()
+        try:
+            if fig.subfigs:
+                # 子 Figure 的布局嵌套求解，不缓存
+                return super().execute(fig)
+            key = layout_signature(fig, ('constrained', repr(sorted(self.get().items())), self._compress))
+            cached = _get(key)
+            if cached is not None and not is_verify_mode():
+                for ax, (original, active) in zip(fig.axes, cached[0]):
+                    ax._set_position(Bbox.from_bounds(*original), which='original')
+                    ax._set_position(Bbox.from_bounds(*active), which='active')
+                for name, position in zip(FIGURE_LABELS, cached[1]):
+                    if position is not None:
+                        getattr(fig, name).set_position(position)
+                return None
+            result = super().execute(fig)
+            fresh = (_axes_positions(fig), _figure_label_positions(fig))
+            if cached is not None and not np.allclose(np.array(cached[0], dtype=float).ravel(),
+                                                      np.array(fresh[0], dtype=float).ravel(),
+                                                      rtol=0, atol=VERIFY_TOLERANCE):
+                _report_mismatch('constrained_layout', cached[0], fresh[0])
+            _put(key, fresh)
+            return result
+        finally:
+            _add_layout_time(fig, time.perf_counter() - start)
+
+
+def enable_layout_cache(fig) -> None:
+    """把 Figure 的 constrained_layout 引擎换成带缓存的版本（其余情况不做改动）"""
+    engine = fig.get_layout_engine()
+    if type(engine) is ConstrainedLayoutEngine:
+        fig.set_layout_engine(CachedConstrainedLayoutEngine(**engine.get(), compress=engine._compress))
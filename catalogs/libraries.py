@@ -0,0 +1,243 @@
+"""
+其他库实战（第6章）相关的数据与图表缓存
+"""
+import hashlib
+import itertools
+import json
+from concurrent.futures import Future
+from typing import Dict, List, Sequence, Tuple
+
+import altair as alt
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import seaborn as sns
+import streamlit as st
+from matplotlib.figure import Figure
+
+from catalogs.aggregate import bin_2d, bin_centers, group_mean
+from catalogs.rc_isolation import attach_figure_rc, rc_lock
+from catalogs.render_cache import FigureCache, figure_to_png, get_render_executor, make_cache_key
+
+# 联合分布图支持的 kind（依次预计算）
+JOINTPLOT_KINDS = ['scatter', 'kde', 'hist']
+
+_jointplot_cache = FigureCache('jointplot')
+
+
+@st.cache_data
+def get_iris_data() -> pd.DataFrame:
+    """获取第6章使用的 iris 数据集"""
+    return px.data.iris()
+
+
+def get_numeric_columns(df: pd.DataFrame) -> List[str]:
+    """获取可作为坐标轴的数值列（去掉 species 和 species_id）"""
+    return list(df.columns[:-2])
+
+
+def _jointplot_figure(df: pd.DataFrame, col_x: str, col_y: str, kind: str = 'scatter',
+                      height: float = 6, ratio: int = 5, space: float = .2) -> Figure:
+    """在独立的 Figure 上绘制与 sns.jointplot(data=df, x=col_x, y=col_y, hue='species', kind=kind) 相同的图
+
+    sns.jointplot 通过 plt.figure 创建图表并调用 plt.sca，会改动 pyplot 的全局状态；
+    预计算在后台线程中运行，与脚本线程同时使用 pyplot 会互相干扰，因此这里按 JointGrid 的布局
+    直接创建 Figure，再用接受 ax 参数的 seaborn 函数绘制。
+    """
+    if kind not in JOINTPLOT_KINDS:
+        raise ValueError(f"未知的联合分布图类型: '{kind}'，可选: {JOINTPLOT_KINDS}")
+    fig = Figure(figsize=(height, height))
+    gs = fig.add_gridspec(ratio + 1, ratio + 1)
+    ax_joint = fig.add_subplot(gs[1:, :-1])
+    ax_marg_x = fig.add_subplot(gs[0, :-1], sharex=ax_joint)
+    ax_marg_y = fig.add_subplot(gs[1:, -1], sharey=ax_joint)
+
+    # 与 JointGrid 相同：隐藏边缘图在数值轴上的刻度和刻度标签
+    hidden = [ax_marg_x.get_xticklabels(), ax_marg_y.get_yticklabels(),
+              ax_marg_x.get_xticklabels(minor=True), ax_marg_y.get_yticklabels(minor=True),
+              ax_marg_x.yaxis.get_majorticklines(), ax_marg_x.yaxis.get_minorticklines(),
+              ax_marg_y.xaxis.get_majorticklines(), ax_marg_y.xaxis.get_minorticklines(),
+              ax_marg_x.get_yticklabels(), ax_marg_y.get_xticklabels(),
+              ax_marg_x.get_yticklabels(minor=True), ax_marg_y.get_xticklabels(minor=True)]
+    for artists in hidden:
+        for artist in artists:
+            artist.set_visible(False)
+    ax_marg_x.yaxis.grid(False)
+    ax_marg_y.xaxis.grid(False)
+    ax_joint.set_xlabel(col_x)
+    ax_joint.set_ylabel(col_y)
+    sns.despine(fig)
+    sns.despine(ax=ax_marg_x, left=True)
+    sns.despine(ax=ax_marg_y, bottom=True)
+    for axes in [ax_marg_x, ax_marg_y]:
+        for axis in [axes.xaxis, axes.yaxis]:
+            axis.label.set_visible(False)
+    fig.tight_layout()
+    fig.subplots_adjust(hspace=space, wspace=space)
+
+    common = dict(data=df, hue="species", color="C0")
+    marginal = dict(common, legend=False)
+    if kind == 'scatter':
+        sns.scatterplot(x=col_x, y=col_y, ax=ax_joint, **common)
+        marginal.update(warn_singular=False, fill=True)
+        sns.kdeplot(x=col_x, ax=ax_marg_x, **marginal)
+        sns.kdeplot(y=col_y, ax=ax_marg_y, **marginal)
+    elif kind == 'kde':
+        sns.kdeplot(x=col_x, y=col_y, ax=ax_joint, warn_singular=False, **common)
+        sns.kdeplot(x=col_x, ax=ax_marg_x, **marginal)
+        sns.kdeplot(y=col_y, ax=ax_marg_y, **marginal)
+    else:
+        sns.histplot(x=col_x, y=col_y, ax=ax_joint, **common)
+        sns.histplot(x=col_x, ax=ax_marg_x, kde=False, **marginal)
+        sns.histplot(y=col_y, ax=ax_marg_y, kde=False, **marginal)
+    ax_marg_x.yaxis.get_label().set_visible(False)
+    ax_marg_y.xaxis.get_label().set_visible(False)
+    return fig
+
+
+def render_jointplot_png(df: pd.DataFrame, col_x: str, col_y: str, kind: str = 'scatter') -> bytes:
+    """渲染 seaborn 联合分布图并编码为 PNG（不经过 pyplot，可在后台线程中调用）
+
+    创建期间持有 rc_lock，不会读到其他会话隔离渲染中的样式；编码时使用创建时的 rcParams，不再持锁。
+    """
+    with rc_lock:
+        fig = _jointplot_figure(df, col_x, col_y, kind)
+        attach_figure_rc(fig)
+    return figure_to_png(fig)
+
+
+def get_jointplot_png(df: pd.DataFrame, col_x: str, col_y: str, kind: str = 'scatter') -> bytes:
+    """获取联合分布图 PNG，命中缓存时不再调用 seaborn"""
+    key = make_cache_key('jointplot', col_x, col_y, kind)
+    png = _jointplot_cache.get(key)
+    if png is None:
+        png = render_jointplot_png(df, col_x, col_y, kind)
+        _jointplot_cache.set(key, png)
+    return png
+
+
+def _precompute_jointplots(df: pd.DataFrame, columns: List[str]) -> int:
+    """依次渲染所有 (kind, col_x, col_y) 组合，返回新生成的图片数量"""
+    rendered = 0
+    for kind in JOINTPLOT_KINDS:
+        for col_x, col_y in itertools.product(columns, repeat=2):
+            key = make_cache_key('jointplot', col_x, col_y, kind)
+            if key in _jointplot_cache:
+                continue
+            try:
+                _jointplot_cache.set(key, render_jointplot_png(df, col_x, col_y, kind))
+                rendered += 1
+            except Exception:
+                # 个别组合（如 x == y 时的 kde）无法绘制，跳过即可
+                continue
+    return rendered
+
+
+@st.cache_resource
+def start_jointplot_precompute() -> Future:
+    """在后台线程中预计算所有列组合的联合分布图（每个服务进程只启动一次）"""
+    df = get_iris_data()
+    return get_render_executor().submit(_precompute_jointplots, df, get_numeric_columns(df))
+
+
+def get_cached_jointplot_count(df: pd.DataFrame) -> int:
+    """返回已缓存的联合分布图数量，用于界面提示"""
+    columns = get_numeric_columns(df)
+    return sum(make_cache_key('jointplot', x, y, kind) in _jointplot_cache
+               for kind in JOINTPLOT_KINDS for x, y in itertools.product(columns, repeat=2))
+
+
+# === 数据下发层：Altair / Plotly 图表规格 ===
+# 所有规格函数都返回纯 JSON 字典并由 st.cache_data 缓存，重复运行时发送完全相同的负载
+
+def make_named_dataset(df: pd.DataFrame, columns: Sequence[str], prefix: str = 'iris') -> Tuple[alt.NamedData, Dict[str, list]]:
+    """只保留图表用到的列，生成可被多个图表引用的命名数据集"""
+    records = df[list(columns)].to_dict('records')
+    digest = hashlib.sha1(json.dumps(records, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:12]
+    name = f"{prefix}_{digest}"
+    return alt.NamedData(name=name), {name: records}
+
+
+def _plotly_spec(fig: go.Figure) -> Dict:
+    """将 Plotly Figure 转为纯 JSON 字典"""
+    return json.loads(fig.to_json())
+
+
+@st.cache_data
+def get_altair_basic_spec() -> Dict:
+    """基础散点图：只下发 4 列"""
+    data, datasets = make_named_dataset(get_iris_data(), ['sepal_length', 'sepal_width', 'petal_length', 'species'])
+    chart = alt.Chart(data).mark_point().encode(
+        x='sepal_length:Q',
+        y='sepal_width:Q',
+        color='species:N',
+        size='petal_length:Q'
+    )
+    chart.datasets = datasets
+    return chart.to_dict()
+
+
+@st.cache_data
+def get_altair_brush_spec() -> Dict:
+    """刷选联动图：散点与柱状图引用同一个命名数据集"""
+    data, datasets = make_named_dataset(get_iris_data(), ['sepal_length', 'sepal_width', 'species'])
+    brush = alt.selection_interval()
+    points = alt.Chart(data).mark_point().encode(
+        x='sepal_length:Q', y='sepal_width:Q',
+        color=alt.condition(brush, 'species:N', alt.value('lightgray'))
+    ).add_params(brush)
+    bars = alt.Chart(data).mark_bar().encode(
+        y='species:N', color='species:N', x='count(species):Q'
+    ).transform_filter(brush)
+    chart = points & bars
+    chart.datasets = datasets
+    return chart.to_dict()
+
+
+@st.cache_data
+def get_altair_combined_spec() -> Dict:
+    """组合图：分组均值在服务端算好，柱状图只下发 3 行"""
+    df = get_iris_data()
+    species, means = group_mean(df['species'].to_numpy(), df['sepal_length'].to_numpy())
+    mean_values = [{'species': str(name), 'mean_sepal_length': float(value)} for name, value in zip(species, means)]
+    data, datasets = make_named_dataset(df, ['sepal_length', 'sepal_width', 'species'])
+    chart1 = alt.Chart(alt.Data(values=mean_values)).mark_bar().encode(
+        x='species:N', y=alt.Y('mean_sepal_length:Q', title='Mean of sepal_length')
+    )
+    chart2 = alt.Chart(data).mark_point().encode(x='sepal_length:Q', y='sepal_width:Q', color='species:N')
+    combined = chart1 | chart2
+    combined.datasets = datasets
+    return combined.to_dict()
+
+
+@st.cache_data
+def get_plotly_scatter_3d_spec() -> Dict:
+    """3D 散点图：只保留用到的列"""
+    df = get_iris_data()[['sepal_length', 'sepal_width', 'petal_width', 'petal_length', 'species']]
+    fig = px.scatter_3d(df, x='sepal_length', y='sepal_width', z='petal_width',
+                        color='species', size='petal_length', opacity=0.7)
+    return _plotly_spec(fig)
+
+
+@st.cache_data
+def get_plotly_line_spec(n_rows: int = 20) -> Dict:
+    """交互式线图：只下发前 n_rows 行"""
+    df = get_iris_data().head(n_rows)[['sepal_length', 'sepal_width', 'species']]
+    fig = px.line(df, x='sepal_length', y='sepal_width', color='species')
+    return _plotly_spec(fig)
+
+
+@st.cache_data
+def get_plotly_density_heatmap_spec(x_col: str = 'sepal_length', y_col: str = 'sepal_width', nbins: int = 20) -> Dict:
+    """密度热力图：在服务端用 np.histogram2d 分箱，浏览器只接收 nbins×nbins 的计数矩阵"""
+    df = get_iris_data()
+    counts, x_edges, y_edges = bin_2d(df[x_col].to_numpy(), df[y_col].to_numpy(), bins=nbins)
+    fig = go.Figure(go.Heatmap(
+        x=np.round(bin_centers(x_edges), 4),
+        y=np.round(bin_centers(y_edges), 4),
+        z=counts.astype(int),
+        colorbar=dict(title='count'),
+    ))
+    fig.update_layout(xaxis_title=x_col, yaxis_title=y_col)
+    return _plotly_spec(fig)
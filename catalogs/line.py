@@ -2,13 +2,15 @@
 Line（线条）相关参数的完整选项目录
 """
 import streamlit as st
-import matplotlib.pyplot as plt
 import matplotlib.lines
 import matplotlib._enums
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple
 from catalogs.utils import get_matplotlib_version, generate_sample_data, generate_sample_data_steps, ensure_chinese_font
+from catalogs.layout_cache import tight_layout
+from catalogs.rc_isolation import locked_subplots
+from catalogs.render_policy import show_figure
 
 @st.cache_data
 def get_linestyle_options() -> Dict:
@@ -85,7 +87,7 @@ def render_linestyle_gallery():
     cols = 2
     rows = (n_strings + cols - 1) // cols
     
-    fig, axes = plt.subplots(rows, cols, figsize=(12, rows * 2.5))
+    fig, axes = locked_subplots(rows, cols, figsize=(12, rows * 2.5))
     if rows == 1:
         axes = axes if isinstance(axes, np.ndarray) else [axes]
     else:
@@ -116,8 +118,8 @@ def render_linestyle_gallery():
     for idx in range(n_strings, len(axes)):
         axes[idx].axis('off')
     
-    plt.tight_layout()
-    st.pyplot(fig)
+    tight_layout()
+    show_figure(fig, fmt='svg')
     
     # === 合法值表格 ===
     st.markdown("### 📋 合法值表格")
@@ -151,7 +153,7 @@ def render_linestyle_gallery():
     cols_per_row = 3
     rows = (n_tuples + cols_per_row - 1) // cols_per_row
     
-    fig2, axes2 = plt.subplots(rows, cols_per_row, figsize=(4*cols_per_row, 2.5*rows))
+    fig2, axes2 = locked_subplots(rows, cols_per_row, figsize=(4*cols_per_row, 2.5*rows))
     if rows == 1:
         axes2 = axes2 if isinstance(axes2, np.ndarray) else [axes2]
     else:
@@ -172,8 +174,8 @@ def render_linestyle_gallery():
     for idx in range(n_tuples, len(axes2)):
         axes2[idx].axis('off')
     
-    plt.tight_layout()
-    st.pyplot(fig2)
+    tight_layout()
+    show_figure(fig2, fmt='svg')
     
     # === 交互式自定义 ===
     st.markdown("#### 🎛️ 交互式自定义虚线")
@@ -186,13 +188,13 @@ def render_linestyle_gallery():
         dash_off = st.number_input("Dash Off（空白长度）", min_value=1, max_value=20, value=5, key='ls_off')
     
     custom_ls = (offset, (dash_on, dash_off))
-    fig_custom, ax_custom = plt.subplots(figsize=(10, 3))
+    fig_custom, ax_custom = locked_subplots(figsize=(10, 3))
     ax_custom.plot(x, y, linestyle=custom_ls, linewidth=2.5, color='#2c3e50')
     ax_custom.set_title(f"linestyle={custom_ls}", fontsize=11, fontweight='bold')
     ax_custom.set_xlim(0, 10)
     ax_custom.set_ylim(-1.2, 1.2)
     ax_custom.grid(True, alpha=0.3)
-    st.pyplot(fig_custom)
+    show_figure(fig_custom, fmt='svg')
     
     st.code(f"""
 import matplotlib.pyplot as plt
@@ -245,7 +247,7 @@ def render_drawstyle_gallery():
     n_styles = len(drawstyles)
     cols = 2
     rows = (n_styles + cols - 1) // cols
-    fig, axes = plt.subplots(rows, cols, figsize=(12, rows * 3))
+    fig, axes = locked_subplots(rows, cols, figsize=(12, rows * 3))
     if rows == 1:
         axes = axes if isinstance(axes, np.ndarray) else [axes]
     else:
@@ -271,8 +273,8 @@ def render_drawstyle_gallery():
     for idx in range(n_styles, len(axes)):
         axes[idx].axis('off')
     
-    plt.tight_layout()
-    st.pyplot(fig)
+    tight_layout()
+    show_figure(fig)
     
     # 代码表格
     st.markdown("### 📋 合法值表格")
@@ -316,7 +318,7 @@ def render_capstyle_gallery():
     y = np.array([0.5, 0.5])
     
     # 预览（使用较粗的虚线以便看清端点）
-    fig, axes = plt.subplots(1, len(capstyles), figsize=(5*len(capstyles), 3))
+    fig, axes = locked_subplots(1, len(capstyles), figsize=(5*len(capstyles), 3))
     if len(capstyles) == 1:
         axes = [axes]
     
@@ -339,8 +341,8 @@ def render_capstyle_gallery():
         ax.axvline(x[1], color='red', linestyle=':', alpha=0.5, label='终点')
         ax.legend(fontsize=8)
     
-    plt.tight_layout()
-    st.pyplot(fig)
+    tight_layout()
+    show_figure(fig, fmt='svg')
     
     # 代码表格
     st.markdown("### 📋 合法值表格")
@@ -386,7 +388,7 @@ def render_joinstyle_gallery():
     y = np.array([0.2, 0.8, 0.3])
     
     # 预览（使用较粗的线以便看清连接）
-    fig, axes = plt.subplots(1, len(joinstyles), figsize=(5*len(joinstyles), 3))
+    fig, axes = locked_subplots(1, len(joinstyles), figsize=(5*len(joinstyles), 3))
     if len(joinstyles) == 1:
         axes = [axes]
     
@@ -406,8 +408,8 @@ def render_joinstyle_gallery():
         ax.axis('off')
         ax.legend(fontsize=8)
     
-    plt.tight_layout()
-    st.pyplot(fig)
+    tight_layout()
+    show_figure(fig)
     
     # 代码表格
     st.markdown("### 📋 合法值表格")
@@ -2,12 +2,14 @@
 Marker（标记点）相关参数的完整选项目录
 """
 import streamlit as st
-import matplotlib.pyplot as plt
 import matplotlib.lines
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple
 from catalogs.utils import get_matplotlib_version, generate_sample_data, ensure_chinese_font
+from catalogs.layout_cache import tight_layout
+from catalogs.rc_isolation import locked_subplots
+from catalogs.render_policy import show_figure
 
 @st.cache_data
 def get_marker_options() -> Dict:
@@ -93,7 +95,7 @@ def render_marker_gallery():
         cols = 4
         rows = (n_markers + cols - 1) // cols
         
-        fig, axes = plt.subplots(rows, cols, figsize=(3*cols, 2.5*rows))
+        fig, axes = locked_subplots(rows, cols, figsize=(3*cols, 2.5*rows))
         if rows == 1:
             axes = axes if isinstance(axes, np.ndarray) else [axes]
         else:
@@ -122,8 +124,8 @@ def render_marker_gallery():
         for idx in range(n_markers, len(axes)):
             axes[idx].axis('off')
         
-        plt.tight_layout()
-        st.pyplot(fig)
+        tight_layout()
+        show_figure(fig)
     
     # === 合法值表格（部分重要标记）===
     st.markdown("### 📋 常用标记表格")
@@ -197,7 +199,7 @@ def render_marker_gallery():
     with col3:
         marker_color = st.color_picker("标记颜色", "#2c3e50", key='marker_color')
     
-    fig_custom, ax_custom = plt.subplots(figsize=(10, 4))
+    fig_custom, ax_custom = locked_subplots(figsize=(10, 4))
     x_custom, y_custom = generate_sample_data(10)
     
     if marker_choice is not None:
@@ -212,7 +214,7 @@ def render_marker_gallery():
     ax_custom.set_title(f"Interactive Marker Preview", fontsize=11, fontweight='bold')
     ax_custom.grid(True, alpha=0.3)
     ax_custom.legend()
-    st.pyplot(fig_custom)
+    show_figure(fig_custom)
     
     marker_code = f"marker='{marker_choice}'" if marker_choice is not None else "marker=None"
     st.code(f"""
@@ -298,7 +300,7 @@ def render_fillstyle_gallery():
     n_fillstyles = len(fillstyles)
     n_markers = len(test_markers)
     
-    fig, axes = plt.subplots(n_fillstyles, n_markers, figsize=(2.5*n_markers, 2.5*n_fillstyles))
+    fig, axes = locked_subplots(n_fillstyles, n_markers, figsize=(2.5*n_markers, 2.5*n_fillstyles))
     if n_fillstyles == 1:
         axes = axes.reshape(1, -1)
     if n_markers == 1:
@@ -333,12 +335,12 @@ def render_fillstyle_gallery():
             ax.set_ylim(-1.5, 1.5)
             ax.axis('off')
     
-    plt.tight_layout()
-    st.pyplot(fig)
+    tight_layout()
+    show_figure(fig)
     
     # === 单个标记详细对比 ===
     st.markdown("### 🔍 单个标记详细对比（圆圈 'o'）")
-    fig2, axes2 = plt.subplots(1, n_fillstyles, figsize=(3*n_fillstyles, 3))
+    fig2, axes2 = locked_subplots(1, n_fillstyles, figsize=(3*n_fillstyles, 3))
     if n_fillstyles == 1:
         axes2 = [axes2]
     
@@ -353,8 +355,8 @@ def render_fillstyle_gallery():
         ax.grid(True, alpha=0.3)
         ax.axis('on')
     
-    plt.tight_layout()
-    st.pyplot(fig2)
+    tight_layout()
+    show_figure(fig2)
     
     # === 合法值表格 ===
     st.markdown("### 📋 合法值表格")
@@ -387,7 +389,7 @@ def render_fillstyle_gallery():
             key='fillstyle_choice'
         )
     
-    fig_custom, ax_custom = plt.subplots(figsize=(10, 4))
+    fig_custom, ax_custom = locked_subplots(figsize=(10, 4))
     x_custom, y_custom = generate_sample_data(8)
     
     ax_custom.plot(x_custom, y_custom, marker=marker_choice, linestyle='-', 
@@ -399,7 +401,7 @@ def render_fillstyle_gallery():
                        fontsize=11, fontweight='bold')
     ax_custom.grid(True, alpha=0.3)
     ax_custom.legend()
-    st.pyplot(fig_custom)
+    show_figure(fig_custom)
     
     st.code(f"""
 import matplotlib.pyplot as plt
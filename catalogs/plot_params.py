@@ -0,0 +1,268 @@
+"""
+交互式编辑器的参数模型 - 不可变、带校验的 PlotParams，渲染和代码生成共用同一份参数
+
+- cache_key：跨进程稳定的参数哈希（可用于磁盘缓存键）
+- diff / changed_sections：与上一次参数逐字段比较，只需比较字段，不必序列化
+- chart_kwargs / title_kwargs / label_kwargs / grid_kwargs：构造时算好，返回只读视图
+"""
+import hashlib
+from dataclasses import dataclass, field, fields, replace
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from catalogs.decimation import DECIMATION_METHODS
+
+CHART_TYPES = ['plot', 'scatter', 'bar', 'hist', 'box', 'pie']
+
+# 传给 matplotlib 与不传完全等价的取值：渲染和生成代码时都省略
+# 只收录没有对应 rcParams 的参数：linestyle、fillstyle、字体属性等的默认值可以被样式表改掉
+# （如 bmh / classic 的 grid.linestyle），即使取默认值也必须显式传入
+NOOP_VALUES = {
+    'alpha': 1.0,
+    'drawstyle': 'default',
+}
+
+# 字段分组：代码生成按分组决定哪些片段需要重新生成（每个片段只能读取本组列出的字段）
+_SUBPLOT_FIELDS = ('subplot_rows', 'subplot_cols')
+FIELD_SECTIONS: Dict[str, Tuple[str, ...]] = {
+    'style': ('style_sheet',),
+    'font': (),
+    'data': ('chart_type', 'n_points'),
+    'figure': _SUBPLOT_FIELDS + ('figsize', 'dpi', 'facecolor'),
+    'artist': _SUBPLOT_FIELDS + ('chart_type', 'n_points', 'decimation',
+                                 'linewidth', 'linestyle', 'color', 'alpha', 'drawstyle', 'capstyle', 'joinstyle',
+                                 'marker', 'markersize', 'markerfacecolor', 'markeredgecolor', 'markeredgewidth',
+                                 'fillstyle'),
+    'axes': _SUBPLOT_FIELDS + ('xlim', 'ylim', 'grid', 'grid_alpha', 'grid_linestyle', 'grid_color',
+                               'spine_top', 'spine_right', 'spine_bottom', 'spine_left'),
+    'text': _SUBPLOT_FIELDS + ('title', 'title_fontsize', 'title_fontweight', 'title_fontstyle', 'title_fontfamily',
+                               'title_color', 'xlabel', 'xlabel_fontsize', 'xlabel_fontweight', 'xlabel_fontstyle',
+                               'xlabel_fontfamily', 'ylabel', 'ylabel_fontsize', 'ylabel_fontweight',
+                               'ylabel_fontstyle', 'ylabel_fontfamily'),
+    'layout': _SUBPLOT_FIELDS,
+}
+
+
+def _drop_noops(pairs, noop_values: Mapping[str, Any] = NOOP_VALUES) -> Dict[str, Any]:
+    return {name: value for name, value in pairs if value is not None and noop_values.get(name, object()) != value}
+
+
+@dataclass(frozen=True, slots=True)
+class PlotParams:
+    """交互式编辑器的全部参数（不可变，修改请用 replace）"""
+    # Chart Type
+    chart_type: str = 'plot'
+    subplot_rows: int = 1
+    subplot_cols: int = 1
+    style_sheet: str = 'default'
+    # Figure
+    figsize: Tuple[float, float] = (8.0, 6.0)
+    dpi: int = 100
+    facecolor: str = 'white'
+    # Line
+    linewidth: float = 2.0
+    linestyle: str = '-'
+    color: str = 'C0'
+    alpha: float = 1.0
+    drawstyle: str = 'default'
+    capstyle: str = 'butt'
+    joinstyle: str = 'miter'
+    # Marker
+    marker: Optional[str] = None
+    markersize: float = 6
+    markerfacecolor: Optional[str] = None
+    markeredgecolor: Optional[str] = None
+    markeredgewidth: float = 1
+    fillstyle: str = 'full'
+    # 数据量
+    n_points: int = 50
+    decimation: str = 'm4'
+    # Axes
+    xlim: Optional[Tuple[float, float]] = None
+    ylim: Optional[Tuple[float, float]] = None
+    grid: bool = False
+    grid_alpha: float = 0.3
+    grid_linestyle: str = '-'
+    grid_color: Optional[str] = None
+    spine_top: bool = True
+    spine_right: bool = True
+    spine_bottom: bool = True
+    spine_left: bool = True
+    # Text
+    title: str = ''
+    title_fontsize: float = 14
+    title_fontweight: str = 'normal'
+    title_fontstyle: str = 'normal'
+    title_fontfamily: str = 'sans-serif'
+    title_color: Optional[str] = None
+    xlabel: str = ''
+    xlabel_fontsize: float = 12
+    xlabel_fontweight: str = 'normal'
+    xlabel_fontstyle: str = 'normal'
+    xlabel_fontfamily: str = 'sans-serif'
+    ylabel: str = ''
+    ylabel_fontsize: float = 12
+    ylabel_fontweight: str = 'normal'
+    ylabel_fontstyle: str = 'normal'
+    ylabel_fontfamily: str = 'sans-serif'
+    # 派生数据（构造时计算，不参与比较）
+    _key: str = field(init=False, repr=False, compare=False)
+    _kwargs: Mapping[str, Mapping[str, Any]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # session_state 中的旧数据可能是 list，统一转为 tuple 以便哈希
+        for name in ('figsize', 'xlim', 'ylim'):
+            value = getattr(self, name)
+            if value is not None:
+                object.__setattr__(self, name, tuple(float(v) for v in value))
+        self._validate()
+        object.__setattr__(self, '_key', hashlib.sha1(repr(self.astuple()).encode('utf-8')).hexdigest())
+        object.__setattr__(self, '_kwargs', MappingProxyType({
+            'chart': MappingProxyType(self._build_chart_kwargs()),
+            'title': MappingProxyType(self._build_text_kwargs('title', include_color=True)),
+            'xlabel': MappingProxyType(self._build_text_kwargs('xlabel')),
+            'ylabel': MappingProxyType(self._build_text_kwargs('ylabel')),
+            # 网格的 alpha / linestyle 都有对应的 rcParams（grid.alpha / grid.linestyle），只省略 None
+            'grid': MappingProxyType(_drop_noops([('alpha', self.grid_alpha), ('linestyle', self.grid_linestyle),
+                                                  ('color', self.grid_color)], noop_values={})),
+        }))
+
+    def _validate(self) -> None:
+        if self.chart_type not in CHART_TYPES:
+            raise ValueError(f"未知的图表类型: '{self.chart_type}'，可选: {CHART_TYPES}")
+        if not (1 <= self.subplot_rows <= 5 and 1 <= self.subplot_cols <= 5):
+            raise ValueError(f"子图行列数需在 1-5 之间: {self.subplot_rows}×{self.subplot_cols}")
+        if len(self.figsize) != 2 or min(self.figsize) <= 0:
+            raise ValueError(f"figsize 需为两个正数: {self.figsize}")
+        if self.dpi <= 0:
+            raise ValueError(f"dpi 必须为正数: {self.dpi}")
+        for name in ('alpha', 'grid_alpha'):
+            if not 0.0 <= getattr(self, name) <= 1.0:
+                raise ValueError(f"{name} 需在 0-1 之间: {getattr(self, name)}")
+        for name in ('linewidth', 'markersize', 'markeredgewidth'):
+            if getattr(self, name) < 0:
+                raise ValueError(f"{name} 不能为负数: {getattr(self, name)}")
+        if self.n_points < 2:
+            raise ValueError(f"n_points 至少为 2: {self.n_points}")
+        if self.decimation != 'none' and self.decimation not in DECIMATION_METHODS:
+            raise ValueError(f"未知的降采样方法: '{self.decimation}'，可选: {list(DECIMATION_METHODS) + ['none']}")
+        for name in ('xlim', 'ylim'):
+            value = getattr(self, name)
+            if value is not None and len(value) != 2:
+                raise ValueError(f"{name} 需为 (最小值, 最大值): {value}")
+
+    # === 构造与比较 ===
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> 'PlotParams':
+        """由字典构造（忽略未知键，缺失的键取默认值）"""
+        return cls(**{name: data[name] for name in FIELD_NAMES if name in data})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转为普通字典（供界面控件逐项修改后再 from_dict）"""
+        return {name: getattr(self, name) for name in FIELD_NAMES}
+
+    def astuple(self) -> Tuple:
+        return tuple(getattr(self, name) for name in FIELD_NAMES)
+
+    def replace(self, **changes) -> 'PlotParams':
+        return replace(self, **changes)
+
+    def __hash__(self) -> int:
+        # 复用构造时算好的参数哈希，作为 lru_cache 等的键时不必逐字段计算
+        return hash(self._key)
+
+    @property
+    def cache_key(self) -> str:
+        """跨进程稳定的参数哈希"""
+        return self._key
+
+    def diff(self, previous: Optional['PlotParams']) -> Dict[str, Tuple[Any, Any]]:
+        """与上一次参数比较，返回 {字段: (旧值, 新值)}；previous 为空时视为全部变化"""
+        if previous is None:
+            return {name: (None, getattr(self, name)) for name in FIELD_NAMES}
+        if previous._key == self._key:
+            return {}
+        return {name: (getattr(previous, name), getattr(self, name))
+                for name in FIELD_NAMES if getattr(previous, name) != getattr(self, name)}
+
+    def changed_sections(self, previous: Optional['PlotParams']) -> List[str]:
+        """发生变化的字段分组（见 FIELD_SECTIONS）"""
+        changed = self.diff(previous)
+        return [section for section, names in FIELD_SECTIONS.items() if any(name in changed for name in names)]
+
+    # === 派生属性 ===
+
+    @property
+    def is_subplots(self) -> bool:
+        return self.subplot_rows > 1 or self.subplot_cols > 1
+
+    @property
+    def data_points(self) -> int:
+        """实际使用的数据点数（只有折线图支持大数据量）"""
+        return self.n_points if self.chart_type == 'plot' else 50
+
+    @property
+    def decimation_method(self) -> str:
+        """预览实际使用的降采样方法：有标记点或阶梯绘制时降采样会改变图形，不做降采样"""
+        if self.marker is not None or self.drawstyle != 'default':
+            return 'none'
+        return self.decimation
+
+    @property
+    def hidden_spines(self) -> List[str]:
+        return [side for side in ('top', 'right', 'bottom', 'left') if not getattr(self, f'spine_{side}')]
+
+    # === 各类 kwargs（只读视图，不会复制） ===
+
+    def chart_kwargs(self) -> Mapping[str, Any]:
+        """当前图表类型对应绘图函数（ax.plot / ax.scatter / ...）的关键字参数"""
+        return self._kwargs['chart']
+
+    def title_kwargs(self) -> Mapping[str, Any]:
+        return self._kwargs['title']
+
+    def label_kwargs(self, axis: str) -> Mapping[str, Any]:
+        """axis 为 'x' 或 'y'"""
+        return self._kwargs[f'{axis}label']
+
+    def grid_kwargs(self) -> Mapping[str, Any]:
+        return self._kwargs['grid']
+
+    def _build_chart_kwargs(self) -> Dict[str, Any]:
+        if self.chart_type == 'plot':
+            kwargs = _drop_noops([
+                ('linewidth', self.linewidth), ('linestyle', self.linestyle), ('color', self.color),
+                ('alpha', self.alpha), ('drawstyle', self.drawstyle),
+                ('solid_capstyle', self.capstyle), ('solid_joinstyle', self.joinstyle),
+            ])
+            # 没有标记点时标记相关参数不起作用
+            if self.marker is not None:
+                kwargs.update(_drop_noops([
+                    ('marker', self.marker), ('markersize', self.markersize),
+                    ('markerfacecolor', self.markerfacecolor), ('markeredgecolor', self.markeredgecolor),
+                    ('markeredgewidth', self.markeredgewidth), ('fillstyle', self.fillstyle),
+                ]))
+            return kwargs
+        if self.chart_type == 'scatter':
+            # scatter 的参数映射：markerfacecolor 优先于 color 作为 c，markersize 平方后作为面积 s
+            return _drop_noops([
+                ('c', self.markerfacecolor if self.markerfacecolor is not None else self.color),
+                ('alpha', self.alpha), ('s', self.markersize ** 2), ('marker', self.marker),
+                ('edgecolors', self.markeredgecolor), ('linewidths', self.markeredgewidth),
+            ])
+        if self.chart_type in ('bar', 'hist'):
+            return _drop_noops([('color', self.color), ('alpha', self.alpha)])
+        if self.chart_type == 'box':
+            return {'patch_artist': True}
+        # pie 只支持 colors 列表，不支持 alpha
+        return {'colors': [self.color] * 5} if self.color is not None else {}
+
+    def _build_text_kwargs(self, prefix: str, include_color: bool = False) -> Dict[str, Any]:
+        pairs = [(name, getattr(self, f'{prefix}_{name}')) for name in ('fontsize', 'fontweight', 'fontstyle', 'fontfamily')]
+        if include_color:
+            pairs.append(('color', getattr(self, f'{prefix}_color')))
+        return _drop_noops(pairs)
+
+
+FIELD_NAMES: Tuple[str, ...] = tuple(f.name for f in fields(PlotParams) if f.init)
@@ -0,0 +1,114 @@
+"""
+渐进式预览 - 先按显示宽度输出低分辨率草稿，再在后台线程渲染完整分辨率并替换
+
+参数再次变化时，过期的完整渲染会被取消（尚未开始的任务直接取消，已开始的在编码前放弃）。
+"""
+import threading
+from concurrent.futures import CancelledError, Future
+from typing import Callable, Dict, Optional
+
+import matplotlib.pyplot as plt
+import streamlit as st
+
+from catalogs.encoders import (EncodedFigure, display_encoded, encode_figure, format_encode_result,
+                               get_output_settings, record_encode_stats)
+from catalogs.layout_cache import get_layout_seconds
+from catalogs.render_cache import get_render_executor
+from catalogs.render_policy import apply_render_policy, format_render_decision, show_figure
+
+# 预览区域的大致显示宽度（wide 布局下右侧栏约 700-800 像素），草稿按此宽度选择 dpi
+PREVIEW_WIDTH_PX = 800
+MIN_DRAFT_DPI = 20
+# 草稿 dpi 达到完整 dpi 的该比例时省略草稿，直接同步渲染完整分辨率
+SKIP_DRAFT_RATIO = 0.8
+POLL_INTERVAL = 0.5
+
+
+def get_draft_dpi(fig_width_in: float, full_dpi: int, width_px: int = PREVIEW_WIDTH_PX) -> int:
+    """让草稿宽度约等于显示宽度的 dpi（不超过完整 dpi）"""
+    return int(max(MIN_DRAFT_DPI, min(full_dpi, width_px / fig_width_in)))
+
+
+def _render_full(fig, full_dpi: int, fmt: str, settings: Dict, cancel: threading.Event) -> Optional[EncodedFigure]:
+    """后台线程：按完整 dpi 编码同一个 Figure；任务已过期时直接放弃"""
+    try:
+        if cancel.is_set():
+            return None
+        decision = apply_render_policy(fig, dpi=full_dpi)
+        if cancel.is_set():
+            return None
+        return encode_figure(fig, fmt, dpi=decision['dpi'], settings=settings)
+    finally:
+        plt.close(fig)
+
+
+def _cancel(state: Dict) -> None:
+    state['cancel'].set()
+    state['future'].cancel()
+
+
+def show_progressive_figure(render: Callable[[], plt.Figure], key: str, full_dpi: int,
+                            state_key: str = 'progressive_preview', width_px: int = PREVIEW_WIDTH_PX) -> None:
+    """渐进式显示 render() 生成的图表
+
+    key 标识当前参数：同一 key 的完整渲染完成后直接显示结果；key 变化时取消旧任务并重新出草稿。
+    SVG 输出或草稿与完整分辨率相差不大时不走渐进流程，直接同步渲染。
+    """
+    settings = get_output_settings()
+    key = f"{key}:{settings['format']}:{settings['png_compress_level']}:{settings['webp_lossless']}:{settings['webp_quality']}"
+    state = st.session_state.get(state_key)
+    if state is not None and state['key'] != key:
+        _cancel(state)
+        del st.session_state[state_key]
+        state = None
+
+    if state is None:
+        fig = render()
+        draft_dpi = get_draft_dpi(fig.get_figwidth(), full_dpi, width_px)
+        if settings['format'] == 'svg' or draft_dpi >= full_dpi * SKIP_DRAFT_RATIO:
+            show_figure(fig, dpi=full_dpi, label='editor')
+            plt.close(fig)
+            return
+        decision = apply_render_policy(fig, dpi=draft_dpi)
+        layout_before = get_layout_seconds(fig)
+        draft = encode_figure(fig, dpi=decision['dpi'])
+        record_encode_stats(draft, 'editor-draft', layout_seconds=get_layout_seconds(fig, reset=True),
+                            render_seconds=draft.seconds + layout_before)
+        # Figure 交给后台线程继续使用，主线程之后不再访问它
+        cancel = threading.Event()
+        future = get_render_executor().submit(_render_full, fig, full_dpi, settings['format'],
+                                              dict(settings), cancel)
+        state = {'key': key, 'draft': draft, 'draft_dpi': draft_dpi, 'draft_caption': format_render_decision(decision),
+                 'future': future, 'cancel': cancel, 'result': None}
+        st.session_state[state_key] = state
+
+    if state['result'] is None and state['future'].done():
+        try:
+            state['result'] = state['future'].result()
+            record_encode_stats(state['result'], 'editor')
+        except CancelledError:
+            pass
+        except Exception as e:
+            st.error(f"完整分辨率渲染失败，显示的是草稿: {str(e)}")
+
+    if state['result'] is not None:
+        display_encoded(state['result'])
+        if settings['show_stats']:
+            st.caption(format_encode_result(state['result']))
+        return
+
+    display_encoded(state['draft'])
+    if state['draft_caption']:
+        st.caption(state['draft_caption'])
+    if state['future'].done():
+        return
+    _wait_for_full_render(state['future'], state['draft_dpi'], full_dpi)
+
+
+def _wait_for_full_render(future: Future, draft_dpi: int, full_dpi: int) -> None:
+    @st.fragment(run_every=POLL_INTERVAL)
+    def _poll():
+        if future.done():
+            st.rerun(scope="app")
+        st.caption(f"⏳ 当前为 {draft_dpi} dpi 草稿，{full_dpi} dpi 完整分辨率正在后台渲染，完成后自动替换")
+    _poll()
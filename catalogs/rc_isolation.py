@@ -0,0 +1,165 @@
+"""
+rcParams 隔离 - 在样式上下文中渲染时，保证一个会话的样式设置不会泄漏到其他会话
+
+rcParams 是进程级的全局字典，而 Streamlit 在同一进程的多个线程中执行各个会话的脚本。
+plt.style.context 只保证"退出时恢复"，并不阻止另一个线程在此期间修改或读取同一份 rcParams。
+这里的做法：
+- 所有修改 rcParams 的渲染（样式预览、交互编辑器、中文字体设置）都持有同一把进程级的锁，互相串行
+- savefig 绘制时仍会读取 rcParams：隔离渲染用 attach_figure_rc 记下绘制时的参数，之后在代码块外
+  （后台线程的完整分辨率渲染、导出）编码时由 figure_rc 把这份参数设为当前线程的覆盖层——
+  本线程读写 rcParams 都落在覆盖层上，不改动全局字典，因此绘制期间不持锁，各线程的编码可以并行
+- 非隔离的图用 locked_subplots / locked_figure 创建：Axes 的默认外观在锁内确定，不会读到其他会话的样式
+- 进入时只写入与当前值不同的键，退出时只恢复期间被改动过的键（不经过 RcParams 的逐键校验），
+  比 plt.style.context 每次复制、校验并写回全部 300 多个参数快得多
+- 样式表的参数解析一次后以只读映射缓存，rc_fingerprint 用于校验某次渲染实际使用的参数
+"""
+import hashlib
+import threading
+import weakref
+from contextlib import contextmanager
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterator, Mapping, Optional
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+
+# 可重入：持有锁的渲染内部再调用 setup_chinese_font 等函数时不会死锁
+rc_lock = threading.RLock()
+
+# Figure -> 绘制时使用的 rcParams（只读快照），由 attach_figure_rc 记录
+_figure_rc: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+
+# 当前线程的 rcParams 覆盖层（figure_rc 期间为 Figure 的参数副本，其余时间为 None）
+_local = threading.local()
+
+# 与 plt.style.use 一致：样式表不能修改这些与外观无关的参数
+STYLE_BLACKLIST = frozenset({
+    'interactive', 'backend', 'webagg.port', 'webagg.address', 'webagg.port_retries',
+    'webagg.open_in_browser', 'backend_fallback', 'toolbar', 'timezone', 'figure.max_open_warning',
+    'figure.raise_window', 'savefig.directory', 'tk.window_focus', 'docstring.hardcopy', 'date.epoch'})
+
+
+@lru_cache(maxsize=None)
+def get_style_params(style: str) -> Mapping:
+    """样式表的参数（只读映射，已经过 rcParams 校验）；'default' 为 matplotlib 的默认参数"""
+    if style == 'default':
+        params = mpl.rcParamsDefault
+    elif style in plt.style.library:
+        params = plt.style.library[style]
+    else:
+        raise ValueError(f"未知的样式表: {style}")
+    return MappingProxyType({key: value for key, value in params.items() if key not in STYLE_BLACKLIST})
+
+
+class _ThreadLocalRcParams(mpl.RcParams):
+    """全局 rcParams 的类型：当前线程设置了覆盖层时，读写都落在覆盖层上
+
+    matplotlib 内部的读取都经过 _get（__getitem__、get、copy），写入经过 _set / _update_raw，
+    这三个方法是 RcParams 承诺保持稳定的接口。
+    """
+
+    def _get(self, key):
+        overlay = getattr(_local, 'params', None)
+        if overlay is not None and key in overlay:
+            return overlay[key]
+        return dict.__getitem__(self, key)
+
+    def _set(self, key, val):
+        overlay = getattr(_local, 'params', None)
+        if overlay is not None:
+            overlay[key] = val
+        else:
+            dict.__setitem__(self, key, val)
+
+    def _update_raw(self, other_params):
+        overlay = getattr(_local, 'params', None)
+        if overlay is None:
+            super()._update_raw(other_params)
+        else:
+            overlay.update(dict.items(other_params) if isinstance(other_params, mpl.RcParams) else other_params)
+
+
+mpl.rcParams.__class__ = _ThreadLocalRcParams
+
+
+def _validate(rc: Mapping) -> Dict:
+    return {key: mpl.rcParams.validate[key](value) for key, value in rc.items()}
+
+
+def _snapshot() -> Dict:
+    # dict.items 直接读底层字典（约 20µs）；dict.copy / RcParams.copy() 会逐键经过 __getitem__，慢 10 倍以上
+    overlay = getattr(_local, 'params', None)
+    return dict(overlay if overlay is not None else dict.items(mpl.rcParams))
+
+
+def _write(params: Mapping) -> None:
+    # 值已经过校验，直接写入，跳过 RcParams.__setitem__ 的校验和弃用检查
+    current = mpl.rcParams
+    for key, value in params.items():
+        old = current._get(key)
+        if old is not value and old != value:
+            current._set(key, value)
+
+
+@contextmanager
+def isolated_style(style: str = 'default', rc: Optional[Mapping] = None) -> Iterator[Mapping]:
+    """在样式表 style（以及额外的 rc 参数）下执行代码块，退出时恢复进入前的 rcParams
+
+    整个代码块持有 rc_lock：Figure 的创建和绘制都应放在代码块内，期间其他会话的隔离渲染会等待；
+    要在代码块外编码的 Figure 需在块内调用 attach_figure_rc。返回应用样式后的参数快照（只读）。
+    """
+    changes = dict(get_style_params(style))
+    if rc:
+        changes.update(_validate(rc))
+    with rc_lock:
+        before = _snapshot()
+        _write(changes)
+        try:
+            yield MappingProxyType({**before, **changes})
+        finally:
+            _write(before)
+
+
+def attach_figure_rc(fig, params: Optional[Mapping] = None) -> None:
+    """记录 fig 绘制时使用的 rcParams（默认为当前值），应在隔离代码块内、Figure 绘制完成后调用"""
+    _figure_rc[getattr(fig, 'figure', fig)] = MappingProxyType(dict(_snapshot() if params is None else params))
+
+
+@contextmanager
+def figure_rc(fig) -> Iterator[None]:
+    """编码 fig 时使用的 rcParams 上下文：本线程在 fig 记录的参数下读取 rcParams，退出时恢复
+
+    savefig 会再次读取 rcParams（savefig.*、布局、字体查找等），在隔离代码块外编码的图必须经过这里。
+    没有记录参数的图使用进入时全局参数的快照（只在取快照时短暂持有 rc_lock）；绘制期间不持锁，
+    也不改动全局 rcParams，不会阻塞其他会话的渲染。
+    """
+    params = _figure_rc.get(getattr(fig, 'figure', fig))
+    if params is None:
+        with rc_lock:
+            params = _snapshot()
+    previous = getattr(_local, 'params', None)
+    _local.params = dict(params)
+    try:
+        yield
+    finally:
+        _local.params = previous
+
+
+def locked_subplots(*args, **kwargs):
+    """plt.subplots，创建 Figure 和 Axes 期间持有 rc_lock（用于不在隔离样式中渲染的图）"""
+    with rc_lock:
+        return plt.subplots(*args, **kwargs)
+
+
+def locked_figure(*args, **kwargs):
+    """plt.figure，创建 Figure 期间持有 rc_lock（用于不在隔离样式中渲染的图）"""
+    with rc_lock:
+        return plt.figure(*args, **kwargs)
+
+
+def rc_fingerprint(params: Optional[Mapping] = None) -> str:
+    """rcParams（默认为当前值）的指纹，用于比较两次渲染使用的参数是否完全相同"""
+    if params is None:
+        params = _snapshot()
+    return hashlib.sha1(repr(sorted(params.items())).encode('utf-8')).hexdigest()
@@ -0,0 +1,105 @@
+"""
+渲染缓存 - 把耗时的图表编码为图片字节，跨会话、跨进程重启复用
+"""
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+import matplotlib
+import matplotlib.pyplot as plt
+import streamlit as st
+
+from catalogs.rc_isolation import figure_rc
+
+# 与 st.pyplot 的默认保存参数保持一致，缓存图片与直接渲染的效果相同
+DEFAULT_SAVEFIG_OPTIONS = {
+    'bbox_inches': 'tight',
+    'dpi': 200,
+    'format': 'png',
+}
+
+
+def get_cache_dir(namespace: str) -> Path:
+    """获取磁盘缓存目录（可通过环境变量 MPL_TEACH_CACHE_DIR 指定根目录）"""
+    root = os.environ.get('MPL_TEACH_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'matplotlib-teach-cache')
+    path = Path(root) / namespace
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def get_library_versions() -> str:
+    """获取影响渲染结果的库版本标记（版本变化后缓存自动失效）"""
+    versions = [f"mpl={matplotlib.__version__}"]
+    try:
+        import seaborn as sns
+        versions.append(f"sns={sns.__version__}")
+    except ImportError:
+        pass
+    return ";".join(versions)
+
+
+def make_cache_key(*parts) -> str:
+    """根据参数和库版本生成稳定的缓存键"""
+    raw = repr((get_library_versions(),) + parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def figure_to_png(fig, **savefig_kwargs) -> bytes:
+    """将 Figure（或带 savefig 方法的对象，如 JointGrid）编码为 PNG 字节并关闭"""
+    options = {**DEFAULT_SAVEFIG_OPTIONS, **savefig_kwargs}
+    buffer = io.BytesIO()
+    with figure_rc(fig):
+        fig.savefig(buffer, **options)
+    plt.close(getattr(fig, 'figure', fig))
+    return buffer.getvalue()
+
+
+class FigureCache:
+    """内存 + 磁盘两级图片缓存（线程安全）"""
+
+    def __init__(self, namespace: str, suffix: str = '.png'):
+        self.directory = get_cache_dir(namespace)
+        self.suffix = suffix
+        self._memory: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.suffix}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """读取缓存，未命中返回 None"""
+        with self._lock:
+            if key in self._memory:
+                return self._memory[key]
+        path = self._path(key)
+        if not path.exists():
+            return None
+        data = path.read_bytes()
+        with self._lock:
+            self._memory[key] = data
+        return data
+
+    def set(self, key: str, data: bytes) -> None:
+        """写入缓存（先写临时文件再替换，避免并发读到半个文件）"""
+        with self._lock:
+            self._memory[key] = data
+        tmp_path = self._path(key).with_suffix(f"{self.suffix}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, self._path(key))
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            if key in self._memory:
+                return True
+        return self._path(key).exists()
+
+
+@st.cache_resource
+def get_render_executor() -> ThreadPoolExecutor:
+    """后台渲染线程池（整个服务进程共享一个）"""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix='mpl-teach-render')
@@ -0,0 +1,146 @@
+"""
+渲染策略 - 绘制前统计 Figure 中的 artist 数量和路径顶点数，超出预算时自动栅格化或降低分辨率
+"""
+from typing import Dict, List, Optional
+
+import streamlit as st
+from matplotlib.artist import Artist
+from matplotlib.collections import Collection
+from matplotlib.image import AxesImage
+from matplotlib.lines import Line2D
+from matplotlib.patches import Patch
+from matplotlib.quiver import Quiver
+from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+
+from catalogs.encoders import display_encoded, encode_figure, format_encode_result, get_output_settings, record_encode_stats
+from catalogs.layout_cache import enable_layout_cache, get_layout_seconds
+from catalogs.rc_isolation import figure_rc
+from catalogs.render_cache import DEFAULT_SAVEFIG_OPTIONS
+
+# 默认预算：超过 rasterize_vertices 时把重型 artist 栅格化（控制 SVG/PDF 体积）；
+# 超过 reduce_dpi_vertices 时降低输出分辨率（控制 PNG 绘制与编码时间）
+DEFAULT_RENDER_BUDGET = {
+    'rasterize_vertices': 50_000,     # 总顶点数超过该值时开始栅格化
+    'artist_vertices': 2_000,         # 单个 artist 顶点数超过该值才会被栅格化
+    'max_artists': 2_000,             # artist 数量超过该值时也视为超出预算
+    'reduce_dpi_vertices': 500_000,   # 总顶点数超过该值时降低分辨率
+    'reduced_dpi': 100,
+}
+
+
+# 投影后每个四边形面的路径顶点数（4 个角 + 闭合点）
+POLY3D_FACE_VERTICES = 5
+
+
+def count_artist_vertices(artist: Artist) -> int:
+    """估算单个 artist 绘制时需要处理的路径顶点数"""
+    if isinstance(artist, Line2D):
+        n = len(artist.get_xydata())
+        if artist.get_marker() not in (None, 'None', '', ' '):
+            n *= 2
+        return n
+    if isinstance(artist, Quiver):
+        # 箭头路径在绘制时才生成，每个箭头 7 个顶点
+        return artist.N * 7
+    if isinstance(artist, Poly3DCollection):
+        # 3D 多边形在绘制时才投影为 2D 路径；已经绘制过时直接统计这些路径
+        paths = artist.get_paths()
+        if paths:
+            return sum(len(path.vertices) for path in paths)
+        # 还没有投影时按面数估算（单独投影一次的开销接近绘制本身的一半，不值得只为计数而做）：
+        # 面数取每个面一个的颜色映射值或面颜色，每个面按曲面的四边形加闭合点计 5 个顶点
+        values = artist.get_array()
+        n_faces = len(values) if values is not None else len(artist.get_facecolor())
+        return n_faces * POLY3D_FACE_VERTICES
+    if isinstance(artist, Collection):
+        paths = artist.get_paths()
+        path_vertices = sum(len(path.vertices) for path in paths)
+        offsets = artist.get_offsets()
+        # scatter 等带 offsets 的集合：每个偏移位置都要绘制一次标记路径
+        if len(offsets) > 1 and len(paths) <= 1:
+            return len(offsets) * max(path_vertices, 1)
+        return path_vertices
+    if isinstance(artist, Patch):
+        return len(artist.get_path().vertices)
+    return 0
+
+
+def _iter_drawable_artists(fig) -> List[Artist]:
+    """Figure 中需要统计的 artist（跳过坐标轴、刻度、文本等固定开销）"""
+    artists = []
+    for ax in fig.axes:
+        artists.extend(ax.lines)
+        artists.extend(ax.collections)
+        artists.extend(ax.patches)
+    return artists
+
+
+def apply_render_policy(fig, budget: Optional[Dict] = None, dpi: Optional[int] = None) -> Dict:
+    """统计 fig 的复杂度并按预算调整，返回决策信息
+
+    返回字典包含 artists、vertices、rasterized（被栅格化的 artist 数量）、base_dpi（请求的分辨率，
+    默认与 st.pyplot 相同）和 dpi（建议的输出分辨率）。
+    """
+    budget = {**DEFAULT_RENDER_BUDGET, **(budget or {})}
+    artists = _iter_drawable_artists(fig)
+    vertex_counts = [count_artist_vertices(artist) for artist in artists]
+    total_vertices = sum(vertex_counts)
+
+    decision = {
+        'artists': len(artists),
+        'vertices': total_vertices,
+        'rasterized': 0,
+        'base_dpi': dpi or DEFAULT_SAVEFIG_OPTIONS['dpi'],
+    }
+    decision['dpi'] = decision['base_dpi']
+
+    over_budget = total_vertices > budget['rasterize_vertices'] or len(artists) > budget['max_artists']
+    if over_budget:
+        for artist, n in zip(artists, vertex_counts):
+            if n > budget['artist_vertices'] or len(artists) > budget['max_artists']:
+                if not isinstance(artist, AxesImage) and not artist.get_rasterized():
+                    artist.set_rasterized(True)
+                    decision['rasterized'] += 1
+
+    if total_vertices > budget['reduce_dpi_vertices']:
+        decision['dpi'] = min(decision['dpi'], budget['reduced_dpi'])
+    return decision
+
+
+def format_render_decision(decision: Dict) -> str:
+    """把渲染决策格式化为界面提示，未做调整时返回空字符串"""
+    actions = []
+    if decision['rasterized']:
+        actions.append(f"{decision['rasterized']} 个 artist 已栅格化 (rasterized=True)")
+    if decision['dpi'] < decision['base_dpi']:
+        actions.append(f"分辨率降至 {decision['dpi']} dpi")
+    if not actions:
+        return ""
+    return (f"⚙️ 渲染策略：{decision['artists']:,} 个 artist，约 {decision['vertices']:,} 个顶点，超出预算 → "
+            + "；".join(actions))
+
+
+def show_figure(fig, budget: Optional[Dict] = None, fmt: Optional[str] = None, label: str = '',
+                dpi: Optional[int] = None, **kwargs) -> Dict:
+    """应用渲染策略后按输出格式编码并显示图表，策略生效时在图下方显示说明
+
+    fmt 为空时使用侧边栏的全局输出格式；dpi 为空时与 st.pyplot 相同（200）；其余关键字参数传给 savefig。
+    返回的决策字典额外包含 format、bytes 和 encode_seconds。应用策略和编码都在 figure_rc 中进行。
+    """
+    with figure_rc(fig):
+        decision = apply_render_policy(fig, budget, dpi)
+        enable_layout_cache(fig)
+        # 绘制前已完成的布局（tight_layout）不在编码耗时内；constrained_layout 在编码时求解
+        layout_before = get_layout_seconds(fig)
+        result = encode_figure(fig, fmt, dpi=decision['dpi'], **kwargs)
+    record_encode_stats(result, label, layout_seconds=get_layout_seconds(fig, reset=True),
+                        render_seconds=result.seconds + layout_before)
+    display_encoded(result)
+    captions = [format_render_decision(decision)]
+    if get_output_settings()['show_stats']:
+        captions.append(format_encode_result(result))
+    caption = "  \n".join(c for c in captions if c)
+    if caption:
+        st.caption(caption)
+    decision.update({'format': result.fmt, 'bytes': result.size, 'encode_seconds': result.seconds})
+    return decision
@@ -0,0 +1,157 @@
+"""
+样式表缩略图 - 每个样式表用同一张示例图渲染一张缩略图，供样式选择器直接预览
+
+缩略图在独立的子进程（spawn 进程池）中渲染：plt.style.context 修改的是进程级的 rcParams，
+放在子进程里不会影响服务进程中其他会话正在绘制的图表。结果按 (样式表, matplotlib/seaborn 版本)
+缓存到磁盘，服务重启后直接复用。
+"""
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import streamlit as st
+
+from catalogs.render_cache import FigureCache, make_cache_key
+
+# 缩略图尺寸（英寸）和分辨率
+THUMBNAIL_FIGSIZE = (3.2, 2.2)
+THUMBNAIL_DPI = 72
+# 示例图变化时递增，使旧缩略图失效
+THUMBNAIL_VERSION = 1
+MAX_STYLE_WORKERS = 4
+GALLERY_COLUMNS = 4
+POLL_INTERVAL = 1.0
+
+_thumbnail_cache = FigureCache('style_thumbnails')
+_pending: Dict[str, Future] = {}
+_failed: Dict[str, Future] = {}
+_pending_lock = threading.RLock()
+
+
+def render_style_thumbnail(style: str) -> bytes:
+    """在子进程中执行：用指定样式表渲染标准示例图（折线 + 柱状图）并编码为 PNG"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.style
+    import numpy as np
+    from matplotlib.figure import Figure
+
+    with matplotlib.style.context(style):
+        # 缩略图布局固定，不使用 tight/constrained layout（省去文本测量）
+        fig = Figure(figsize=THUMBNAIL_FIGSIZE)
+        fig.subplots_adjust(left=0.12, right=0.97, bottom=0.13, top=0.87, wspace=0.2)
+        ax_line, ax_bar = fig.subplots(1, 2, width_ratios=[2, 1])
+        x = np.linspace(0, 10, 60)
+        for i in range(1, 4):
+            ax_line.plot(x, np.sin(x + i * .5) * (7 - i), label=f"Wave {i}")
+        ax_line.set_title(style, fontsize=9)
+        ax_line.legend(fontsize=6)
+        for i in range(4):
+            ax_bar.bar(i, 3 + i % 3, color=f"C{i}")
+        ax_bar.set_xticks([])
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', dpi=THUMBNAIL_DPI)
+    return buffer.getvalue()
+
+
+@st.cache_resource
+def get_style_executor() -> ProcessPoolExecutor:
+    """缩略图渲染进程池（spawn 启动，子进程不继承服务进程的 rcParams 修改）"""
+    workers = max(1, min(MAX_STYLE_WORKERS, os.cpu_count() or 1))
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def get_thumbnail_key(style: str) -> str:
+    return make_cache_key('style-thumbnail', THUMBNAIL_VERSION, style)
+
+
+def _submit_thumbnail(style: str) -> Future:
+    try:
+        return get_style_executor().submit(render_style_thumbnail, style)
+    except BrokenProcessPool:
+        # 子进程异常退出（如被 OOM killer 结束）后进程池不能再提交任务：丢弃缓存的进程池，换一个新的
+        get_style_executor.clear()
+        return get_style_executor().submit(render_style_thumbnail, style)
+
+
+def _store_thumbnail(style: str, future: Future) -> None:
+    """任务结束后移除记录：成功的缩略图写入磁盘缓存，失败的任务转入 _failed 等待显示错误"""
+    failed = future.cancelled() or future.exception() is not None
+    if not failed:
+        _thumbnail_cache.set(get_thumbnail_key(style), future.result())
+    with _pending_lock:
+        if _pending.get(style) is future:
+            del _pending[style]
+            if failed:
+                _failed[style] = future
+
+
+def get_style_thumbnails(styles: Sequence[str]) -> Tuple[Dict[str, bytes], Dict[str, str], int]:
+    """获取缩略图：返回 (已有缩略图, 渲染失败的样式 -> 错误信息, 仍在渲染的数量)
+
+    缺少的缩略图一次性批量提交到进程池，不等待结果。渲染失败（包括进程池损坏）的样式只报告一次错误，
+    之后的获取会重新提交。
+    """
+    thumbnails, errors, missing = {}, {}, []
+    for style in styles:
+        data = _thumbnail_cache.get(get_thumbnail_key(style))
+        if data is not None:
+            thumbnails[style] = data
+        else:
+            missing.append(style)
+    pending = 0
+    with _pending_lock:
+        for style in missing:
+            future = _failed.pop(style, None) or _pending.get(style)
+            if future is None:
+                future = _submit_thumbnail(style)
+                _pending[style] = future
+                future.add_done_callback(lambda f, style=style: _store_thumbnail(style, f))
+            if not future.done():
+                pending += 1
+            elif future.cancelled():
+                errors[style] = "渲染任务已取消"
+            elif future.exception() is not None:
+                errors[style] = str(future.exception()) or type(future.exception()).__name__
+            else:
+                thumbnails[style] = future.result()
+    return thumbnails, errors, pending
+
+
+def _select_style(state_key: str, style: str) -> None:
+    st.session_state[state_key] = style
+
+
+def render_style_gallery(styles: Sequence[str], state_key: str, columns: int = GALLERY_COLUMNS,
+                         current: Optional[str] = None) -> None:
+    """样式表缩略图网格；点击"使用"把 st.session_state[state_key]（样式选择框的 key）设为该样式"""
+    thumbnails, errors, pending = get_style_thumbnails(styles)
+    if pending:
+        @st.fragment(run_every=POLL_INTERVAL)
+        def _wait_for_thumbnails():
+            _, _, still_pending = get_style_thumbnails(styles)
+            if not still_pending:
+                st.rerun(scope="app")
+            st.caption(f"⏳ 正在后台渲染 {still_pending} 个样式的缩略图（只在首次访问时渲染，之后直接读取缓存）...")
+        _wait_for_thumbnails()
+
+    grid: List = []
+    for idx, style in enumerate(styles):
+        if idx % columns == 0:
+            grid = st.columns(columns)
+        with grid[idx % columns]:
+            if style in thumbnails:
+                st.image(thumbnails[style], width='stretch')
+            elif style in errors:
+                st.caption(f"⚠️ {style} 无法渲染: {errors[style]}")
+                continue
+            else:
+                st.caption(f"⏳ {style}")
+                continue
+            label = f"✅ {style}" if style == current else style
+            st.button(label, key=f"{state_key}_thumb_{style}", width='stretch',
+                      on_click=_select_style, args=(state_key, style), disabled=style == current)
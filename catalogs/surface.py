@@ -0,0 +1,181 @@
+"""
+3D 曲面的细节层次（LOD） - 按渲染耗时预算选择网格分辨率，并缓存网格和多边形几何
+
+plot_surface 的耗时几乎全部花在绘制阶段：每个面都要投影、按深度排序再逐个填充，耗时随面数线性增长。
+- 各分辨率的 Z 网格和 Poly3DCollection 的顶点数组按 (函数, 分辨率) 缓存，切换回来时不再重新计算
+- 每次渲染后记录 (面数, 耗时)，用线性拟合预测各分辨率的耗时，自动模式下选择预算内最高的分辨率
+"""
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+
+# 可选的网格分辨率（每个方向的采样点数）
+SURFACE_RESOLUTIONS = [20, 30, 40, 50, 60, 80, 100, 120, 150, 200, 250, 300, 400]
+DEFAULT_RESOLUTION = 50
+SURFACE_EXTENT = (-5.0, 5.0)
+# 缓存的网格数量上限（400×400 的几何约 15 MB）
+MAX_MESH_ENTRIES = 16
+# 还没有测量数据时使用的耗时模型：固定开销 + 每个面的耗时（秒）
+DEFAULT_BASE_SECONDS = 0.4
+DEFAULT_FACE_SECONDS = 1.3e-5
+# 每种输出格式保留的最近测量数
+MAX_TIMING_SAMPLES = 20
+
+
+class SurfaceFunction(NamedTuple):
+    """可选的曲面函数：Z = func(X, Y)，expression 用于生成示例代码"""
+    label: str
+    func: Callable[[np.ndarray, np.ndarray], np.ndarray]
+    expression: str
+
+
+class SurfaceMesh(NamedTuple):
+    """一个 (函数, 分辨率) 的网格和多边形几何（数组只读，可在会话间共享）"""
+    X: np.ndarray
+    Y: np.ndarray
+    Z: np.ndarray
+    polys: np.ndarray    # (面数, 4, 3)：每个面四个角的 (x, y, z)
+    face_z: np.ndarray   # 每个面的平均高度，用于颜色映射
+
+    @property
+    def n_faces(self) -> int:
+        return len(self.polys)
+
+
+SURFACE_FUNCTIONS: Dict[str, SurfaceFunction] = {}
+
+
+def register_surface_function(name: str, label: str, expression: str):
+    """注册曲面函数的装饰器"""
+    def decorator(func):
+        SURFACE_FUNCTIONS[name] = SurfaceFunction(label, func, expression)
+        return func
+    return decorator
+
+
+@register_surface_function('ripple', "涟漪 sin(r)", "np.sin(np.sqrt(X**2 + Y**2))")
+def _ripple(X, Y):
+    return np.sin(np.sqrt(X**2 + Y**2))
+
+
+@register_surface_function('peaks', "多峰 peaks", "3*(1-X/2)**2*np.exp(-(X/2)**2-(Y/2+1)**2) - "
+                           "10*(X/10-(X/2)**3-(Y/2)**5)*np.exp(-(X/2)**2-(Y/2)**2) - "
+                           "np.exp(-(X/2+1)**2-(Y/2)**2)/3")
+def _peaks(X, Y):
+    x, y = X / 2, Y / 2
+    return (3 * (1 - x)**2 * np.exp(-x**2 - (y + 1)**2) - 10 * (x / 5 - x**3 - y**5) * np.exp(-x**2 - y**2)
+            - np.exp(-(x + 1)**2 - y**2) / 3)
+
+
+@register_surface_function('waves', "波纹 sin(x)·cos(y)", "np.sin(X) * np.cos(Y) * np.exp(-(X**2 + Y**2) / 20)")
+def _waves(X, Y):
+    return np.sin(X) * np.cos(Y) * np.exp(-(X**2 + Y**2) / 20)
+
+
+_meshes: Dict[Tuple[str, int], SurfaceMesh] = {}
+_mesh_lock = threading.Lock()
+_mesh_stats = {'hits': 0, 'misses': 0}
+_timings: Dict[str, Deque[Tuple[int, float]]] = {}
+_timing_lock = threading.Lock()
+
+
+def _build_mesh(name: str, resolution: int) -> SurfaceMesh:
+    x = np.linspace(*SURFACE_EXTENT, resolution)
+    X, Y = np.meshgrid(x, x)
+    Z = SURFACE_FUNCTIONS[name].func(X, Y)
+    # 与 plot_surface(rstride=1, cstride=1) 相同：每个网格单元一个四边形，顶点按周长顺序排列
+    corners = [(slice(None, -1), slice(None, -1)), (slice(None, -1), slice(1, None)),
+               (slice(1, None), slice(1, None)), (slice(1, None), slice(None, -1))]
+    polys = np.stack([np.stack([a[rows, cols] for rows, cols in corners], axis=-1).reshape(-1, 4)
+                      for a in (X, Y, Z)], axis=-1)
+    mesh = SurfaceMesh(X, Y, Z, polys, polys[..., 2].mean(axis=-1))
+    for array in mesh:
+        array.flags.writeable = False
+    return mesh
+
+
+def get_surface_mesh(name: str, resolution: int) -> Tuple[SurfaceMesh, bool]:
+    """获取 (函数, 分辨率) 的网格和几何，返回 (网格, 是否命中缓存)"""
+    if name not in SURFACE_FUNCTIONS:
+        raise ValueError(f"未知的曲面函数: '{name}'，可选: {list(SURFACE_FUNCTIONS)}")
+    key = (name, int(resolution))
+    with _mesh_lock:
+        mesh = _meshes.get(key)
+        if mesh is not None:
+            _mesh_stats['hits'] += 1
+            # 最近使用的移到末尾，超出上限时丢弃最久未用的
+            _meshes[key] = _meshes.pop(key)
+            return mesh, True
+        _mesh_stats['misses'] += 1
+    mesh = _build_mesh(name, key[1])
+    with _mesh_lock:
+        _meshes[key] = mesh
+        while len(_meshes) > MAX_MESH_ENTRIES:
+            del _meshes[next(iter(_meshes))]
+    return mesh, False
+
+
+def get_mesh_cache_info() -> Dict[str, int]:
+    """网格缓存的命中统计"""
+    with _mesh_lock:
+        return {**_mesh_stats, 'size': len(_meshes)}
+
+
+def plot_lod_surface(ax, mesh: SurfaceMesh, cmap: str = 'viridis', **kwargs) -> Poly3DCollection:
+    """用缓存的几何直接创建 Poly3DCollection（效果与 plot_surface(X, Y, Z, rstride=1, cstride=1) 相同）"""
+    had_data = ax.has_data()
+    surface = Poly3DCollection(mesh.polys, cmap=cmap, **kwargs)
+    surface.set_array(mesh.face_z)
+    ax.add_collection3d(surface, autolim=False)
+    ax.auto_scale_xyz(mesh.X, mesh.Y, mesh.Z, had_data)
+    return surface
+
+
+def record_surface_timing(fmt: str, n_faces: int, seconds: float) -> None:
+    """记录一次曲面渲染（几何 + 绘制 + 编码）的耗时"""
+    with _timing_lock:
+        _timings.setdefault(fmt, deque(maxlen=MAX_TIMING_SAMPLES)).append((n_faces, seconds))
+
+
+def get_timing_model(fmt: str) -> Tuple[float, float, int]:
+    """返回 (固定开销, 每个面的耗时, 测量次数)；不同面数的测量少于两组时使用默认模型"""
+    with _timing_lock:
+        samples = list(_timings.get(fmt, ()))
+    faces = np.array([n for n, _ in samples], dtype=float)
+    seconds = np.array([s for _, s in samples], dtype=float)
+    if len(np.unique(faces)) < 2:
+        return DEFAULT_BASE_SECONDS, DEFAULT_FACE_SECONDS, len(samples)
+    slope, intercept = np.polyfit(faces, seconds, 1)
+    return max(float(intercept), 0.0), max(float(slope), 1e-9), len(samples)
+
+
+def predict_render_seconds(resolution: int, fmt: str) -> float:
+    base, per_face, _ = get_timing_model(fmt)
+    return base + per_face * (resolution - 1)**2
+
+
+def choose_resolution(budget_seconds: float, fmt: str, resolutions: Optional[List[int]] = None) -> int:
+    """预测耗时不超过预算的最高分辨率（预算内没有可选分辨率时取最低的一档）"""
+    resolutions = sorted(resolutions or SURFACE_RESOLUTIONS)
+    fitting = [n for n in resolutions if predict_render_seconds(n, fmt) <= budget_seconds]
+    return fitting[-1] if fitting else resolutions[0]
+
+
+def format_surface_readout(resolution: int, mesh: SurfaceMesh, cache_hit: bool, geometry_seconds: float,
+                           render_seconds: float, budget_seconds: Optional[float] = None,
+                           predicted_seconds: Optional[float] = None) -> str:
+    """曲面渲染的耗时说明：网格、几何（是否命中缓存）、总耗时以及与预算的比较"""
+    total = geometry_seconds + render_seconds
+    parts = [f"🕒 本次渲染 **{total * 1000:.0f} ms**",
+             f"网格 {resolution}×{resolution}（{mesh.n_faces:,} 个面）",
+             f"几何 {geometry_seconds * 1000:.1f} ms（{'缓存命中' if cache_hit else '新计算'}）",
+             f"绘制 + 编码 {render_seconds * 1000:.0f} ms"]
+    if budget_seconds is not None:
+        status = "✅ 在预算内" if total <= budget_seconds else "⚠️ 超出预算"
+        predicted = f"，预测 {predicted_seconds * 1000:.0f} ms" if predicted_seconds is not None else ""
+        parts.append(f"预算 {budget_seconds * 1000:.0f} ms{predicted} {status}")
+    return " · ".join(parts)
+
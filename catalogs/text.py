@@ -2,12 +2,14 @@
 Text（文本）相关参数的完整选项目录
 """
 import streamlit as st
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple
 from catalogs.utils import get_matplotlib_version, generate_sample_data, ensure_chinese_font
+from catalogs.rc_isolation import locked_subplots
+from catalogs.render_policy import show_figure
+from catalogs.fonts import get_font_families, render_font_catalog
+from catalogs.text_sheet import TextRow, build_text_sheet
 
 @st.cache_data
 def get_fontsize_options() -> Dict:
@@ -47,10 +49,10 @@ def get_fontfamily_options() -> Dict:
     # 通用字体族
     generic_families = ['serif', 'sans-serif', 'monospace', 'cursive', 'fantasy']
     
-    # 获取系统可用字体（限制数量以避免过长）
+    # 系统可用字体（完整列表，来自字体索引）
     try:
-        available_fonts = sorted(set([f.name for f in fm.fontManager.ttflist]))[:50]  # 限制50个
-    except:
+        available_fonts = get_font_families()
+    except Exception:
         available_fonts = []
     
     return {
@@ -79,47 +81,22 @@ def render_fontsize_gallery():
     """)
     
     options = get_fontsize_options()
-    x, y = generate_sample_data(50)
     
     # === 数值大小预览 ===
     st.markdown("### 🎨 数值大小预览")
     common_sizes = options['numeric']['common']
     
-    fig1, axes1 = plt.subplots(len(common_sizes), 1, figsize=(10, 1.5*len(common_sizes)))
-    if len(common_sizes) == 1:
-        axes1 = [axes1]
-    
-    for idx, size in enumerate(common_sizes):
-        ax = axes1[idx]
-        ax.plot(x, y, linewidth=2, color='#2c3e50')
-        ax.set_title(f"Fontsize = {size}", fontsize=size, fontweight='bold')
-        ax.text(5, 0, f"fontsize={size}", fontsize=size, ha='center')
-        ax.set_xlim(0, 10)
-        ax.set_ylim(-1.5, 1.5)
-        ax.axis('off')
-    
-    plt.tight_layout()
-    st.pyplot(fig1)
+    fig1 = build_text_sheet([TextRow(f"fontsize={size}", f"Fontsize = {size}", size=size)
+                             for size in common_sizes])
+    show_figure(fig1, bbox_inches=None)
     
     # === 字符串大小预览 ===
     st.markdown("### 🎨 字符串大小预览")
     string_sizes = {k: v for k, v in options['string'].items() if isinstance(v, (int, float))}
     
-    fig2, axes2 = plt.subplots(len(string_sizes), 1, figsize=(10, 1.5*len(string_sizes)))
-    if len(string_sizes) == 1:
-        axes2 = [axes2]
-    
-    for idx, (size_name, size_val) in enumerate(string_sizes.items()):
-        ax = axes2[idx]
-        ax.plot(x, y, linewidth=2, color='#2c3e50')
-        ax.set_title(f"Fontsize = '{size_name}' ({size_val}pt)", fontsize=size_val, fontweight='bold')
-        ax.text(5, 0, f"fontsize='{size_name}'", fontsize=size_val, ha='center')
-        ax.set_xlim(0, 10)
-        ax.set_ylim(-1.5, 1.5)
-        ax.axis('off')
-    
-    plt.tight_layout()
-    st.pyplot(fig2)
+    fig2 = build_text_sheet([TextRow(f"fontsize='{size_name}'", f"Fontsize = '{size_name}' ({size_val}pt)", size=size_val)
+                             for size_name, size_val in string_sizes.items()])
+    show_figure(fig2, bbox_inches=None)
     
     # === 合法值表格 ===
     st.markdown("### 📋 合法值表格")
@@ -154,7 +131,7 @@ def render_fontsize_gallery():
         else:
             fontsize_value = st.selectbox("字体大小", list(string_sizes.keys()), key='fontsize_string')
     
-    fig_custom, ax_custom = plt.subplots(figsize=(10, 4))
+    fig_custom, ax_custom = locked_subplots(figsize=(10, 4))
     x_custom, y_custom = generate_sample_data(50)
     ax_custom.plot(x_custom, y_custom, linewidth=2, color='#2c3e50')
     ax_custom.set_title(f"Title with fontsize={fontsize_value}", fontsize=fontsize_value, fontweight='bold')
@@ -162,7 +139,7 @@ def render_fontsize_gallery():
     ax_custom.set_ylabel(f"Y Label with fontsize={fontsize_value}", fontsize=fontsize_value)
     ax_custom.text(5, 0, f"Text with fontsize={fontsize_value}", fontsize=fontsize_value, ha='center')
     ax_custom.grid(True, alpha=0.3)
-    st.pyplot(fig_custom)
+    show_figure(fig_custom)
     
     size_code = str(fontsize_value) if size_type == "数值" else f"'{fontsize_value}'"
     st.code(f"""
@@ -215,20 +192,9 @@ def render_fontweight_gallery():
     # 常用 fontweight
     common_weights = ['normal', 'bold', 'light', 'medium', 'heavy', '100', '400', '700', '900']
     
-    fig, axes = plt.subplots(len(common_weights), 1, figsize=(10, 1.5*len(common_weights)))
-    if len(common_weights) == 1:
-        axes = [axes]
-    
-    for idx, weight in enumerate(common_weights):
-        ax = axes[idx]
-        ax.text(0.5, 0.5, f"Fontweight = '{weight}'", fontsize=16, fontweight=weight, 
-               ha='center', va='center', transform=ax.transAxes)
-        ax.set_xlim(0, 1)
-        ax.set_ylim(0, 1)
-        ax.axis('off')
-    
-    plt.tight_layout()
-    st.pyplot(fig)
+    fig = build_text_sheet([TextRow(f"fontweight='{weight}'", f"Fontweight = '{weight}'", size=16, weight=weight)
+                            for weight in common_weights])
+    show_figure(fig, bbox_inches=None)
     
     # 表格
     st.markdown("### 📋 合法值表格")
@@ -268,20 +234,9 @@ def render_fontstyle_gallery():
     
     fontstyles = get_fontstyle_options()
     
-    fig, axes = plt.subplots(len(fontstyles), 1, figsize=(10, 3*len(fontstyles)))
-    if len(fontstyles) == 1:
-        axes = [axes]
-    
-    for idx, style in enumerate(fontstyles):
-        ax = axes[idx]
-        ax.text(0.5, 0.5, f"Fontstyle = '{style}'", fontsize=20, fontstyle=style,
-               ha='center', va='center', transform=ax.transAxes)
-        ax.set_xlim(0, 1)
-        ax.set_ylim(0, 1)
-        ax.axis('off')
-    
-    plt.tight_layout()
-    st.pyplot(fig)
+    fig = build_text_sheet([TextRow(f"fontstyle='{style}'", f"Fontstyle = '{style}'", size=20, style=style)
+                            for style in fontstyles])
+    show_figure(fig, bbox_inches=None)
     
     st.markdown("### ⚠️ 常见坑")
     st.warning("""
@@ -311,27 +266,14 @@ def render_fontfamily_gallery():
     
     # 通用字体族预览
     st.markdown("### 🎨 通用字体族预览")
-    fig, axes = plt.subplots(len(options['generic']), 1, figsize=(10, 2*len(options['generic'])))
-    if len(options['generic']) == 1:
-        axes = [axes]
-    
-    for idx, family in enumerate(options['generic']):
-        ax = axes[idx]
-        ax.text(0.5, 0.5, f"Fontfamily = '{family}'", fontsize=18, fontfamily=family,
-               ha='center', va='center', transform=ax.transAxes)
-        ax.set_xlim(0, 1)
-        ax.set_ylim(0, 1)
-        ax.axis('off')
-    
-    plt.tight_layout()
-    st.pyplot(fig)
-    
-    # 可用字体列表（部分）
+    fig = build_text_sheet([TextRow(f"fontfamily='{family}'", f"Fontfamily = '{family}'", size=18, family=family)
+                            for family in options['generic']])
+    show_figure(fig, bbox_inches=None)
+    
+    # 完整字体目录（搜索 + 分页，只渲染当前页的样张）
     if options['available']:
-        st.markdown("### 📋 系统可用字体（部分）")
-        st.info(f"系统检测到 {len(options['available'])} 个可用字体（仅显示前50个）")
-        df = pd.DataFrame({'字体名称': options['available']})
-        st.dataframe(df, use_container_width=True, hide_index=True, height=300)
+        st.markdown("### 📋 系统可用字体")
+        render_font_catalog()
     
     st.markdown("### ⚠️ 常见坑")
     st.warning("""
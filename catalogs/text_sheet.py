@@ -0,0 +1,102 @@
+"""
+文本样张 - 把多行文字样例排在同一个 Figure 上，行高由缓存的文本尺寸直接算出
+
+- 文本尺寸按 (字体文件, 字号, 粗细, 样式, 文字) 缓存，同样的样例只测量一次
+- 每行的位置在排版时就已确定，不需要每行一个 Axes，也不需要 tight_layout 反复测量文本
+"""
+import threading
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+import matplotlib.font_manager as fm
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import RendererAgg
+
+from catalogs.rc_isolation import locked_figure
+
+# 样张宽度和边距（英寸）
+SHEET_WIDTH_IN = 10.0
+MARGIN_IN = 0.2
+# 左侧说明列的宽度（英寸）和字号
+LABEL_COLUMN_IN = 2.6
+LABEL_FONTSIZE = 10
+LABEL_COLOR = '#7f8c8d'
+LABEL_FAMILY = 'monospace'
+# 行间距（点）
+ROW_GAP_PT = 10.0
+
+_extent_cache: Dict[Tuple, Tuple[float, float, float]] = {}
+_extent_lock = threading.Lock()
+_extent_stats = {'hits': 0, 'misses': 0}
+_renderer = None
+
+
+class TextRow(NamedTuple):
+    """样张中的一行：左侧说明 + 按指定字体属性绘制的样例文字"""
+    label: str
+    text: str
+    size: float = 12
+    weight: str = 'normal'
+    style: str = 'normal'
+    family: str = 'sans-serif'
+
+    def font_properties(self) -> fm.FontProperties:
+        return fm.FontProperties(family=self.family, size=self.size, weight=self.weight, style=self.style)
+
+
+def _get_renderer() -> RendererAgg:
+    # 72 dpi 下像素即为点，测量结果与输出 dpi 无关
+    global _renderer
+    if _renderer is None:
+        _renderer = RendererAgg(1, 1, 72)
+    return _renderer
+
+
+def measure_text(text: str, size: float, weight: str = 'normal', style: str = 'normal',
+                 family: str = 'sans-serif') -> Tuple[float, float, float]:
+    """返回文字的 (宽, 高, 下沉) ，单位为点；按 (字体文件, 字号, 粗细, 样式, 文字) 缓存"""
+    prop = fm.FontProperties(family=family, size=size, weight=weight, style=style)
+    key = (fm.findfont(prop), tuple(prop.get_family()), size, weight, style, text)
+    with _extent_lock:
+        extent = _extent_cache.get(key)
+        if extent is not None:
+            _extent_stats['hits'] += 1
+            return extent
+        _extent_stats['misses'] += 1
+        extent = _get_renderer().get_text_width_height_descent(text, prop, ismath=False)
+        _extent_cache[key] = extent
+        return extent
+
+
+def get_text_extent_cache_info() -> Dict[str, int]:
+    """文本尺寸缓存的命中统计"""
+    with _extent_lock:
+        return {**_extent_stats, 'size': len(_extent_cache)}
+
+
+def layout_text_sheet(rows: Sequence[TextRow]) -> Tuple[List[float], float]:
+    """计算每行基线到样张顶部的距离和样张总高度（英寸）"""
+    baselines = []
+    y = MARGIN_IN
+    for row in rows:
+        _, height, descent = measure_text(row.text, row.size, row.weight, row.style, row.family)
+        _, label_height, label_descent = measure_text(row.label, LABEL_FONTSIZE, family=LABEL_FAMILY)
+        ascent = max(height - descent, label_height - label_descent)
+        baselines.append(y + ascent / 72)
+        y += (ascent + max(descent, label_descent) + ROW_GAP_PT) / 72
+    return baselines, y - ROW_GAP_PT / 72 + MARGIN_IN
+
+
+def build_text_sheet(rows: Sequence[TextRow], width: float = SHEET_WIDTH_IN) -> plt.Figure:
+    """按预先算好的行位置把所有样例画在一个 Figure 上（不创建 Axes）
+
+    Figure 的尺寸已经正好容纳所有行，显示时可以传 bbox_inches=None 省掉紧凑边界的测量。
+    """
+    baselines, height = layout_text_sheet(rows)
+    fig = locked_figure(figsize=(width, height))
+    for row, baseline in zip(rows, baselines):
+        y = height - baseline
+        fig.text(MARGIN_IN, y, row.label, transform=fig.dpi_scale_trans, fontsize=LABEL_FONTSIZE,
+                 color=LABEL_COLOR, va='baseline', family=LABEL_FAMILY)
+        fig.text(LABEL_COLUMN_IN, y, row.text, transform=fig.dpi_scale_trans, va='baseline',
+                 fontproperties=row.font_properties())
+    return fig
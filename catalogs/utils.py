@@ -3,44 +3,71 @@
 """
 import streamlit as st
 import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
 import numpy as np
-from typing import Tuple
+from typing import List, Optional, Sequence, Tuple
 import warnings
 
+from catalogs.rc_isolation import rc_lock
+
+# 尝试的中文字体列表（按优先级排序）
+CHINESE_FONTS = [
+    'SimHei',           # 黑体（Windows）
+    'Microsoft YaHei',  # 微软雅黑（Windows）
+    'WenQuanYi Micro Hei',  # 文泉驿微米黑（Linux）
+    'WenQuanYi Zen Hei',   # 文泉驿正黑（Linux）
+    'Noto Sans CJK SC',    # Noto Sans（跨平台）
+    'Source Han Sans CN',   # 思源黑体（跨平台）
+    'STHeiti',          # 华文黑体（macOS）
+    'Arial Unicode MS', # Arial Unicode（跨平台）
+    'sans-serif',       # 回退到系统默认
+]
+
 # 配置中文字体支持
+@st.cache_resource
+def resolve_chinese_font() -> Optional[str]:
+    """按字形覆盖率索引选出中文字体（没有支持中文的字体时返回 None）"""
+    from catalogs.fonts import get_cjk_font_ranking
+    ranking = get_cjk_font_ranking()
+    return ranking[0][0] if ranking else None
+
+_missing_glyph_warnings_silenced = False
+
+def _silence_missing_glyph_warnings():
+    """没有中文字体时，中文字形必然缺失：只提示一次，不再逐字输出警告"""
+    global _missing_glyph_warnings_silenced
+    if _missing_glyph_warnings_silenced:
+        return
+    _missing_glyph_warnings_silenced = True
+    warnings.warn("未找到支持中文的字体，中文将显示为方框（可在字体族画廊中查看中文字体排名）")
+    warnings.filterwarnings('ignore', message='Glyph .* missing from font')
+
+def _set_rc_if_changed(key: str, value) -> None:
+    # 值相同时不写入：已配置好的 rcParams 不会被反复修改
+    if plt.rcParams[key] != value:
+        plt.rcParams[key] = value
+
 def setup_chinese_font():
-    """设置中文字体，优先使用开源字体"""
-    # 尝试的中文字体列表（按优先级排序）
-    chinese_fonts = [
-        'SimHei',           # 黑体（Windows）
-        'Microsoft YaHei',  # 微软雅黑（Windows）
-        'WenQuanYi Micro Hei',  # 文泉驿微米黑（Linux）
-        'WenQuanYi Zen Hei',   # 文泉驿正黑（Linux）
-        'Noto Sans CJK SC',    # Noto Sans（跨平台）
-        'Source Han Sans CN',   # 思源黑体（跨平台）
-        'STHeiti',          # 华文黑体（macOS）
-        'Arial Unicode MS', # Arial Unicode（跨平台）
-        'sans-serif',       # 回退到系统默认
-    ]
-    
-    # 获取系统可用字体
-    available_fonts = [f.name for f in fm.fontManager.ttflist]
-    
-    # 查找第一个可用的中文字体
-    for font in chinese_fonts:
-        if font in available_fonts:
+    """设置中文字体：使用覆盖率索引中排名第一的字体（而不是逐个匹配字体名）
+
+    写入 rcParams 时持有 rc_lock，不会改动其他会话正在进行的隔离渲染（见 catalogs/rc_isolation.py）。
+    """
+    return apply_chinese_font(resolve_chinese_font())
+
+def apply_chinese_font(font: Optional[str]) -> str:
+    """把 resolve_chinese_font 选出的字体写入 rcParams（不访问 Streamlit 缓存，可在后台线程中调用）"""
+    with rc_lock:
+        if font is not None:
             # 确保字体在列表最前面，避免被覆盖
             current_fonts = plt.rcParams['font.sans-serif']
-            if font not in current_fonts or current_fonts[0] != font:
-                plt.rcParams['font.sans-serif'] = [font] + [f for f in current_fonts if f != font]
-            plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
+            _set_rc_if_changed('font.sans-serif', [font] + [f for f in current_fonts if f != font])
+            _set_rc_if_changed('axes.unicode_minus', False)  # 解决负号显示问题
             return font
-    
-    # 如果没有找到，使用通用设置
-    plt.rcParams['font.sans-serif'] = ['DejaVu Sans', 'Arial', 'sans-serif']
-    plt.rcParams['axes.unicode_minus'] = False
-    return 'sans-serif'
+        
+        # 如果没有找到，使用通用设置
+        _silence_missing_glyph_warnings()
+        _set_rc_if_changed('font.sans-serif', ['DejaVu Sans', 'Arial', 'sans-serif'])
+        _set_rc_if_changed('axes.unicode_minus', False)
+        return 'sans-serif'
 
 # 初始化中文字体（全局设置）
 _chinese_font_initialized = False
@@ -72,3 +99,83 @@ def generate_sample_data_steps(n_points: int = 20) -> Tuple[np.ndarray, np.ndarr
     y = np.sin(x) + np.random.randn(n_points) * 0.1
     return x, y
 
+
+@st.cache_resource
+def generate_large_series(n_points: int = 1_000_000) -> Tuple[np.ndarray, np.ndarray]:
+    """生成大数据量时间序列（正弦 + 随机游走），用 cache_resource 避免每次复制大数组"""
+    rng = np.random.default_rng(42)
+    x = np.linspace(0, 100, n_points)
+    y = np.sin(x) + np.cumsum(rng.standard_normal(n_points)) / np.sqrt(n_points) * 5
+    return x, y
+
+
+@st.cache_resource
+def generate_large_scatter(n_points: int = 1_000_000) -> Tuple[np.ndarray, np.ndarray]:
+    """生成大数据量散点（三个二维高斯簇的混合），用 cache_resource 避免每次复制大数组"""
+    rng = np.random.default_rng(42)
+    centers = np.array([[-2.0, -1.0], [1.5, 1.0], [0.0, 2.5]])
+    scales = np.array([[1.0, 0.6], [0.5, 1.2], [1.5, 0.3]])
+    cluster = rng.integers(0, len(centers), n_points)
+    points = centers[cluster] + rng.standard_normal((n_points, 2)) * scales[cluster]
+    return points[:, 0], points[:, 1]
+
+
+class _LazyTab:
+    """lazy_tabs 返回的标签页：用法与 st.tabs 的标签页相同（with tab: ...），额外保留未选中时的控件值
+
+    Streamlit 会在一次运行结束时清除本次没有渲染的控件状态，切回标签页时控件回到默认值。
+    标签页打开时记录其中新出现的 session_state 键；标签页未选中时，把这些键重新赋值为当前值，
+    使其成为普通的会话状态而不被清除，再次渲染控件时沿用原来的值。
+    """
+
+    def __init__(self, tab, keys: set):
+        self._tab = tab
+        self._keys = keys
+        self._before = None
+
+    def __getattr__(self, name):
+        return getattr(self._tab, name)
+
+    def __enter__(self):
+        self._tab.__enter__()
+        if is_tab_open(self._tab):
+            self._before = set(st.session_state.keys())
+        else:
+            for key in self._keys:
+                if key in st.session_state:
+                    try:
+                        st.session_state[key] = st.session_state[key]
+                    except st.errors.StreamlitAPIException:
+                        # 同名控件本次已在别处渲染，状态不会被清除
+                        pass
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._before is not None:
+            self._keys.update(key for key in st.session_state.keys()
+                              if key not in self._before and not key.startswith(_LAZY_TAB_KEYS))
+            self._before = None
+        return self._tab.__exit__(*exc_info)
+
+
+# session_state 中记录各标签页控件键的条目前缀
+_LAZY_TAB_KEYS = '_lazy_tab_keys'
+
+
+def lazy_tabs(labels: Sequence[str], key: str) -> List:
+    """创建只执行当前标签页的 st.tabs：切换标签页时重新运行，未选中的标签页 .open 为 False
+
+    未选中标签页中带 key 的控件保留其值（见 _LazyTab）。旧版本 Streamlit 不支持 key/on_change 参数时
+    退化为普通 st.tabs（所有标签页都会执行）。
+    """
+    try:
+        tabs = st.tabs(labels, key=key, on_change="rerun")
+    except TypeError:
+        return st.tabs(labels)
+    registry = st.session_state.setdefault(f'{_LAZY_TAB_KEYS}_{key}', [set() for _ in labels])
+    return [_LazyTab(tab, keys) for tab, keys in zip(tabs, registry)]
+
+
+def is_tab_open(tab) -> bool:
+    """标签页内容是否需要执行（没有 .open 属性的旧版本总是执行）"""
+    return getattr(tab, 'open', None) is not False
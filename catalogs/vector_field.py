@@ -0,0 +1,207 @@
+"""
+矢量场缓存 - 预先计算 quiver / streamplot 用到的场数据和流线几何，重跑页面时直接复用
+
+- 场数据 (X, Y, U, V) 按 (场, 网格大小) 缓存
+- streamplot 的耗时几乎全部花在流线积分上；积分结果（流线线段、颜色值和箭头位置）按
+  (场, 网格大小, density) 缓存，之后只需重新创建 LineCollection 和箭头，与直接调用 ax.streamplot 的效果相同
+- quiver 的箭头多边形在绘制时才根据坐标变换生成，只缓存场数据
+"""
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+import matplotlib.collections as mcollections
+import matplotlib.colors as mcolors
+import matplotlib.patches as mpatches
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.streamplot import StreamplotSet
+
+from catalogs.rc_isolation import rc_lock
+
+FIELD_GRID_SIZES = [10, 15, 20, 30, 40, 60, 80, 120]
+STREAM_DENSITIES = [0.5, 1.0, 1.5, 2.0, 3.0, 4.0]
+STREAM_LINEWIDTH = 2
+STREAM_ARROWSTYLE = '-|>'
+STREAM_ARROWSIZE = 1
+# 箭头颜色在积分时就已按颜色映射算好，因此色图固定
+STREAM_CMAP = 'viridis'
+MAX_FIELD_ENTRIES = 64
+
+
+class VectorField(NamedTuple):
+    """可选的矢量场：(U, V) = func(X, Y)，定义在 extent 范围内；expression 用于生成示例代码"""
+    label: str
+    func: Callable[[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]]
+    extent: Tuple[float, float]
+    expression: str
+
+
+class FieldGrid(NamedTuple):
+    X: np.ndarray
+    Y: np.ndarray
+    U: np.ndarray
+    V: np.ndarray
+
+
+class StreamGeometry(NamedTuple):
+    """一次 streamplot 积分的结果（数据坐标）"""
+    segments: np.ndarray      # (线段数, 2, 2)：按颜色值着色的短线段
+    values: np.ndarray        # 每个线段的颜色值
+    norm_range: Tuple[float, float]
+    arrows: np.ndarray        # (箭头数, 2, 2)：每个箭头的 (尾, 头)
+    arrow_colors: np.ndarray  # (箭头数, 4)：RGBA
+    extent: Tuple[float, float, float, float]
+    seconds: float            # 积分耗时
+
+
+VECTOR_FIELDS: Dict[str, VectorField] = {}
+
+
+def register_vector_field(name: str, label: str, extent: Tuple[float, float], expression: str):
+    """注册矢量场的装饰器"""
+    def decorator(func):
+        VECTOR_FIELDS[name] = VectorField(label, func, extent, expression)
+        return func
+    return decorator
+
+
+@register_vector_field('waves', "波动场 (cos x, sin y)", (0.0, 2 * np.pi), "np.cos(X), np.sin(Y)")
+def _waves(X, Y):
+    return np.cos(X), np.sin(Y)
+
+
+@register_vector_field('vortex', "涡旋 (-y, x)", (-3.0, 3.0), "-Y, X")
+def _vortex(X, Y):
+    return -Y, X
+
+
+@register_vector_field('saddle', "鞍点 (x, -y)", (-3.0, 3.0), "X, -Y")
+def _saddle(X, Y):
+    return X, -Y
+
+
+_cache: Dict[Tuple, object] = {}
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def _cached(key: Tuple, build: Callable[[], object]) -> Tuple[object, bool]:
+    with _lock:
+        value = _cache.get(key)
+        _stats['hits' if value is not None else 'misses'] += 1
+        if value is not None:
+            _cache[key] = _cache.pop(key)
+            return value, True
+    value = build()
+    with _lock:
+        _cache[key] = value
+        while len(_cache) > MAX_FIELD_ENTRIES:
+            del _cache[next(iter(_cache))]
+    return value, False
+
+
+def get_field_cache_info() -> Dict[str, int]:
+    """场数据与流线缓存的命中统计"""
+    with _lock:
+        return {**_stats, 'size': len(_cache)}
+
+
+def _readonly(*arrays: np.ndarray) -> None:
+    for array in arrays:
+        array.flags.writeable = False
+
+
+def _build_field(name: str, grid_size: int) -> FieldGrid:
+    x = np.linspace(*VECTOR_FIELDS[name].extent, grid_size)
+    X, Y = np.meshgrid(x, x)
+    U, V = (np.asarray(a, dtype=float) for a in VECTOR_FIELDS[name].func(X, Y))
+    field = FieldGrid(X, Y, U, V)
+    _readonly(*field)
+    return field
+
+
+def get_field(name: str, grid_size: int) -> FieldGrid:
+    """获取 (场, 网格大小) 的 X, Y, U, V（只读数组，可在会话间共享）"""
+    if name not in VECTOR_FIELDS:
+        raise ValueError(f"未知的矢量场: '{name}'，可选: {list(VECTOR_FIELDS)}")
+    field, _ = _cached(('field', name, int(grid_size)), lambda: _build_field(name, int(grid_size)))
+    return field
+
+
+def _integrate_streamlines(name: str, grid_size: int, density: float) -> StreamGeometry:
+    # 在不显示的 Figure 上运行一次 streamplot，取出数据坐标下的线段和箭头
+    # （创建 Figure 和 Axes 时持有 rc_lock，不会读到其他会话隔离渲染中的样式）
+    field = get_field(name, grid_size)
+    with rc_lock:
+        ax = Figure().subplots()
+    start = time.perf_counter()
+    stream = ax.streamplot(field.X, field.Y, field.U, field.V, density=density, color=field.U,
+                           linewidth=STREAM_LINEWIDTH, cmap=STREAM_CMAP, arrowstyle=STREAM_ARROWSTYLE,
+                           arrowsize=STREAM_ARROWSIZE)
+    seconds = time.perf_counter() - start
+    lines = stream.lines
+    arrows = [patch for patch in ax.patches if isinstance(patch, mpatches.FancyArrowPatch)]
+    segments = np.array(lines.get_segments(), dtype=float).reshape(-1, 2, 2)
+    geometry = StreamGeometry(
+        segments=segments,
+        values=np.asarray(lines.get_array(), dtype=float),
+        norm_range=(float(lines.norm.vmin), float(lines.norm.vmax)),
+        arrows=_arrow_positions(arrows, segments),
+        arrow_colors=np.array([patch.get_facecolor() for patch in arrows], dtype=float).reshape(-1, 4),
+        extent=(*lines.sticky_edges.x, *lines.sticky_edges.y),
+        seconds=seconds)
+    _readonly(geometry.segments, geometry.values, geometry.arrows, geometry.arrow_colors)
+    return geometry
+
+
+def _arrow_positions(arrows: List[mpatches.FancyArrowPatch], segments: np.ndarray) -> np.ndarray:
+    """streamplot 箭头的 (尾, 头)（数据坐标）
+
+    streamplot 把箭头放在流线的某个线段上：尾为线段起点，头为线段中点。去掉箭头样式和收缩后，
+    get_path() 给出数据坐标下的尾和头（经过一次显示坐标换算，有舍入误差），再对齐到起点和中点都最接近的线段
+    （流线中有重复的点，只比较起点会选中长度为 0 的线段），得到与 streamplot 完全相同的坐标。
+    这些箭头只在离屏 Figure 上使用，可以直接修改。
+    """
+    starts, midpoints = segments[:, 0], segments.mean(axis=1)
+    positions = np.empty((len(arrows), 2, 2))
+    for i, patch in enumerate(arrows):
+        patch.set_arrowstyle('-')
+        patch.shrinkA = patch.shrinkB = 0
+        vertices = patch.get_path().vertices
+        distance = np.sum((starts - vertices[0]) ** 2, axis=1) + np.sum((midpoints - vertices[-1]) ** 2, axis=1)
+        nearest = int(np.argmin(distance))
+        positions[i] = starts[nearest], midpoints[nearest]
+    return positions
+
+
+def get_stream_geometry(name: str, grid_size: int, density: float) -> Tuple[StreamGeometry, bool]:
+    """获取 (场, 网格大小, density) 的流线几何，返回 (几何, 是否命中缓存)"""
+    key = ('stream', name, int(grid_size), float(density))
+    return _cached(key, lambda: _integrate_streamlines(name, int(grid_size), float(density)))
+
+
+def add_cached_streamplot(ax, geometry: StreamGeometry) -> StreamplotSet:
+    """把缓存的流线几何重新添加到 ax（与 ax.streamplot(..., color=U, linewidth=2, cmap='viridis') 的效果相同）
+
+    返回的 StreamplotSet.arrows 是 FancyArrowPatch 列表：streamplot 返回的 PatchCollection 只是容器，
+    构造它要为每个箭头计算一次路径，这里省掉。箭头与 streamplot 一样用 add_patch 添加（会更新数据范围）。
+    """
+    norm = mcolors.Normalize(*geometry.norm_range)
+    lines = mcollections.LineCollection(geometry.segments, linewidth=STREAM_LINEWIDTH, zorder=2,
+                                        transform=ax.transData)
+    lines.sticky_edges.x[:] = geometry.extent[:2]
+    lines.sticky_edges.y[:] = geometry.extent[2:]
+    lines.set_array(geometry.values)
+    lines.set_cmap(STREAM_CMAP)
+    lines.set_norm(norm)
+    ax.add_collection(lines)
+    arrows: List[mpatches.FancyArrowPatch] = []
+    for (tail, head), color in zip(geometry.arrows, geometry.arrow_colors):
+        arrow = mpatches.FancyArrowPatch(tuple(tail), tuple(head), transform=ax.transData, zorder=2,
+                                         arrowstyle=STREAM_ARROWSTYLE, mutation_scale=10 * STREAM_ARROWSIZE,
+                                         linewidth=STREAM_LINEWIDTH, color=tuple(color))
+        ax.add_patch(arrow)
+        arrows.append(arrow)
+    ax.autoscale_view()
+    return StreamplotSet(lines, arrows)
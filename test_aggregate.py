@@ -0,0 +1,65 @@
+"""
+测试脚本：像素网格分箱与 np.histogram2d 的结果一致，范围宽度为 0 时不出现除以 0
+"""
+import sys
+import warnings
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+
+try:
+    from catalogs.aggregate import bin_2d_pixels, pad_range
+    from catalogs.density import density_scatter
+    print("✅ 成功导入 catalogs.aggregate 模块")
+except Exception as e:
+    print(f"❌ 导入失败: {e}")
+    sys.exit(1)
+
+
+def histogram_reference(x, y, shape, x_range, y_range):
+    counts, _, _ = np.histogram2d(x, y, bins=(shape[1], shape[0]), range=(pad_range(x_range), pad_range(y_range)))
+    return counts.T.astype(np.int64)
+
+
+try:
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal(100_000)
+    y = rng.standard_normal(100_000)
+    shape = (60, 80)
+    x_range = (float(x.min()), float(x.max()))
+    y_range = (float(y.min()), float(y.max()))
+    counts = bin_2d_pixels(x, y, shape, x_range, y_range)
+    assert counts.shape == shape and counts.sum() == len(x), "计数总数或形状不对"
+    assert np.array_equal(counts, histogram_reference(x, y, shape, x_range, y_range)), "与 np.histogram2d 不一致"
+    print("✅ 分箱结果与 np.histogram2d 一致（包括落在右/上边界上的点）")
+
+    # 范围宽度为 0：单个点、x 全相同、y 全相同
+    cases = {
+        "单个点": (np.array([2.0]), np.array([3.0])),
+        "x 全相同": (np.full(1000, 1.5), rng.standard_normal(1000)),
+        "y 全相同": (rng.standard_normal(1000), np.zeros(1000)),
+    }
+    for name, (cx, cy) in cases.items():
+        cx_range = (float(cx.min()), float(cx.max()))
+        cy_range = (float(cy.min()), float(cy.max()))
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            result = bin_2d_pixels(cx, cy, shape, cx_range, cy_range)
+        assert result.sum() == len(cx), f"{name}: 有点被丢弃 ({result.sum()} / {len(cx)})"
+        assert np.array_equal(result, histogram_reference(cx, cy, shape, cx_range, cy_range)), f"{name}: 与 np.histogram2d 不一致"
+    print("✅ 范围宽度为 0 时扩展 ±0.5，不出现除以 0，结果与 np.histogram2d 一致")
+
+    # 密度散点图的 extent 使用扩展后的范围
+    from matplotlib.figure import Figure
+    ax = Figure().subplots()
+    image = density_scatter(ax, np.full(10, 4.0), np.arange(10.0))
+    assert tuple(image.get_extent()) == (3.5, 4.5, 0.0, 9.0), f"extent 不对: {image.get_extent()}"
+    print("✅ 密度散点图的 extent 与分箱范围一致")
+
+    print("\n✅ 所有测试通过！")
+except Exception as e:
+    print(f"❌ 测试失败: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
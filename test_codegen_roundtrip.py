@@ -0,0 +1,117 @@
+"""
+测试脚本：在无界面环境下执行编辑器生成的代码，与 render_plot 的渲染结果逐像素比较
+"""
+import io
+import random
+import sys
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+from PIL import Image
+
+try:
+    from catalogs.codegen import generate_code, get_codegen_cache_info
+    from catalogs.interactive_editor import render_plot
+    from catalogs.plot_params import PlotParams
+    print("✅ 成功导入 catalogs.codegen / catalogs.interactive_editor 模块")
+except Exception as e:
+    print(f"❌ 导入失败: {e}")
+    sys.exit(1)
+
+# 参数空间：每个字段的候选取值（第一个为默认值）
+PARAM_SPACE = {
+    'chart_type': ['plot', 'scatter', 'bar', 'hist', 'box', 'pie'],
+    'subplot_rows': [1, 1, 2],
+    'subplot_cols': [1, 2],
+    # bmh / classic 的网格默认为虚线/点线，用来检查取默认值的参数没有被省略
+    'style_sheet': ['default', 'ggplot', 'seaborn-v0_8-darkgrid', 'bmh', 'classic'],
+    'figsize': [(8.0, 6.0), (5.0, 3.0)],
+    'facecolor': ['#FFFFFF', '#f0f0f0'],
+    'linewidth': [2.0, 0.5, 5.0],
+    'linestyle': ['-', '--', ':'],
+    'color': ['#1f77b4', '#d62728'],
+    'alpha': [1.0, 0.5],
+    'drawstyle': ['default', 'steps-mid'],
+    'capstyle': ['butt', 'round'],
+    'marker': [None, 'o', 's'],
+    'markersize': [6, 12],
+    'markerfacecolor': [None, '#2ca02c'],
+    'fillstyle': ['full', 'left'],
+    'n_points': [50, 1000],
+    # 降采样后的预览按设计只是近似（生成的代码绘制全部点），逐像素比较时关闭
+    'decimation': ['none'],
+    'xlim': [None, (1.0, 8.0)],
+    'grid': [False, True],
+    'grid_linestyle': ['-', '--'],
+    'spine_top': [True, False],
+    'spine_right': [True, False],
+    'title': ['', "It's a title"],
+    'title_fontweight': ['normal', 'bold'],
+    'title_color': [None, '#333333'],
+    'xlabel': ['', 'x'],
+    'ylabel_fontsize': [12, 16],
+    'ylabel': ['', 'sin(x)'],
+}
+N_SAMPLES = 30
+# 比较时使用较低的 dpi，加快测试
+COMPARE_DPI = 40
+
+
+def to_pixels(fig) -> np.ndarray:
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=COMPARE_DPI, bbox_inches='tight')
+    plt.close(fig)
+    return np.asarray(Image.open(buffer).convert('RGBA'))
+
+
+def run_generated_code(code: str):
+    """执行生成的代码并返回其 Figure（在 default 样式下执行，与 render_plot 的样式上下文一致）"""
+    plt.close('all')
+    with plt.style.context('default'):
+        namespace = {}
+        exec(compile(code.replace("plt.show()", ""), '<generated>', 'exec'), namespace)
+        return namespace['fig']
+
+
+def sample_params(rng: random.Random) -> PlotParams:
+    return PlotParams(**{name: rng.choice(values) for name, values in PARAM_SPACE.items()})
+
+
+try:
+    rng = random.Random(0)
+    # 样式表改掉了网格线型时，选择实线网格仍然得到实线
+    solid_grid = [PlotParams(style_sheet=style, grid=True, grid_linestyle='-', marker='o')
+                  for style in ('bmh', 'classic')]
+    for params in solid_grid:
+        fig = render_plot(params)
+        styles = {line.get_linestyle() for ax in fig.axes for line in ax.get_xgridlines() + ax.get_ygridlines()}
+        plt.close(fig)
+        assert styles == {'-'}, f"{params.style_sheet}: 网格线型为 {styles}"
+        assert "linestyle='-'" in generate_code(params), f"{params.style_sheet}: 生成的代码省略了网格线型"
+    print("✅ bmh / classic 样式下选择实线网格时，预览和生成的代码都使用实线")
+
+    samples = [PlotParams()] + solid_grid + [sample_params(rng) for _ in range(N_SAMPLES)]
+    for i, params in enumerate(samples):
+        code = generate_code(params)
+        expected = to_pixels(render_plot(params))
+        actual = to_pixels(run_generated_code(code))
+        assert expected.shape == actual.shape, f"样本 {i}: 图片尺寸不同 {expected.shape} vs {actual.shape}\n{code}"
+        diff = np.abs(expected.astype(int) - actual.astype(int)).max()
+        assert diff == 0, f"样本 {i}: 像素不一致（最大差值 {diff}）\n{params}\n{code}"
+    print(f"✅ {len(samples)} 组参数的生成代码与 render_plot 逐像素一致")
+
+    # 只修改标题时，其余片段直接命中缓存
+    before = get_codegen_cache_info()
+    generate_code(samples[1].replace(title='changed'))
+    after = get_codegen_cache_info()
+    assert after['misses'] - before['misses'] == 1, f"只应重新生成 text 片段: {before} -> {after}"
+    print("✅ 只修改标题时只重新生成 1 个片段")
+
+    print("\n✅ 所有测试通过！")
+except Exception as e:
+    print(f"❌ 测试失败: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,58 @@
+"""
+测试脚本：验证缓存的等高线路径和标签重新添加后与 ax.contour + ax.clabel 的图像完全一致
+"""
+import hashlib
+import io
+import sys
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+try:
+    from catalogs.contour_cache import (CONTOUR_FUNCTIONS, add_cached_contour, get_contour_cache_info,
+                                        get_contour_geometry)
+    print("✅ 成功导入 catalogs.contour_cache 模块")
+except Exception as e:
+    print(f"❌ 导入失败: {e}")
+    sys.exit(1)
+
+
+def render_png(draw) -> str:
+    fig = plt.figure(figsize=(8, 6))
+    draw(fig.add_subplot(111))
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=60)
+    plt.close(fig)
+    return hashlib.sha1(buffer.getvalue()).hexdigest()
+
+
+try:
+    for name, function in CONTOUR_FUNCTIONS.items():
+        # 同一网格先后使用两种等高线数量：第二次复用 marching squares 生成器
+        for grid_size, n_levels in [(200, 10), (200, 5)]:
+            x = np.linspace(*function.extent, grid_size)
+            X, Y = np.meshgrid(x, x)
+            Z = function.func(X, Y)
+
+            def draw_direct(ax):
+                contours = ax.contour(X, Y, Z, levels=n_levels, cmap='viridis')
+                ax.clabel(contours, inline=True, fontsize=8)
+
+            geometry, _ = get_contour_geometry(name, grid_size, n_levels)
+            assert render_png(lambda ax: add_cached_contour(ax, geometry)) == render_png(draw_direct), \
+                f"{name} {grid_size}×{grid_size} levels={n_levels}: 缓存几何的渲染结果与 contour + clabel 不同"
+        print(f"✅ {name}: 与 ax.contour + ax.clabel(inline=True) 的图像完全一致")
+
+    info = get_contour_cache_info()
+    assert info['grid_hits'] >= len(CONTOUR_FUNCTIONS), f"生成器没有被复用: {info}"
+    assert get_contour_geometry('gaussian', 200, 10)[1], "等高线几何未缓存"
+    print(f"✅ 生成器复用 {info['grid_hits']} 次，几何缓存命中")
+
+    print("\n✅ 所有测试通过！")
+except Exception as e:
+    print(f"❌ 测试失败: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
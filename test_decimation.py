@@ -0,0 +1,80 @@
+"""
+测试脚本：验证降采样模块保留了首尾点与极值
+"""
+import sys
+import numpy as np
+
+try:
+    from catalogs.decimation import DECIMATION_METHODS, decimate
+    print("✅ 成功导入 catalogs.decimation 模块")
+except Exception as e:
+    print(f"❌ 导入失败: {e}")
+    sys.exit(1)
+
+try:
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 100, 200_000)
+    y = np.cumsum(rng.standard_normal(len(x)))
+
+    for method in DECIMATION_METHODS:
+        x_dec, y_dec = decimate(x, y, 2000, method)
+        assert len(x_dec) <= 2000, f"{method}: 点数超出预算 ({len(x_dec)})"
+        assert x_dec[0] == x[0] and x_dec[-1] == x[-1], f"{method}: 未保留首尾点"
+        assert np.all(np.diff(x_dec) > 0), f"{method}: x 不再单调递增"
+        print(f"✅ {method}: {len(x):,} -> {len(x_dec):,} 个点")
+
+    # M4 必须保留全局最大值和最小值
+    _, y_m4 = decimate(x, y, 2000, 'm4')
+    assert y_m4.max() == y.max() and y_m4.min() == y.min(), "m4: 未保留全局极值"
+    print("✅ m4 保留全局极值")
+
+    # LTTB 与逐桶计算的参考实现选出完全相同的点
+    def reference_lttb(x, y, max_points):
+        n = len(x)
+        edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+        selected, prev = [0], 0
+        for i, (start, end) in enumerate(zip(edges[:-1], edges[1:])):
+            if i + 2 < len(edges):
+                nx, ny = x[end:edges[i + 2]].mean(), y[end:edges[i + 2]].mean()
+            else:
+                nx, ny = x[-1], y[-1]
+            area = np.abs((x[prev] - nx) * (y[start:end] - y[prev]) - (x[prev] - x[start:end]) * (ny - y[prev]))
+            prev = start + int(np.argmax(area))
+            selected.append(prev)
+        return np.array(selected + [n - 1])
+
+    for n, budget in [(50_000, 500), (200_000, 2000), (1001, 997)]:
+        xs = np.sort(rng.random(n))
+        ys = np.cumsum(rng.standard_normal(n))
+        idx = DECIMATION_METHODS['lttb'](xs, ys, budget)
+        assert np.array_equal(idx, reference_lttb(xs, ys, budget)), f"lttb: 与参考实现不同 (n={n}, budget={budget})"
+    print("✅ lttb 与逐桶参考实现选出相同的点")
+
+    # 桶之间的依次计算是可接受的开销：远小于直接绘制全部数据
+    import io
+    import time
+    from matplotlib.figure import Figure
+    x_big = np.arange(1_000_000, dtype=float)
+    y_big = np.cumsum(rng.standard_normal(len(x_big)))
+    start = time.perf_counter()
+    DECIMATION_METHODS['lttb'](x_big, y_big, 2500)
+    lttb_seconds = time.perf_counter() - start
+    fig = Figure(figsize=(8, 4))
+    fig.subplots().plot(x_big, y_big)
+    start = time.perf_counter()
+    fig.savefig(io.BytesIO(), format='png', dpi=200)
+    draw_seconds = time.perf_counter() - start
+    assert lttb_seconds < draw_seconds, f"lttb ({lttb_seconds:.3f}s) 比直接绘制 ({draw_seconds:.3f}s) 还慢"
+    print(f"✅ lttb 1e6 点 / 2500 桶 {lttb_seconds * 1000:.0f} ms，直接绘制并编码 {draw_seconds * 1000:.0f} ms")
+
+    # 点数未超出预算时原样返回
+    x_small, _ = decimate(x[:100], y[:100], 2000, 'lttb')
+    assert len(x_small) == 100
+    print("✅ 小数据量原样返回")
+
+    print("\n✅ 所有测试通过！")
+except Exception as e:
+    print(f"❌ 测试失败: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
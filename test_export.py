@@ -0,0 +1,65 @@
+"""
+测试脚本：导出缓存键包含格式、dpi 和库版本；大尺寸高 dpi 导出在后台进行时，其他线程创建图不被阻塞
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault('MPL_TEACH_CACHE_DIR', tempfile.mkdtemp(prefix='mpl_teach_export_'))
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+try:
+    from catalogs import render_cache
+    from catalogs.export import export_figure, get_export_key
+    from catalogs.interactive_editor import render_plot, resolve_render_settings
+    from catalogs.plot_params import PlotParams
+    from catalogs.rc_isolation import locked_subplots
+    print("✅ 成功导入 catalogs.export 模块")
+except Exception as e:
+    print(f"❌ 导入失败: {e}")
+    sys.exit(1)
+
+
+try:
+    # 缓存键：格式、dpi、库版本任一不同都是不同的键
+    key = get_export_key('params', 'png', 300)
+    assert key == get_export_key('params', 'png', 300), "同样的参数得到了不同的键"
+    assert len({key, get_export_key('params', 'pdf', 300), get_export_key('params', 'png', 600),
+                get_export_key('other', 'png', 300)}) == 4, "格式、dpi 或参数不同时键相同"
+    versions = render_cache.get_library_versions
+    render_cache.get_library_versions = lambda: versions() + ';mpl=0.0.0'
+    try:
+        assert get_export_key('params', 'png', 300) != key, "库版本变化后导出缓存键不变"
+    finally:
+        render_cache.get_library_versions = versions
+    print("✅ 导出缓存键包含格式、dpi 和库版本")
+
+    # 10×10 英寸、600 dpi 的导出在后台线程中绘制时，另一个线程创建图的等待时间
+    params = PlotParams(figsize=(10.0, 10.0), grid=True, title='export', marker='o', n_points=200)
+    settings = resolve_render_settings(params)
+    exporting = threading.Thread(target=export_figure, args=(lambda: render_plot(params, settings), 'png', 600))
+    exporting.start()
+    time.sleep(0.3)
+    waits = []
+    while exporting.is_alive():
+        start = time.perf_counter()
+        fig, _ = locked_subplots(figsize=(2, 2))
+        waits.append(time.perf_counter() - start)
+        plt.close(fig)
+        time.sleep(0.05)
+    exporting.join()
+    assert waits and max(waits) < 0.5, f"导出期间创建图最多等待了 {max(waits, default=0):.2f}s"
+    assert len(waits) >= 3, f"导出过快（只测量了 {len(waits)} 次），无法检查是否阻塞"
+    print(f"✅ 导出期间创建了 {len(waits)} 次图，最长等待 {max(waits) * 1000:.1f}ms")
+
+    print("\n✅ 所有测试通过！")
+except Exception as e:
+    print(f"❌ 测试失败: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,164 @@
+"""
+测试脚本：图像金字塔各层的尺寸和数值（2×2 平均）正确，按窗口选层和读取的结果与直接缩小原图一致
+"""
+import io
+import os
+import sys
+import tempfile
+
+os.environ.setdefault('MPL_TEACH_CACHE_DIR', tempfile.mkdtemp(prefix='mpl_teach_pyramid_'))
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+
+try:
+    from catalogs import image_pyramid
+    from catalogs.image_pyramid import (
+        MIN_LEVEL_SIZE, build_pyramid, choose_level, get_view_window, read_view
+    )
+    from catalogs.render_cache import get_cache_dir
+    print("✅ 成功导入 catalogs.image_pyramid 模块")
+except Exception as e:
+    print(f"❌ 导入失败: {e}")
+    sys.exit(1)
+
+
+def downsample(array, factor):
+    """直接把原图按 factor×factor 求平均（与金字塔逐级 2×2 平均等价）"""
+    h, w = array.shape[0] // factor, array.shape[1] // factor
+    return array[:h * factor, :w * factor].astype(np.float64).reshape(h, factor, w, factor, *array.shape[2:]).mean(axis=(1, 3))
+
+
+try:
+    size = 2048
+    pyramid = image_pyramid.get_synthetic_pyramid.__wrapped__(size)
+    shapes = [level.shape for level in pyramid.levels]
+    expected_shapes = []
+    side = size
+    while True:
+        expected_shapes.append((side, side))
+        if side <= MIN_LEVEL_SIZE:
+            break
+        side //= 2
+    assert shapes == expected_shapes, f"层尺寸不对: {shapes}"
+    assert all(isinstance(level, np.memmap) and not level.flags.writeable for level in pyramid.levels), "各层应为只读内存映射"
+    print(f"✅ 合成图像金字塔共 {len(shapes)} 层: {shapes[0]} → {shapes[-1]}，均为只读内存映射")
+
+    level0 = np.array(pyramid.levels[0])
+    assert np.isfinite(level0).all() and level0.std() > 0.1, "合成图像内容异常"
+    for index, level in enumerate(pyramid.levels[1:], start=1):
+        assert np.allclose(level, downsample(level0, 2**index), atol=1e-5), f"第 {index} 层不是原图的平均"
+    print("✅ 每一层都等于原图按 2^k×2^k 求平均")
+
+    # 再次获取时直接打开已有文件，临时目录不会残留
+    again = image_pyramid.get_synthetic_pyramid.__wrapped__(size)
+    assert [level.filename for level in again.levels] == [level.filename for level in pyramid.levels]
+    leftovers = [path.name for path in get_cache_dir('image_pyramids').iterdir() if path.name.endswith('.tmp')]
+    assert not leftovers, f"临时目录残留: {leftovers}"
+    print("✅ 再次获取时复用磁盘上的金字塔，没有残留临时目录")
+
+    # 窗口计算：不超出图像，放大倍数越大窗口越小
+    assert get_view_window((size, size), 1, (0.5, 0.5)) == (0, size, 0, size)
+    x0, x1, y0, y1 = get_view_window((size, size), 4, (0.99, 0.0))
+    assert (x1 - x0, y1 - y0) == (size // 4, size // 4) and x1 == size and y0 == 0, "窗口超出图像"
+    print("✅ 缩放/平移窗口计算正确")
+
+    # 选层：所选层在窗口内的像素数不少于显示像素数，再粗一层则不够
+    display = (300, 400)
+    for zoom in [1, 2, 4, 8, 16]:
+        window = get_view_window((size, size), zoom, (0.37, 0.61))
+        level = choose_level(pyramid, window, display)
+        width = window[1] - window[0]
+        assert width / 2**level >= display[1] or level == 0, f"{zoom}×: 第 {level} 层像素不足"
+        assert width / 2**(level + 1) < display[1] or level == len(pyramid.levels) - 1, f"{zoom}×: 第 {level} 层过细"
+
+        view = read_view(pyramid, window, level)
+        scale = 2**level
+        left, right, bottom, top = view.extent
+        assert left <= window[0] and right >= window[1] and top <= window[2] and bottom >= window[3], "读取范围未覆盖窗口"
+        assert view.data.shape[:2] == ((bottom - top) // scale, (right - left) // scale)
+        expected = downsample(level0, scale)[top // scale:bottom // scale, left // scale:right // scale]
+        assert np.allclose(view.data, expected, atol=1e-5), f"{zoom}×: 读取的窗口与直接缩小原图不同"
+    print("✅ 各放大倍数下选层正确，读取的窗口与直接缩小原图一致")
+
+    # 上传的 RGB 图片保持 uint8，奇数尺寸时丢弃最后一行/列
+    from PIL import Image
+    rng = np.random.default_rng(0)
+    rgb = rng.integers(0, 256, size=(601, 1203, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(rgb).save(buffer, format='PNG')
+    uploaded = image_pyramid.get_uploaded_pyramid.__wrapped__(buffer.getvalue(), 'random.png')
+    assert uploaded.levels[0].dtype == np.uint8 and np.array_equal(uploaded.levels[0], rgb), "上传图片的第 0 层与原图不同"
+    assert [level.shape for level in uploaded.levels] == [(601, 1203, 3), (300, 601, 3), (150, 300, 3), (75, 150, 3)]
+    assert np.abs(uploaded.levels[2].astype(int) - np.rint(downsample(rgb, 4)).astype(int)).max() <= 1, "RGB 金字塔数值不对"
+    print("✅ 上传的 RGB 图片按 uint8 保存，各层尺寸和数值正确")
+
+    # 调色板图片按行分块转换为 RGB，与整张转换的结果相同
+    palette = Image.fromarray(rng.integers(0, 256, size=(700, 333), dtype=np.uint8)).convert('P', colors=16)
+    buffer = io.BytesIO()
+    palette.save(buffer, format='PNG')
+    uploaded = image_pyramid.get_uploaded_pyramid.__wrapped__(buffer.getvalue(), 'palette.png')
+    assert np.array_equal(uploaded.levels[0], np.asarray(palette.convert('RGB'))), "调色板图片分块转换的结果不对"
+    print("✅ 调色板图片按行分块转换为 RGB，与整张转换的结果相同")
+
+    # 16 位灰度图按整图的最小、最大值缩放到 0-255，而不是截断到 255
+    deep = rng.integers(1000, 5000, size=(600, 257)).astype(np.uint16)
+    deep[0, 0], deep[-1, -1] = 1000, 4999
+    buffer = io.BytesIO()
+    Image.fromarray(deep).save(buffer, format='PNG')
+    assert Image.open(io.BytesIO(buffer.getvalue())).mode.startswith('I'), "测试图片不是高位深模式"
+    uploaded = image_pyramid.get_uploaded_pyramid.__wrapped__(buffer.getvalue(), 'deep.png')
+    expected = np.rint((deep.astype(np.float64) - 1000) * (255 / 3999)).astype(np.uint8)
+    assert uploaded.levels[0].dtype == np.uint8 and uploaded.levels[0].ndim == 2, "16 位灰度图没有保存为 uint8 灰度"
+    assert np.array_equal(uploaded.levels[0], expected), "16 位灰度图的缩放结果不对"
+    print("✅ 16 位灰度图按数值范围缩放到 0-255，没有被截断")
+
+    # 超过像素上限的图片被拒绝，不会生成金字塔
+    original_limit = image_pyramid.MAX_UPLOAD_PIXELS
+    pillow_limit = Image.MAX_IMAGE_PIXELS
+    image_pyramid.MAX_UPLOAD_PIXELS = 100_000
+    try:
+        buffer = io.BytesIO()
+        Image.new('L', (400, 300)).save(buffer, format='PNG')
+        try:
+            image_pyramid.get_uploaded_pyramid.__wrapped__(buffer.getvalue(), 'big.png')
+            raise AssertionError("超过像素上限的图片没有被拒绝")
+        except ValueError as e:
+            assert "上限" in str(e), f"提示信息不对: {e}"
+    finally:
+        image_pyramid.MAX_UPLOAD_PIXELS = original_limit
+    assert Image.MAX_IMAGE_PIXELS == pillow_limit, "Pillow 的全局像素上限被修改"
+    print("✅ 超过像素上限的图片被拒绝，Pillow 的全局设置不变")
+
+    # 磁盘上只保留最近使用的 MAX_UPLOAD_PYRAMIDS 个上传图片的金字塔
+    uploads = []
+    for i in range(image_pyramid.MAX_UPLOAD_PYRAMIDS + 3):
+        buffer = io.BytesIO()
+        Image.new('L', (40, 30), color=i).save(buffer, format='PNG')
+        uploads.append(image_pyramid.get_uploaded_pyramid.__wrapped__(buffer.getvalue(), f'{i}.png'))
+    names = {path.name for path in get_cache_dir('image_pyramids').iterdir() if 'upload-' in path.name}
+    assert len(names) == image_pyramid.MAX_UPLOAD_PYRAMIDS, f"上传图片的金字塔没有淘汰: {len(names)} 个"
+    assert {f"v{image_pyramid.PYRAMID_VERSION}-{pyramid.key}" for pyramid in uploads[-image_pyramid.MAX_UPLOAD_PYRAMIDS:]} == names, \
+        "淘汰的不是最早的金字塔"
+    assert np.array_equal(uploads[0].levels[0], np.zeros((30, 40))), "已打开的金字塔在淘汰后无法读取"
+    print(f"✅ 磁盘上只保留最近的 {image_pyramid.MAX_UPLOAD_PYRAMIDS} 个上传图片金字塔，已打开的不受影响")
+
+    # 构建失败时不会留下不完整的金字塔
+    def fail(level0):
+        raise RuntimeError("boom")
+    try:
+        build_pyramid('broken', 'broken', (64, 64), np.float32, fail)
+        raise AssertionError("构建失败没有报错")
+    except RuntimeError:
+        pass
+    names = [path.name for path in get_cache_dir('image_pyramids').iterdir()]
+    assert not any('broken' in name for name in names), f"构建失败后残留文件: {names}"
+    print("✅ 构建失败时不留下不完整的金字塔")
+
+    print("\n✅ 所有测试通过！")
+except Exception as e:
+    print(f"❌ 测试失败: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,61 @@
+"""
+测试脚本：布局缓存的签名包含实际使用的字体——只切换 font.sans-serif 时不会套用另一种字体下求解的布局
+"""
+import os
+import sys
+import warnings
+
+os.environ['MPL_TEACH_VERIFY_LAYOUT'] = '1'
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+from matplotlib.figure import Figure
+
+try:
+    from catalogs.layout_cache import enable_layout_cache, get_layout_cache_info, tight_layout
+    print("✅ 成功导入 catalogs.layout_cache 模块")
+except Exception as e:
+    print(f"❌ 导入失败: {e}")
+    sys.exit(1)
+
+FONTS = (['DejaVu Sans'], ['DejaVu Sans Mono'])
+
+
+def layout(font, engine: str):
+    """在 font.sans-serif=font 下创建同样的图并求解布局，返回 subplotpars 或各 Axes 的位置"""
+    with matplotlib.rc_context({'font.family': 'sans-serif', 'font.sans-serif': font}):
+        fig = Figure(figsize=(4, 3), layout='constrained' if engine == 'constrained' else None)
+        axes = fig.subplots(1, 2)
+        for ax in axes:
+            ax.plot(np.arange(10), np.arange(10) * 12345.0)
+            ax.set_ylabel('amplitude / units')
+            ax.set_title('signal')
+        if engine == 'constrained':
+            enable_layout_cache(fig)
+            fig.draw_without_rendering()
+            return [tuple(ax.get_position().bounds) for ax in axes]
+        tight_layout(fig)
+        return (fig.subplotpars.left, fig.subplotpars.right, fig.subplotpars.wspace)
+
+
+try:
+    for engine in ('tight', 'constrained'):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            first = [layout(font, engine) for font in FONTS]
+            second = [layout(font, engine) for font in FONTS]
+        assert first[0] != first[1], f"{engine}: 两种字体的布局相同，测试无法区分"
+        assert second == first, f"{engine}: 再次求解的结果与第一次不同"
+        print(f"✅ {engine}: 切换 font.sans-serif 后布局不同，再次渲染时各自命中缓存")
+    info = get_layout_cache_info()
+    assert info['mismatches'] == 0, f"校验模式发现 {info['mismatches']} 次缓存不一致"
+    assert info['hits'] >= 4, f"缓存没有命中（{info}）"
+    print(f"✅ 校验模式下没有发现不一致（{info}）")
+
+    print("\n✅ 所有测试通过！")
+except Exception as e:
+    print(f"❌ 测试失败: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
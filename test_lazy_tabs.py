@@ -0,0 +1,73 @@
+"""
+测试脚本：lazy_tabs 只执行当前标签页，切到其他标签页再切回来时，（包括嵌套标签页中的）控件保留原来的值
+"""
+import sys
+
+try:
+    from streamlit.testing.v1 import AppTest
+    print("✅ 成功导入 streamlit.testing")
+except Exception as e:
+    print(f"❌ 导入失败: {e}")
+    sys.exit(1)
+
+
+def tabs_app():
+    import streamlit as st
+    from catalogs.utils import is_tab_open, lazy_tabs
+
+    outer = lazy_tabs(["A", "B"], key="outer")
+    with outer[0]:
+        if is_tab_open(outer[0]):
+            value = st.slider("value", 0, 10, 3, key='value')
+            inner = lazy_tabs(["x", "y"], key="inner")
+            with inner[0]:
+                if is_tab_open(inner[0]):
+                    choice = st.selectbox("choice", ['a', 'b', 'c'], key='choice')
+                    st.write(f"value={value} choice={choice}")
+            with inner[1]:
+                if is_tab_open(inner[1]):
+                    st.write("y open")
+    with outer[1]:
+        if is_tab_open(outer[1]):
+            st.write("B open")
+
+
+def texts(at):
+    return [markdown.value for markdown in at.markdown]
+
+
+try:
+    at = AppTest.from_function(tabs_app)
+    at.run()
+    assert texts(at) == ['value=3 choice=a'], f"初始渲染错误: {texts(at)}"
+    at.slider(key='value').set_value(8)
+    at.selectbox(key='choice').set_value('c')
+    at.run()
+    assert texts(at) == ['value=8 choice=c'], f"修改控件后渲染错误: {texts(at)}"
+
+    # 切到 B 并多运行几次（未渲染的控件状态本应在运行结束时被清除），再切回 A
+    at.session_state['outer'] = 'B'
+    at.run()
+    assert texts(at) == ['B open'], f"未选中的标签页被执行: {texts(at)}"
+    at.run()
+    at.session_state['outer'] = 'A'
+    at.run()
+    assert texts(at) == ['value=8 choice=c'], f"切回标签页后控件值丢失: {texts(at)}"
+    print("✅ 切换外层标签页后控件保留原来的值")
+
+    # 只切换嵌套的标签页
+    at.session_state['inner'] = 'y'
+    at.run()
+    at.run()
+    at.session_state['inner'] = 'x'
+    at.run()
+    assert texts(at) == ['value=8 choice=c'], f"切回嵌套标签页后控件值丢失: {texts(at)}"
+    assert not at.exception, f"运行出错: {[e.value for e in at.exception]}"
+    print("✅ 切换嵌套标签页后控件保留原来的值")
+
+    print("\n✅ 所有测试通过！")
+except Exception as e:
+    print(f"❌ 测试失败: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,168 @@
+"""
+测试脚本：多个线程同时用不同样式表渲染时，每张图使用的 rcParams 都与单独渲染时完全相同，
+结束后全局 rcParams 恢复原状；像应用一样在样式代码块外编码（后台完整分辨率渲染、导出）时结果同样不变，
+且编码绘制期间不会阻塞其他线程
+"""
+import hashlib
+import io
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.artist import Artist
+from matplotlib.figure import Figure
+
+try:
+    from catalogs.encoders import encode_figure
+    from catalogs.interactive_editor import render_plot
+    from catalogs.plot_params import PlotParams
+    from catalogs.rc_isolation import attach_figure_rc, isolated_style, locked_subplots, rc_fingerprint
+    from catalogs.utils import setup_chinese_font
+    print("✅ 成功导入 catalogs.rc_isolation 模块")
+except Exception as e:
+    print(f"❌ 导入失败: {e}")
+    sys.exit(1)
+
+STYLES = [style for style in ['default', 'ggplot', 'dark_background', 'classic', 'bmh',
+                               'fivethirtyeight', 'grayscale', 'seaborn-v0_8-darkgrid', 'seaborn-v0_8-paper',
+                               'seaborn-v0_8-poster', 'seaborn-v0_8-talk']
+          if style == 'default' or style in plt.style.available]
+N_RENDERS = 120
+
+
+class PausingArtist(Artist):
+    """绘制到这个 artist 时通知测试并暂停，模拟一次耗时很长的编码"""
+
+    def __init__(self, started: threading.Event, resume: threading.Event):
+        super().__init__()
+        self.started = started
+        self.resume = resume
+
+    def draw(self, renderer):
+        self.started.set()
+        self.resume.wait(timeout=10)
+
+
+def render(style):
+    """与交互编辑器一样：进入样式后重新设置中文字体，再创建并绘制图表；返回 (rc 指纹, PNG 哈希)"""
+    with isolated_style(style, rc={'lines.linewidth': 2.5}):
+        setup_chinese_font()
+        fingerprint = rc_fingerprint()
+        fig = Figure(figsize=(3, 2))
+        ax = fig.subplots()
+        x = np.linspace(0, 10, 50)
+        for i in range(3):
+            ax.plot(x, np.sin(x + i))
+        ax.set_title(style)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', dpi=50)
+    return fingerprint, hashlib.sha1(buffer.getvalue()).hexdigest()
+
+
+def render_like_app(style, encode_inside: bool = False):
+    """与应用一样：编辑器在样式代码块内创建并绘制，返回后才在代码块外编码；style 为 None 时是
+    普通章节的图（locked_subplots 创建，不进入样式）。encode_inside=True 时整个过程都在样式内（参照结果）。
+    返回 PNG 哈希"""
+    if encode_inside and style is not None:
+        with isolated_style(style):
+            setup_chinese_font()
+            return render_like_app(style)
+    if style is None:
+        fig, ax = locked_subplots(figsize=(3, 2))
+        ax.plot([0, 1, 2], [0, 1, 0])
+        ax.set_title('plain')
+    else:
+        fig = render_plot(PlotParams(style_sheet=style, figsize=(3.0, 2.0), grid=True, title=style,
+                                     xlabel='x', marker='o', n_points=30))
+    data = encode_figure(fig, 'png', dpi=50, settings={}).data
+    plt.close(fig)
+    return hashlib.sha1(data).hexdigest()
+
+
+try:
+    setup_chinese_font()
+    initial = rc_fingerprint()
+
+    # 单线程依次渲染，得到每个样式的预期结果
+    expected = {style: render(style) for style in STYLES}
+    assert len({fingerprint for fingerprint, _ in expected.values()}) == len(STYLES), "不同样式的 rc 指纹相同"
+    assert rc_fingerprint() == initial, "单线程渲染后全局 rcParams 未恢复"
+    print(f"✅ {len(STYLES)} 个样式的预期结果各不相同，渲染后全局 rcParams 已恢复")
+
+    # 多线程同时渲染随机样式
+    rng = random.Random(0)
+    styles = [rng.choice(STYLES) for _ in range(N_RENDERS)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(render, styles))
+    for style, (fingerprint, png) in zip(styles, results):
+        assert fingerprint == expected[style][0], f"{style}: 并发渲染时 rcParams 被其他线程修改"
+        assert png == expected[style][1], f"{style}: 并发渲染的图像与单独渲染时不同"
+    print(f"✅ {N_RENDERS} 次并发渲染的 rc 指纹和图像都与单独渲染时一致")
+
+    assert rc_fingerprint() == initial, "并发渲染后全局 rcParams 未恢复"
+    print("✅ 并发渲染后全局 rcParams 已恢复")
+
+    # 在样式代码块外编码（与预览草稿、后台完整分辨率渲染和导出相同），并混入不使用样式的普通图
+    app_styles = STYLES + [None]
+    expected_app = {style: render_like_app(style, encode_inside=True) for style in app_styles}
+    assert len(set(expected_app.values())) == len(app_styles), "不同样式的图像相同"
+    styles = [rng.choice(app_styles) for _ in range(N_RENDERS)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(render_like_app, styles))
+    for style, png in zip(styles, results):
+        assert png == expected_app[style], f"{style}: 在代码块外编码时图像与单独渲染时不同"
+    assert rc_fingerprint() == initial, "代码块外编码后全局 rcParams 未恢复"
+    print(f"✅ {N_RENDERS} 次在代码块外编码的并发渲染（含普通图）都与单独渲染时一致")
+
+    # 编码绘制期间不持有 rc_lock：另一个线程仍可创建图、进入样式，全局 rcParams 也不受编码中的图影响
+    started, resume = threading.Event(), threading.Event()
+    with isolated_style('dark_background'):
+        fig = Figure(figsize=(3, 2))
+        fig.subplots().plot([0, 1], [1, 0])
+        fig.add_artist(PausingArtist(started, resume))
+        attach_figure_rc(fig)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        encoding = pool.submit(encode_figure, fig, 'png', 50, {})
+        assert started.wait(timeout=10), "编码没有开始绘制"
+        start = time.perf_counter()
+        other, _ = locked_subplots(figsize=(2, 2))
+        plt.close(other)
+        with isolated_style('ggplot'):
+            pass
+        waited = time.perf_counter() - start
+        assert rc_fingerprint() == initial, "编码中的图的 rcParams 泄漏到了其他线程"
+        resume.set()
+        encoding.result(timeout=10)
+    assert waited < 1.0, f"编码绘制期间其他线程等待了 {waited:.2f}s"
+    print(f"✅ 编码绘制期间其他线程创建图和进入样式不被阻塞（{waited * 1000:.1f}ms），全局 rcParams 不受影响")
+
+    # 代码块内对 rcParams 的修改（包括异常退出）同样会被撤销
+    try:
+        with isolated_style('ggplot'):
+            plt.rcParams['axes.titlesize'] = 30
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert rc_fingerprint() == initial, "异常退出后全局 rcParams 未恢复"
+    print("✅ 代码块内的修改在退出（含异常）后被撤销")
+
+    # 未知样式表
+    try:
+        with isolated_style('no-such-style'):
+            pass
+        raise AssertionError("未知样式表没有报错")
+    except ValueError:
+        print("✅ 未知样式表报错")
+
+    print("\n✅ 所有测试通过！")
+except Exception as e:
+    print(f"❌ 测试失败: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
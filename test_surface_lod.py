@@ -0,0 +1,60 @@
+"""
+测试脚本：验证 LOD 曲面用缓存几何绘制的结果与 plot_surface 完全一致，且分辨率随预算单调变化
+"""
+import hashlib
+import io
+import sys
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+try:
+    from catalogs.surface import (SURFACE_FUNCTIONS, SURFACE_RESOLUTIONS, choose_resolution, get_surface_mesh,
+                                  plot_lod_surface, record_surface_timing)
+    print("✅ 成功导入 catalogs.surface 模块")
+except Exception as e:
+    print(f"❌ 导入失败: {e}")
+    sys.exit(1)
+
+
+def render_png(draw) -> str:
+    fig = plt.figure(figsize=(5, 4))
+    ax = fig.add_subplot(111, projection='3d')
+    fig.colorbar(draw(ax), ax=ax)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=60)
+    plt.close(fig)
+    return hashlib.sha1(buffer.getvalue()).hexdigest()
+
+
+try:
+    for name in SURFACE_FUNCTIONS:
+        mesh, _ = get_surface_mesh(name, 40)
+        assert mesh.n_faces == 39 * 39, f"{name}: 面数错误 ({mesh.n_faces})"
+        expected = render_png(lambda ax: ax.plot_surface(mesh.X, mesh.Y, mesh.Z, rstride=1, cstride=1,
+                                                         cmap='viridis', alpha=0.9))
+        actual = render_png(lambda ax: plot_lod_surface(ax, mesh, cmap='viridis', alpha=0.9))
+        assert actual == expected, f"{name}: 缓存几何的渲染结果与 plot_surface 不同"
+        print(f"✅ {name}: 与 plot_surface(rstride=1, cstride=1) 的图像完全一致")
+
+    # 缓存命中时返回同一份只读几何
+    mesh, hit = get_surface_mesh('ripple', 40)
+    assert hit and get_surface_mesh('ripple', 40)[0] is mesh
+    assert not mesh.polys.flags.writeable
+    print("✅ 网格缓存命中，几何数组只读")
+
+    # 预算越高，选择的分辨率越高
+    for n_faces, seconds in [(2_000, 0.2), (40_000, 0.6), (160_000, 2.0)]:
+        record_surface_timing('test', n_faces, seconds)
+    chosen = [choose_resolution(budget, 'test') for budget in (0.01, 0.3, 0.8, 1.5, 10)]
+    assert chosen == sorted(chosen), f"分辨率没有随预算单调增加: {chosen}"
+    assert chosen[0] == SURFACE_RESOLUTIONS[0] and chosen[-1] == SURFACE_RESOLUTIONS[-1]
+    print(f"✅ 预算 10 ms → 10 s 选择的分辨率: {chosen}")
+
+    print("\n✅ 所有测试通过！")
+except Exception as e:
+    print(f"❌ 测试失败: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,49 @@
+"""
+测试脚本：验证缓存的流线几何重新添加后与直接调用 streamplot 的图像完全一致
+"""
+import hashlib
+import io
+import sys
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+try:
+    from catalogs.vector_field import VECTOR_FIELDS, add_cached_streamplot, get_field, get_stream_geometry
+    print("✅ 成功导入 catalogs.vector_field 模块")
+except Exception as e:
+    print(f"❌ 导入失败: {e}")
+    sys.exit(1)
+
+
+def render_png(draw, figsize) -> str:
+    fig, ax = plt.subplots(figsize=figsize)
+    draw(ax)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=60)
+    plt.close(fig)
+    return hashlib.sha1(buffer.getvalue()).hexdigest()
+
+
+try:
+    for name in VECTOR_FIELDS:
+        field = get_field(name, 20)
+        geometry, hit = get_stream_geometry(name, 20, 1.5)
+        assert not hit and get_stream_geometry(name, 20, 1.5)[0] is geometry, f"{name}: 流线几何未缓存"
+        # 箭头的数据范围与显示尺寸有关，换几种 Figure 尺寸比较；不同 density 下流线中会出现重复的点
+        for density, figsize in [(1.5, (8, 6)), (1.5, (3, 2)), (0.5, (8, 6)), (4.0, (8, 6))]:
+            cached = get_stream_geometry(name, 20, density)[0]
+            expected = render_png(lambda ax: ax.streamplot(field.X, field.Y, field.U, field.V, density=density,
+                                                           color=field.U, linewidth=2, cmap='viridis'), figsize)
+            actual = render_png(lambda ax: add_cached_streamplot(ax, cached), figsize)
+            assert actual == expected, f"{name} density={density} {figsize}: 缓存几何的渲染结果与 streamplot 不同"
+        print(f"✅ {name}: {len(geometry.segments):,} 个线段、{len(geometry.arrows)} 个箭头，"
+              f"各 density 和 Figure 尺寸下都与 streamplot 的图像完全一致")
+
+    print("\n✅ 所有测试通过！")
+except Exception as e:
+    print(f"❌ 测试失败: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)